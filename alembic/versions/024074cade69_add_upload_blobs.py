@@ -0,0 +1,47 @@
+"""Add upload_blobs for content-addressed uploads
+
+Revision ID: 024074cade69
+Revises: 7a3647e50a82
+Create Date: 2026-10-19 15:21:47.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '024074cade69'
+down_revision: Union[str, Sequence[str], None] = '7a3647e50a82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNREFERENCED_PREDICATE = sa.text("ref_count = 0")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upload_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('unreferenced_since', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    op.create_index(op.f('ix_upload_blobs_id'), 'upload_blobs', ['id'], unique=False)
+    op.create_index(
+        'ix_upload_blobs_unreferenced', 'upload_blobs', ['unreferenced_since'], unique=False,
+        postgresql_where=UNREFERENCED_PREDICATE, sqlite_where=UNREFERENCED_PREDICATE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_upload_blobs_unreferenced', table_name='upload_blobs')
+    op.drop_index(op.f('ix_upload_blobs_id'), table_name='upload_blobs')
+    op.drop_table('upload_blobs')
@@ -0,0 +1,55 @@
+"""Add amount_paid_cents to appointments
+
+Revision ID: 3e5b7d91c2a4
+Revises: c81f2a6d4e90
+Create Date: 2026-10-19 21:14:52.630117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e5b7d91c2a4'
+down_revision: Union[str, Sequence[str], None] = 'c81f2a6d4e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Appointment ids per UPDATE; run inside an autocommit block so each batch commits on its own
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_amount_paid_cents(bind, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Paid appointments from before the amount was kept are counted at their doctor's
+    current fee, which is what the stats rollups assumed for them. Only touches rows
+    where amount_paid_cents IS NULL, so it can be re-run to resume.
+    """
+    max_id = bind.execute(sa.text("SELECT MAX(id) FROM appointments")).scalar() or 0
+    filled = 0
+    for start in range(0, max_id, batch_size):
+        filled += bind.execute(
+            sa.text(
+                "UPDATE appointments SET amount_paid_cents = "
+                "(SELECT fee_cents FROM doctors WHERE doctors.id = appointments.doctor_id) "
+                "WHERE paid AND amount_paid_cents IS NULL AND id > :start AND id <= :end"
+            ),
+            {"start": start, "end": start + batch_size},
+        ).rowcount
+    return filled
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('amount_paid_cents', sa.Integer(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        filled = backfill_amount_paid_cents(op.get_bind())
+        print(f"amount_paid_cents backfill: filled {filled} paid appointments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('appointments', 'amount_paid_cents')
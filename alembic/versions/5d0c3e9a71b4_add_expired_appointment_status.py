@@ -0,0 +1,34 @@
+"""Add the expired appointment status
+
+Revision ID: 5d0c3e9a71b4
+Revises: bc4c7ce2b101
+Create Date: 2026-10-19 17:22:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0c3e9a71b4'
+down_revision: Union[str, Sequence[str], None] = 'bc4c7ce2b101'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite stores the status as plain text, only the Postgres enum type needs the new label
+    if op.get_bind().dialect.name == "postgresql":
+        # ADD VALUE cannot be used in the same transaction as the new label
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE appointment_status ADD VALUE IF NOT EXISTS 'expired'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum label; fold expired bookings back into cancelled instead
+    op.execute("UPDATE appointments SET status = 'cancelled' WHERE status = 'expired'")
+    # The rollups may already hold a cancelled bucket for the same key; the reconcile job rebuilds it
+    op.execute("DELETE FROM appointment_stats WHERE status = 'expired'")
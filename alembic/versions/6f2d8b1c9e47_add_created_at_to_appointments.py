@@ -0,0 +1,30 @@
+"""Add created_at to appointments
+
+Revision ID: 6f2d8b1c9e47
+Revises: 3e5b7d91c2a4
+Create Date: 2026-10-19 22:40:11.318504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2d8b1c9e47'
+down_revision: Union[str, Sequence[str], None] = '3e5b7d91c2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default, so adding it does not rewrite the table; existing
+    # unpaid bookings keep expiring at their start time
+    op.add_column('appointments', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('appointments', 'created_at')
@@ -0,0 +1,85 @@
+"""Add fee_cents to doctors with batched backfill
+
+Revision ID: 77ad95f9620c
+Revises: 8a818a8aca0a
+Create Date: 2026-10-19 10:41:37.502911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.money import parse_fee_cents
+
+
+# revision identifiers, used by Alembic.
+revision: str = '77ad95f9620c'
+down_revision: Union[str, Sequence[str], None] = '8a818a8aca0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows converted per UPDATE; run inside an autocommit block so each batch commits on its own
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_fee_cents(bind, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Fill doctors.fee_cents from the legacy fee string in id order.
+    Only touches rows where fee_cents IS NULL, so it can be re-run to resume.
+    Values that cannot be parsed are left NULL and reported.
+    """
+    last_id = 0
+    converted = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, fee FROM doctors "
+                "WHERE fee_cents IS NULL AND id > :last_id "
+                "ORDER BY id LIMIT :batch_size"
+            ),
+            {"last_id": last_id, "batch_size": batch_size},
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for doctor_id, fee in rows:
+            cents = parse_fee_cents(fee)
+            if cents is None:
+                print(f"fee_cents backfill: could not parse fee {fee!r} for doctor {doctor_id}")
+            else:
+                updates.append({"id": doctor_id, "fee_cents": cents})
+        if updates:
+            bind.execute(
+                sa.text("UPDATE doctors SET fee_cents = :fee_cents WHERE id = :id AND fee_cents IS NULL"),
+                updates,
+            )
+
+        converted += len(updates)
+        last_id = rows[-1][0]
+    return converted
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('doctors', sa.Column('fee_cents', sa.Integer(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        if bind.dialect.name == "postgresql":
+            op.create_index(
+                op.f('ix_doctors_fee_cents'), 'doctors', ['fee_cents'],
+                unique=False, postgresql_concurrently=True,
+            )
+        else:
+            op.create_index(op.f('ix_doctors_fee_cents'), 'doctors', ['fee_cents'], unique=False)
+
+        converted = backfill_fee_cents(bind)
+        print(f"fee_cents backfill: converted {converted} doctors")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_doctors_fee_cents'), table_name='doctors')
+    op.drop_column('doctors', 'fee_cents')
@@ -0,0 +1,32 @@
+"""Add thumbnail and WebP derivative URLs to doctors and users
+
+Revision ID: 7a3647e50a82
+Revises: f1fb8777507f
+Create Date: 2026-10-19 14:02:11.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3647e50a82'
+down_revision: Union[str, Sequence[str], None] = 'f1fb8777507f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('doctors', 'users'):
+        op.add_column(table, sa.Column('thumbnail_url', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('webp_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('doctors', 'users'):
+        op.drop_column(table, 'webp_url')
+        op.drop_column(table, 'thumbnail_url')
@@ -0,0 +1,67 @@
+"""Add admin stats rollup tables
+
+Revision ID: 8a818a8aca0a
+Revises: 7a6194e3c8e2
+Create Date: 2026-10-19 09:12:04.118236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.money import parse_fee_cents
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a818a8aca0a'
+down_revision: Union[str, Sequence[str], None] = '7a6194e3c8e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('appointment_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('appointment_count', sa.Integer(), nullable=False),
+    sa.Column('paid_count', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'doctor_id', 'status')
+    )
+    op.create_table('stat_counters',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Seed the rollups from existing appointments; the reconcile job keeps them in sync afterwards
+    op.execute(
+        """
+        INSERT INTO appointment_stats (day, doctor_id, status, appointment_count, paid_count, revenue_cents)
+        SELECT date, doctor_id, COALESCE(status, 'booked'), COUNT(*),
+               SUM(CASE WHEN paid THEN 1 ELSE 0 END), 0
+        FROM appointments
+        GROUP BY date, doctor_id, COALESCE(status, 'booked')
+        """
+    )
+    # Revenue of the seeded paid appointments at each doctor's fee (the legacy fee string at this revision)
+    bind = op.get_bind()
+    fees = [
+        {"doctor_id": doctor_id, "fee_cents": parse_fee_cents(fee) or 0}
+        for doctor_id, fee in bind.execute(sa.text("SELECT id, fee FROM doctors")).fetchall()
+    ]
+    if fees:
+        bind.execute(
+            sa.text("UPDATE appointment_stats SET revenue_cents = paid_count * :fee_cents WHERE doctor_id = :doctor_id"),
+            fees,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stat_counters')
+    op.drop_table('appointment_stats')
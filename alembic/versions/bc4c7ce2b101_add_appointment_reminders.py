@@ -0,0 +1,64 @@
+"""Add appointment_reminders and queue reminders for upcoming appointments
+
+Revision ID: bc4c7ce2b101
+Revises: 024074cade69
+Create Date: 2026-10-19 16:04:12.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bc4c7ce2b101'
+down_revision: Union[str, Sequence[str], None] = '024074cade69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING_PREDICATE = sa.text("outcome IS NULL")
+SEED_HOURS = (24, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('appointment_reminders',
+    sa.Column('appointment_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('appointment_id', 'kind')
+    )
+    op.create_index(
+        'ix_appointment_reminders_pending_due', 'appointment_reminders', ['due_at'], unique=False,
+        postgresql_where=PENDING_PREDICATE, sqlite_where=PENDING_PREDICATE,
+    )
+
+    # Queue reminders for appointments that are still ahead of their reminder time
+    if op.get_bind().dialect.name == 'postgresql':
+        starts_at = "(date + time)"
+        due_at = "(date + time) - make_interval(hours => {hours})"
+        now = "LOCALTIMESTAMP"
+    else:
+        starts_at = "datetime(date || ' ' || time)"
+        due_at = "datetime(date || ' ' || time, '-{hours} hours')"
+        now = "datetime('now', 'localtime')"
+    for hours in SEED_HOURS:
+        op.execute(
+            f"""
+            INSERT INTO appointment_reminders (appointment_id, kind, due_at, attempts)
+            SELECT id, '{hours}h', {due_at.format(hours=hours)}, 0
+            FROM appointments
+            WHERE status IN ('booked', 'confirmed') AND {due_at.format(hours=hours)} > {now}
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointment_reminders_pending_due', table_name='appointment_reminders')
+    op.drop_table('appointment_reminders')
@@ -0,0 +1,154 @@
+"""Partition appointments by month on Postgres
+
+Revision ID: c81f2a6d4e90
+Revises: 5d0c3e9a71b4
+Create Date: 2026-10-19 18:05:13.407219
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f2a6d4e90'
+down_revision: Union[str, Sequence[str], None] = '5d0c3e9a71b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUS_PREDICATE = sa.text("status IN ('booked', 'confirmed')")
+# Partitions created ahead of the current month; the partition job keeps this window
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, doctor_id, date, time, reason, status, paid, stripe_payment_id"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_index(
+        'ix_appointments_active_user_doctor', 'appointments', ['user_id', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE,
+    )
+    op.create_index(
+        'ix_appointments_active_date', 'appointments', ['date', 'time', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE,
+    )
+    op.create_index('ix_appointments_user_date', 'appointments', ['user_id', 'date'], unique=False)
+
+
+def _drop_indexes() -> None:
+    op.drop_index('ix_appointments_user_date', table_name='appointments')
+    op.drop_index('ix_appointments_active_date', table_name='appointments')
+    op.drop_index('ix_appointments_active_user_doctor', table_name='appointments')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        # SQLite keeps a single table; only the per-patient index applies
+        op.create_index('ix_appointments_user_date', 'appointments', ['user_id', 'date'], unique=False)
+        return
+
+    bind = op.get_bind()
+    # A foreign key must cover the partition key, so reminders can no longer reference appointments.id
+    op.execute("ALTER TABLE appointment_reminders DROP CONSTRAINT IF EXISTS appointment_reminders_appointment_id_fkey")
+
+    op.execute("ALTER TABLE appointments RENAME TO appointments_unpartitioned")
+    op.execute("ALTER TABLE appointments_unpartitioned DROP CONSTRAINT appointments_pkey")
+    op.drop_index('ix_appointments_active_date', table_name='appointments_unpartitioned')
+    op.drop_index('ix_appointments_active_user_doctor', table_name='appointments_unpartitioned')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments_unpartitioned')
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE appointments (
+            id integer NOT NULL DEFAULT nextval('appointments_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id),
+            doctor_id integer NOT NULL REFERENCES doctors (id),
+            date date NOT NULL,
+            time time without time zone NOT NULL,
+            reason varchar,
+            status appointment_status NOT NULL DEFAULT 'booked',
+            paid boolean,
+            stripe_payment_id varchar,
+            PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+        """
+    )
+
+    oldest = bind.execute(sa.text("SELECT min(date) FROM appointments_unpartitioned")).scalar()
+    this_month = date.today().replace(day=1)
+    month = min(oldest.replace(day=1), this_month) if oldest else this_month
+    last = _add_months(this_month, MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE appointments_{month.year}_{month.month:02d} PARTITION OF appointments "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    # Catches dates beyond the prepared window until the partition job splits them out
+    op.execute("CREATE TABLE appointments_default PARTITION OF appointments DEFAULT")
+
+    op.execute(f"INSERT INTO appointments ({COLUMNS}) SELECT {COLUMNS} FROM appointments_unpartitioned")
+    op.drop_table('appointments_unpartitioned')
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+
+    # Created on the parent after the copy; each partition gets its own local index
+    _create_indexes()
+    op.execute("ANALYZE appointments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index('ix_appointments_user_date', table_name='appointments')
+        return
+
+    _drop_indexes()
+    op.execute("ALTER TABLE appointments RENAME TO appointments_partitioned")
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY NONE")
+    op.execute(
+        """
+        CREATE TABLE appointments (
+            id integer NOT NULL DEFAULT nextval('appointments_id_seq') PRIMARY KEY,
+            user_id integer NOT NULL REFERENCES users (id),
+            doctor_id integer NOT NULL REFERENCES doctors (id),
+            date date NOT NULL,
+            time time without time zone NOT NULL,
+            reason varchar,
+            status appointment_status NOT NULL DEFAULT 'booked',
+            paid boolean,
+            stripe_payment_id varchar
+        )
+        """
+    )
+    # Archived (detached) partitions are not copied back
+    op.execute(f"INSERT INTO appointments ({COLUMNS}) SELECT {COLUMNS} FROM appointments_partitioned")
+    op.execute("DROP TABLE appointments_partitioned")
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_index(
+        'ix_appointments_active_user_doctor', 'appointments', ['user_id', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE,
+    )
+    op.create_index(
+        'ix_appointments_active_date', 'appointments', ['date', 'time', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE,
+    )
+
+    op.execute("DELETE FROM appointment_reminders WHERE appointment_id NOT IN (SELECT id FROM appointments)")
+    op.create_foreign_key(
+        'appointment_reminders_appointment_id_fkey', 'appointment_reminders', 'appointments',
+        ['appointment_id'], ['id'], ondelete='CASCADE',
+    )
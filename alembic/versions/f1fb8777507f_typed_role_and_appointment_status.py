@@ -0,0 +1,84 @@
+"""Typed role and appointment status enums with partial indexes
+
+Revision ID: f1fb8777507f
+Revises: 77ad95f9620c
+Create Date: 2026-10-19 11:58:20.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1fb8777507f'
+down_revision: Union[str, Sequence[str], None] = '77ad95f9620c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUS_PREDICATE = sa.text("status IN ('booked', 'confirmed')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Normalise legacy values before applying the enum types
+    op.execute("UPDATE users SET is_adman = 'user' WHERE is_adman IS NULL OR is_adman NOT IN ('user', 'admin')")
+    op.execute("UPDATE appointments SET status = 'booked' WHERE status IS NULL OR status = 'scheduled'")
+    op.execute(
+        "UPDATE appointments SET status = 'booked' "
+        "WHERE status NOT IN ('booked', 'confirmed', 'cancelled', 'completed')"
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE TYPE user_role AS ENUM ('user', 'admin')")
+        op.execute(
+            "ALTER TABLE users ALTER COLUMN is_adman TYPE user_role USING is_adman::user_role, "
+            "ALTER COLUMN is_adman SET DEFAULT 'user', "
+            "ALTER COLUMN is_adman SET NOT NULL"
+        )
+        op.execute("CREATE TYPE appointment_status AS ENUM ('booked', 'confirmed', 'cancelled', 'completed')")
+        op.execute(
+            "ALTER TABLE appointments ALTER COLUMN status TYPE appointment_status USING status::appointment_status, "
+            "ALTER COLUMN status SET DEFAULT 'booked', "
+            "ALTER COLUMN status SET NOT NULL"
+        )
+    else:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('is_adman', existing_type=sa.String(), nullable=False)
+        with op.batch_alter_table('appointments') as batch_op:
+            batch_op.alter_column('status', existing_type=sa.String(), nullable=False)
+
+    op.create_index(
+        'ix_appointments_active_user_doctor', 'appointments', ['user_id', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE, sqlite_where=ACTIVE_STATUS_PREDICATE,
+    )
+    op.create_index(
+        'ix_appointments_active_date', 'appointments', ['date', 'time', 'doctor_id'], unique=False,
+        postgresql_where=ACTIVE_STATUS_PREDICATE, sqlite_where=ACTIVE_STATUS_PREDICATE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_active_date', table_name='appointments')
+    op.drop_index('ix_appointments_active_user_doctor', table_name='appointments')
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE appointments ALTER COLUMN status DROP DEFAULT, "
+            "ALTER COLUMN status DROP NOT NULL, "
+            "ALTER COLUMN status TYPE VARCHAR USING status::text"
+        )
+        op.execute("DROP TYPE appointment_status")
+        op.execute(
+            "ALTER TABLE users ALTER COLUMN is_adman DROP DEFAULT, "
+            "ALTER COLUMN is_adman DROP NOT NULL, "
+            "ALTER COLUMN is_adman TYPE VARCHAR USING is_adman::text"
+        )
+        op.execute("DROP TYPE user_role")
+    else:
+        with op.batch_alter_table('appointments') as batch_op:
+            batch_op.alter_column('status', existing_type=sa.String(), nullable=True)
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('is_adman', existing_type=sa.String(), nullable=True)
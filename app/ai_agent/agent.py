@@ -1,47 +1,67 @@
 # backend/app/ai_agent/agent.py
-from openai import AsyncOpenAI
+"""
+The DocAssist agent. The Agents SDK and OpenAI client are imported when the agent is
+first needed (or warmed up at startup), so importing the app stays fast and does not
+require OPENAI_API_KEY until the chatbot is used.
+"""
 import asyncio
+import threading
+import time
 from typing import Any
-from agents import Agent, Runner, SQLiteSession, OpenAIChatCompletionsModel, set_default_openai_key
-from .prompts import SYSTEM_INSTRUCTIONS
-from .tools import (
-    show_dashboard, show_admin_dashboard, show_doctors, show_appointments, 
-    show_profile, book_appointment, start_booking, show_users, delete_user, 
-    edit_user, update_user_profile, add_doctor, delete_doctor, edit_doctor
-)
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-# --- Set the OpenAI API key properly ---
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # Ensure your .env has OPENAI_API_KEY
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY is not set in the environment")
-set_default_openai_key(OPENAI_API_KEY)
-
-# Create the main assistant agent. Keep instructions clear and focused.
-assistant_agent = Agent(
-    name="DocAssist",
-    instructions=SYSTEM_INSTRUCTIONS,
-    tools=[
+from config import OPENAI_API_KEY
+from app.shared_state import MemoryState
+from .session import CompactingSession
+
+_assistant_agent = None
+_agent_lock = threading.Lock()
+_active_runs = 0
+
+
+def _build_agent():
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is not set in the environment")
+    from agents import Agent, set_default_openai_key
+    from .prompts import SYSTEM_INSTRUCTIONS
+    from .tools import (
         show_dashboard, show_admin_dashboard, show_doctors, show_appointments,
-        show_profile, book_appointment, start_booking, show_users,
-        delete_user, edit_user, update_user_profile, add_doctor,
-        delete_doctor, edit_doctor
-    ]
-)
+        show_profile, quick_book, book_appointment, start_booking, show_users, delete_user,
+        edit_user, update_user_profile, add_doctor, delete_doctor, edit_doctor
+    )
+
+    # --- Set the OpenAI API key properly ---
+    set_default_openai_key(OPENAI_API_KEY)
+
+    # Create the main assistant agent. Keep instructions clear and focused.
+    return Agent(
+        name="DocAssist",
+        instructions=SYSTEM_INSTRUCTIONS,
+        tools=[
+            show_dashboard, show_admin_dashboard, show_doctors, show_appointments,
+            show_profile, quick_book, book_appointment, start_booking, show_users,
+            delete_user, edit_user, update_user_profile, add_doctor,
+            delete_doctor, edit_doctor
+        ]
+    )
+
 
-# --- Add a session store ---
-_session_store: dict[str, SQLiteSession] = {}
+def get_assistant_agent():
+    """The shared assistant agent, built on first use."""
+    global _assistant_agent
+    if _assistant_agent is None:
+        with _agent_lock:
+            if _assistant_agent is None:
+                _assistant_agent = _build_agent()
+    return _assistant_agent
 
-def get_or_create_session(user_id: str | None = None) -> SQLiteSession:
-    """Return the existing session for a user, or create a new one if none exists."""
+
+def get_or_create_session(user_id: str | None = None) -> CompactingSession:
+    """
+    The user's chat session, shared by every worker, sending the model a compacted
+    history within CHAT_TOKEN_BUDGET; anonymous sessions are not kept.
+    """
     if not user_id:
-        return SQLiteSession(session_id="anonymous")  # fallback session
-    if user_id not in _session_store:
-        _session_store[user_id] = SQLiteSession(session_id=user_id)
-    return _session_store[user_id]
+        return CompactingSession("anonymous", MemoryState())
+    return CompactingSession(user_id)
 
 
 async def run_agent(user_input: str, user_context: dict | None = None, max_turns: int = 10) -> dict[str, Any]:
@@ -49,6 +69,8 @@ async def run_agent(user_input: str, user_context: dict | None = None, max_turns
     Run the DocAssist agent with a user input and optional context.
     Returns dict with shape {'final_output': str, 'raw': run_result}
     """
+    global _active_runs
+    _active_runs += 1
     try:
         user_id = str(user_context.get("user_id")) if user_context and "user_id" in user_context else None
         user_session = get_or_create_session(user_id)
@@ -58,8 +80,10 @@ async def run_agent(user_input: str, user_context: dict | None = None, max_turns
         print(f"Running agent with input: {user_input}")
         print(f"Context: {enhanced_context}")
 
+        from agents import Runner
+
         run_result = await Runner.run(
-            assistant_agent,
+            get_assistant_agent(),
             input=user_input,
             max_turns=max_turns,
             context=enhanced_context,
@@ -72,3 +96,13 @@ async def run_agent(user_input: str, user_context: dict | None = None, max_turns
     except Exception as e:
         print(f"Error in run_agent: {str(e)}")
         return {"final_output": f"Agent error: {str(e)}", "raw": None}
+    finally:
+        _active_runs -= 1
+
+
+async def wait_for_runs(timeout: float) -> int:
+    """Wait for in-flight agent runs to finish. Returns how many are still running."""
+    deadline = time.monotonic() + timeout
+    while _active_runs and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return _active_runs
@@ -0,0 +1,76 @@
+# backend/app/ai_agent/booking_request.py
+"""
+Reads a free-text booking request ("Dr. Patel tomorrow at 2pm for a rash", "a
+dermatologist next monday morning") into candidate doctors, a date, a time and a
+reason, without a model round trip. Doctors are matched by name first, then by
+specialty, against the cached doctor catalog.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date, time
+from typing import Dict, List, Optional
+from app.utils.datetime_parser import find_when
+
+# Everyday words for a specialty, matched against the first letters of its name
+SPECIALTY_WORDS = {
+    "heart": "cardio", "skin": "dermat", "child": "pediat", "children": "pediat", "kid": "pediat",
+    "kids": "pediat", "bone": "orthop", "bones": "orthop", "joint": "orthop", "eye": "ophtha",
+    "eyes": "ophtha", "brain": "neurol", "nerves": "neurol", "mental": "psychi", "anxiety": "psychi",
+}
+# Letters of a word and a specialty that must agree ("dermatologist" / "Dermatology")
+STEM_LENGTH = 6
+# Words that never identify a doctor, even when a name contains them
+_IGNORED = {"doctor", "appointment", "book", "booking", "with", "see", "visit", "need", "want", "please"}
+_WORDS = re.compile(r"[a-z]+")
+_REASON = re.compile(r"\b(?:for|because of|because|about|regarding)\s+(?P<reason>.+)$", re.IGNORECASE | re.DOTALL)
+_ARTICLES = re.compile(r"^(?:a|an|my|some)\s+")
+
+
+@dataclass
+class BookingRequest:
+    doctors: List[Dict] = field(default_factory=list)  # catalog entries, best matches only
+    matched_by: Optional[str] = None  # "name" or "specialty"
+    day: Optional[date] = None
+    at: Optional[time] = None
+    reason: Optional[str] = None
+
+
+def _name_words(doctor: Dict) -> set:
+    return {word for word in _WORDS.findall(doctor["name"].lower()) if len(word) >= 3 and word not in _IGNORED}
+
+
+def _stems(words) -> set:
+    stems = {word[:STEM_LENGTH] for word in words if len(word) >= STEM_LENGTH - 1}
+    return stems | {SPECIALTY_WORDS[word] for word in words if word in SPECIALTY_WORDS}
+
+
+def match_doctors(catalog: List[Dict], text: str):
+    """(doctors, how): the doctors whose name best matches the text, else those of a matching specialty."""
+    words = set(_WORDS.findall(text.lower())) - _IGNORED
+    scores = [(len(_name_words(doctor) & words), doctor) for doctor in catalog]
+    best = max((score for score, _ in scores), default=0)
+    if best:
+        return [doctor for score, doctor in scores if score == best], "name"
+    stems = _stems(words)
+    by_specialty = [doctor for doctor in catalog if _stems(_WORDS.findall(doctor["specialty"].lower())) & stems]
+    return by_specialty, "specialty" if by_specialty else None
+
+
+def _reason(text: str, doctors: List[Dict]) -> Optional[str]:
+    match = _REASON.search(text)
+    if not match:
+        return None
+    # "for a rash with Dr. Lee next friday" -> "rash"
+    _, _, rest = find_when(match["reason"])
+    rest = rest.split(" with ")[0]
+    names = set().union(*(_name_words(doctor) for doctor in doctors)) if doctors else set()
+    rest = " ".join(word for word in rest.split() if word.strip(".") not in names | {"dr"})
+    rest = _ARTICLES.sub("", rest).strip()
+    return rest or None
+
+
+def parse_booking_request(text: str, catalog: List[Dict], today: Optional[date] = None) -> BookingRequest:
+    """Raises DateParseError for dates that cannot exist ("Feb 30")."""
+    day, at, rest = find_when(text, today)
+    doctors, matched_by = match_doctors(catalog, rest)
+    return BookingRequest(doctors=doctors, matched_by=matched_by, day=day, at=at, reason=_reason(text, doctors))
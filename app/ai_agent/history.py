@@ -0,0 +1,141 @@
+# backend/app/ai_agent/history.py
+"""
+What of a chat history is sent to the model. The last few turns go verbatim; the
+turns before them keep their shape but long tool outputs (show_doctors' full list,
+say) become short references; anything older is a one-line-per-turn summary in a
+single system message. A token budget is then enforced by folding more turns into
+the summary. A turn is a user message and everything after it up to the next one,
+so a tool call and its output always stay together.
+"""
+import json
+from typing import Dict, List, Optional, Sequence
+from app.utils.serialization import dumps
+from config import CHAT_KEEP_TURNS, CHAT_MEMORY_LINES, CHAT_REFERENCE_TURNS, CHAT_TOKEN_BUDGET, CHAT_TOOL_OUTPUT_CHARS
+
+
+# Rough tokens for the model's tokenizer, which is not a dependency here
+CHARS_PER_TOKEN = 4
+MEMORY_HEADER = "Summary of the earlier conversation, oldest first:"
+
+
+def estimate_tokens(items: Sequence[Dict]) -> int:
+    return sum(len(dumps(item)) for item in items) // CHARS_PER_TOKEN
+
+
+def split_turns(items: Sequence[Dict]) -> List[List[Dict]]:
+    turns: List[List[Dict]] = []
+    for item in items:
+        if item.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(item)
+    return turns
+
+
+def _text(item: Dict) -> str:
+    content = item.get("content", item.get("output", ""))
+    if isinstance(content, list):
+        content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return " ".join(str(content).split())
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _gist(text: str) -> str:
+    """A tool payload (see payloads.py) as "[type] message"; other text as is."""
+    if text.startswith("{"):
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return text
+        if isinstance(payload, dict) and "type" in payload:
+            return f"[{payload['type']}] {' '.join(str(payload.get('message', '')).split())}"
+    return text
+
+
+def summarise_turn(turn: Sequence[Dict]) -> str:
+    """One line: what the user asked, which tools ran, and how the assistant replied."""
+    user = next((_text(item) for item in turn if item.get("role") == "user"), "")
+    tools = [item["name"] for item in turn if item.get("type") == "function_call" and "name" in item]
+    reply = next((_text(item) for item in reversed(turn) if item.get("role") == "assistant"), "")
+    line = f"- User: {_clip(user, 120)}"
+    if tools:
+        line += f" | tools: {', '.join(tools)}"
+    if reply:
+        line += f" | reply: {_clip(_gist(reply), 160)}"
+    return line
+
+
+def shorten_tool_outputs(turn: Sequence[Dict], max_chars: int = CHAT_TOOL_OUTPUT_CHARS) -> List[Dict]:
+    """The turn with tool outputs over `max_chars` (and assistant echoes of them) replaced by references."""
+    names = {item.get("call_id"): item.get("name") for item in turn if item.get("type") == "function_call"}
+    shortened = []
+    for item in turn:
+        text = _text(item)
+        if len(text) > max_chars and item.get("type") == "function_call_output":
+            name = names.get(item.get("call_id"), "tool")
+            item = {**item, "output": f"[{name} result, {len(text)} characters, omitted: {_clip(_gist(text), 120)}]"}
+        elif len(text) > max_chars and item.get("role") == "assistant":
+            item = {"role": "assistant", "content": f"[reply omitted: {_clip(_gist(text), 120)}]"}
+        shortened.append(item)
+    return shortened
+
+
+def memory_item(lines: Sequence[str], max_lines: int = CHAT_MEMORY_LINES) -> Optional[Dict]:
+    if not lines:
+        return None
+    shown = list(lines[-max_lines:]) if max_lines > 0 else []
+    header = MEMORY_HEADER + (f" ({len(lines) - len(shown)} earlier turns not shown)" if len(shown) < len(lines) else "")
+    return {"role": "system", "content": "\n".join([header, *shown])}
+
+
+def compact_history(
+    items: Sequence[Dict],
+    memory: Sequence[str] = (),
+    keep_turns: int = CHAT_KEEP_TURNS,
+    reference_turns: int = CHAT_REFERENCE_TURNS,
+    token_budget: int = CHAT_TOKEN_BUDGET,
+    tool_output_chars: int = CHAT_TOOL_OUTPUT_CHARS,
+    memory_lines: int = CHAT_MEMORY_LINES,
+) -> List[Dict]:
+    """
+    The history to send: a summary message for `memory` (lines already folded out of
+    storage) and the turns beyond the two windows, then the reference window, then
+    the verbatim window, within `token_budget` tokens.
+    """
+    turns = split_turns(items)
+    verbatim = turns[max(0, len(turns) - keep_turns):] if keep_turns > 0 else []
+    referenced = turns[max(0, len(turns) - len(verbatim) - reference_turns):len(turns) - len(verbatim)]
+    folded = turns[:len(turns) - len(verbatim) - len(referenced)]
+    memory = list(memory) + [summarise_turn(turn) for turn in folded]
+    newest_shortened = False
+
+    def build() -> List[Dict]:
+        head = memory_item(memory, memory_lines)
+        history = [head] if head else []
+        for turn in referenced:
+            history += shorten_tool_outputs(turn, tool_output_chars)
+        for index, turn in enumerate(verbatim):
+            newest = index == len(verbatim) - 1
+            history += shorten_tool_outputs(turn, tool_output_chars) if newest and newest_shortened else turn
+        return history
+
+    history = build()
+    # Over budget: fold the oldest turns into the summary, shorten the newest turn's
+    # tool outputs, fold it too, and finally drop the oldest summary lines
+    while estimate_tokens(history) > token_budget:
+        if referenced:
+            memory.append(summarise_turn(referenced.pop(0)))
+        elif len(verbatim) > 1:
+            memory.append(summarise_turn(verbatim.pop(0)))
+        elif verbatim and not newest_shortened:
+            newest_shortened = True
+        elif verbatim:
+            memory.append(summarise_turn(verbatim.pop(0)))
+        elif memory:
+            memory.pop(0)
+        else:
+            break
+        history = build()
+    return history
@@ -0,0 +1,54 @@
+# backend/app/ai_agent/payloads.py
+"""
+Typed tool replies understood by the frontend.
+Each payload is serialized exactly once with to_json(); nothing downstream re-parses it.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from app.utils.serialization import dumps
+
+
+@dataclass
+class NavigationResponse:
+    message: str
+    path: str
+    success: bool = True
+    delay_ms: int = 200
+    data: Optional[Dict[str, Any]] = None
+
+    def to_json(self) -> str:
+        payload = {
+            "type": "navigation_response",
+            "success": self.success,
+            "message": self.message,
+            "navigation": {"action": "navigate", "path": self.path, "delay_ms": self.delay_ms},
+        }
+        if self.data is not None:
+            payload["data"] = self.data
+        return dumps(payload)
+
+
+@dataclass
+class MessageResponse:
+    message: str
+    success: bool = True
+
+    def to_json(self) -> str:
+        return dumps({"type": "message_response", "success": self.success, "message": self.message})
+
+
+@dataclass
+class PaymentRedirect:
+    message: str
+    payment_url: str
+    appointment_details: Dict[str, Any] = field(default_factory=dict)
+    success: bool = True
+
+    def to_json(self) -> str:
+        return dumps({
+            "type": "payment_redirect",
+            "success": self.success,
+            "message": self.message,
+            "payment_url": self.payment_url,
+            "appointment_details": self.appointment_details,
+        })
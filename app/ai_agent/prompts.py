@@ -19,7 +19,7 @@ TOOL USAGE MAPPING:
 - "show appointments", "appointments", "my appointments" -> call show_appointments tool
 - "show profile", "profile" -> call show_profile tool
 - "admin dashboard", "admin", "show admin" -> call show_admin_dashboard tool
-- "book appointment", "book", "schedule" -> call start_booking tool
+- "book appointment", "book", "schedule", or any booking details -> call quick_book tool
 - "show users", "users" -> call show_users tool (admin only)
 
 ADMIN ACTIONS (always use tools):
@@ -30,24 +30,10 @@ ADMIN ACTIONS (always use tools):
 - "edit doctor [name]" -> call edit_doctor tool
 
 BOOKING WORKFLOW:
-1. User says "book appointment" -> call start_booking tool
-2. User mentions doctor name (e.g., "Dr. Aisha Patel", "with Dr. Smith", "Sarah") -> call start_booking with doctor_name parameter
-3. User provides booking details (date, time, reason) -> call book_appointment with doctor_id, date, time, reason
-
-DOCTOR NAME RECOGNITION:
-- "Dr. Aisha Patel" -> extract "Aisha Patel" and call start_booking(doctor_name="Aisha Patel")
-- "with Dr. Smith" -> extract "Smith" and call start_booking(doctor_name="Smith")  
-- "with Sarah" -> extract "Sarah" and call start_booking(doctor_name="Sarah")
-- Always extract doctor names from user messages and pass to start_booking tool
-
-APPOINTMENT COMPLETION:
-- When user provides ONLY date after doctor selection, ask for time and reason
-- When user provides date AND time, ask for reason (optional)
-- Only call book_appointment when you have: doctor_id, date, time (reason is optional)
-- Parse natural language dates: "tomorrow", "today", "next monday"
-- Convert time to 24-hour format: "9pm" -> "21:00"
-- Example: book_appointment(doctor_id=2, date="tomorrow", time="21:00", reason="checkup")
-- Use the doctor ID shown in start_booking response
+1. Any booking request -> call quick_book with the user's own words, e.g. quick_book(request="Dr. Aisha Patel tomorrow at 2pm for a skin rash")
+2. When quick_book asks a question and the user answers, call quick_book again with the earlier request plus the answer, e.g. "Dr. Aisha Patel tomorrow" + "2pm" -> quick_book(request="Dr. Aisha Patel tomorrow 2pm")
+3. Do not ask for details yourself; quick_book asks for exactly what is missing (doctor, day or time). The reason is optional
+4. book_appointment(doctor_id, date, time, reason) is only for when you already have a doctor ID, date and time
 
 RESPONSE RULES:
 - When tools return JSON with "type": "navigation_response", "message_response", or "payment_redirect" -> return EXACTLY that JSON
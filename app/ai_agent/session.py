@@ -0,0 +1,90 @@
+# backend/app/ai_agent/session.py
+"""Chat history kept in the shared state, so every worker and node sees the same conversation."""
+import asyncio
+from typing import List, Optional
+from app.shared_state import SharedState, get_shared_state
+from app.utils.serialization import dumps_bytes, loads
+from .history import (
+    CHAT_KEEP_TURNS, CHAT_MEMORY_LINES, CHAT_REFERENCE_TURNS, CHAT_TOKEN_BUDGET,
+    compact_history, split_turns, summarise_turn,
+)
+from config import CHAT_SESSION_TTL_SECONDS, CHAT_FOLD_TURNS
+
+
+class SharedSession:
+    """An Agents SDK session (get_items/add_items/pop_item/clear_session) stored as one shared list."""
+
+    def __init__(self, session_id: str, state: Optional[SharedState] = None, ttl: float = CHAT_SESSION_TTL_SECONDS):
+        self.session_id = session_id
+        self.state = state or get_shared_state()
+        self.ttl = ttl
+        self.key = f"chat:{session_id}"
+
+    async def get_items(self, limit: Optional[int] = None) -> List[dict]:
+        if limit is not None and limit <= 0:
+            return []
+        items = await asyncio.to_thread(self.state.list_range, self.key, -limit if limit else 0, -1)
+        return [loads(item) for item in items]
+
+    async def add_items(self, items: List[dict]) -> None:
+        if items:
+            await asyncio.to_thread(self.state.list_push, self.key, [dumps_bytes(i) for i in items], self.ttl)
+
+    async def pop_item(self) -> Optional[dict]:
+        item = await asyncio.to_thread(self.state.list_pop, self.key)
+        return loads(item) if item is not None else None
+
+    async def clear_session(self) -> None:
+        await asyncio.to_thread(self.state.delete, self.key)
+
+
+class CompactingSession(SharedSession):
+    """
+    A SharedSession that sends the model a compacted history (see history.py) instead
+    of every item. Turns that fall out of both windows are folded into a summary list
+    at `{key}:memory` and trimmed from the chat list, a batch at a time, so storage and
+    the work per message stay bounded however long the conversation runs.
+    """
+
+    def __init__(self, session_id: str, state: Optional[SharedState] = None, ttl: float = CHAT_SESSION_TTL_SECONDS,
+                 token_budget: int = CHAT_TOKEN_BUDGET):
+        super().__init__(session_id, state, ttl)
+        self.memory_key = f"{self.key}:memory"
+        self.token_budget = token_budget
+
+    def _fold(self, items: List[dict]) -> List[dict]:
+        """Move the turns beyond the windows into the summary list; returns the items still stored."""
+        if len(split_turns(items)) - CHAT_KEEP_TURNS - CHAT_REFERENCE_TURNS < CHAT_FOLD_TURNS:
+            return items
+        # One worker folds at a time; the others send the unfolded history this once
+        if not self.state.set(f"{self.key}:folding", b"1", ttl=10, only_if_absent=True):
+            return items
+        try:
+            # Re-read under the lock: another worker may have folded since `items` was read
+            items = [loads(item) for item in self.state.list_range(self.key, 0, -1)]
+            turns = split_turns(items)
+            old = turns[:len(turns) - CHAT_KEEP_TURNS - CHAT_REFERENCE_TURNS]
+            if len(old) < CHAT_FOLD_TURNS:
+                return items
+            self.state.list_push(self.memory_key, [summarise_turn(turn).encode() for turn in old], self.ttl)
+            self.state.list_trim(self.memory_key, -CHAT_MEMORY_LINES)
+            # New items only ever go on the end, so the folded ones are still the first
+            folded = sum(len(turn) for turn in old)
+            self.state.list_trim(self.key, folded)
+            return items[folded:]
+        finally:
+            self.state.delete(f"{self.key}:folding")
+
+    def _compacted(self) -> List[dict]:
+        items = self._fold([loads(item) for item in self.state.list_range(self.key, 0, -1)])
+        memory = [line.decode() for line in self.state.list_range(self.memory_key, 0, -1)]
+        return compact_history(items, memory, token_budget=self.token_budget)
+
+    async def get_items(self, limit: Optional[int] = None) -> List[dict]:
+        if limit is not None and limit <= 0:
+            return []
+        items = await asyncio.to_thread(self._compacted)
+        return items[-limit:] if limit else items
+
+    async def clear_session(self) -> None:
+        await asyncio.to_thread(self.state.delete, self.key, self.memory_key)
@@ -1,16 +1,32 @@
-import json
 from typing import Optional
+import stripe
 from agents import function_tool, RunContextWrapper
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, read_session
+from app.models.user import User, UserRole
 from app.models.doctor import Doctor
 from app.models.appointment import Appointment
-from app.services.doctor_service import get_doctor_by_id, list_doctors_by_specialty
-from app.services.appointment_service import create_appointment_for_user
+from app.services import doctor_service, user_service
+from app.services.doctor_service import get_doctor_by_id, get_doctor_catalog, list_doctors_by_specialty
+from app.services.appointment_service import (
+    BookingRefused, SlotUnavailable, create_appointment_for_user, free_slots, validate_booking
+)
+from app.services.query_service import column_value, count
+from app.utils.datetime_parser import DATE_HINT, TIME_HINT, DateParseError, parse_when
 from app.utils.email_service import create_appointment_email, send_email
-from datetime import datetime, timedelta, date
-import calendar
+from app.utils.money import format_fee, parse_fee_cents
+from app.utils.stripe import create_appointment_checkout
+from .booking_request import parse_booking_request
+from .payloads import MessageResponse, NavigationResponse, PaymentRedirect
+
+# How many free times / matching doctors quick_book lists in a question
+QUICK_BOOK_SLOTS_OFFERED = 6
+QUICK_BOOK_DOCTORS_OFFERED = 5
+
+
+def _is_admin(db: Session, user_id) -> bool:
+    """Role check that reads one column instead of the whole user row."""
+    return column_value(db, User.is_adman, User.id == user_id) == UserRole.ADMIN
 
 
 # ==================== DASHBOARD TOOLS ====================
@@ -20,26 +36,9 @@ async def show_dashboard(ctx: RunContextWrapper[dict]) -> str:
     """Redirect to dashboard page."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
-    db: Session = next(get_db())
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
-        dashboard_path = "/dashboard"
-        
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": "Opening your dashboard...",
-            "navigation": {"action": "navigate", "path": dashboard_path, "delay_ms": 200}
-        })
-    finally:
-        db.close()
+    return NavigationResponse("Opening your dashboard...", path="/dashboard").to_json()
 
 
 @function_tool
@@ -47,29 +46,14 @@ async def show_admin_dashboard(ctx: RunContextWrapper[dict]) -> str:
     """Redirect to admin dashboard page."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
-    db: Session = next(get_db())
+    db: Session = read_session(user_id)
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or user.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, user_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": "Opening admin dashboard...",
-            "navigation": {"action": "navigate", "path": "/admin", "delay_ms": 200}
-        })
+        return NavigationResponse("Opening admin dashboard...", path="/admin").to_json()
     finally:
         db.close()
 
@@ -79,43 +63,37 @@ async def show_admin_dashboard(ctx: RunContextWrapper[dict]) -> str:
 @function_tool
 async def show_doctors(ctx: RunContextWrapper[dict], specialty: Optional[str] = None) -> str:
     """Show doctors list in chatbot AND redirect to doctors page."""
-    db: Session = next(get_db())
+    db: Session = read_session(ctx.context.get("user_id"))
     try:
         # Get all doctors directly from database
         doctors = db.query(Doctor).all()
         
         if not doctors:
-            return json.dumps({
-                "type": "navigation_response",
-                "success": True,
-                "message": "No doctors found. Redirecting to doctors page...",
-                "navigation": {"action": "navigate", "path": "/doctors", "delay_ms": 200}
-            })
+            return NavigationResponse("No doctors found. Redirecting to doctors page...", path="/doctors").to_json()
         
         message = "🩺 **Available Doctors:**\n\n"
         for doctor in doctors:
             message += f"• **Dr. {doctor.name}**\n"
             message += f"  Specialty: {doctor.specialty}\n"
-            if doctor.fee:
-                message += f"  Fee: ${doctor.fee}\n"
+            fee_cents = doctor.fee_cents if doctor.fee_cents is not None else parse_fee_cents(doctor.fee)
+            if fee_cents is not None:
+                message += f"  Fee: ${format_fee(fee_cents)}\n"
             message += "\n"
         
         message += "Opening doctors page for more details..."
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": message,
-            "data": {"doctors": [{"id": d.id, "name": d.name, "specialty": d.specialty, "fee": d.fee} for d in doctors]},
-            "navigation": {"action": "navigate", "path": "/doctors", "delay_ms": 300}
-        })
+        return NavigationResponse(
+            message,
+            path="/doctors",
+            delay_ms=300,
+            data={"doctors": [
+                {"id": d.id, "name": d.name, "specialty": d.specialty, "fee": d.fee, "fee_cents": d.fee_cents}
+                for d in doctors
+            ]}
+        ).to_json()
     except Exception as e:
         print(f"Error in show_doctors: {e}")
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": f"Error fetching doctors: {str(e)}"
-        })
+        return MessageResponse(f"Error fetching doctors: {str(e)}", success=False).to_json()
     finally:
         db.close()
 
@@ -127,41 +105,31 @@ async def show_appointments(ctx: RunContextWrapper[dict]) -> str:
     """Show appointments list in chatbot AND redirect to appointments page."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
-    db: Session = next(get_db())
+    db: Session = read_session(user_id)
     try:
-        appointments = db.query(Appointment).filter(Appointment.user_id == user_id).all()
-        
+        # Doctor names come with the appointments in one query, not one lookup per row
+        appointments = (
+            db.query(Appointment, Doctor.name)
+            .outerjoin(Doctor, Doctor.id == Appointment.doctor_id)
+            .filter(Appointment.user_id == user_id)
+            .all()
+        )
+
         if not appointments:
-            return json.dumps({
-                "type": "navigation_response",
-                "success": True,
-                "message": "You have no appointments. Opening appointments page...",
-                "navigation": {"action": "navigate", "path": "/appointments", "delay_ms": 200}
-            })
-        
+            return NavigationResponse("You have no appointments. Opening appointments page...", path="/appointments").to_json()
+
         message = "📅 **Your Appointments:**\n\n"
-        for apt in appointments:
-            doctor = db.query(Doctor).filter(Doctor.id == apt.doctor_id).first()
-            doctor_name = doctor.name if doctor else "Unknown Doctor"
+        for apt, doctor_name in appointments:
+            doctor_name = doctor_name or "Unknown Doctor"
             message += f"• **{apt.date} at {apt.time}**\n"
             message += f"  Doctor: Dr. {doctor_name}\n"
-            message += f"  Status: {apt.status.title()}\n\n"
+            message += f"  Status: {apt.status.value.title()}\n\n"
         
         message += "Opening appointments page for more details..."
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": message,
-            "navigation": {"action": "navigate", "path": "/appointments", "delay_ms": 300}
-        })
+        return NavigationResponse(message, path="/appointments", delay_ms=300).to_json()
     finally:
         db.close()
 
@@ -173,253 +141,129 @@ async def show_profile(ctx: RunContextWrapper[dict]) -> str:
     """Redirect to profile page."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
     
-    return json.dumps({
-        "type": "navigation_response",
-        "success": True,
-        "message": "Opening your profile...",
-        "navigation": {"action": "navigate", "path": "/profile", "delay_ms": 200}
-    })
+    return NavigationResponse("Opening your profile...", path="/profile").to_json()
 
 
 # ==================== BOOKING TOOLS (CHATBOT ONLY) ====================
 
+def _checkout_reply(ctx: RunContextWrapper[dict], doctor, fee_cents: int, day, at, reason: Optional[str]) -> str:
+    """Stripe checkout for a validated booking, as the payment redirect the frontend follows."""
+    try:
+        checkout_session = create_appointment_checkout(
+            doctor, fee_cents, day, at, reason,
+            ctx.context.get("user_id"), ctx.context.get("name", ""), ctx.context.get("email", ""),
+        )
+    except stripe.error.StripeError as e:
+        print(f"Stripe error while booking: {str(e)}")
+        return MessageResponse(f"Payment setup failed: {str(e)}", success=False).to_json()
+    return PaymentRedirect(
+        "💳 **Pay Now** - Redirecting to secure payment...",
+        payment_url=checkout_session.url,
+        appointment_details={
+            "doctor": doctor.name,
+            "specialty": doctor.specialty,
+            "date": day.isoformat(),
+            "time": at.strftime("%H:%M"),
+            "fee": fee_cents / 100
+        }
+    ).to_json()
+
+
+def _free_times_text(db: Session, doctor_id: int, day) -> str:
+    slots = free_slots(db, doctor_id, day, limit=QUICK_BOOK_SLOTS_OFFERED)
+    return ", ".join(f"{slot:%H:%M}" for slot in slots)
+
+
 @function_tool
-async def book_appointment(ctx: RunContextWrapper[dict], doctor_id: int, date: str, time: str, reason: Optional[str] = None) -> str:
-    """Complete appointment booking with payment."""
+async def quick_book(ctx: RunContextWrapper[dict], request: str) -> str:
+    """
+    Book from the patient's own words in one call, e.g. "Dr. Patel tomorrow at 2pm for a rash" or
+    "a dermatologist next monday morning". Returns a payment link, or one question for what is
+    missing; call again with the earlier request plus the patient's answer.
+    """
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "Please log in to book an appointment."
-        })
+        return MessageResponse("Please log in to book an appointment.", success=False).to_json()
 
     db: Session = next(get_db())
     try:
-        # Debug logging
-        print(f"DEBUG: Looking for doctor_id: {doctor_id}")
-        print(f"DEBUG: User ID: {user_id}, Date: {date}, Time: {time}")
-        
-        # Find doctor by ID
-        doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-        print(f"DEBUG: Doctor found: {doctor}")
-        if not doctor:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "❌ **Doctor Not Found** - Please select a doctor from the available list. Would you like me to show you the available doctors?"
-            })
-        
-        # Check for duplicate appointment
-        from app.models.appointment import Appointment
-        existing_appointment = db.query(Appointment).filter(
-            Appointment.user_id == user_id,
-            Appointment.doctor_id == doctor_id,
-            Appointment.status.in_(["scheduled", "confirmed"])
-        ).first()
-        
-        if existing_appointment:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"❌ **Duplicate Appointment** - You already have an appointment with Dr. {doctor.name}. Please cancel your existing appointment before booking a new one."
-            })
-        
-        # Validate and parse appointment date
-        from datetime import datetime, date as date_type, timedelta
-        import re
+        catalog = get_doctor_catalog()
+        try:
+            booking = parse_booking_request(request, catalog)
+        except DateParseError as e:
+            return MessageResponse(f"{e} Which day would you like instead?").to_json()
+
+        # One question that asks for everything still missing
+        when = "" if booking.day else " and which day and time"
+        if not booking.doctors:
+            specialties = sorted({doctor["specialty"] for doctor in catalog})
+            if not specialties:
+                return MessageResponse("No doctors available at the moment.", success=False).to_json()
+            return MessageResponse(
+                f"Which doctor would you like to see{when}? You can give a name or a specialty "
+                f"({', '.join(specialties[:8])}), e.g. 'Dr. Patel tomorrow at 2pm'."
+            ).to_json()
+        if len(booking.doctors) > 1:
+            options = [f"Dr. {doctor['name']} ({doctor['specialty']})" for doctor in booking.doctors[:QUICK_BOOK_DOCTORS_OFFERED]]
+            when = when or ("" if booking.at else " and at what time")
+            return MessageResponse(f"Which doctor would you like{when}: {', '.join(options[:-1])} or {options[-1]}?").to_json()
+
+        doctor = booking.doctors[0]
+        if booking.day is None:
+            return MessageResponse(f"Which day and time would you like to see Dr. {doctor['name']}? For example 'tomorrow at 2pm' or 'next Monday morning'.").to_json()
+        if booking.at is None:
+            times = _free_times_text(db, doctor["id"], booking.day)
+            if not times:
+                return MessageResponse(f"Dr. {doctor['name']} has no free times on {booking.day:%A %d %B}. Which other day would suit you?").to_json()
+            return MessageResponse(f"What time on {booking.day:%A %d %B}? Dr. {doctor['name']} is free at {times}.").to_json()
 
         try:
-            lower_date = date.lower().strip()
-            print(f"DEBUG: Original date input: '{date}', lower_date: '{lower_date}'")
-            
-            # Handle natural language dates
-            if lower_date == "today":
-                appointment_date = date_type.today()
-                print(f"DEBUG: Parsed as today: {appointment_date}")
-            elif lower_date == "tomorrow":
-                appointment_date = date_type.today() + timedelta(days=1)
-                print(f"DEBUG: Parsed as tomorrow: {appointment_date}")
-            elif lower_date == "yesterday":
-                return json.dumps({
-                    "type": "message_response",
-                    "success": False,
-                    "message": "❌ **Invalid Date** - You cannot book appointments for past dates like yesterday."
-                })
-            elif "next" in lower_date:
-                # Handle "next monday", "next week", etc.
-                days_ahead = 7  # Default to next week
-                if "monday" in lower_date:
-                    days_ahead = (0 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "tuesday" in lower_date:
-                    days_ahead = (1 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "wednesday" in lower_date:
-                    days_ahead = (2 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "thursday" in lower_date:
-                    days_ahead = (3 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "friday" in lower_date:
-                    days_ahead = (4 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "saturday" in lower_date:
-                    days_ahead = (5 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                elif "sunday" in lower_date:
-                    days_ahead = (6 - date_type.today().weekday() + 7) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                
-                appointment_date = date_type.today() + timedelta(days=days_ahead)
-            elif any(day in lower_date for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]):
-                # Handle "this monday", "monday", etc.
-                days_ahead = 0
-                if "monday" in lower_date:
-                    days_ahead = (0 - date_type.today().weekday()) % 7
-                elif "tuesday" in lower_date:
-                    days_ahead = (1 - date_type.today().weekday()) % 7
-                elif "wednesday" in lower_date:
-                    days_ahead = (2 - date_type.today().weekday()) % 7
-                elif "thursday" in lower_date:
-                    days_ahead = (3 - date_type.today().weekday()) % 7
-                elif "friday" in lower_date:
-                    days_ahead = (4 - date_type.today().weekday()) % 7
-                elif "saturday" in lower_date:
-                    days_ahead = (5 - date_type.today().weekday()) % 7
-                elif "sunday" in lower_date:
-                    days_ahead = (6 - date_type.today().weekday()) % 7
-                
-                # If the day has already passed this week, move to next week
-                if days_ahead == 0 and date_type.today().weekday() != 0:  # Not Monday
-                    days_ahead = 7
-                
-                appointment_date = date_type.today() + timedelta(days=days_ahead)
-            else:
-                # Try to parse as YYYY-MM-DD format
-                appointment_date = datetime.strptime(date, "%Y-%m-%d").date()
-
-            today = date_type.today()
-            print(f"DEBUG: Parsed appointment_date: {appointment_date}, today: {today}")
-            print(f"DEBUG: appointment_date < today: {appointment_date < today}")
-            
-            if appointment_date < today:
-                return json.dumps({
-                    "type": "message_response",
-                    "success": False,
-                    "message": f"❌ **Invalid Date** - Please select a date from today ({today.strftime('%Y-%m-%d')}) onwards."
-                })
-            
-            # Convert to string YYYY-MM-DD for Stripe metadata and response
-            parsed_date_str = appointment_date.strftime("%Y-%m-%d")
-
-        except ValueError as ve:
-            print(f"DEBUG: Date parsing error: {str(ve)}")
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "❌ **Invalid Date Format** - Please provide date as 'today', 'tomorrow', 'next Monday', or YYYY-MM-DD format (e.g., 2025-01-15)."
-            })
-        except Exception as e:
-            print(f"DEBUG: Unexpected error in date parsing: {str(e)}")
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"❌ **Date Processing Error** - {str(e)}"
-            })
-
-        # Stripe payment setup
-        import stripe
-        from dotenv import load_dotenv
-        import os
-        load_dotenv() 
-
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
-        
+            doctor, fee_cents = validate_booking(db, user_id, doctor["id"], booking.day, booking.at)
+        except SlotUnavailable as e:
+            times = _free_times_text(db, doctor["id"], booking.day)
+            suggestion = f" Dr. {doctor['name']} is free at {times} that day. Which time works?" if times else " Which other day would suit you?"
+            return MessageResponse(f"{e}{suggestion}").to_json()
+        except BookingRefused as e:
+            return MessageResponse(f"❌ **{e.title}** - {e}", success=False).to_json()
+        return _checkout_reply(ctx, doctor, fee_cents, booking.day, booking.at, booking.reason)
+    except Exception as e:
+        print(f"Error in quick_book: {str(e)}")
+        return MessageResponse("An error occurred while booking your appointment. Please try again.", success=False).to_json()
+    finally:
+        db.close()
+
+
+@function_tool
+async def book_appointment(ctx: RunContextWrapper[dict], doctor_id: int, date: str, time: str, reason: Optional[str] = None) -> str:
+    """Complete appointment booking with payment. date and time take phrases ("tomorrow", "next Monday", "2pm", "morning") or ISO values."""
+    user_id = ctx.context.get("user_id")
+    if not user_id:
+        return MessageResponse("Please log in to book an appointment.", success=False).to_json()
+
+    db: Session = next(get_db())
+    try:
+        # The model may put the whole phrase in either argument ("tomorrow 2pm", "next monday morning")
         try:
-            checkout_session = stripe.checkout.Session.create(
-                payment_method_types=['card'],
-                line_items=[{
-                    'price_data': {
-                        'currency': 'usd',
-                        'product_data': {
-                            'name': f'Appointment with Dr. {doctor.name}',
-                            'description': f'{doctor.specialty} - {parsed_date_str} at {time}',
-                        },
-                        'unit_amount': int(float(doctor.fee or "100") * 100),
-                    },
-                    'quantity': 1,
-                }],
-                mode='payment',
-                success_url=f"{os.getenv('FRONTEND_URL', 'https://docassist-web.vercel.app')}/appointments/success?session_id={{CHECKOUT_SESSION_ID}}",
-                cancel_url=f"{os.getenv('FRONTEND_URL', 'https://docassist-web.vercel.app')}/appointments/cancel",
-                metadata={
-                    'user_id': str(user_id),
-                    'doctor_id': str(doctor_id),
-                    'date': parsed_date_str,
-                    'time': time,
-                    'reason': reason or '',
-                    'user_name': ctx.context.get("name", ""),
-                    'user_email': ctx.context.get("email", ""),
-                    'doctor_name': doctor.name,
-                    'doctor_specialty': doctor.specialty
-                }
-            )
-            
-            return json.dumps({
-                "type": "payment_redirect",
-                "success": True,
-                "message": "💳 **Pay Now** - Redirecting to secure payment...",
-                "payment_url": checkout_session.url,
-                "appointment_details": {
-                    "doctor": doctor.name,
-                    "specialty": doctor.specialty,
-                    "date": parsed_date_str,
-                    "time": time,
-                    "fee": float(doctor.fee or "100")
-                }
-            })
-            
-        except stripe.error.StripeError as e:
-            print(f"DEBUG: Stripe error: {str(e)}")
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"Payment setup failed: {str(e)}"
-            })
-        except Exception as e:
-            print(f"DEBUG: General error in book_appointment: {str(e)}")
-            import traceback
-            print(f"DEBUG: Full traceback: {traceback.format_exc()}")
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"An error occurred while booking your appointment: {str(e)}"
-            })
-        
+            appointment_date, appointment_time = parse_when(f"{date} {time}")
+        except DateParseError as e:
+            return MessageResponse(f"❌ **Invalid Date or Time** - {e}", success=False).to_json()
+        if appointment_date is None:
+            return MessageResponse(f"❌ **Missing Date** - Which day would you like? {DATE_HINT}", success=False).to_json()
+        if appointment_time is None:
+            return MessageResponse(f"❌ **Missing Time** - What time works for you? {TIME_HINT}", success=False).to_json()
+
+        try:
+            doctor, fee_cents = validate_booking(db, user_id, doctor_id, appointment_date, appointment_time)
+        except BookingRefused as e:
+            return MessageResponse(f"❌ **{e.title}** - {e}", success=False).to_json()
+        return _checkout_reply(ctx, doctor, fee_cents, appointment_date, appointment_time, reason)
     except Exception as e:
-        print(f"DEBUG: Outer exception in book_appointment: {str(e)}")
+        print(f"Error in book_appointment: {str(e)}")
         import traceback
-        print(f"DEBUG: Full outer traceback: {traceback.format_exc()}")
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "An error occurred while booking your appointment. Please try again."
-        })
+        print(traceback.format_exc())
+        return MessageResponse("An error occurred while booking your appointment. Please try again.", success=False).to_json()
     finally:
         db.close()
 
@@ -431,29 +275,14 @@ async def show_users(ctx: RunContextWrapper[dict]) -> str:
     """Redirect to users management page (admin only)."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
-    db: Session = next(get_db())
+    db: Session = read_session(user_id)
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or user.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, user_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": "Opening users management...",
-            "navigation": {"action": "navigate", "path": "/admin", "delay_ms": 500}
-        })
+        return NavigationResponse("Opening users management...", path="/admin", delay_ms=500).to_json()
     finally:
         db.close()
 
@@ -463,45 +292,31 @@ async def delete_user(ctx: RunContextWrapper[dict], user_name: str) -> str:
     """Delete a user by name (admin only)."""
     admin_id = ctx.context.get("user_id")
     if not admin_id:
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "Please log in first."
-        })
+        return MessageResponse("Please log in first.", success=False).to_json()
 
     db: Session = next(get_db())
+    db.info["user_id"] = admin_id
     try:
-        admin = db.query(User).filter(User.id == admin_id).first()
-        if not admin or admin.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, admin_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
         target_user = db.query(User).filter(User.name.ilike(f"%{user_name}%")).first()
         if not target_user:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"User '{user_name}' not found."
-            })
+            return MessageResponse(f"User '{user_name}' not found.", success=False).to_json()
         
         if target_user.id == admin_id:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "You cannot delete your own account."
-            })
+            return MessageResponse("You cannot delete your own account.", success=False).to_json()
+        
+        appointment_count = count(db, Appointment, Appointment.user_id == target_user.id)
+        if appointment_count:
+            return MessageResponse(
+                f"Cannot delete {target_user.name}: they have {appointment_count} appointment(s). "
+                "Cancel or reassign them first.", success=False,
+            ).to_json()
         
-        db.delete(target_user)
-        db.commit()
+        user_service.delete_user(db, target_user)
         
-        return json.dumps({
-            "type": "message_response",
-            "success": True,
-            "message": f"✅ User '{target_user.name}' deleted successfully."
-        })
+        return MessageResponse(f"✅ User '{target_user.name}' deleted successfully.").to_json()
     finally:
         db.close()
 
@@ -511,37 +326,18 @@ async def edit_user(ctx: RunContextWrapper[dict], user_name: str) -> str:
     """Redirect to edit user page (admin only)."""
     admin_id = ctx.context.get("user_id")
     if not admin_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
-    db: Session = next(get_db())
+    db: Session = read_session(admin_id)
     try:
-        admin = db.query(User).filter(User.id == admin_id).first()
-        if not admin or admin.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, admin_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
         target_user = db.query(User).filter(User.name.ilike(f"%{user_name}%")).first()
         if not target_user:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"User '{user_name}' not found."
-            })
+            return MessageResponse(f"User '{user_name}' not found.", success=False).to_json()
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": f"Opening edit page for {target_user.name}...",
-            "navigation": {"action": "navigate", "path": "/admin/", "delay_ms": 200}
-        })
+        return NavigationResponse(f"Opening edit page for {target_user.name}...", path="/admin/").to_json()
     finally:
         db.close()
 
@@ -551,21 +347,14 @@ async def update_user_profile(ctx: RunContextWrapper[dict], name: Optional[str]
     """Update user profile information."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "Please log in first."
-        })
+        return MessageResponse("Please log in first.", success=False).to_json()
 
     db: Session = next(get_db())
+    db.info["user_id"] = user_id
     try:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "User not found."
-            })
+            return MessageResponse("User not found.", success=False).to_json()
         
         updates = []
         if name:
@@ -583,17 +372,9 @@ async def update_user_profile(ctx: RunContextWrapper[dict], name: Optional[str]
         
         if updates:
             db.commit()
-            return json.dumps({
-                "type": "message_response",
-                "success": True,
-                "message": f"✅ Successfully updated: {', '.join(updates)}"
-            })
+            return MessageResponse(f"✅ Successfully updated: {', '.join(updates)}").to_json()
         else:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "No updates provided."
-            })
+            return MessageResponse("No updates provided.", success=False).to_json()
     finally:
         db.close()
 
@@ -605,29 +386,14 @@ async def add_doctor(ctx: RunContextWrapper[dict]) -> str:
     """Redirect to add doctor page (admin only)."""
     admin_id = ctx.context.get("user_id")
     if not admin_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
     db: Session = next(get_db())
     try:
-        admin = db.query(User).filter(User.id == admin_id).first()
-        if not admin or admin.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, admin_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": "Opening add doctor page...",
-            "navigation": {"action": "navigate", "path": "/admin", "delay_ms": 200}
-        })
+        return NavigationResponse("Opening add doctor page...", path="/admin").to_json()
     finally:
         db.close()
 
@@ -637,38 +403,20 @@ async def delete_doctor(ctx: RunContextWrapper[dict], doctor_name: str) -> str:
     """Delete a doctor by name (admin only)."""
     admin_id = ctx.context.get("user_id")
     if not admin_id:
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "Please log in first."
-        })
+        return MessageResponse("Please log in first.", success=False).to_json()
 
     db: Session = next(get_db())
     try:
-        admin = db.query(User).filter(User.id == admin_id).first()
-        if not admin or admin.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, admin_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
         doctor = db.query(Doctor).filter(Doctor.name.ilike(f"%{doctor_name}%")).first()
         if not doctor:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"Doctor '{doctor_name}' not found."
-            })
+            return MessageResponse(f"Doctor '{doctor_name}' not found.", success=False).to_json()
         
-        db.delete(doctor)
-        db.commit()
+        doctor_service.delete_doctor(db, doctor)
         
-        return json.dumps({
-            "type": "message_response",
-            "success": True,
-            "message": f"✅ Doctor '{doctor.name}' deleted successfully."
-        })
+        return MessageResponse(f"✅ Doctor '{doctor.name}' deleted successfully.").to_json()
     finally:
         db.close()
 
@@ -678,37 +426,18 @@ async def edit_doctor(ctx: RunContextWrapper[dict], doctor_name: str) -> str:
     """Redirect to edit doctor page (admin only)."""
     admin_id = ctx.context.get("user_id")
     if not admin_id:
-        return json.dumps({
-            "type": "navigation_response",
-            "success": False,
-            "message": "Please log in first.",
-            "navigation": {"action": "navigate", "path": "/login", "delay_ms": 500}
-        })
+        return NavigationResponse("Please log in first.", path="/login", success=False, delay_ms=500).to_json()
 
     db: Session = next(get_db())
     try:
-        admin = db.query(User).filter(User.id == admin_id).first()
-        if not admin or admin.is_adman != "admin":
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "Admin access required."
-            })
+        if not _is_admin(db, admin_id):
+            return MessageResponse("Admin access required.", success=False).to_json()
         
         doctor = db.query(Doctor).filter(Doctor.name.ilike(f"%{doctor_name}%")).first()
         if not doctor:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": f"Doctor '{doctor_name}' not found."
-            })
+            return MessageResponse(f"Doctor '{doctor_name}' not found.", success=False).to_json()
         
-        return json.dumps({
-            "type": "navigation_response",
-            "success": True,
-            "message": f"Opening edit page for Dr. {doctor.name}...",
-            "navigation": {"action": "navigate", "path": "/admin", "delay_ms": 200}
-        })
+        return NavigationResponse(f"Opening edit page for Dr. {doctor.name}...", path="/admin").to_json()
     finally:
         db.close()
 
@@ -717,11 +446,7 @@ async def start_booking(ctx: RunContextWrapper[dict], doctor_name: Optional[str]
     """Start appointment booking process in chatbot."""
     user_id = ctx.context.get("user_id")
     if not user_id:
-        return json.dumps({
-            "type": "message_response",
-            "success": False,
-            "message": "Please log in to book an appointment."
-        })
+        return MessageResponse("Please log in to book an appointment.", success=False).to_json()
 
     db: Session = next(get_db())
     try:
@@ -729,20 +454,12 @@ async def start_booking(ctx: RunContextWrapper[dict], doctor_name: Optional[str]
             # Find specific doctor by name (case insensitive, partial match)
             doctor = db.query(Doctor).filter(Doctor.name.ilike(f"%{doctor_name}%")).first()
             if doctor:
-                return json.dumps({
-                    "type": "message_response",
-                    "success": True,
-                    "message": f"Perfect! I found {doctor.name} ({doctor.specialty}) - ID: {doctor.id}.\n\nTo complete your booking, please provide:\n\n📅 **Date**: When would you like your appointment? (e.g., 'today', 'tomorrow', 'next Monday')\n⏰ **Time**: What time works for you? (e.g., 'morning', '2 PM', '14:30')\n📝 **Reason**: What's the reason for your visit? (optional)\n\nYou can provide all details in one message like: 'Tomorrow at 2 PM for skin consultation'"
-                })
+                return MessageResponse(f"Perfect! I found {doctor.name} ({doctor.specialty}) - ID: {doctor.id}.\n\nTo complete your booking, please provide:\n\n📅 **Date**: When would you like your appointment? (e.g., 'today', 'tomorrow', 'next Monday')\n⏰ **Time**: What time works for you? (e.g., 'morning', '2 PM', '14:30')\n📝 **Reason**: What's the reason for your visit? (optional)\n\nYou can provide all details in one message like: 'Tomorrow at 2 PM for skin consultation'").to_json()
             else:
                 # Doctor not found, show available doctors
                 doctors = db.query(Doctor).all()
                 if not doctors:
-                    return json.dumps({
-                        "type": "message_response",
-                        "success": False,
-                        "message": "No doctors available at the moment."
-                    })
+                    return MessageResponse("No doctors available at the moment.", success=False).to_json()
                 
                 message = f"I couldn't find a doctor named '{doctor_name}'. Here are our available doctors:\n\n"
                 for i, doc in enumerate(doctors[:5], 1):
@@ -750,20 +467,12 @@ async def start_booking(ctx: RunContextWrapper[dict], doctor_name: Optional[str]
                 
                 message += "\nPlease tell me the exact doctor's name you'd like to book with."
                 
-                return json.dumps({
-                    "type": "message_response",
-                    "success": True,
-                    "message": message
-                })
+                return MessageResponse(message).to_json()
         
         # Show available doctors when no specific doctor mentioned
         doctors = db.query(Doctor).all()
         if not doctors:
-            return json.dumps({
-                "type": "message_response",
-                "success": False,
-                "message": "No doctors available at the moment."
-            })
+            return MessageResponse("No doctors available at the moment.", success=False).to_json()
         
         message = "Which doctor would you like to book with?\n\n"
         for i, doctor in enumerate(doctors[:5], 1):
@@ -771,10 +480,6 @@ async def start_booking(ctx: RunContextWrapper[dict], doctor_name: Optional[str]
         
         message += "\nPlease tell me the doctor's name."
         
-        return json.dumps({
-            "type": "message_response",
-            "success": True,
-            "message": message
-        })
+        return MessageResponse(message).to_json()
     finally:
         db.close()
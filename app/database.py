@@ -1,28 +1,215 @@
 # backend/app/database.py
-from sqlalchemy import create_engine
+import itertools
+from typing import Dict, List, Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import (
+    DATABASE_URL, DATABASE_REPLICA_URLS,
+    REPLICA_STICKY_SECONDS, REPLICA_MAX_LAG_SECONDS, REPLICA_HEALTH_SECONDS,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    STATEMENT_TIMEOUT_MS, READ_STATEMENT_TIMEOUT_MS, DB_HOLD_WARN_SECONDS,
+)
+from app.utils.db_monitor import (
+    TimedQueuePool, instrument_engine, install_statement_timeouts, set_statement_timeout,
+)
+from app.shared_state import get_shared_state
+from app.utils.jwt_handler import decode_access_token
+from app.utils.scheduler import register_job
+
+
+
+def _create_engine(url: str):
+    return create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        echo=False  # Disable SQL logging in production
+    )
 
-from config import DATABASE_URL
 
 # SQLAlchemy setup with performance optimizations
-engine = create_engine(
-    DATABASE_URL, 
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    echo=False  # Disable SQL logging in production
-)
+engine = _create_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+install_statement_timeouts(SessionLocal)
+install_statement_timeouts(ReadSessionLocal)
 
 Base = declarative_base()
 
+
+class ReadRouter:
+    """
+    Chooses where read-only sessions go: replicas in turn, skipping any that are
+    unreachable or lagging, and the primary for users who wrote in the last few seconds.
+    Recent writers are tracked in the shared state, so stickiness holds across workers.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], sticky_seconds: float = REPLICA_STICKY_SECONDS):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._down: Dict[Engine, str] = {}
+        self._turn = itertools.count()
+
+    def record_write(self, user_id: int) -> None:
+        state = get_shared_state()
+        state.set(f"sticky:{user_id}", b"1", ttl=self.sticky_seconds)
+        state.set("sticky:any", b"1", ttl=self.sticky_seconds)
+
+    def has_recent_writes(self) -> bool:
+        return get_shared_state().get("sticky:any") is not None
+
+    def wrote_recently(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        return get_shared_state().get(f"sticky:{user_id}") is not None
+
+    def mark_down(self, replica: Engine, reason: str) -> None:
+        if replica not in self._down:
+            print(f"Read replica {replica.url.render_as_string()} unavailable: {reason}")
+        self._down[replica] = reason
+
+    def mark_up(self, replica: Engine) -> None:
+        if self._down.pop(replica, None) is not None:
+            print(f"Read replica {replica.url.render_as_string()} back in rotation")
+
+    def pick(self, user_id: Optional[int] = None) -> Engine:
+        """The engine a read-only session for this user should use."""
+        if self.wrote_recently(user_id):
+            return self.primary
+        healthy = [r for r in self.replicas if r not in self._down]
+        if not healthy:
+            return self.primary
+        return healthy[next(self._turn) % len(healthy)]
+
+    def check_replicas(self) -> None:
+        """Probe every replica; lagging or unreachable ones leave the rotation until they recover."""
+        for replica in self.replicas:
+            try:
+                with replica.connect() as conn:
+                    lag = 0.0
+                    if replica.dialect.name == "postgresql":
+                        # An idle replica that has replayed everything it received is not lagging
+                        lag = conn.execute(text(
+                            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                        )).scalar() or 0.0
+                    else:
+                        conn.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_down(replica, str(e).splitlines()[0])
+                continue
+            if lag > REPLICA_MAX_LAG_SECONDS:
+                self.mark_down(replica, f"{lag:.1f}s behind the primary")
+            else:
+                self.mark_up(replica)
+
+
+read_router = ReadRouter(engine, [_create_engine(url) for url in DATABASE_REPLICA_URLS])
+
+if read_router.replicas:
+    register_job("replica-health", REPLICA_HEALTH_SECONDS, read_router.check_replicas)
+
+connection_trackers = [instrument_engine(engine, "primary")] + [
+    instrument_engine(replica, f"replica{i}") for i, replica in enumerate(read_router.replicas)
+]
+
+
+def report_held_connections() -> None:
+    for tracker in connection_trackers:
+        tracker.report(DB_HOLD_WARN_SECONDS)
+
+
+register_job("held-connections", max(DB_HOLD_WARN_SECONDS / 2, 1), report_held_connections)
+
+
+@event.listens_for(Engine, "handle_error")
+def _replica_connection_error(context):
+    # A dropped connection takes the replica out of rotation until the next health check
+    replica = context.engine
+    if context.is_disconnect and replica in read_router.replicas:
+        read_router.mark_down(replica, "connection lost")
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stick_to_primary(session):
+    # get_current_user tags the session with the caller, so their next reads see this write
+    wrote = session.info.pop("wrote", False)
+    if wrote and read_router.replicas and session.info.get("user_id") is not None:
+        read_router.record_write(session.info["user_id"])
+
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only session")
+
+
+def read_session(user_id: Optional[int] = None, statement_timeout_ms: int = READ_STATEMENT_TIMEOUT_MS) -> Session:
+    """A session for read-only work, on a replica unless this user has just written."""
+    bind = read_router.pick(user_id)
+    db = SessionLocal() if bind is read_router.primary else ReadSessionLocal(bind=bind)
+    db.info["statement_timeout_ms"] = statement_timeout_ms
+    return db
+
+
+def _request_user_id(request: Optional[Request]) -> Optional[int]:
+    # Only decoded when some user has a recent write, which is when it matters
+    if request is None or not read_router.has_recent_writes():
+        return None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(decode_access_token(token)["sub"])
+    except Exception:
+        return None
+
+
 # Dependency for FastAPI routes
 def get_db():
     db = SessionLocal()
+    db.info["statement_timeout_ms"] = STATEMENT_TIMEOUT_MS
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request = None):
+    """Dependency for read-only routes: a replica session when replicas are configured."""
+    if read_router.replicas:
+        db = read_session(_request_user_id(request))
+    else:
+        db = SessionLocal()
+        db.info["statement_timeout_ms"] = READ_STATEMENT_TIMEOUT_MS
     try:
         yield db
     finally:
         db.close()
+
+
+def statement_timeout(timeout_ms: int):
+    """Route dependency giving the request's session a different statement timeout."""
+    def apply(db: Session = Depends(get_db)):
+        set_statement_timeout(db, timeout_ms)
+    return apply
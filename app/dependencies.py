@@ -18,13 +18,25 @@ def get_current_user(
         user = db.query(User).filter(User.id == payload["sub"]).first()
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
+        # Lets the caller's next reads stay on the primary after they write
+        db.info["user_id"] = user.id
         return user
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+def require_admin(user: User) -> None:
+    """Raise 403 unless the user has the admin role"""
+    if user is None or not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+def can_manage_appointment(user: User, appointment) -> bool:
+    """Owners and admins may change an appointment"""
+    return appointment.user_id == user.id or user.is_admin
+
+
 def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     """Ensure the current user is an admin"""
-    if not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Admins only")
+    require_admin(current_user)
     return current_user
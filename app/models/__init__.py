@@ -1,8 +1,11 @@
 # backend/app/models/__init__.py
 # Import all models to ensure they are registered with SQLAlchemy
-from .user import User
+from .user import User, UserRole
 from .doctor import Doctor
-from .appointment import Appointment
+from .appointment import Appointment, AppointmentStatus
+from .stats import AppointmentStat, StatCounter
+from .upload import UploadBlob
+from .reminder import AppointmentReminder
 
 # Make models available at package level
-__all__ = ["User", "Doctor", "Appointment"]
+__all__ = ["User", "UserRole", "Doctor", "Appointment", "AppointmentStatus", "AppointmentStat", "StatCounter", "UploadBlob", "AppointmentReminder"]
@@ -1,10 +1,44 @@
 # backend/app/models/appointment.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Boolean
+import enum
+from datetime import datetime
+from sqlalchemy import Column, Enum, Index, Integer, String, ForeignKey, Date, DateTime, Time, Boolean, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
+class AppointmentStatus(str, enum.Enum):
+    BOOKED = "booked"
+    CONFIRMED = "confirmed"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+    EXPIRED = "expired"  # booked but never paid within the checkout hold, or by its start time
+
+
+# Statuses that still occupy a slot with the doctor
+ACTIVE_STATUSES = (AppointmentStatus.BOOKED, AppointmentStatus.CONFIRMED)
+
+ALLOWED_TRANSITIONS = {
+    AppointmentStatus.BOOKED: {AppointmentStatus.CONFIRMED, AppointmentStatus.CANCELLED, AppointmentStatus.EXPIRED},
+    AppointmentStatus.CONFIRMED: {AppointmentStatus.CANCELLED, AppointmentStatus.COMPLETED},
+    AppointmentStatus.CANCELLED: set(),
+    AppointmentStatus.COMPLETED: set(),
+    AppointmentStatus.EXPIRED: set(),
+}
+
+# Predicate shared by the partial indexes below
+ACTIVE_STATUS_PREDICATE = text("status IN ('booked', 'confirmed')")
+
+
+class InvalidStatusTransition(ValueError):
+    pass
+
+
 class Appointment(Base):
+    """
+    On Postgres the table is range-partitioned by month on date, with primary key
+    (id, date); ids still come from one sequence, so the ORM identity stays id.
+    Partitions are managed by app/services/partition_service.py.
+    """
     __tablename__ = "appointments"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -13,10 +47,47 @@ class Appointment(Base):
     date = Column(Date, nullable=False)
     time = Column(Time, nullable=False)
     reason = Column(String, nullable=True)
-    status = Column(String, default="booked")  # booked, cancelled, completed
+    status = Column(
+        Enum(AppointmentStatus, name="appointment_status", values_callable=lambda statuses: [s.value for s in statuses]),
+        default=AppointmentStatus.BOOKED,
+        nullable=False,
+    )
     paid = Column(Boolean, default=False)
+    # What Stripe charged (the session's amount_total); None for bookings paid before it was kept
+    amount_paid_cents = Column(Integer, nullable=True)
     stripe_payment_id = Column(String, nullable=True)
+    # Local time, like date/time and the maintenance clock; starts an unpaid booking's checkout hold.
+    # None for rows from before it was kept, which hold their slot until the start time
+    created_at = Column(DateTime, nullable=True, default=datetime.now)
 
     # relationships
     user = relationship("User", back_populates="appointments")
     doctor = relationship("Doctor", back_populates="appointments")
+
+    __table_args__ = (
+        # Duplicate-booking check: (user, doctor) among active appointments
+        Index(
+            "ix_appointments_active_user_doctor", "user_id", "doctor_id",
+            postgresql_where=ACTIVE_STATUS_PREDICATE, sqlite_where=ACTIVE_STATUS_PREDICATE,
+        ),
+        # Upcoming/active appointments by date (reminders, doctor schedules)
+        Index(
+            "ix_appointments_active_date", "date", "time", "doctor_id",
+            postgresql_where=ACTIVE_STATUS_PREDICATE, sqlite_where=ACTIVE_STATUS_PREDICATE,
+        ),
+        # A patient's appointments, newest months first
+        Index("ix_appointments_user_date", "user_id", "date"),
+    )
+
+    def can_transition_to(self, new_status: AppointmentStatus) -> bool:
+        current = AppointmentStatus(self.status or AppointmentStatus.BOOKED)
+        return AppointmentStatus(new_status) in ALLOWED_TRANSITIONS[current]
+
+    def transition_to(self, new_status: AppointmentStatus) -> None:
+        """Change status, raising InvalidStatusTransition for moves the lifecycle does not allow."""
+        if not self.can_transition_to(new_status):
+            current = AppointmentStatus(self.status or AppointmentStatus.BOOKED)
+            raise InvalidStatusTransition(
+                f"Cannot change appointment status from {current.value} to {AppointmentStatus(new_status).value}"
+            )
+        self.status = AppointmentStatus(new_status)
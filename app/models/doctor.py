@@ -1,7 +1,8 @@
 # backend/app/models/doctor.py
 from sqlalchemy import Column, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.utils.money import parse_fee_cents
 
 
 class Doctor(Base):
@@ -12,7 +13,23 @@ class Doctor(Base):
     specialty = Column(String, nullable=False)
     bio = Column(Text, nullable=True)
     image_url = Column(String, nullable=True)
-    fee = Column(String, nullable=False)
+    # Derivatives of image_url; null until the background pipeline has produced them
+    thumbnail_url = Column(String, nullable=True)
+    webp_url = Column(String, nullable=True)
+    fee = Column(String, nullable=False)  # legacy display value, kept in sync with fee_cents
+    fee_cents = Column(Integer, nullable=True, index=True)
 
     # relationships - using string reference to avoid circular imports
     appointments = relationship("Appointment", back_populates="doctor", lazy="dynamic")
+
+    @validates("image_url")
+    def _reset_derivatives(self, key, value):
+        if value != self.image_url:
+            self.thumbnail_url = None
+            self.webp_url = None
+        return value
+
+    @validates("fee")
+    def _sync_fee_cents(self, key, value):
+        self.fee_cents = parse_fee_cents(value)
+        return value
@@ -0,0 +1,28 @@
+# backend/app/models/reminder.py
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from app.database import Base
+
+PENDING_PREDICATE = text("outcome IS NULL")
+
+
+class AppointmentReminder(Base):
+    """One reminder (e.g. 24h or 1h ahead) for an appointment, and whether it has gone out."""
+    __tablename__ = "appointment_reminders"
+
+    # No foreign key: appointments is partitioned on Postgres and only (id, date) is unique there.
+    # Reminders of archived appointments are removed when their partition is detached, and
+    # send_due_reminders marks any whose appointment was deleted as skipped.
+    appointment_id = Column(Integer, primary_key=True)
+    kind = Column(String, primary_key=True)  # "24h", "1h", ...
+    due_at = Column(DateTime, nullable=False)
+    outcome = Column(String, nullable=True)  # None while pending, then "sent", "skipped" or "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The scheduler's per-tick range scan: pending reminders by due time
+        Index(
+            "ix_appointment_reminders_pending_due", "due_at",
+            postgresql_where=PENDING_PREDICATE, sqlite_where=PENDING_PREDICATE,
+        ),
+    )
@@ -0,0 +1,24 @@
+# backend/app/models/stats.py
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Date, DateTime
+from app.database import Base
+
+
+class AppointmentStat(Base):
+    """Rollup of appointments per day, doctor and status, kept up to date incrementally."""
+    __tablename__ = "appointment_stats"
+
+    day = Column(Date, primary_key=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, primary_key=True)
+    appointment_count = Column(Integer, nullable=False, default=0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    revenue_cents = Column(BigInteger, nullable=False, default=0)
+
+
+class StatCounter(Base):
+    """Named scalar counters refreshed by the reconcile job (e.g. total/active users)."""
+    __tablename__ = "stat_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
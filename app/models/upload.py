@@ -0,0 +1,26 @@
+# backend/app/models/upload.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, text
+from app.database import Base
+
+UNREFERENCED_PREDICATE = text("ref_count = 0")
+
+
+class UploadBlob(Base):
+    """A content-addressed upload file and how many rows currently reference it."""
+    __tablename__ = "upload_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, unique=True, nullable=False)  # relative to uploads/, e.g. doctor_images/ab/cd/<sha>.jpg
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    unreferenced_since = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # GC candidates only: blobs nobody references, oldest first
+        Index(
+            "ix_upload_blobs_unreferenced", "unreferenced_since",
+            postgresql_where=UNREFERENCED_PREDICATE, sqlite_where=UNREFERENCED_PREDICATE,
+        ),
+    )
@@ -1,9 +1,15 @@
 # backend/app/models/user.py
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import relationship
+import enum
+from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 
 
+class UserRole(str, enum.Enum):
+    USER = "user"
+    ADMIN = "admin"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -11,10 +17,29 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    is_adman = Column(String, default="user")  # "user" or "admin"
+    # Column name kept for API/JWT compatibility; values are UserRole
+    is_adman = Column(
+        Enum(UserRole, name="user_role", values_callable=lambda roles: [r.value for r in roles]),
+        default=UserRole.USER,
+        nullable=False,
+    )
     phone_number = Column(String, nullable=True)
     DOB = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
+    # Derivatives of image_url; null until the background pipeline has produced them
+    thumbnail_url = Column(String, nullable=True)
+    webp_url = Column(String, nullable=True)
 
     # relationships - using string reference to avoid circular imports
     appointments = relationship("Appointment", back_populates="user", lazy="dynamic")
+
+    @validates("image_url")
+    def _reset_derivatives(self, key, value):
+        if value != self.image_url:
+            self.thumbnail_url = None
+            self.webp_url = None
+        return value
+
+    @property
+    def is_admin(self) -> bool:
+        return self.is_adman == UserRole.ADMIN
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db, get_read_db, SessionLocal, engine, read_router, connection_trackers
+from app.models.user import User
+from app.dependencies import require_admin
+from app.models.stats import StatCounter
+from app.services.maintenance_service import LAST_RUN, run_appointment_maintenance
+from app.services.stats_service import get_admin_stats, reconcile_stats
+from app.shared_state import get_shared_state
+from app.utils.scheduler import register_job
+from app.utils.db_monitor import pool_status
+from app.utils.metrics import all_histograms
+from .users import get_current_user
+from config import STATS_RECONCILE_SECONDS, APPOINTMENT_MAINTENANCE_SECONDS
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def run_stats_reconcile():
+    """Rebuild the admin stats rollups in a dedicated session, on one node per interval."""
+    # The rebuild holds the stats lock exclusively, blocking every booking's rollup update;
+    # the lease keeps the other workers and nodes from queueing rebuilds behind it
+    if not get_shared_state().set("job-lease:stats-reconcile", b"1", ttl=STATS_RECONCILE_SECONDS * 0.9,
+                                  only_if_absent=True):
+        return
+    db = SessionLocal()
+    try:
+        groups = reconcile_stats(db)
+        print(f"Admin stats reconciled: {groups} groups")
+    finally:
+        db.close()
+
+
+register_job("stats-reconcile", STATS_RECONCILE_SECONDS, run_stats_reconcile)
+
+
+def run_maintenance_job():
+    """Complete past appointments and expire stale bookings in a dedicated session."""
+    db = SessionLocal()
+    try:
+        result = run_appointment_maintenance(db)
+        if result["completed"] or result["expired"]:
+            print(f"Appointment maintenance: {result}")
+    finally:
+        db.close()
+
+
+register_job("appointment-maintenance", APPOINTMENT_MAINTENANCE_SECONDS, run_maintenance_job)
+
+
+@router.get("/stats")
+def admin_stats(
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Precomputed dashboard statistics served from the rollup tables"""
+    require_admin(current_user)
+
+    return get_admin_stats(db, days=days)
+
+
+@router.get("/maintenance")
+def maintenance_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Last appointment maintenance run on this node and totals across all nodes"""
+    require_admin(current_user)
+
+    counters = db.query(StatCounter).filter(StatCounter.name.like("maintenance_%")).all()
+    return {
+        "last_run": LAST_RUN or None,
+        "totals": {c.name: c.value for c in counters},
+    }
+
+
+@router.get("/db-pool")
+def db_pool_status(current_user: User = Depends(get_current_user)):
+    """Connection pool usage, checkout-wait histograms and long-held connections on this node"""
+    require_admin(current_user)
+
+    engines = {"primary": engine}
+    engines.update({f"replica{i}": replica for i, replica in enumerate(read_router.replicas)})
+    return {
+        "pools": {name: pool_status(e) for name, e in engines.items()},
+        "checkout_wait_seconds": {h.name.split(":", 1)[-1]: h.snapshot() for h in all_histograms()
+                                  if h.name.startswith("db_pool_checkout_wait_seconds")},
+        "held_connections": {t.name: t.held(older_than=1.0) for t in connection_trackers},
+    }
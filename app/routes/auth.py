@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.schemas.user_schema import UserCreate, UserLogin, UserOut
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.database import get_db
+from app.services.query_service import exists
 from app.utils.security import hash_password, verify_password
 from app.utils.jwt_handler import create_access_token
 
@@ -11,15 +12,14 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/register")
 def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+    if exists(db, User.email == user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = User(
         email=user.email,
         name=user.name,
         hashed_password=hash_password(user.password),
-        is_adman="user",
+        is_adman=UserRole.USER,
         phone_number=user.phone_number,
         DOB=user.DOB
     )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
-from app.ai_agent.agent import assistant_agent, run_agent
+from app.ai_agent.agent import run_agent
+from app.utils.serialization import dumps, loads
 from .users import get_current_user
-import json
 
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
@@ -19,44 +19,31 @@ async def chat_with_bot(message: dict, current_user=Depends(get_current_user)):
                 "user_id": current_user.id, 
                 "name": current_user.name, 
                 "email": current_user.email,
-                "is_admin": getattr(current_user, 'is_adman', 'user') == 'admin'
+                "is_admin": current_user.is_admin
             }
         )
         
-        # Debug logging for production troubleshooting
-        print(f"Agent result: {result}")
-        print(f"Agent result type: {type(result)}")
-        
         final_output = result.get("final_output", "")
         print(f"Final output: {final_output}")
-        print(f"Final output type: {type(final_output)}")
         
         # Clean up malformed responses that wrap tool outputs
         if isinstance(final_output, str):
             # Remove wrapper patterns like {"start_booking_response": {"results": [...]}}
-            if final_output.startswith('{"') and '"_response"' in final_output:
+            if final_output.startswith('{"') and '_response"' in final_output:
                 try:
-                    parsed = json.loads(final_output)
+                    parsed = loads(final_output)
                     # Extract the actual tool response from wrapper
                     for key, value in parsed.items():
                         if key.endswith('_response') and isinstance(value, dict):
                             results = value.get('results', [])
                             if results and isinstance(results, list):
-                                final_output = results[0]
+                                final_output = results[0] if isinstance(results[0], str) else dumps(results[0])
                                 break
-                except:
+                except Exception:
                     pass
         
-        # Check if the result is a JSON string that needs to be returned as-is for frontend navigation handling
-        try:
-            parsed_result = json.loads(final_output)
-            # If it's a structured response (navigation_response or message_response), return it as JSON string
-            if isinstance(parsed_result, dict) and parsed_result.get("type") in ["navigation_response", "message_response", "payment_redirect"]:
-                return {"reply": final_output}
-        except (json.JSONDecodeError, TypeError):
-            # Not JSON, return as regular text
-            pass
-        
+        # Tool payloads (navigation_response, message_response, payment_redirect) are already
+        # serialized JSON strings and go to the frontend as-is; plain text is returned unchanged too
         return {"reply": final_output}
         
     except Exception as e:
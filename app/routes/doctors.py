@@ -1,25 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db, statement_timeout
 from app.models.doctor import Doctor
 from app.schemas.doctor_schema import DoctorOut, DoctorCreate, DoctorUpdate, DoctorCreateForm
 from app.routes.users import get_current_user
 from app.models.user import User
-import os
-import uuid
+from app.dependencies import require_admin
+from app.services import doctor_service
+from app.services.doctor_service import get_doctor_catalog
+from app.services.doctor_import_service import detect_format, import_doctors
+from app.services.image_service import schedule_derivatives, schedule_missing_derivatives
+from app.services.upload_service import store_upload, verify_upload
+from app.storage import get_storage
+from app.utils.money import parse_fee_cents
+from typing import Literal, Optional
+import zipfile
 from pathlib import Path
+from config import IMPORT_STATEMENT_TIMEOUT_MS
 
 router = APIRouter(prefix="/doctors", tags=["Doctors"])
 
 
 # Public routes (no auth required)
 @router.get("/", response_model=list[DoctorOut])
-def list_doctors(db: Session = Depends(get_db)):
-    return db.query(Doctor).all()
+def list_doctors(
+    min_fee_cents: Optional[int] = Query(None, ge=0),
+    max_fee_cents: Optional[int] = Query(None, ge=0),
+    sort: Optional[Literal["fee_asc", "fee_desc"]] = None,
+    db: Session = Depends(get_read_db)
+):
+    # Unfiltered listing is served from the cached catalog
+    if min_fee_cents is None and max_fee_cents is None and sort is None:
+        return get_doctor_catalog()
+
+    query = db.query(Doctor)
+    if min_fee_cents is not None:
+        query = query.filter(Doctor.fee_cents >= min_fee_cents)
+    if max_fee_cents is not None:
+        query = query.filter(Doctor.fee_cents <= max_fee_cents)
+    if sort == "fee_asc":
+        query = query.order_by(Doctor.fee_cents.asc().nulls_last(), Doctor.id)
+    elif sort == "fee_desc":
+        query = query.order_by(Doctor.fee_cents.desc().nulls_last(), Doctor.id)
+    return query.all()
 
 
 @router.get("/{doctor_id}", response_model=DoctorOut)
-def get_doctor(doctor_id: int, db: Session = Depends(get_db)):
+def get_doctor(doctor_id: int, db: Session = Depends(get_read_db)):
     doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
@@ -33,29 +60,24 @@ def create_doctor(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if user is admin
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(current_user)
     
+    if parse_fee_cents(form_data.fee) is None:
+        raise HTTPException(status_code=400, detail="Invalid fee. Please provide an amount such as 150 or 150.50.")
+
     # Handle image upload
     image_url = None
     if form_data.image:
-        # Create uploads directory if it doesn't exist
-        upload_dir = Path("uploads/doctor_images")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate unique filename
+        # Store by content hash; identical images share one file
         file_extension = form_data.image.filename.split(".")[-1] if "." in form_data.image.filename else "jpg"
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = upload_dir / unique_filename
-        
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            content = form_data.image.file.read()
-            buffer.write(content)
-        
-        # Store relative URL
-        image_url = f"/uploads/doctor_images/{unique_filename}"
+        image_url = store_upload(
+            db, form_data.image.file, "doctor_images", f".{file_extension}", form_data.image.content_type
+        )
+    elif form_data.image_key:
+        # Image already uploaded directly to storage via /upload/presign
+        if verify_upload(db, form_data.image_key, "doctor_images") is None:
+            raise HTTPException(status_code=400, detail="Image upload not found. Please upload the image first.")
+        image_url = get_storage().url(form_data.image_key)
     
     # Create doctor with validated data
     doctor_data = {
@@ -66,13 +88,44 @@ def create_doctor(
         "image_url": image_url
     }
     
-    new_doc = Doctor(**doctor_data)
-    db.add(new_doc)
-    db.commit()
-    db.refresh(new_doc)
+    new_doc = doctor_service.create_doctor(db, doctor_data)
+    schedule_derivatives("doctor", new_doc.id, new_doc.image_url)
     return new_doc
 
 
+@router.post("/bulk", dependencies=[Depends(statement_timeout(IMPORT_STATEMENT_TIMEOUT_MS))])
+def bulk_import_doctors(
+    file: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import doctors from a CSV or NDJSON file, with an optional zip of images keyed by filename"""
+    require_admin(current_user)
+
+    file_format = detect_format(file.filename, file.content_type)
+    if not file_format:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a .csv or .ndjson file.")
+
+    archive = None
+    if images is not None:
+        try:
+            archive = zipfile.ZipFile(images.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Images must be uploaded as a .zip archive")
+
+    try:
+        result = import_doctors(db, file.file, file_format, images=archive)
+        if result["inserted"]:
+            schedule_missing_derivatives(db, "doctor")
+        return result
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8 encoded")
+    finally:
+        if archive is not None:
+            archive.close()
+
+
 @router.put("/{doctor_id}", response_model=DoctorOut)
 def update_doctor(
     doctor_id: int,
@@ -80,21 +133,17 @@ def update_doctor(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if user is admin
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(current_user)
     
     doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
     
     # Update only provided fields
-    update_data = doctor_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(doctor, field, value)
-    
-    db.commit()
-    db.refresh(doctor)
+    old_image_url = doctor.image_url
+    doctor_service.update_doctor(db, doctor, doctor_update.dict(exclude_unset=True))
+    if doctor.image_url != old_image_url:
+        schedule_derivatives("doctor", doctor.id, doctor.image_url)
     return doctor
 
 
@@ -104,14 +153,11 @@ def delete_doctor(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if user is admin
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(current_user)
     
     doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
     
-    db.delete(doctor)
-    db.commit()
+    doctor_service.delete_doctor(db, doctor)
     return {"message": f"Doctor {doctor.name} deleted successfully"}
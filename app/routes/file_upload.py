@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
+from app.dependencies import require_admin
 from app.models.user import User
-from app.utils.jwt_handler import decode_access_token
-import os
-import uuid
+from app.schemas.upload_schema import CompleteUploadRequest, PresignUploadRequest
+from app.services.image_service import schedule_derivatives
+from app.services.upload_service import (
+    collect_garbage, complete_upload, derivative_keys, grant_upload, register_upload, release_upload, replace_upload,
+    store_upload,
+)
+from app.storage import LocalStorage, get_storage
+from app.utils.jwt_handler import decode_access_token, verify_token
+from app.utils.scheduler import register_job
+from config import STORAGE_PRESIGN_EXPIRE_SECONDS, UPLOAD_GC_SECONDS
+import asyncio
+import hashlib
+import tempfile
 from pathlib import Path
 
 router = APIRouter(prefix="/upload", tags=["File Upload"])
@@ -16,6 +27,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+
+def run_upload_gc():
+    """Delete uploads nothing has referenced for the grace period, one batch per pass."""
+    db = SessionLocal()
+    try:
+        result = collect_garbage(db)
+        if result["deleted"]:
+            print(f"Upload GC: removed {result['deleted']} blobs, freed {result['bytes_freed']} bytes")
+    finally:
+        db.close()
+
+
+register_job("upload-gc", UPLOAD_GC_SECONDS, run_upload_gc)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
         print(f"DEBUG: Received token: {token[:20]}..." if token else "No token")
@@ -57,7 +82,7 @@ def validate_image_file(file: UploadFile) -> bool:
     return True
 
 @router.post("/profile-image")
-async def upload_profile_image(
+def upload_profile_image(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -72,25 +97,16 @@ async def upload_profile_image(
         )
     
     try:
-        # Create uploads directory if it doesn't exist
-        upload_dir = Path("uploads/patient_profile_image")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate unique filename
+        # Store by content hash; re-uploading the same image reuses the existing file
         file_ext = Path(file.filename).suffix.lower()
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = upload_dir / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        image_url = store_upload(db, file.file, "patient_profile_image", file_ext, file.content_type)
         
         # Update user's image_url in database
-        image_url = f"/uploads/patient_profile_image/{unique_filename}"
+        replace_upload(db, current_user.image_url, image_url)
         current_user.image_url = image_url
         db.commit()
         db.refresh(current_user)
+        schedule_derivatives("user", current_user.id, image_url)
         
         return {
             "success": True,
@@ -106,7 +122,7 @@ async def upload_profile_image(
         )
 
 @router.delete("/profile-image")
-async def delete_profile_image(
+def delete_profile_image(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -116,11 +132,13 @@ async def delete_profile_image(
         raise HTTPException(status_code=404, detail="No profile image found")
     
     try:
-        # Remove file from filesystem
-        if current_user.image_url.startswith("/uploads/"):
-            file_path = Path(current_user.image_url.lstrip("/"))
-            if file_path.exists():
-                file_path.unlink()
+        # Shared files are removed by the upload GC once nothing references them;
+        # legacy uuid uploads belong to this user alone and are removed directly
+        storage = get_storage()
+        key = storage.key_for_url(current_user.image_url)
+        if not release_upload(db, current_user.image_url) and key is not None:
+            for stored_key in (key, *derivative_keys(key)):
+                storage.delete(stored_key)
         
         # Update database
         current_user.image_url = None
@@ -138,3 +156,83 @@ async def delete_profile_image(
             status_code=500,
             detail=f"Failed to delete image: {str(e)}"
         )
+
+
+# Direct-to-storage uploads: presign, PUT the bytes to storage, then complete.
+# With the s3 backend image bytes never pass through the API workers.
+@router.post("/presign")
+def presign_upload(
+    request: PresignUploadRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a URL the client can upload an image to directly"""
+    if request.kind == "doctor_images":
+        require_admin(current_user)
+    file_ext = Path(request.filename).suffix.lower()
+    if file_ext not in ALLOWED_EXTENSIONS or request.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file. Please upload a valid image file (JPG, PNG, GIF, BMP, WebP) under 5MB."
+        )
+
+    user_id = current_user.id  # read before register_upload's commit expires it
+    key = register_upload(db, request.kind, request.sha256, file_ext, request.size)
+    # Always upload, even when the content is already stored: completing needs proof of the bytes,
+    # and the key alone (derived from the hash) is no proof
+    grant_upload(user_id, key, STORAGE_PRESIGN_EXPIRE_SECONDS * 2)
+    upload = get_storage().presign_upload(
+        key, request.content_type, request.size, request.sha256, STORAGE_PRESIGN_EXPIRE_SECONDS
+    )
+    return {"key": key, "upload": upload}
+
+
+@router.put("/direct/{token}")
+async def direct_upload(token: str, request: Request):
+    """Receive a presigned upload for the local storage backend"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        claims = verify_token(token, "upload")
+    except Exception:
+        raise HTTPException(status_code=403, detail="Invalid or expired upload URL")
+
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > claims["size"]:
+                raise HTTPException(status_code=400, detail="Upload is larger than the presigned size")
+            digest.update(chunk)
+            spool.write(chunk)
+        if size != claims["size"] or digest.hexdigest() != claims["sha256"]:
+            raise HTTPException(status_code=400, detail="Upload does not match the presigned size and checksum")
+        spool.seek(0)
+        await asyncio.to_thread(storage.save, claims["key"], spool, request.headers.get("content-type"))
+    return {"success": True}
+
+
+@router.post("/profile-image/complete")
+def complete_profile_image_upload(
+    request: CompleteUploadRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Use an image the current user uploaded directly as their profile image"""
+    if complete_upload(db, current_user.id, request.key, "patient_profile_image") is None:
+        raise HTTPException(status_code=400, detail="Upload not found. Please upload the image first.")
+
+    image_url = get_storage().url(request.key)
+    replace_upload(db, current_user.image_url, image_url)
+    current_user.image_url = image_url
+    db.commit()
+    db.refresh(current_user)
+    schedule_derivatives("user", current_user.id, image_url)
+
+    return {
+        "success": True,
+        "message": "Profile image uploaded successfully",
+        "image_url": image_url
+    }
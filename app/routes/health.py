@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from app.services.lifecycle_service import STATE
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+def live():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    """Warm-up has finished and the node is not shutting down; the load balancer routes to it only then"""
+    if not STATE["ready"]:
+        failed = any("error" in STATE["warmup"].get(step, {}) for step in ("pool", "queries"))
+        status = "draining" if STATE["draining"] else "database_unavailable" if failed else "warming_up"
+        return ORJSONResponse({"status": status, "warmup": STATE["warmup"]}, status_code=503)
+    return {"status": "ready", "warmup": STATE["warmup"]}
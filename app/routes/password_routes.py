@@ -6,12 +6,8 @@ from app.schemas import PasswordResetRequest, PasswordResetConfirm
 from app.utils.jwt_handler import create_reset_token, verify_token
 from app.utils.security import hash_password
 from app.utils.email_service import send_email
-from config import RESET_TOKEN_EXPIRE_MINUTES
+from config import RESET_TOKEN_EXPIRE_MINUTES, RESET_LINK_BASE_URL
 import urllib.parse
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 router = APIRouter(prefix="/password", tags=["password"])
 
@@ -23,9 +19,7 @@ def forgot_password(data: PasswordResetRequest, db: Session = Depends(get_db)):
 
     token = create_reset_token({"sub": str(user.id), "email": user.email})
     
-    # Use frontend URL from environment variable
-    frontend_url = os.getenv("NEXT_PUBLIC_API_URL", "https://docassist-web.vercel.app")
-    reset_link = f"{frontend_url}/reset-password?token={urllib.parse.quote(token)}"
+    reset_link = f"{RESET_LINK_BASE_URL}/reset-password?token={urllib.parse.quote(token)}"
 
     body = f"Hello,\n\nClick the link to reset your password (valid {RESET_TOKEN_EXPIRE_MINUTES} minutes):\n{reset_link}"
     send_email(user.email, "Password Reset", body)
@@ -1,34 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from datetime import date, time
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.appointment import Appointment
+from app.models.appointment import Appointment, AppointmentStatus
 from app.models.doctor import Doctor
+from app.services.stats_service import record_appointment_created, record_appointment_change
+from app.services.reminder_service import schedule_reminders
 from .users import get_current_user
+from config import STRIPE_API_KEY, STRIPE_WEBHOOK_SECRET
 import stripe
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
 # Set Stripe API key
-stripe.api_key = os.getenv("STRIPE_API_KEY")
-
-# Webhook secret for verifying Stripe webhooks
-STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+stripe.api_key = STRIPE_API_KEY
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+
+async def raw_body(request: Request) -> bytes:
+    """The exact request bytes, which the Stripe signature is computed over."""
+    return await request.body()
+
+
 @router.post("/webhook")
-def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+def stripe_webhook(request: Request, payload: bytes = Depends(raw_body), db: Session = Depends(get_db)):
     """Handle Stripe webhook events"""
-    payload = request.body()
     sig_header = request.headers.get('stripe-signature')
     
     # For development, skip webhook signature verification
     if STRIPE_WEBHOOK_SECRET and STRIPE_WEBHOOK_SECRET != "whsec_test_webhook_secret_here":
         try:
+            # Plain dicts from here on, same as the unverified branch
             event = stripe.Webhook.construct_event(
                 payload, sig_header, STRIPE_WEBHOOK_SECRET
-            )
+            ).to_dict()
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid payload")
         except stripe.error.SignatureVerificationError:
@@ -60,15 +64,20 @@ def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 appointment = Appointment(
                     user_id=int(metadata['user_id']),
                     doctor_id=int(metadata['doctor_id']),
-                    date=metadata['date'],
-                    time=metadata['time'],
+                    date=date.fromisoformat(metadata['date']),
+                    time=time.fromisoformat(metadata['time']),
                     reason=metadata['reason'],
-                    status="confirmed",
+                    status=AppointmentStatus.CONFIRMED,
                     paid=True,
+                    amount_paid_cents=session.get('amount_total'),
                     stripe_payment_id=session['id']
                 )
                 
                 db.add(appointment)
+                record_appointment_created(db, appointment)
+                schedule_reminders(db, appointment)
+                # The patient's next reads should see their new appointment
+                db.info["user_id"] = appointment.user_id
                 db.commit()
                 db.refresh(appointment)
                 
@@ -126,15 +135,19 @@ def verify_payment(
                     appointment = Appointment(
                         user_id=int(metadata['user_id']),
                         doctor_id=int(metadata['doctor_id']),
-                        date=metadata['date'],
-                        time=metadata['time'],
+                        date=date.fromisoformat(metadata['date']),
+                        time=time.fromisoformat(metadata['time']),
                         reason=metadata['reason'],
-                        status="confirmed",
+                        status=AppointmentStatus.CONFIRMED,
                         paid=True,
+                        amount_paid_cents=getattr(session, "amount_total", None),
                         stripe_payment_id=session_id
                     )
                     
                     db.add(appointment)
+                    record_appointment_created(db, appointment)
+                    schedule_reminders(db, appointment)
+                    db.info["user_id"] = appointment.user_id
                     db.commit()
                     db.refresh(appointment)
                     
@@ -168,15 +181,19 @@ def verify_payment(
         
         # Update appointment if payment successful
         if session.payment_status == "paid" and not appointment.paid:
+            old_status, old_paid = appointment.status, appointment.paid
             appointment.paid = True
-            appointment.status = "confirmed"
+            appointment.amount_paid_cents = getattr(session, "amount_total", None)
+            if appointment.can_transition_to(AppointmentStatus.CONFIRMED):
+                appointment.transition_to(AppointmentStatus.CONFIRMED)
+            record_appointment_change(db, appointment, old_status, old_paid)
             db.commit()
             db.refresh(appointment)
         
         return {
             "payment_status": session.payment_status,
             "appointment_paid": appointment.paid,
-            "appointment_status": appointment.status
+            "appointment_status": AppointmentStatus(appointment.status).value
         }
     except stripe.error.StripeError as e:
         raise HTTPException(status_code=400, detail=f"Stripe error: {str(e)}")
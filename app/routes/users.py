@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
+from app.dependencies import require_admin
+from app.services.query_service import count, exists
 from app.schemas.user_schema import UserOut, UserUpdate
+from app.services import user_service
+from app.services.upload_service import replace_upload
 from app.utils.jwt_handler import decode_access_token
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import HTTPException
@@ -27,14 +31,15 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Lets the caller's next reads stay on the primary after they write
+    db.info["user_id"] = user.id
     return user
 
 
 @router.get("/", response_model=list[UserOut])
-def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_all_users(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     # Only allow admins to view all users
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Access forbidden: Admin privileges required")
+    require_admin(current_user)
     
     return db.query(User).all()
 
@@ -56,6 +61,7 @@ def update_profile(user_update: UserUpdate, current_user: User = Depends(get_cur
     if user_update.DOB is not None:
         current_user.DOB = user_update.DOB
     if user_update.image_url is not None:
+        replace_upload(db, current_user.image_url, user_update.image_url)
         current_user.image_url = user_update.image_url
     
     db.commit()
@@ -71,9 +77,7 @@ def update_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if user is admin
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(current_user)
     
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -84,8 +88,7 @@ def update_user(
         user.name = user_update.name
     if user_update.email is not None:
         # Check if email already exists for another user
-        existing_user = db.query(User).filter(User.email == user_update.email, User.id != user_id).first()
-        if existing_user:
+        if exists(db, User.email == user_update.email, User.id != user_id):
             raise HTTPException(status_code=400, detail="Email already registered")
         user.email = user_update.email
     if user_update.phone_number is not None:
@@ -93,6 +96,7 @@ def update_user(
     if user_update.DOB is not None:
         user.DOB = user_update.DOB
     if user_update.image_url is not None:
+        replace_upload(db, user.image_url, user_update.image_url)
         user.image_url = user_update.image_url
     
     db.commit()
@@ -106,9 +110,7 @@ def delete_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if user is admin
-    if current_user.is_adman != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(current_user)
     
     # Prevent admin from deleting themselves
     if current_user.id == user_id:
@@ -121,17 +123,15 @@ def delete_user(
     try:
         # Check if user has appointments
         from app.models.appointment import Appointment
-        appointments = db.query(Appointment).filter(Appointment.user_id == user_id).all()
-        
-        if appointments:
-            appointment_count = len(appointments)
+        appointment_count = count(db, Appointment, Appointment.user_id == user_id)
+
+        if appointment_count:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Cannot delete user {user.name}. They have {appointment_count} appointment(s). Please cancel or reassign their appointments first."
             )
         
-        db.delete(user)
-        db.commit()
+        user_service.delete_user(db, user)
         return {"message": f"User {user.name} deleted successfully"}
         
     except HTTPException:
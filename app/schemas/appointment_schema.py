@@ -1,7 +1,8 @@
 # backend/app/schemas/appointment_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 from datetime import date, time
+from app.utils.datetime_parser import parse_date, parse_time
 
 
 class AppointmentBase(BaseModel):
@@ -12,7 +13,16 @@ class AppointmentBase(BaseModel):
 
 
 class AppointmentCreate(AppointmentBase):
-    pass
+    # Also accepts phrases such as "next monday" and "2pm"
+    @field_validator("date", mode="before")
+    @classmethod
+    def parse_date_phrase(cls, value):
+        return parse_date(value) if isinstance(value, str) else value
+
+    @field_validator("time", mode="before")
+    @classmethod
+    def parse_time_phrase(cls, value):
+        return parse_time(value) if isinstance(value, str) else value
 
 
 class AppointmentOut(AppointmentBase):
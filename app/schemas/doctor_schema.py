@@ -1,7 +1,8 @@
 # backend/app/schemas/doctor_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator, model_validator
 from typing import Optional
 from fastapi import Form, UploadFile, File
+from app.utils.money import parse_fee_cents
 
 
 class DoctorBase(BaseModel):
@@ -10,10 +11,21 @@ class DoctorBase(BaseModel):
     bio: Optional[str] = None
     image_url: Optional[str] = None
     fee: str
+    fee_cents: Optional[int] = None
 
 
 class DoctorCreate(DoctorBase):
-    pass
+    @field_validator("fee")
+    @classmethod
+    def fee_must_be_amount(cls, value: str) -> str:
+        if parse_fee_cents(value) is None:
+            raise ValueError("fee must be an amount such as 150 or 150.50")
+        return value
+
+    @model_validator(mode="after")
+    def fill_fee_cents(self):
+        self.fee_cents = parse_fee_cents(self.fee)
+        return self
 
 
 class DoctorCreateForm:
@@ -23,13 +35,15 @@ class DoctorCreateForm:
         specialty: str = Form(...),
         fee: str = Form(...),
         bio: Optional[str] = Form(None),
-        image: Optional[UploadFile] = File(None)
+        image: Optional[UploadFile] = File(None),
+        image_key: Optional[str] = Form(None)  # storage key from /upload/presign, instead of `image`
     ):
         self.name = name
         self.specialty = specialty
         self.fee = fee
         self.bio = bio
         self.image = image
+        self.image_key = image_key
 
 
 class DoctorUpdate(BaseModel):
@@ -38,10 +52,27 @@ class DoctorUpdate(BaseModel):
     bio: Optional[str] = None
     image_url: Optional[str] = None
     fee: Optional[str] = None
+    fee_cents: Optional[int] = None
+
+    @field_validator("fee")
+    @classmethod
+    def fee_must_be_amount(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and parse_fee_cents(value) is None:
+            raise ValueError("fee must be an amount such as 150 or 150.50")
+        return value
+
+    @field_validator("fee_cents")
+    @classmethod
+    def fee_cents_not_negative(cls, value: Optional[int]) -> Optional[int]:
+        if value is not None and value < 0:
+            raise ValueError("fee_cents must not be negative")
+        return value
 
 
 class DoctorOut(DoctorBase):
     id: int
+    thumbnail_url: Optional[str] = None
+    webp_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,14 @@
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class PresignUploadRequest(BaseModel):
+    kind: Literal["patient_profile_image", "doctor_images"] = "patient_profile_image"
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+
+
+class CompleteUploadRequest(BaseModel):
+    key: str
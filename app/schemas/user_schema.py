@@ -33,6 +33,8 @@ class UserOut(UserBase):
     phone_number: Optional[str] = None
     DOB: Optional[str] = None
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    webp_url: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
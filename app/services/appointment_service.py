@@ -1,7 +1,118 @@
 # backend/app/services/appointment_service.py
-from typing import List, Optional
-from app.models.appointment import Appointment
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.doctor import Doctor
 from app.schemas.appointment_schema import AppointmentCreate
+from app.services.stats_service import record_appointment_created, record_appointment_change
+from app.services.reminder_service import schedule_reminders
+from app.services.query_service import exists
+from app.utils.datetime_parser import WEEKDAYS, parse_time
+from app.utils.money import parse_fee_cents
+from config import CLINIC_HOURS, CLINIC_DAYS, SLOT_MINUTES
+
+
+def _minute_of_day(text: str) -> int:
+    """Minutes since midnight for "HH:MM"; "24:00" is the end of the day."""
+    if text.strip() == "24:00":
+        return 24 * 60
+    at = parse_time(text)
+    return at.hour * 60 + at.minute
+
+
+def _clock(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+# Clinic hours as minutes since midnight; the default 00:00-24:00 takes bookings at any time
+CLINIC_OPENS, CLINIC_CLOSES = (_minute_of_day(part) for part in CLINIC_HOURS.split("-"))
+CLINIC_WEEKDAYS = {WEEKDAYS[day.strip().lower()] for day in CLINIC_DAYS.split(",")}
+
+
+class BookingRefused(ValueError):
+    """A booking the patient cannot make. `title` heads the chatbot reply, `status_code` is the REST error."""
+
+    def __init__(self, message: str, title: str = "Booking Unavailable", status_code: int = 400):
+        super().__init__(message)
+        self.title = title
+        self.status_code = status_code
+
+
+class SlotUnavailable(BookingRefused):
+    def __init__(self, message: str):
+        super().__init__(message, "Slot Unavailable")
+
+
+def check_slot_available(db, doctor_id: int, day: date, at: time, now: Optional[datetime] = None) -> None:
+    """
+    Raise SlotUnavailable (with a message for the patient) when the slot is in the
+    past, outside clinic hours, or already taken by an active appointment with the doctor.
+    """
+    now = now or datetime.now()
+    if day < now.date():
+        raise SlotUnavailable(f"Please select a date from today ({now.date():%Y-%m-%d}) onwards. You cannot book appointments for past dates.")
+    if day == now.date() and at <= now.time():
+        raise SlotUnavailable(f"{at:%H:%M} today has already passed. Please choose a later time.")
+    if day.weekday() not in CLINIC_WEEKDAYS:
+        raise SlotUnavailable(f"The clinic is closed on {day:%A}s. Please choose another day.")
+    if not CLINIC_OPENS <= at.hour * 60 + at.minute < CLINIC_CLOSES:
+        raise SlotUnavailable(f"Appointments start between {_clock(CLINIC_OPENS)} and {_clock(CLINIC_CLOSES)}.")
+    if exists(
+        db,
+        Appointment.doctor_id == doctor_id,
+        Appointment.date == day,
+        Appointment.time == at,
+        Appointment.status.in_(ACTIVE_STATUSES),
+    ):
+        raise SlotUnavailable(f"That doctor is already booked on {day:%Y-%m-%d} at {at:%H:%M}. Please choose another time.")
+
+
+def validate_booking(db, user_id: int, doctor_id: int, day: date, at: time,
+                     now: Optional[datetime] = None) -> Tuple[Doctor, int]:
+    """
+    Every check before a checkout is created, shared by the REST route and the agent's
+    tools. Returns the doctor and fee in cents, or raises BookingRefused.
+    """
+    check_slot_available(db, doctor_id, day, at, now=now)
+    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
+    if not doctor:
+        raise BookingRefused("Doctor not found. Please choose a doctor from the list.", "Doctor Not Found", 404)
+    if exists(
+        db,
+        Appointment.user_id == user_id,
+        Appointment.doctor_id == doctor_id,
+        Appointment.status.in_(ACTIVE_STATUSES),
+    ):
+        raise BookingRefused(
+            f"You already have an appointment with Dr. {doctor.name}. Please cancel your existing appointment before booking a new one.",
+            "Duplicate Appointment",
+        )
+    fee_cents = doctor.fee_cents if doctor.fee_cents is not None else parse_fee_cents(doctor.fee)
+    if fee_cents is None:
+        raise BookingRefused(f"Dr. {doctor.name} does not have a valid consultation fee configured.", "Fee Not Configured")
+    return doctor, fee_cents
+
+
+def free_slots(db, doctor_id: int, day: date, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[time]:
+    """Start times on `day`, every SLOT_MINUTES within clinic hours, that the doctor has free."""
+    now = now or datetime.now()
+    if day < now.date() or day.weekday() not in CLINIC_WEEKDAYS:
+        return []
+    taken = {
+        at for (at,) in db.query(Appointment.time).filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.date == day,
+            Appointment.status.in_(ACTIVE_STATUSES),
+        )
+    }
+    slots = []
+    minute = CLINIC_OPENS
+    while minute < CLINIC_CLOSES and (limit is None or len(slots) < limit):
+        at = time(minute // 60, minute % 60)
+        if at not in taken and (day > now.date() or at > now.time()):
+            slots.append(at)
+        minute += SLOT_MINUTES
+    return slots
 
 
 async def create_appointment_for_user(
@@ -13,9 +124,11 @@ async def create_appointment_for_user(
         date=date,
         time=time,
         reason=reason,
-        status="booked",
+        status=AppointmentStatus.BOOKED,
     )
     db.add(appointment)
+    record_appointment_created(db, appointment)
+    schedule_reminders(db, appointment)
     db.commit()
     db.refresh(appointment)
     return appointment
@@ -37,7 +150,11 @@ async def cancel_appointment(db, appointment_id: int) -> bool:
     appointment = await get_appointment_by_id(db, appointment_id)
     if not appointment:
         return False
-    appointment.status = "cancelled"
+    if not appointment.can_transition_to(AppointmentStatus.CANCELLED):
+        return False
+    old_status = appointment.status
+    appointment.transition_to(AppointmentStatus.CANCELLED)
+    record_appointment_change(db, appointment, old_status, appointment.paid)
     db.commit()
     db.refresh(appointment)
     return True
@@ -0,0 +1,125 @@
+# backend/app/services/doctor_import_service.py
+import csv
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from app.schemas.doctor_schema import DoctorCreate
+from app.services.doctor_service import bulk_insert_doctors, refresh_doctor_catalog
+from app.services.upload_service import retain_upload, store_upload
+
+BATCH_SIZE = 500
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Return "csv" or "ndjson" based on the uploaded file name or content type."""
+    suffix = Path(filename or "").suffix.lower()
+    if suffix == ".csv" or content_type == "text/csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl") or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_rows(stream, file_format: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Stream (row_number, row, error) tuples out of a binary file object
+    without loading the whole file into memory.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}, None
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, row, None
+
+
+def _extract_image(db, images: zipfile.ZipFile, member: str) -> str:
+    """Store a zip member as a doctor image and return its public URL."""
+    extension = Path(member).suffix.lower()
+    if extension not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image type for '{member}'")
+    try:
+        info = images.getinfo(member)
+    except KeyError:
+        raise ValueError(f"Image '{member}' not found in archive")
+
+    with images.open(info) as source:
+        return store_upload(db, source, "doctor_images", extension)
+
+
+def validate_row(db, row: Dict, images: Optional[zipfile.ZipFile]) -> Dict:
+    """Validate one import row and resolve its image; raises ValueError on bad input."""
+    image_name = row.pop("image", None) or row.pop("image_filename", None)
+    try:
+        doctor = DoctorCreate(**{k: v for k, v in row.items() if v not in (None, "")})
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+
+    data = doctor.model_dump()
+    if image_name:
+        if images is None:
+            raise ValueError(f"Row references image '{image_name}' but no image archive was uploaded")
+        data["image_url"] = _extract_image(db, images, image_name)
+    return data
+
+
+def import_doctors(db, stream, file_format: str, images: Optional[zipfile.ZipFile] = None, batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    Validate and insert doctors from a CSV/NDJSON stream in batches.
+    Returns a report with inserted/failed counts and per-row errors.
+    """
+    inserted = 0
+    errors: List[Dict] = []
+    batch: List[Tuple[int, Dict]] = []
+
+    def flush():
+        nonlocal inserted
+        if not batch:
+            return
+        try:
+            inserted += bulk_insert_doctors(db, [data for _, data in batch])
+            for _, data in batch:
+                retain_upload(db, data.get("image_url"))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Bulk doctor insert failed: {e}")
+            errors.extend({"row": n, "error": f"Database error: {e}"} for n, _ in batch)
+        batch.clear()
+
+    for row_number, row, error in iter_rows(stream, file_format):
+        if error is None:
+            try:
+                batch.append((row_number, validate_row(db, row, images)))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            errors.append({"row": row_number, "error": error})
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    # Rebuild the catalog once for the whole import
+    if inserted:
+        refresh_doctor_catalog(db)
+
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
@@ -1,14 +1,36 @@
 # backend/app/services/doctor_service.py
-from typing import List, Optional
+import csv
+import io
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import insert
+from app.database import SessionLocal
 from app.models.doctor import Doctor
-from app.schemas.doctor_schema import DoctorCreate, DoctorUpdate
+from app.schemas.doctor_schema import DoctorOut
+from app.services.upload_service import release_upload, replace_upload, retain_upload
+from app.shared_state import get_shared_state
+from app.utils.money import format_fee
 
+# Columns written by bulk inserts, in COPY order
+BULK_COLUMNS = ("name", "specialty", "bio", "image_url", "fee", "fee_cents")
 
-async def create_doctor(db, doctor_in: DoctorCreate) -> Doctor:
-    doctor = Doctor(**doctor_in.dict())
+# In-process snapshot of the public doctor list. Writes bump a shared version so
+# every worker rebuilds its own snapshot on its next read, from the primary: a
+# lagging replica would cache rows from before the write under the new version.
+CATALOG_VERSION_KEY = "doctor_catalog:version"
+_catalog: Optional[List[Dict]] = None
+_catalog_version: Optional[bytes] = None
+_catalog_lock = threading.Lock()
+
+
+def create_doctor(db, doctor_data: Dict) -> Doctor:
+    """Add a doctor, counting its image upload, and refresh the catalog."""
+    doctor = Doctor(**doctor_data)
     db.add(doctor)
+    retain_upload(db, doctor.image_url)
     db.commit()
     db.refresh(doctor)
+    refresh_doctor_catalog(db)
     return doctor
 
 
@@ -33,21 +55,92 @@ async def find_doctors_by_query(db, query: str) -> List[Doctor]:
     )
 
 
-async def update_doctor(db, doctor_id: int, update_data: DoctorUpdate) -> Optional[Doctor]:
-    doctor = await get_doctor_by_id(db, doctor_id)
-    if not doctor:
-        return None
-    for field, value in update_data.dict(exclude_unset=True).items():
-        setattr(doctor, field, value)
+def update_doctor(db, doctor: Doctor, update_data: Dict) -> Doctor:
+    """Apply a partial update (see apply_doctor_update), moving the image reference, and refresh the catalog."""
+    old_image_url = doctor.image_url
+    apply_doctor_update(doctor, update_data)
+    replace_upload(db, old_image_url, doctor.image_url)
     db.commit()
     db.refresh(doctor)
+    refresh_doctor_catalog(db)
     return doctor
 
 
-async def delete_doctor(db, doctor_id: int) -> bool:
-    doctor = await get_doctor_by_id(db, doctor_id)
-    if not doctor:
-        return False
+def delete_doctor(db, doctor: Doctor) -> None:
+    """Delete a doctor, releasing its image upload, and refresh the catalog."""
+    release_upload(db, doctor.image_url)
     db.delete(doctor)
     db.commit()
-    return True
+    refresh_doctor_catalog(db)
+
+
+def apply_doctor_update(doctor: Doctor, update_data: Dict) -> None:
+    """Apply a partial update, keeping fee and fee_cents consistent."""
+    if update_data.get("fee") is not None:
+        # fee_cents is derived from fee by the model
+        update_data.pop("fee_cents", None)
+    elif update_data.get("fee_cents") is not None:
+        update_data["fee"] = format_fee(update_data["fee_cents"])
+    else:
+        update_data.pop("fee", None)
+        update_data.pop("fee_cents", None)
+    for field, value in update_data.items():
+        setattr(doctor, field, value)
+
+
+def _load_catalog(db, version: Optional[bytes]) -> List[Dict]:
+    global _catalog, _catalog_version
+    doctors = db.query(Doctor).order_by(Doctor.id).all()
+    catalog = [DoctorOut.model_validate(d).model_dump() for d in doctors]
+    with _catalog_lock:
+        _catalog = catalog
+        _catalog_version = version
+    return catalog
+
+
+def refresh_doctor_catalog(db) -> List[Dict]:
+    """Rebuild the cached doctor list after a write, and have the other workers rebuild theirs."""
+    version = str(get_shared_state().incr(CATALOG_VERSION_KEY)).encode()
+    return _load_catalog(db, version)
+
+
+def get_doctor_catalog() -> List[Dict]:
+    """Return the cached doctor list, loading it on first use or after another worker changed it."""
+    # Read the version before the rows, so a write racing with the rebuild triggers another one
+    version = get_shared_state().get(CATALOG_VERSION_KEY)
+    if _catalog is None or version != _catalog_version:
+        with SessionLocal() as db:
+            return _load_catalog(db, version)
+    return _catalog
+
+
+def bulk_insert_doctors(db, rows: List[Dict]) -> int:
+    """
+    Insert a batch of validated doctor rows in a single round trip.
+    Uses COPY on PostgreSQL and executemany everywhere else.
+    Caller is responsible for committing.
+    """
+    if not rows:
+        return 0
+
+    if db.bind.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row.get(column) for column in BULK_COLUMNS])
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY doctors ({', '.join(BULK_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+    else:
+        db.execute(
+            insert(Doctor),
+            [{column: row.get(column) for column in BULK_COLUMNS} for row in rows],
+        )
+    return len(rows)
@@ -0,0 +1,88 @@
+# backend/app/services/image_service.py
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+from app.database import SessionLocal
+from app.models.doctor import Doctor
+from app.models.user import User
+from app.storage import get_storage
+from app.utils.image_derivatives import derivatives_available, derive_stored_image
+from config import IMAGE_WORKERS
+
+
+OWNER_MODELS = {"doctor": Doctor, "user": User}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn keeps DB connections and threads of the API process out of the workers
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool(wait: bool = True) -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=wait, cancel_futures=not wait)
+        _pool = None
+
+
+def save_derivative_urls(owner: str, owner_id: int, image_url: str, derived: Dict[str, str]) -> bool:
+    """Store derivative URLs if the owner still uses `image_url`. Returns True if updated."""
+    model = OWNER_MODELS[owner]
+    storage = get_storage()
+    db = SessionLocal()
+    try:
+        updated = db.query(model).filter(model.id == owner_id, model.image_url == image_url).update(
+            {"thumbnail_url": storage.url(derived["thumbnail"]), "webp_url": storage.url(derived["webp"])},
+            synchronize_session=False,
+        )
+        db.commit()
+        if updated and owner == "doctor":
+            from app.services.doctor_service import refresh_doctor_catalog
+            refresh_doctor_catalog(db)
+        return bool(updated)
+    finally:
+        db.close()
+
+
+def _on_done(owner: str, owner_id: int, image_url: str, future: Future) -> None:
+    try:
+        derived = future.result()
+    except Exception as e:
+        print(f"Image derivative generation failed for {image_url}: {e}")
+        return
+    try:
+        save_derivative_urls(owner, owner_id, image_url, derived)
+    except Exception as e:
+        print(f"Saving derivative URLs failed for {owner} {owner_id}: {e}")
+
+
+def schedule_derivatives(owner: str, owner_id: int, image_url: Optional[str]) -> Optional[Future]:
+    """
+    Generate thumbnail/WebP variants for an upload in the background.
+    The original image_url keeps being served until the derivative URLs are stored.
+    """
+    key = get_storage().key_for_url(image_url)
+    if key is None or not derivatives_available():
+        return None
+    future = _get_pool().submit(derive_stored_image, key)
+    future.add_done_callback(lambda f: _on_done(owner, owner_id, image_url, f))
+    return future
+
+
+def schedule_missing_derivatives(db, owner: str = "doctor", limit: int = 10000) -> int:
+    """Queue derivatives for every owner that has an image but no thumbnail yet."""
+    model = OWNER_MODELS[owner]
+    rows = (
+        db.query(model.id, model.image_url)
+        .filter(model.image_url.isnot(None), model.thumbnail_url.is_(None))
+        .limit(limit)
+        .all()
+    )
+    for owner_id, image_url in rows:
+        schedule_derivatives(owner, owner_id, image_url)
+    return len(rows)
@@ -0,0 +1,114 @@
+# backend/app/services/lifecycle_service.py
+"""
+Startup warm-up and graceful shutdown, driven by the app lifespan.
+
+Warm-up runs in the background after the server starts listening: it opens pool
+connections, runs the hot queries once, checks the shared state, primes the doctor
+catalog, builds the OpenAPI schema and the chatbot agent, and then marks the node ready.
+The primary pool and the hot queries must succeed (they are retried every
+WARMUP_RETRY_SECONDS until they do); the other steps only leave their part cold. Shutdown takes
+the node out of rotation first, lets agent runs finish, stops the jobs, flushes the
+image queue and closes every pooled connection.
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from config import DB_POOL_WARM_CONNECTIONS, OPENAI_API_KEY, SHUTDOWN_DRAIN_SECONDS, WARMUP_RETRY_SECONDS
+from app.ai_agent.agent import get_assistant_agent, wait_for_runs
+from app.database import SessionLocal, engine, read_router
+from app.models.doctor import Doctor
+from app.models.user import User
+from app.services.doctor_service import get_doctor_catalog
+from app.services.image_service import shutdown_pool
+from app.shared_state import get_shared_state
+from app.utils.scheduler import stop_jobs
+
+
+# Readiness of this node, served by /health/ready
+STATE: Dict = {"ready": False, "draining": False, "warmup": {}}
+
+
+def warm_pool(target: Engine, connections: int = DB_POOL_WARM_CONNECTIONS) -> int:
+    """Open up to `connections` pooled connections at once, then return them to the pool."""
+    opened: List = []
+    try:
+        for _ in range(max(0, min(connections, target.pool.size()))):
+            conn = target.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm_queries() -> int:
+    """Run the hot lookups once so their statements are compiled and cached."""
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == 0).first()  # get_current_user
+        db.query(User).filter(User.email == "").first()  # login
+        db.query(Doctor).filter(Doctor.id == 0).first()  # get_doctor
+        return 3
+    finally:
+        db.close()
+
+
+def warm_catalog() -> int:
+    """Prime the doctor catalog (it also reads the shared state)."""
+    return len(get_doctor_catalog())
+
+
+def build_agent() -> bool:
+    if not OPENAI_API_KEY:
+        return False
+    get_assistant_agent()
+    return True
+
+
+async def _step(name: str, func, *args) -> bool:
+    """Run one warm-up step and record it in STATE; False if it raised."""
+    start = time.perf_counter()
+    try:
+        result, error = await asyncio.to_thread(func, *args), None
+    except Exception as e:
+        print(f"Warm-up step '{name}' failed: {e}")
+        result, error = None, str(e)
+    STATE["warmup"][name] = {"result": result, "ms": round((time.perf_counter() - start) * 1000, 1)}
+    if error is not None:
+        STATE["warmup"][name]["error"] = error
+    return error is None
+
+
+async def warm_up(app) -> None:
+    STATE.update(ready=False, draining=False, warmup={})
+    start = time.perf_counter()
+    # Without the primary database the node cannot serve anything: stay out of rotation until it answers
+    while not (await _step("pool", warm_pool, engine) and await _step("queries", warm_queries)):
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+    # A failure below leaves that part cold; it is not a reason to stay out of rotation
+    for i, replica in enumerate(read_router.replicas):
+        await _step(f"replica{i}_pool", warm_pool, replica)
+    await _step("shared_state", lambda: get_shared_state().ping())
+    await _step("catalog", warm_catalog)
+    await _step("openapi", lambda: len(app.openapi()["paths"]))
+    await _step("agent", build_agent)
+    STATE["ready"] = not STATE["draining"]
+    print(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms: {STATE['warmup']}")
+
+
+async def shut_down(warmup_task: Optional[asyncio.Task] = None) -> None:
+    STATE["ready"] = False
+    STATE["draining"] = True
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    remaining = await wait_for_runs(SHUTDOWN_DRAIN_SECONDS)
+    if remaining:
+        print(f"Shutting down with {remaining} agent runs still in flight")
+    await stop_jobs()
+    # Pending image derivatives finish instead of being dropped
+    await asyncio.to_thread(shutdown_pool, True)
+    for target in [engine] + read_router.replicas:
+        target.dispose()
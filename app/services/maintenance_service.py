@@ -0,0 +1,101 @@
+# backend/app/services/maintenance_service.py
+"""
+Appointment housekeeping.
+
+Confirmed appointments whose slot has passed become completed, and bookings that
+were never paid for expire once their checkout hold (BOOKING_HOLD_MINUTES from
+created_at) runs out, or their time has gone by. Both are set-based
+UPDATEs over the active-appointment index, run in small chunks that each commit
+on their own, so row locks are held for milliseconds and several nodes can run
+the job at once (SKIP LOCKED, and the status guard makes a rerun a no-op).
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import and_, or_, select, update
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUS_PREDICATE
+from app.services.stats_service import increment_counter, record_bulk_status_change
+from config import MAINTENANCE_CHUNK_SIZE, COMPLETE_AFTER_MINUTES, BOOKING_HOLD_MINUTES
+
+
+# Last run on this node, served by the admin maintenance endpoint
+LAST_RUN: Dict = {}
+
+
+def _started_before(cutoff: datetime):
+    """(date, time) < cutoff, written so the date range can use the active index."""
+    return or_(
+        Appointment.date < cutoff.date(),
+        and_(Appointment.date == cutoff.date(), Appointment.time < cutoff.time()),
+    )
+
+
+def _transition_chunk(db, old_status: AppointmentStatus, new_status: AppointmentStatus, due,
+                      chunk_size: int, *criteria) -> int:
+    """Move one chunk of matching appointments to new_status and commit. Returns rows touched."""
+    ids = (
+        select(Appointment.id)
+        # The literal index predicate lets the planner use the partial active-date index
+        .where(ACTIVE_STATUS_PREDICATE, Appointment.status == old_status, due, *criteria)
+        .order_by(Appointment.date, Appointment.time)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        update(Appointment)
+        # Re-checking the status keeps a concurrent run from moving the same row twice
+        .where(Appointment.id.in_(ids), Appointment.status == old_status)
+        .values(status=new_status)
+        .returning(Appointment.date, Appointment.doctor_id, Appointment.paid, Appointment.amount_paid_cents)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if rows:
+        record_bulk_status_change(db, rows, old_status, new_status)
+    db.commit()
+    return len(rows)
+
+
+def _transition_all(db, old_status, new_status, due, chunk_size, *criteria) -> int:
+    touched = 0
+    while True:
+        count = _transition_chunk(db, old_status, new_status, due, chunk_size, *criteria)
+        touched += count
+        if count < chunk_size:
+            return touched
+
+
+def run_appointment_maintenance(
+    db,
+    now: Optional[datetime] = None,
+    chunk_size: int = MAINTENANCE_CHUNK_SIZE,
+) -> Dict:
+    """Complete past confirmed appointments and expire unpaid bookings whose hold or time has passed."""
+    now = now or datetime.now()
+    start = time.perf_counter()
+
+    completed = _transition_all(
+        db, AppointmentStatus.CONFIRMED, AppointmentStatus.COMPLETED,
+        _started_before(now - timedelta(minutes=COMPLETE_AFTER_MINUTES)), chunk_size,
+    )
+    expired = _transition_all(
+        db, AppointmentStatus.BOOKED, AppointmentStatus.EXPIRED,
+        or_(Appointment.created_at < now - timedelta(minutes=BOOKING_HOLD_MINUTES), _started_before(now)),
+        chunk_size, Appointment.paid.is_(False),
+    )
+    duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    recorded_at = datetime.utcnow()
+    increment_counter(db, "maintenance_completed_total", completed, recorded_at)
+    increment_counter(db, "maintenance_expired_total", expired, recorded_at)
+    increment_counter(db, "maintenance_runs_total", 1, recorded_at)
+    db.commit()
+
+    LAST_RUN.clear()
+    LAST_RUN.update({
+        "ran_at": recorded_at.isoformat(),
+        "completed": completed,
+        "expired": expired,
+        "duration_ms": duration_ms,
+    })
+    return dict(LAST_RUN)
@@ -0,0 +1,139 @@
+# backend/app/services/partition_service.py
+"""
+Monthly partitions of the appointments table (Postgres only).
+
+The table is range-partitioned on date, one partition per month plus a DEFAULT
+partition. A daily job keeps partitions created a few months ahead and, when
+APPOINTMENT_ARCHIVE_MONTHS is set, detaches months older than that into the
+`archive` schema, so day-to-day queries only touch recent data. Archived tables
+stay queryable (archive.appointments_2024_01) and can be re-attached by hand.
+"""
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import text
+from config import PARTITION_MONTHS_AHEAD, APPOINTMENT_ARCHIVE_MONTHS
+
+ARCHIVE_SCHEMA = "archive"
+
+# Serialises partition DDL when several nodes run the job
+_ADVISORY_LOCK_ID = 0x41505054  # "APPT"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"appointments_{month.year}_{month.month:02d}"
+
+
+def _is_partitioned(db) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('appointments')"
+    )).scalar())
+
+
+def _try_lock(db) -> bool:
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _ADVISORY_LOCK_ID}).scalar())
+
+
+def attached_months(db) -> List[date]:
+    """Months that currently have their own partition, oldest first."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('appointments')"
+    )).scalars()
+    months = []
+    for name in names:
+        parts = name.split("_")
+        if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+            months.append(date(int(parts[1]), int(parts[2]), 1))
+    return sorted(months)
+
+
+def archived_months(db) -> List[date]:
+    """Months moved to the archive schema by archive_partitions, oldest first (none off Postgres)."""
+    if db.bind.dialect.name != "postgresql":
+        return []
+    names = db.execute(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = :schema AND tablename LIKE 'appointments\\_%'"
+    ), {"schema": ARCHIVE_SCHEMA}).scalars()
+    months = []
+    for name in names:
+        parts = name.split("_")
+        if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+            months.append(date(int(parts[1]), int(parts[2]), 1))
+    return sorted(months)
+
+
+def _create_partition(db, month: date) -> None:
+    """
+    Create one month's partition. Rows that landed in the DEFAULT partition for that
+    month are moved into the new table before it is attached.
+    """
+    name, lower, upper = partition_name(month), month.isoformat(), add_months(month, 1).isoformat()
+    db.execute(text(f"CREATE TABLE {name} (LIKE appointments INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM appointments_default WHERE date >= :lower AND date < :upper RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), {"lower": lower, "upper": upper})
+    # Matching indexes are created on the new partition as part of the attach
+    db.execute(text(f"ALTER TABLE appointments ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+
+
+def ensure_future_partitions(db, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Create any missing partitions from this month up to months_ahead. Returns the new partition names."""
+    if not _is_partitioned(db) or not _try_lock(db):
+        db.rollback()
+        return []
+    this_month = (today or date.today()).replace(day=1)
+    existing = set(attached_months(db))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        if month not in existing:
+            _create_partition(db, month)
+            created.append(partition_name(month))
+    db.commit()
+    return created
+
+
+def archive_partitions(db, keep_months: int = APPOINTMENT_ARCHIVE_MONTHS, today: Optional[date] = None) -> List[str]:
+    """
+    Detach month partitions older than keep_months and move them to the archive schema.
+    Months that still hold booked or confirmed appointments are left attached.
+    """
+    if keep_months <= 0 or not _is_partitioned(db) or not _try_lock(db):
+        db.rollback()
+        return []
+    cutoff = add_months((today or date.today()).replace(day=1), -keep_months)
+    archived = []
+    for month in attached_months(db):
+        if month >= cutoff:
+            break
+        name = partition_name(month)
+        if db.execute(text(f"SELECT 1 FROM {name} WHERE status IN ('booked', 'confirmed') LIMIT 1")).scalar():
+            continue
+        db.execute(text(f"DELETE FROM appointment_reminders WHERE appointment_id IN (SELECT id FROM {name})"))
+        db.execute(text(f"ALTER TABLE appointments DETACH PARTITION {name}"))
+        # Archived rows must not block deleting users or doctors
+        for (constraint,) in db.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+        ), {"name": name}).all():
+            db.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        archived.append(f"{ARCHIVE_SCHEMA}.{name}")
+    db.commit()
+    return archived
+
+
+def maintain_partitions(db) -> dict:
+    """Daily job body: create upcoming partitions, then archive old ones."""
+    return {
+        "created": ensure_future_partitions(db),
+        "archived": archive_partitions(db),
+    }
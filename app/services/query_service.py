@@ -0,0 +1,24 @@
+# backend/app/services/query_service.py
+"""
+Existence checks, counts and single-column lookups that never load ORM rows.
+Use these instead of `.first()` or `.all()` when only a yes/no, a number or one
+value is needed: the database stops at the first match (EXISTS), counts without
+shipping rows, and nothing is added to the session's identity map.
+"""
+from typing import Any, Optional
+from sqlalchemy import exists as sql_exists, func, select
+
+
+def exists(db, *criteria) -> bool:
+    """Whether any row matches, e.g. exists(db, User.email == email)."""
+    return bool(db.scalar(select(sql_exists().where(*criteria))))
+
+
+def count(db, model, *criteria) -> int:
+    """Number of `model` rows matching the criteria."""
+    return db.scalar(select(func.count()).select_from(model).where(*criteria)) or 0
+
+
+def column_value(db, column, *criteria) -> Optional[Any]:
+    """One column of the first matching row (None if there is none), e.g. column_value(db, User.name, User.id == 5)."""
+    return db.scalar(select(column).where(*criteria).limit(1))
@@ -0,0 +1,130 @@
+# backend/app/services/reminder_service.py
+"""
+Appointment reminders.
+
+Each appointment gets one appointment_reminders row per window when it is booked.
+A scheduler tick claims due rows with a single range scan over the pending-reminder
+index (FOR UPDATE SKIP LOCKED, so several nodes can share the work), renders the
+emails, sends them over one SMTP connection and records the outcome.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, update
+from app.models.appointment import Appointment, ACTIVE_STATUSES
+from app.models.doctor import Doctor
+from app.models.reminder import AppointmentReminder
+from app.models.user import User
+from app.utils.email_service import create_reminder_email, send_emails
+from config import REMINDER_HOURS, REMINDER_BATCH_SIZE
+
+MAX_SEND_ATTEMPTS = 3
+
+Sender = Callable[[Sequence[Tuple[str, str, str]]], List[bool]]
+
+
+def reminder_kind(hours: int) -> str:
+    return f"{hours}h"
+
+
+def appointment_datetime(appointment_date, appointment_time) -> datetime:
+    """Appointments store naive local date and time, as entered when booking."""
+    if not isinstance(appointment_date, date):
+        appointment_date = date.fromisoformat(str(appointment_date))
+    if not isinstance(appointment_time, time):
+        appointment_time = time.fromisoformat(str(appointment_time))
+    return datetime.combine(appointment_date, appointment_time)
+
+
+def schedule_reminders(db, appointment: Appointment, now: Optional[datetime] = None) -> None:
+    """Queue the reminders for a new appointment. Call before committing."""
+    now = now or datetime.now()
+    starts_at = appointment_datetime(appointment.date, appointment.time)
+    if appointment.id is None:
+        db.flush()
+    for hours in REMINDER_HOURS:
+        due_at = starts_at - timedelta(hours=hours)
+        # Booked inside the window: the confirmation email already covers it
+        if due_at > now:
+            db.add(AppointmentReminder(appointment_id=appointment.id, kind=reminder_kind(hours), due_at=due_at))
+
+
+def _claim_due(db, now: datetime, batch_size: int):
+    """
+    One range scan over pending reminders, locking the claimed rows. Outer joins, so
+    reminders whose appointment was deleted are claimed too (with a None date) and skipped.
+    """
+    return db.execute(
+        select(
+            AppointmentReminder.appointment_id, AppointmentReminder.kind, AppointmentReminder.attempts,
+            Appointment.date, Appointment.time, Appointment.reason, Appointment.status,
+            User.name, User.email, Doctor.name, Doctor.specialty,
+        )
+        .outerjoin(Appointment, Appointment.id == AppointmentReminder.appointment_id)
+        .outerjoin(User, User.id == Appointment.user_id)
+        .outerjoin(Doctor, Doctor.id == Appointment.doctor_id)
+        .where(AppointmentReminder.outcome.is_(None), AppointmentReminder.due_at <= now)
+        .order_by(AppointmentReminder.due_at)
+        .limit(batch_size)
+        .with_for_update(of=AppointmentReminder, skip_locked=True)
+    ).all()
+
+
+def send_due_reminders(
+    db,
+    now: Optional[datetime] = None,
+    batch_size: int = REMINDER_BATCH_SIZE,
+    sender: Sender = send_emails,
+) -> Dict[str, int]:
+    """
+    Send every reminder that is due, one claimed batch at a time.
+    Cancelled, already-started or deleted appointments are marked skipped instead.
+    """
+    now = now or datetime.now()
+    totals = {"sent": 0, "skipped": 0, "failed": 0, "retry": 0}
+
+    while True:
+        rows = _claim_due(db, now, batch_size)
+        if not rows:
+            db.commit()
+            break
+
+        outcomes = []
+        to_send = []
+        for row in rows:
+            (appointment_id, kind, attempts, appt_date, appt_time, reason, status,
+             user_name, user_email, doctor_name, specialty) = row
+            key = {"appointment_id": appointment_id, "kind": kind}
+            if appt_date is None or status not in ACTIVE_STATUSES or appointment_datetime(appt_date, appt_time) <= now:
+                outcomes.append({**key, "outcome": "skipped"})
+                continue
+            body = create_reminder_email(
+                user_name=user_name,
+                doctor_name=doctor_name,
+                specialty=specialty,
+                date=str(appt_date),
+                time=str(appt_time),
+                reason=reason,
+                hours_before=int(kind.rstrip("h")),
+            )
+            to_send.append((key, attempts, (user_email, "Appointment Reminder - HealthCare+", body)))
+
+        results = sender([message for _, _, message in to_send]) if to_send else []
+        for (key, attempts, _), ok in zip(to_send, results):
+            if ok:
+                outcomes.append({**key, "outcome": "sent", "sent_at": now, "attempts": attempts + 1})
+            elif attempts + 1 >= MAX_SEND_ATTEMPTS:
+                outcomes.append({**key, "outcome": "failed", "attempts": attempts + 1})
+            else:
+                # Stays pending and is picked up again next tick
+                outcomes.append({**key, "outcome": None, "attempts": attempts + 1})
+
+        for outcome in outcomes:
+            totals[outcome["outcome"] or "retry"] += 1
+        db.execute(update(AppointmentReminder), outcomes)
+        db.commit()
+
+        if len(rows) < batch_size or totals["retry"]:
+            # A short batch means the backlog is drained; retries wait for the next tick
+            break
+
+    return totals
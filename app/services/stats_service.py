@@ -0,0 +1,293 @@
+# backend/app/services/stats_service.py
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, delete, distinct, func, not_, or_, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.doctor import Doctor
+from app.models.stats import AppointmentStat, StatCounter
+from app.models.user import User
+from app.services.partition_service import add_months, archived_months
+
+ROLLUP_COLUMNS = ("appointment_count", "paid_count", "revenue_cents")
+# Postgres advisory lock: incremental updates hold it shared, reconcile_stats exclusively,
+# so a rebuild never overwrites an update from a transaction it could not see
+STATS_LOCK_ID = 818_027
+
+
+def _lock_stats(db, exclusive: bool = False) -> None:
+    """Held until the transaction ends. Other backends serialise writers themselves (SQLite) or lock rows."""
+    if db.bind.dialect.name == "postgresql":
+        lock = "pg_advisory_xact_lock" if exclusive else "pg_advisory_xact_lock_shared"
+        db.execute(text(f"SELECT {lock}(:id)"), {"id": STATS_LOCK_ID})
+
+
+def _paid_cents(db, appointment: Appointment) -> int:
+    """
+    What the appointment was paid, falling back to the doctor's fee_cents for rows without
+    an amount: the same coalesce(amount_paid_cents, fee_cents, 0) reconcile_stats uses.
+    """
+    if appointment.amount_paid_cents is not None:
+        return appointment.amount_paid_cents
+    return db.query(Doctor.fee_cents).filter(Doctor.id == appointment.doctor_id).scalar() or 0
+
+
+def _upsert_stmt(dialect: str, replace: bool = False):
+    """Insert buckets, adding to existing ones (or overwriting them with `replace`)."""
+    insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert_fn(AppointmentStat)
+    return stmt.on_conflict_do_update(
+        index_elements=["day", "doctor_id", "status"],
+        set_={
+            column: stmt.excluded[column] if replace else getattr(AppointmentStat, column) + stmt.excluded[column]
+            for column in ROLLUP_COLUMNS
+        },
+    )
+
+
+def _bump(db, day: date, doctor_id: int, status: str, count: int, paid: int, revenue_cents: int) -> None:
+    """Add deltas to a single rollup bucket, creating it if needed."""
+    _bump_many(db, [dict(
+        day=day, doctor_id=doctor_id, status=status,
+        appointment_count=count, paid_count=paid, revenue_cents=revenue_cents,
+    )])
+
+
+def _bump_many(db, deltas: List[Dict]) -> None:
+    """Add deltas to several distinct rollup buckets in one executemany."""
+    if not deltas:
+        return
+    _lock_stats(db)
+    _write_buckets(db, deltas)
+
+
+def _write_buckets(db, rows: List[Dict], replace: bool = False) -> None:
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        db.execute(_upsert_stmt(dialect, replace), rows)
+        return
+
+    for values in rows:
+        bucket = db.get(AppointmentStat, (values["day"], values["doctor_id"], values["status"]), with_for_update=True)
+        if bucket is None:
+            db.add(AppointmentStat(**values))
+            continue
+        for column in ROLLUP_COLUMNS:
+            setattr(bucket, column, values[column] if replace else getattr(bucket, column) + values[column])
+
+
+def _status_value(status) -> str:
+    return AppointmentStatus(status or AppointmentStatus.BOOKED).value
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def record_appointment_created(db, appointment: Appointment) -> None:
+    """Count a new appointment in its rollup bucket. Call before committing."""
+    paid = 1 if appointment.paid else 0
+    revenue = _paid_cents(db, appointment) if paid else 0
+    _bump(db, _as_date(appointment.date), appointment.doctor_id, _status_value(appointment.status), 1, paid, revenue)
+
+
+def record_appointment_change(db, appointment: Appointment, old_status: str, old_paid: bool) -> None:
+    """Move an appointment between rollup buckets after a status/payment change. Call before committing."""
+    old_status = _status_value(old_status)
+    new_status = _status_value(appointment.status)
+    if old_status == new_status and bool(old_paid) == bool(appointment.paid):
+        return
+    day = _as_date(appointment.date)
+    fee_cents = _paid_cents(db, appointment)
+    old_paid_count = 1 if old_paid else 0
+    new_paid_count = 1 if appointment.paid else 0
+    _bump(db, day, appointment.doctor_id, old_status, -1, -old_paid_count, -fee_cents * old_paid_count)
+    _bump(db, day, appointment.doctor_id, new_status, 1, new_paid_count, fee_cents * new_paid_count)
+
+
+def record_bulk_status_change(db, rows, old_status: str, new_status: str) -> None:
+    """
+    Move many appointments between rollup buckets after a set-based status update.
+    rows are (date, doctor_id, paid, amount_paid_cents) tuples. Call before committing.
+    """
+    doctor_ids = {doctor_id for _, doctor_id, paid, amount in rows if paid and amount is None}
+    fees = {
+        doctor_id: fee_cents or 0
+        for doctor_id, fee_cents in db.query(Doctor.id, Doctor.fee_cents).filter(Doctor.id.in_(doctor_ids)).all()
+    } if doctor_ids else {}
+    buckets: Dict = {}
+    for day, doctor_id, paid, amount in rows:
+        key = (_as_date(day), doctor_id)
+        count, paid_count, revenue = buckets.get(key, (0, 0, 0))
+        if paid:
+            paid_count, revenue = paid_count + 1, revenue + (amount if amount is not None else fees.get(doctor_id, 0))
+        buckets[key] = (count + 1, paid_count, revenue)
+    old_status, new_status = _status_value(old_status), _status_value(new_status)
+    deltas = []
+    for (day, doctor_id), (count, paid_count, revenue) in buckets.items():
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            deltas.append(dict(
+                day=day, doctor_id=doctor_id, status=status,
+                appointment_count=sign * count, paid_count=sign * paid_count, revenue_cents=sign * revenue,
+            ))
+    _bump_many(db, deltas)
+
+
+def _set_counter(db, name: str, value: int, now: datetime) -> None:
+    counter = db.get(StatCounter, name)
+    if counter is None:
+        db.add(StatCounter(name=name, value=value, updated_at=now))
+    else:
+        counter.value = value
+        counter.updated_at = now
+
+
+def increment_counter(db, name: str, delta: int, now: datetime) -> None:
+    """Atomically add to a named counter, safe when several nodes write at once."""
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_fn(StatCounter).values(name=name, value=delta, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": StatCounter.value + stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+        db.execute(stmt)
+        return
+
+    counter = db.get(StatCounter, name, with_for_update=True)
+    if counter is None:
+        db.add(StatCounter(name=name, value=delta, updated_at=now))
+    else:
+        counter.value += delta
+        counter.updated_at = now
+
+
+def reconcile_stats(db) -> int:
+    """
+    Rebuild all rollups from the appointments table and refresh user counters.
+    Run periodically to correct any drift from the incremental updates. Rollups are
+    overwritten in place (upserts) while holding the stats lock exclusively, so
+    incremental updates wait for the rebuild instead of being lost.
+    """
+    _lock_stats(db, exclusive=True)
+    paid_cents = func.coalesce(Appointment.amount_paid_cents, Doctor.fee_cents, 0)
+    grouped = (
+        db.query(
+            Appointment.date,
+            Appointment.doctor_id,
+            Appointment.status,
+            func.count(Appointment.id),
+            func.sum(case((Appointment.paid.is_(True), 1), else_=0)),
+            func.sum(case((Appointment.paid.is_(True), paid_cents), else_=0)),
+        )
+        .outerjoin(Doctor, Doctor.id == Appointment.doctor_id)
+        .group_by(Appointment.date, Appointment.doctor_id, Appointment.status)
+        .all()
+    )
+
+    # Months whose partitions were archived are no longer in appointments; keep their rollups.
+    # Every other bucket is zeroed, overwritten from the appointments, and dropped if still empty
+    archived = or_(False, *(
+        and_(AppointmentStat.day >= month, AppointmentStat.day < add_months(month, 1)) for month in archived_months(db)
+    ))
+    in_window = not_(archived)
+    db.execute(update(AppointmentStat).where(in_window).values({column: 0 for column in ROLLUP_COLUMNS}))
+    if grouped:
+        _write_buckets(db, [
+            {
+                "day": day,
+                "doctor_id": doctor_id,
+                "status": _status_value(status),
+                "appointment_count": count,
+                "paid_count": paid or 0,
+                "revenue_cents": revenue or 0,
+            }
+            for day, doctor_id, status, count, paid, revenue in grouped
+        ], replace=True)
+    db.execute(delete(AppointmentStat).where(in_window, AppointmentStat.appointment_count == 0))
+
+    now = datetime.utcnow()
+    _set_counter(db, "users_total", db.query(func.count(User.id)).scalar() or 0, now)
+    _set_counter(db, "users_active", db.query(func.count(distinct(Appointment.user_id))).filter(
+        Appointment.date >= date.today(),
+        Appointment.status.in_(ACTIVE_STATUSES),
+    ).scalar() or 0, now)
+    db.commit()
+    return len(grouped)
+
+
+def get_admin_stats(db, days: int = 30) -> Dict:
+    """
+    Read dashboard statistics from the rollup tables only.
+    Cost depends on the number of days/doctors/statuses, not on the number of appointments.
+    """
+    today = date.today()
+    window_start = today - timedelta(days=days)
+    window_end = today + timedelta(days=days)
+
+    by_status = {
+        status: {"appointments": count or 0, "paid": paid or 0, "revenue_cents": revenue or 0}
+        for status, count, paid, revenue in db.query(
+            AppointmentStat.status,
+            func.sum(AppointmentStat.appointment_count),
+            func.sum(AppointmentStat.paid_count),
+            func.sum(AppointmentStat.revenue_cents),
+        ).group_by(AppointmentStat.status).all()
+        if count
+    }
+
+    by_doctor = [
+        {"doctor_id": doctor_id, "appointments": count or 0, "revenue_cents": revenue or 0}
+        for doctor_id, count, revenue in db.query(
+            AppointmentStat.doctor_id,
+            func.sum(AppointmentStat.appointment_count),
+            func.sum(AppointmentStat.revenue_cents),
+        ).group_by(AppointmentStat.doctor_id).order_by(AppointmentStat.doctor_id).all()
+    ]
+
+    by_day = [
+        {"date": day.isoformat(), "appointments": count or 0, "revenue_cents": revenue or 0}
+        for day, count, revenue in db.query(
+            AppointmentStat.day,
+            func.sum(AppointmentStat.appointment_count),
+            func.sum(AppointmentStat.revenue_cents),
+        ).filter(AppointmentStat.day.between(window_start, window_end))
+        .group_by(AppointmentStat.day).order_by(AppointmentStat.day).all()
+    ]
+
+    upcoming = [
+        {"date": day.isoformat(), "appointments": count or 0}
+        for day, count in db.query(
+            AppointmentStat.day,
+            func.sum(AppointmentStat.appointment_count),
+        ).filter(
+            AppointmentStat.day.between(today, window_end),
+            AppointmentStat.status.in_([s.value for s in ACTIVE_STATUSES]),
+        ).group_by(AppointmentStat.day).order_by(AppointmentStat.day).all()
+    ]
+
+    counters = {c.name: c for c in db.query(StatCounter).all()}
+    users_total: Optional[StatCounter] = counters.get("users_total")
+    users_active: Optional[StatCounter] = counters.get("users_active")
+
+    return {
+        "totals": {
+            "appointments": sum(s["appointments"] for s in by_status.values()),
+            "paid_appointments": sum(s["paid"] for s in by_status.values()),
+            "revenue_cents": sum(s["revenue_cents"] for s in by_status.values()),
+        },
+        "by_status": by_status,
+        "by_doctor": by_doctor,
+        "by_day": by_day,
+        "upcoming": {
+            "appointments": sum(d["appointments"] for d in upcoming),
+            "by_day": upcoming,
+        },
+        "users": {
+            "total": users_total.value if users_total else 0,
+            "active": users_active.value if users_active else 0,
+            "updated_at": users_total.updated_at.isoformat() if users_total and users_total.updated_at else None,
+        },
+    }
@@ -0,0 +1,208 @@
+# backend/app/services/upload_service.py
+"""
+Content-addressed upload storage.
+
+Files are stored under the key <kind>/<sha[:2]>/<sha[2:4]>/<sha><ext> in the configured
+storage backend, so identical uploads share one object. upload_blobs tracks how many rows (doctors, users) point at each
+file; blobs that drop to zero references are deleted by collect_garbage after a
+grace period.
+"""
+import hashlib
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+from typing import BinaryIO, Dict, Optional
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.upload import UploadBlob
+from app.shared_state import get_shared_state
+from app.storage import get_storage
+from app.utils.image_derivatives import derivative_paths
+from config import UPLOAD_GC_GRACE_SECONDS
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 1024 * 1024
+GC_BATCH_SIZE = 500
+
+
+def blob_path(kind: str, sha256: str, extension: str) -> str:
+    """Sharded storage key, e.g. doctor_images/ab/cd/<sha256>.jpg"""
+    return f"{kind}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+
+def url_to_blob_path(url: Optional[str]) -> Optional[str]:
+    return get_storage().key_for_url(url)
+
+
+def derivative_keys(key: str):
+    return [str(path) for path in derivative_paths(PurePosixPath(key)).values()]
+
+
+def _register_blob(db, path: str, sha256: str, size: int) -> None:
+    """Create the blob row, or restart the grace period of an unreferenced one."""
+    now = datetime.utcnow()
+    values = dict(path=path, sha256=sha256, size=size, ref_count=0, created_at=now, unreferenced_since=now)
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_fn(UploadBlob).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["path"],
+            set_={"unreferenced_since": case(
+                (UploadBlob.ref_count == 0, stmt.excluded.unreferenced_since),
+                else_=UploadBlob.unreferenced_since,
+            )},
+        )
+        db.execute(stmt)
+        return
+
+    blob = db.query(UploadBlob).filter(UploadBlob.path == path).with_for_update().first()
+    if blob is None:
+        db.add(UploadBlob(**values))
+    elif blob.ref_count == 0:
+        blob.unreferenced_since = now
+
+
+def register_upload(db, kind: str, sha256: str, extension: str, size: int) -> str:
+    """
+    Record a blob before its bytes are written and return its storage key. Commits,
+    so the blob is tracked (and GC-protected for the grace period) even if the
+    caller's later work fails; the caller takes a reference with retain_upload.
+    """
+    path = blob_path(kind, sha256, extension)
+    _register_blob(db, path, sha256, size)
+    db.commit()
+    return path
+
+
+def grant_upload(user_id: int, key: str, ttl: float) -> None:
+    """Remember that `user_id` was handed an upload URL for `key`; complete_upload checks it."""
+    get_shared_state().set(f"upload-grant:{user_id}:{key}", b"1", ttl=ttl)
+
+
+def verify_upload(db, key: str, kind: str) -> Optional[UploadBlob]:
+    """
+    The blob for a directly uploaded key, if the stored bytes match the size and sha256
+    it was registered with. Keys are derived from content, so knowing one proves nothing.
+    """
+    if not key.startswith(f"{kind}/"):
+        return None
+    blob = db.query(UploadBlob).filter(UploadBlob.path == key).first()
+    storage = get_storage()
+    if blob is None or storage.size(key) != blob.size:
+        return None
+    digest = hashlib.sha256()
+    with storage.open(key) as stored:
+        while chunk := stored.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return blob if digest.hexdigest() == blob.sha256 else None
+
+
+def complete_upload(db, user_id: int, key: str, kind: str) -> Optional[UploadBlob]:
+    """verify_upload for a key this user was granted by presign; the grant is used up."""
+    grant = f"upload-grant:{user_id}:{key}"
+    if get_shared_state().get(grant) is None:
+        return None
+    blob = verify_upload(db, key, kind)
+    if blob is not None:
+        get_shared_state().delete(grant)
+    return blob
+
+
+def store_upload(db, source: BinaryIO, kind: str, extension: str, content_type: Optional[str] = None) -> str:
+    """
+    Stream `source` into content-addressed storage and return its public URL.
+    The file is hashed while it is spooled, and an identical stored file is reused.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
+
+        # Register before touching storage so a concurrent GC pass either
+        # finishes deleting first or sees the refreshed grace period
+        path = register_upload(db, kind, digest.hexdigest(), extension, size)
+        storage = get_storage()
+        if not storage.exists(path):
+            spool.seek(0)
+            storage.save(path, spool, content_type)
+    return storage.url(path)
+
+
+def retain_upload(db, url: Optional[str]) -> None:
+    """Count a new reference to an upload. Part of the caller's transaction."""
+    path = url_to_blob_path(url)
+    if path is None:
+        return
+    db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.path == path)
+        .values(ref_count=UploadBlob.ref_count + 1, unreferenced_since=None)
+    )
+
+
+def release_upload(db, url: Optional[str]) -> bool:
+    """
+    Drop a reference to an upload. Part of the caller's transaction.
+    Returns False if the URL is not a tracked blob (e.g. a legacy uuid upload).
+    """
+    path = url_to_blob_path(url)
+    if path is None:
+        return False
+    result = db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.path == path, UploadBlob.ref_count > 0)
+        .values(
+            ref_count=UploadBlob.ref_count - 1,
+            unreferenced_since=case(
+                (UploadBlob.ref_count <= 1, datetime.utcnow()),
+                else_=UploadBlob.unreferenced_since,
+            ),
+        )
+    )
+    return result.rowcount > 0
+
+
+def replace_upload(db, old_url: Optional[str], new_url: Optional[str]) -> None:
+    if old_url == new_url:
+        return
+    retain_upload(db, new_url)
+    release_upload(db, old_url)
+
+
+def collect_garbage(db, grace_seconds: int = UPLOAD_GC_GRACE_SECONDS, batch_size: int = GC_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Delete one batch of blobs that have been unreferenced for longer than the grace
+    period, oldest first. Reads only the GC index, never lists the storage.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    candidate_ids = db.scalars(
+        select(UploadBlob.id)
+        .where(UploadBlob.ref_count == 0, UploadBlob.unreferenced_since < cutoff)
+        .order_by(UploadBlob.unreferenced_since)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not candidate_ids:
+        db.commit()
+        return {"deleted": 0, "bytes_freed": 0}
+
+    # Re-check the reference count in the DELETE itself in case a blob was retained meanwhile
+    deleted = db.execute(
+        delete(UploadBlob)
+        .where(UploadBlob.id.in_(candidate_ids), UploadBlob.ref_count == 0)
+        .returning(UploadBlob.path, UploadBlob.size)
+    ).all()
+
+    # Objects go before the commit: a concurrent store_upload waits on the row
+    # locks and then recreates both the row and the object
+    storage = get_storage()
+    for path, _ in deleted:
+        for key in (path, *derivative_keys(path)):
+            storage.delete(key)
+    db.commit()
+    return {"deleted": len(deleted), "bytes_freed": sum(size for _, size in deleted)}
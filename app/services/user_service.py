@@ -0,0 +1,10 @@
+# backend/app/services/user_service.py
+from app.models.user import User
+from app.services.upload_service import release_upload
+
+
+def delete_user(db, user: User) -> None:
+    """Delete a user, releasing their profile image upload."""
+    release_upload(db, user.image_url)
+    db.delete(user)
+    db.commit()
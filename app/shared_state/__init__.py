@@ -0,0 +1,41 @@
+# backend/app/shared_state/__init__.py
+from typing import Optional
+from config import SHARED_STATE_BACKEND, REDIS_URL, SHARED_STATE_PREFIX, SHARED_STATE_MAX_KEYS
+from .base import SharedState
+from .memory import MemoryState
+
+_state: Optional[SharedState] = None
+
+
+def create_shared_state(backend: str = SHARED_STATE_BACKEND) -> SharedState:
+    if backend == "memory":
+        return MemoryState(max_keys=SHARED_STATE_MAX_KEYS)
+    if backend == "redis":
+        # Imported here so the memory backend does not load the redis client at startup
+        from .redis import RedisState
+        return RedisState(REDIS_URL, prefix=SHARED_STATE_PREFIX)
+    raise RuntimeError(f"Unknown SHARED_STATE_BACKEND '{backend}' (expected 'memory' or 'redis')")
+
+
+def get_shared_state() -> SharedState:
+    """The configured shared state, created on first use."""
+    global _state
+    if _state is None:
+        _state = create_shared_state()
+    return _state
+
+
+def set_shared_state(state: Optional[SharedState]) -> None:
+    """Swap the shared state backend (tests, scripts)."""
+    global _state
+    _state = state
+
+
+def __getattr__(name: str):
+    if name == "RedisState":
+        from .redis import RedisState
+        return RedisState
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["SharedState", "MemoryState", "RedisState", "create_shared_state", "get_shared_state", "set_shared_state"]
@@ -0,0 +1,52 @@
+# backend/app/shared_state/base.py
+from typing import List, Optional, Tuple
+
+
+class SharedState:
+    """
+    Small key/value state shared by every worker process on every node: chat
+    sessions, cache versions, replica stickiness and rate limits. Values are bytes;
+    `ttl` is in seconds and applies to the whole key.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        """Store a value. With only_if_absent, returns False and leaves the key alone if it exists."""
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add to an integer counter (missing keys start at 0) and return the new value."""
+        raise NotImplementedError
+
+    def list_push(self, key: str, values: List[bytes], ttl: Optional[float] = None) -> int:
+        """Append values to a list and return its new length."""
+        raise NotImplementedError
+
+    def list_range(self, key: str, start: int = 0, end: int = -1) -> List[bytes]:
+        """Items from start to end inclusive; negative indexes count from the end."""
+        raise NotImplementedError
+
+    def list_pop(self, key: str) -> Optional[bytes]:
+        """Remove and return the last item of a list."""
+        raise NotImplementedError
+
+    def list_trim(self, key: str, start: int, end: int = -1) -> None:
+        """Keep only the items from start to end inclusive (indexes as in list_range)."""
+        raise NotImplementedError
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> Tuple[bool, float]:
+        """
+        One atomic GCRA step: each allowed call pushes the key's theoretical arrival time
+        `interval` seconds further, and calls more than `tolerance` seconds ahead of now are
+        refused. Returns (allowed, seconds): the retry delay when refused, otherwise the
+        slack left (how far ahead another call may still go). Keys expire once idle.
+        """
+        raise NotImplementedError
+
+    def ping(self) -> bool:
+        return True
@@ -0,0 +1,135 @@
+# backend/app/shared_state/memory.py
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from app.shared_state.base import SharedState
+
+# Expired keys are swept once the store grows past this many entries; the next sweep
+# waits until it has doubled again, so sweeping stays O(1) per write on average
+SWEEP_THRESHOLD = 10000
+
+
+class MemoryState(SharedState):
+    """
+    State held in this process only (single-worker setups and tests). With `max_keys`,
+    the least recently written keys are evicted once expired ones are not enough.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self._data: Dict[str, Union[bytes, List[bytes], float]] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+        self._next_sweep = min(SWEEP_THRESHOLD, max_keys) if max_keys else SWEEP_THRESHOLD
+
+    def _live(self, key: str, now: float) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= now:
+            self._data.pop(key, None)
+            del self._expires[key]
+        return key in self._data
+
+    def _expire(self, key: str, ttl: Optional[float], now: float) -> None:
+        # Called after every write: keeps keys in write order for eviction
+        self._data[key] = self._data.pop(key)
+        if ttl is not None:
+            self._expires[key] = now + ttl
+        if len(self._data) > self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        for stale in [k for k, t in self._expires.items() if t <= now]:
+            self._data.pop(stale, None)
+            del self._expires[stale]
+        self._next_sweep = max(SWEEP_THRESHOLD, 2 * len(self._data))
+        if self.max_keys:
+            if len(self._data) > self.max_keys:
+                # Drop to 90% of the cap so the next eviction is a while away
+                for old in list(itertools.islice(self._data, len(self._data) - self.max_keys * 9 // 10)):
+                    del self._data[old]
+                    self._expires.pop(old, None)
+            self._next_sweep = min(self._next_sweep, self.max_keys)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data[key] if self._live(key, time.monotonic()) else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if only_if_absent and self._live(key, now):
+                return False
+            self._data[key] = value
+            self._expires.pop(key, None)
+            self._expire(key, ttl, now)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                if self._live(key, now):
+                    del self._data[key]
+                    self._expires.pop(key, None)
+                    deleted += 1
+            return deleted
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.monotonic()
+        with self._lock:
+            value = int(self._data[key]) + amount if self._live(key, now) else amount
+            self._data[key] = str(value).encode()
+            self._expire(key, ttl, now)
+            return value
+
+    def list_push(self, key: str, values: List[bytes], ttl: Optional[float] = None) -> int:
+        now = time.monotonic()
+        with self._lock:
+            items = self._data[key] if self._live(key, now) else []
+            items.extend(values)
+            self._data[key] = items
+            self._expire(key, ttl, now)
+            return len(items)
+
+    def list_range(self, key: str, start: int = 0, end: int = -1) -> List[bytes]:
+        with self._lock:
+            if not self._live(key, time.monotonic()):
+                return []
+            # Redis ranges include `end`
+            return self._data[key][start:(end + 1) or None]
+
+    def list_pop(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if not self._live(key, time.monotonic()):
+                return None
+            items = self._data[key]
+            value = items.pop()
+            if not items:
+                del self._data[key]
+                self._expires.pop(key, None)
+            return value
+
+    def list_trim(self, key: str, start: int, end: int = -1) -> None:
+        with self._lock:
+            if not self._live(key, time.monotonic()):
+                return
+            items = self._data[key][start:(end + 1) or None]
+            if items:
+                self._data[key] = items
+            else:
+                del self._data[key]
+                self._expires.pop(key, None)
+
+    def gcra(self, key: str, interval: float, tolerance: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tat = max(self._data[key], now) if self._live(key, now) else now
+            if tat - now > tolerance:
+                return False, tat - tolerance - now
+            tat += interval
+            self._data[key] = tat
+            # Idle once the arrival time has passed: the key is dropped then
+            self._expire(key, tat - now, now)
+            return True, tolerance + interval - (tat - now)
@@ -0,0 +1,89 @@
+# backend/app/shared_state/redis.py
+from typing import List, Optional, Tuple
+from app.shared_state.base import SharedState
+
+try:
+    import redis
+except ImportError:  # redis is only needed for the redis backend
+    redis = None
+
+
+# GCRA on the server clock, so every node agrees on "now". Numbers go back as strings
+# because Lua numbers are truncated to integers in replies.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+if tat - now > tolerance then
+    return {0, tostring(tat - tolerance - now)}
+end
+tat = tat + interval
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return {1, tostring(tolerance + interval - (tat - now))}
+"""
+
+
+class RedisState(SharedState):
+    """Any Redis-protocol server (Redis, Valkey, KeyDB, ...), shared by all workers and nodes."""
+
+    def __init__(self, url: str, prefix: str = "docassist:", timeout: float = 1.0):
+        if redis is None:
+            raise RuntimeError("The redis shared state backend requires redis. Install it with: pip install redis")
+        if not url:
+            raise RuntimeError("REDIS_URL must be set for the redis shared state backend")
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    @staticmethod
+    def _ms(ttl: float) -> int:
+        return max(int(ttl * 1000), 1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self._key(key))
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        px = self._ms(ttl) if ttl is not None else None
+        return bool(self.client.set(self._key(key), value, px=px, nx=only_if_absent))
+
+    def delete(self, *keys: str) -> int:
+        return self.client.delete(*[self._key(k) for k in keys]) if keys else 0
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        if ttl is None:
+            return self.client.incrby(self._key(key), amount)
+        pipe = self.client.pipeline()
+        pipe.incrby(self._key(key), amount)
+        pipe.pexpire(self._key(key), self._ms(ttl))
+        return pipe.execute()[0]
+
+    def list_push(self, key: str, values: List[bytes], ttl: Optional[float] = None) -> int:
+        if not values:
+            return self.client.llen(self._key(key))
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key(key), *values)
+        if ttl is not None:
+            pipe.pexpire(self._key(key), self._ms(ttl))
+        return pipe.execute()[0]
+
+    def list_range(self, key: str, start: int = 0, end: int = -1) -> List[bytes]:
+        return self.client.lrange(self._key(key), start, end)
+
+    def list_pop(self, key: str) -> Optional[bytes]:
+        return self.client.rpop(self._key(key))
+
+    def list_trim(self, key: str, start: int, end: int = -1) -> None:
+        self.client.ltrim(self._key(key), start, end)
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> Tuple[bool, float]:
+        # Plain EVAL rather than EVALSHA: nothing to reload after a restart, and the server caches the compiled script
+        allowed, seconds = self.client.eval(GCRA_SCRIPT, 1, self._key(key), interval, tolerance)
+        return bool(allowed), float(seconds)
+
+    def ping(self) -> bool:
+        return bool(self.client.ping())
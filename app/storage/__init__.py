@@ -0,0 +1,51 @@
+# backend/app/storage/__init__.py
+from typing import Optional
+from config import (
+    STORAGE_BACKEND, STORAGE_LOCAL_ROOT, STORAGE_PUBLIC_URL,
+    S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY,
+)
+from .base import StorageBackend
+from .local import LocalStorage
+
+_storage: Optional[StorageBackend] = None
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> StorageBackend:
+    if backend == "local":
+        return LocalStorage(STORAGE_LOCAL_ROOT, STORAGE_PUBLIC_URL or "/uploads")
+    if backend == "s3":
+        # Imported here so the local backend does not load boto3 at startup
+        from .s3 import S3Storage
+        return S3Storage(
+            S3_BUCKET,
+            endpoint_url=S3_ENDPOINT_URL,
+            region=S3_REGION,
+            access_key_id=S3_ACCESS_KEY_ID,
+            secret_access_key=S3_SECRET_ACCESS_KEY,
+            public_url=STORAGE_PUBLIC_URL,
+        )
+    raise RuntimeError(f"Unknown STORAGE_BACKEND '{backend}' (expected 'local' or 's3')")
+
+
+def get_storage() -> StorageBackend:
+    """The configured upload storage, created on first use."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]) -> None:
+    """Swap the storage backend (tests, scripts)."""
+    global _storage
+    _storage = storage
+
+
+def __getattr__(name: str):
+    if name == "S3Storage":
+        from .s3 import S3Storage
+        return S3Storage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["StorageBackend", "LocalStorage", "S3Storage", "create_storage", "get_storage", "set_storage"]
@@ -0,0 +1,49 @@
+# backend/app/storage/base.py
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+
+class StorageBackend:
+    """
+    Where upload bytes live. Keys are relative paths such as
+    doctor_images/ab/cd/<sha256>.jpg; public URLs are public_url + "/" + key.
+    """
+
+    public_url: str = ""
+
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> Optional[int]:
+        """Stored size in bytes, or None if the key does not exist."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a key; missing keys are ignored."""
+        raise NotImplementedError
+
+    def presign_upload(self, key: str, content_type: str, size: int, sha256: str, expires_in: int) -> Dict:
+        """
+        Describe a direct upload of exactly `size` bytes with the given SHA-256:
+        {"method", "url", "headers"}. The storage rejects bodies that do not match.
+        """
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path for backends that have one."""
+        return None
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        prefix = f"{self.public_url}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
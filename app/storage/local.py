@@ -0,0 +1,56 @@
+# backend/app/storage/local.py
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+from app.storage.base import StorageBackend
+from app.utils.jwt_handler import create_upload_token
+
+CHUNK_SIZE = 64 * 1024
+
+
+class LocalStorage(StorageBackend):
+    """Files under a local directory, served by the API at /uploads (single-node setups)."""
+
+    def __init__(self, root: str = "uploads", public_url: str = "/uploads"):
+        self.root = Path(root)
+        self.public_url = public_url.rstrip("/")
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        target = self.local_path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a half-written file is never served
+        with tempfile.NamedTemporaryFile(dir=target.parent, prefix=".upload-", delete=False) as tmp:
+            try:
+                shutil.copyfileobj(stream, tmp, CHUNK_SIZE)
+            except Exception:
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, target)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self.local_path(key).is_file()
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self.local_path(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        self.local_path(key).unlink(missing_ok=True)
+
+    def presign_upload(self, key: str, content_type: str, size: int, sha256: str, expires_in: int) -> Dict:
+        # No separate storage service: the signed URL points back at the API, which verifies the body
+        token = create_upload_token({"key": key, "size": size, "sha256": sha256}, expires_in)
+        return {"method": "PUT", "url": f"/upload/direct/{token}", "headers": {"Content-Type": content_type}}
@@ -0,0 +1,98 @@
+# backend/app/storage/s3.py
+import base64
+from contextlib import closing
+from typing import BinaryIO, Dict, Optional
+from app.storage.base import StorageBackend
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:  # boto3 is only needed for the s3 backend
+    boto3 = None
+
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class S3Storage(StorageBackend):
+    """
+    Any S3-compatible object store (AWS S3, MinIO, R2, ...). Uploads stream through
+    multipart transfers; clients can upload directly with presigned PUT URLs.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: str = "us-east-1",
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+    ):
+        if boto3 is None:
+            raise RuntimeError("The s3 storage backend requires boto3. Install it with: pip install boto3")
+        if not bucket:
+            raise RuntimeError("S3_BUCKET must be set for the s3 storage backend")
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # Path-style addressing works with MinIO and other self-hosted endpoints
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path" if endpoint_url else "auto"}),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE, multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        )
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif endpoint_url:
+            self.public_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.{region}.amazonaws.com"
+
+    def save(self, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(stream, self.bucket, key, ExtraArgs=extra, Config=self.transfer_config)
+
+    def open(self, key: str) -> BinaryIO:
+        return closing(self.client.get_object(Bucket=self.bucket, Key=key)["Body"])
+
+    def _head(self, key: str) -> Optional[Dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        head = self._head(key)
+        return head["ContentLength"] if head is not None else None
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presign_upload(self, key: str, content_type: str, size: int, sha256: str, expires_in: int) -> Dict:
+        # Length and checksum are part of the signature, so the store rejects any other body
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket, "Key": key, "ContentType": content_type,
+                "ContentLength": size, "ChecksumSHA256": checksum,
+            },
+            ExpiresIn=expires_in,
+            HttpMethod="PUT",
+        )
+        return {
+            "method": "PUT",
+            "url": url,
+            "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksum},
+        }
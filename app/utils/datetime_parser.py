@@ -0,0 +1,213 @@
+# backend/app/utils/datetime_parser.py
+"""
+Appointment dates and times from what patients type: "tomorrow 2pm", "next Monday
+morning", "in 3 days", "Jan 15", "2025-01-15T14:30". Phrases are normalised, then
+matched against tables of patterns compiled once at import; relative dates resolve
+against `today` (date.today() unless given). Failures raise DateParseError, a
+ValueError whose message can be shown to the user.
+"""
+import calendar
+import re
+from datetime import date, time, timedelta
+from typing import Callable, List, Optional, Pattern, Tuple
+
+
+class DateParseError(ValueError):
+    pass
+
+
+RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "tmrw": 1, "tmr": 1, "day after tomorrow": 2}
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+}
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+DAY_PARTS = {
+    "morning": time(9), "noon": time(12), "midday": time(12),
+    "afternoon": time(14), "evening": time(17), "midnight": time(0),
+}
+UNIT_DAYS = {"day": 1, "days": 1, "week": 7, "weeks": 7}
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+
+def _alternation(words) -> str:
+    # Longest first, so "tues" wins over "tue" and "day after tomorrow" over "tomorrow"
+    return "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+
+
+# Applied in order by _normalise: (pattern, replacement)
+_NORMALISE: List[Tuple[Pattern, str]] = [
+    (re.compile(r"(?<![a-z])([ap])\.?\s?m\b\.?"), r"\1m"),     # "p.m." / "p m" -> "pm"
+    (re.compile(r"(\d)t(\d)"), r"\1 \2"),                   # ISO "2025-01-15t14:30"
+    (re.compile(r"(?<![\d:])(\d{1,2})\.(\d{2})(?![\d.])"), r"\1:\2"),  # "2.30pm"
+    (re.compile(r"[,!?]|\.(?!\d)|\b(?:at|on|the|of|around|about|for|by)\b"), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def _normalise(text: str) -> str:
+    text = text.lower()
+    for pattern, replacement in _NORMALISE:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def _twelve_hour(match) -> time:
+    hour, minute = int(match["hour"]), int(match["minute"] or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        raise DateParseError(f"'{match[0]}' is not a valid time")
+    return time(hour % 12 + (12 if match["meridiem"] == "pm" else 0), minute)
+
+
+def _twenty_four_hour(match) -> time:
+    hour, minute, second = int(match["hour"]), int(match["minute"] or 0), int(match["second"] or 0)
+    if hour > 23 or minute > 59 or second > 59:
+        raise DateParseError(f"'{match[0]}' is not a valid time")
+    return time(hour, minute, second)
+
+
+# Searched for inside a phrase by parse_when; a bare hour ("14") is only accepted by parse_time
+TIME_PATTERNS: List[Tuple[Pattern, Callable[..., time]]] = [
+    (re.compile(r"(?<![\d:-])(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))? ?(?P<meridiem>am|pm)\b"), _twelve_hour),
+    (re.compile(r"(?<![\d:-])(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2})(?:\.\d+)?)?(?![\d:])"),
+     _twenty_four_hour),
+    (re.compile(rf"(?:\bin )?\b(?P<part>{_alternation(DAY_PARTS)})\b"), lambda match: DAY_PARTS[match["part"]]),
+]
+_BARE_HOUR = re.compile(r"(?P<hour>\d{1,2})(?P<minute>)(?P<second>)")
+
+
+def _calendar_date(year: int, month: int, day: int, text: str) -> date:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        raise DateParseError(f"'{text}' is not a valid date") from None
+
+
+def _weekday(match, today: date) -> date:
+    ahead = (WEEKDAYS[match["day"]] - today.weekday()) % 7
+    # "next friday" is never today; "friday" / "this friday" may be
+    if match["modifier"] == "next" and ahead == 0:
+        ahead = 7
+    return today + timedelta(days=ahead)
+
+
+def _month_day(match, today: date) -> date:
+    month, day = MONTHS[match["month"]], int(match["day"])
+    if match["year"]:
+        return _calendar_date(int(match["year"]), month, day, match[0])
+    # Without a year, the next time that day comes round (Feb 29 may be years away)
+    for year in range(today.year, today.year + 9):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if candidate >= today:
+            return candidate
+    raise DateParseError(f"'{match[0]}' is not a valid date")
+
+
+def _in_units(match, today: date) -> date:
+    count = NUMBER_WORDS.get(match["count"]) or int(match["count"])
+    return today + timedelta(days=count * UNIT_DAYS[match["unit"]])
+
+
+_ORDINAL = r"(?:st|nd|rd|th)?"
+_MONTH = _alternation(MONTHS)
+
+# Matched against the whole (normalised) date phrase, first match wins
+DATE_PATTERNS: List[Tuple[Pattern, Callable[..., date]]] = [
+    (re.compile(r"(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})"),
+     lambda match, today: _calendar_date(int(match["year"]), int(match["month"]), int(match["day"]), match[0])),
+    (re.compile(rf"(?P<word>{_alternation(RELATIVE_DAYS)})"),
+     lambda match, today: today + timedelta(days=RELATIVE_DAYS[match["word"]])),
+    (re.compile(rf"(?:(?P<modifier>this|next|coming) )?(?P<day>{_alternation(WEEKDAYS)})"), _weekday),
+    (re.compile(r"next week"), lambda match, today: today + timedelta(days=7)),
+    (re.compile(rf"in (?P<count>\d{{1,3}}|{_alternation(NUMBER_WORDS)}) (?P<unit>{_alternation(UNIT_DAYS)})"),
+     _in_units),
+    (re.compile(rf"(?P<month>{_MONTH}) (?P<day>\d{{1,2}}){_ORDINAL}(?: (?P<year>\d{{4}}))?"), _month_day),
+    (re.compile(rf"(?P<day>\d{{1,2}}){_ORDINAL} (?P<month>{_MONTH})(?: (?P<year>\d{{4}}))?"), _month_day),
+]
+
+DATE_HINT = "Use 'today', 'tomorrow', 'next Monday', 'in 3 days', 'Jan 15' or YYYY-MM-DD."
+TIME_HINT = "Use '2pm', '14:30' or 'morning'."
+
+
+def _match_date(phrase: str, text: str, today: date) -> date:
+    for pattern, resolve in DATE_PATTERNS:
+        match = pattern.fullmatch(phrase)
+        if match:
+            return resolve(match, today)
+    raise DateParseError(f"Unrecognised date '{text.strip()}'. {DATE_HINT}")
+
+
+def _cut(phrase: str, match) -> str:
+    return " ".join(f"{phrase[:match.start()]} {phrase[match.end():]}".split())
+
+
+def parse_date(text: str, today: Optional[date] = None) -> date:
+    """A date from an ISO string or a phrase such as "tomorrow" or "next friday"."""
+    try:
+        return date.fromisoformat(text.strip())
+    except ValueError:
+        pass
+    return _match_date(_normalise(text), text, today or date.today())
+
+
+def parse_time(text: str) -> time:
+    """A time of day from "2pm", "2:30 p.m.", "14:30", "14" or "morning"."""
+    try:
+        return time.fromisoformat(text.strip())
+    except ValueError:
+        pass
+    phrase = _normalise(text)
+    for pattern, resolve in TIME_PATTERNS + [(_BARE_HOUR, _twenty_four_hour)]:
+        match = pattern.fullmatch(phrase)
+        if match:
+            return resolve(match)
+    raise DateParseError(f"Unrecognised time '{text.strip()}'. {TIME_HINT}")
+
+
+def parse_when(text: str, today: Optional[date] = None) -> Tuple[Optional[date], Optional[time]]:
+    """
+    Date and time from one phrase ("tomorrow 2pm", "next monday morning"); either is
+    None when the phrase leaves it out. Unrecognised leftovers raise DateParseError.
+    """
+    phrase = _normalise(text)
+    when_time = None
+    for pattern, resolve in TIME_PATTERNS:
+        match = pattern.search(phrase)
+        if match:
+            when_time, phrase = resolve(match), _cut(phrase, match)
+            break
+    if not phrase:
+        return None, when_time
+    return _match_date(phrase, text, today or date.today()), when_time
+
+
+# DATE_PATTERNS for searching inside longer text, bounded so "mon" does not match "month"
+_DATE_SEARCH: List[Tuple[Pattern, Callable[..., date]]] = [
+    (re.compile(rf"(?<![\w-])(?:{pattern.pattern})(?![\w-])"), resolve) for pattern, resolve in DATE_PATTERNS
+]
+
+
+def find_when(text: str, today: Optional[date] = None) -> Tuple[Optional[date], Optional[time], str]:
+    """
+    Date and time mentioned anywhere in free text ("see Dr. Lee next friday at 2pm"), plus
+    the normalised text with them removed. The first of each counts; either may be None.
+    """
+    phrase = _normalise(text)
+    when_date = when_time = None
+    for pattern, resolve in TIME_PATTERNS:
+        match = pattern.search(phrase)
+        if match:
+            when_time, phrase = resolve(match), _cut(phrase, match)
+            break
+    for pattern, resolve in _DATE_SEARCH:
+        match = pattern.search(phrase)
+        if match:
+            when_date, phrase = resolve(match, today or date.today()), _cut(phrase, match)
+            break
+    return when_date, when_time, phrase
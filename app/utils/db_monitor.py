@@ -0,0 +1,129 @@
+# backend/app/utils/db_monitor.py
+"""
+Connection pool instrumentation: how long checkouts wait for a connection,
+per-session statement timeouts, and a detector for connections held too long.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from app.utils.metrics import Histogram, histogram
+from app.utils.query_stats import install_query_stats
+
+# SQLAlchemy's own frames are noise in a held-connection report
+_SQLALCHEMY_PATH = os.path.dirname(sqlalchemy.__file__)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long every checkout waited for a connection."""
+
+    wait_histogram: Optional[Histogram] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_histogram is not None:
+                self.wait_histogram.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        return pool
+
+
+class HeldConnectionTracker:
+    """
+    Remembers when and where each pooled connection was checked out, so a periodic
+    check can log the ones held past a threshold along with the code holding them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._held: Dict[int, list] = {}
+
+    def install(self, engine) -> None:
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        # Frames are captured without source lines; they are only formatted if reported
+        stack = traceback.StackSummary.extract(traceback.walk_stack(sys._getframe(1)), limit=40, lookup_lines=False)
+        self._held[id(connection_record)] = [time.monotonic(), threading.current_thread().name, stack, False]
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self._held.pop(id(connection_record), None)
+
+    def held(self, older_than: float = 0.0) -> List[Dict]:
+        now = time.monotonic()
+        return [
+            {"held_seconds": round(now - started, 3), "thread": thread}
+            for started, thread, _, _ in list(self._held.values())
+            if now - started >= older_than
+        ]
+
+    def report(self, threshold_seconds: float) -> int:
+        """Log every connection held longer than the threshold, once per checkout."""
+        now = time.monotonic()
+        reported = 0
+        for entry in list(self._held.values()):
+            started, thread, stack, logged = entry
+            if logged or now - started < threshold_seconds:
+                continue
+            entry[3] = True
+            reported += 1
+            frames = [
+                frame for frame in reversed(stack)
+                if not frame.filename.startswith((_SQLALCHEMY_PATH, "<"))
+            ]
+            print(
+                f"DB connection ({self.name}) held for {now - started:.1f}s by thread {thread}, checked out at:\n"
+                + "".join(traceback.StackSummary.from_list(frames).format())
+            )
+        return reported
+
+
+def instrument_engine(engine, name: str) -> HeldConnectionTracker:
+    """Attach the checkout-wait histogram, held-connection tracking and per-request query stats to an engine."""
+    engine.pool.wait_histogram = histogram(f"db_pool_checkout_wait_seconds:{name}")
+    install_query_stats(engine)
+    tracker = HeldConnectionTracker(name)
+    tracker.install(engine)
+    return tracker
+
+
+def pool_status(engine) -> Dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin(),
+    }
+
+
+def _apply_statement_timeout(session, transaction, connection):
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms and connection.dialect.name == "postgresql":
+        # SET LOCAL ends with the transaction, so the connection returns to the pool clean
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def install_statement_timeouts(session_factory) -> None:
+    """Apply session.info["statement_timeout_ms"] at the start of every transaction."""
+    event.listen(session_factory, "after_begin", _apply_statement_timeout)
+
+
+def set_statement_timeout(session, timeout_ms: Optional[int]) -> None:
+    """Change a session's statement timeout, including for a transaction already under way."""
+    session.info["statement_timeout_ms"] = timeout_ms
+    if timeout_ms and session.in_transaction():
+        connection = session.connection()
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
@@ -2,21 +2,74 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Sequence, Tuple
 from config import SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD
 
 
+def _build_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = SMTP_USER
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+def _connect() -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    server.starttls()
+    server.login(SMTP_USER, SMTP_PASSWORD)
+    return server
+
+
+def send_emails(messages: Sequence[Tuple[str, str, str]]) -> List[bool]:
+    """
+    Send (to_email, subject, body) messages over a single SMTP connection.
+    Reconnects once if the server drops the connection mid-batch.
+    Returns one success flag per message.
+    """
+    results: List[bool] = []
+    server = None
+    try:
+        for to_email, subject, body in messages:
+            msg = _build_message(to_email, subject, body)
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server = _connect()
+                    server.send_message(msg)
+                    results.append(True)
+                    break
+                except smtplib.SMTPServerDisconnected as e:
+                    server = None
+                    if attempt == 1:
+                        print(f"Email error for {to_email}: {e}")
+                        results.append(False)
+                except Exception as e:
+                    print(f"Email error for {to_email}: {e}")
+                    results.append(False)
+                    if server is None:
+                        # Could not connect at all; fail the rest of the batch fast
+                        raise
+                    break
+    except Exception:
+        pass
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+    return results + [False] * (len(messages) - len(results))
+
+
 def send_email(to_email: str, subject: str, body: str) -> bool:
     """
     Send an email using SMTP.
     Returns True if sent successfully, else False.
     """
     try:
-        msg = MIMEMultipart()
-        msg["From"] = SMTP_USER
-        msg["To"] = to_email
-        msg["Subject"] = subject
-
-        msg.attach(MIMEText(body, "plain"))
+        msg = _build_message(to_email, subject, body)
 
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls()
@@ -63,3 +116,40 @@ Best regards,
 HealthCare+ Team
     """
     return email_body
+
+
+def create_reminder_email(
+    user_name: str,
+    doctor_name: str,
+    specialty: str,
+    date: str,
+    time: str,
+    reason: str,
+    hours_before: int
+) -> str:
+    """
+    Creates the email body for an upcoming appointment reminder.
+    """
+    when = "tomorrow" if hours_before >= 24 else f"in {hours_before} hour{'s' if hours_before != 1 else ''}"
+    email_body = f"""
+Dear {user_name},
+
+This is a reminder that your appointment is {when}.
+
+Appointment Details:
+- Doctor: Dr. {doctor_name}
+- Specialty: {specialty}
+- Date: {date}
+- Time: {time}
+- Reason: {reason}
+
+Please arrive 15 minutes early for your appointment.
+
+If you need to cancel or reschedule, please contact us as soon as possible.
+
+Thank you for choosing HealthCare+!
+
+Best regards,
+HealthCare+ Team
+    """
+    return email_body
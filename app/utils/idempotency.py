@@ -0,0 +1,202 @@
+# backend/app/utils/idempotency.py
+import asyncio
+import hashlib
+import tempfile
+from typing import BinaryIO, List, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.shared_state import SharedState, get_shared_state
+from app.utils.rate_limit import client_key
+from app.utils.serialization import dumps_bytes, loads
+from config import (
+    IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_MAX_RESPONSE_BYTES, IDEMPOTENCY_SPOOL_BYTES, IDEMPOTENCY_TTL_SECONDS,
+)
+
+WAIT_POLL_SECONDS = 0.05
+# Request body chunks handed on to the route after the body was spooled
+REPLAY_CHUNK_SIZE = 64 * 1024
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Answers about the attempt rather than the request (rate limited, key busy): never replayed
+UNSTORED_STATUSES = {409, 429}
+
+
+class RequestFingerprint:
+    """
+    Hash of method, path, query and body, fed the body a chunk at a time. Multipart
+    boundaries are random per attempt, so they are left out; the last few bytes of
+    each chunk wait for the next one in case a boundary straddles them.
+    """
+
+    def __init__(self, scope: Scope):
+        self.digest = hashlib.sha256(
+            scope["method"].encode() + b" " + scope["path"].encode() + b"?" + scope.get("query_string", b"") + b"\n"
+        )
+        content_type = Headers(scope=scope).get("content-type", "")
+        boundary = content_type.partition("boundary=")[2].split(";")[0].strip('"')
+        self.boundary = boundary.encode("latin-1") if content_type.startswith("multipart/") else b""
+        self.pending = b""
+
+    def update(self, chunk: bytes) -> None:
+        if not self.boundary:
+            self.digest.update(chunk)
+            return
+        data, start = self.pending + chunk, 0
+        while (found := data.find(self.boundary, start)) != -1:
+            self.digest.update(data[start:found])
+            start = found + len(self.boundary)
+        keep = max(start, len(data) - len(self.boundary) + 1)
+        self.digest.update(data[start:keep])
+        self.pending = data[keep:]
+
+    def hexdigest(self) -> str:
+        self.digest.update(self.pending)
+        self.pending = b""
+        return self.digest.hexdigest()
+
+
+def request_fingerprint(scope: Scope, body: bytes) -> str:
+    fingerprint = RequestFingerprint(scope)
+    fingerprint.update(body)
+    return fingerprint.hexdigest()
+
+
+def encode_response(fingerprint: str, status: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> bytes:
+    meta = {"fingerprint": fingerprint, "status": status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers]}
+    # orjson never emits a raw newline, so the first one ends the metadata
+    return dumps_bytes(meta) + b"\n" + body
+
+
+def decode_response(stored: bytes) -> Tuple[dict, bytes]:
+    meta, _, body = stored.partition(b"\n")
+    return loads(meta), body
+
+
+def should_store(status: int, scope: Scope) -> bool:
+    """
+    2xx responses, and 4xx ones that a route produced (the router puts "endpoint" in
+    the scope once a route matched), so a 429 from the rate limiter or an unrouted
+    404 is not replayed for the key's lifetime.
+    """
+    if 200 <= status < 300:
+        return True
+    return 400 <= status < 500 and status not in UNSTORED_STATUSES and "endpoint" in scope
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key support for mutating requests. The first response for a key
+    (per caller, method and path) is stored for IDEMPOTENCY_TTL_SECONDS and replayed
+    to retries with an Idempotent-Replayed header. A retry that arrives while the first
+    request is still running waits for its response instead of running again. Reusing
+    a key with a different body is refused with 422. Only responses the route itself
+    produced are stored (see should_store), so 5xx, 409 and 429 can be retried. The
+    body is fingerprinted as it arrives and spooled to a temporary file past
+    IDEMPOTENCY_SPOOL_BYTES, so keyed uploads cost no more memory than unkeyed ones.
+    """
+
+    def __init__(self, app: ASGIApp, state: Optional[SharedState] = None, wait_seconds: float = IDEMPOTENCY_LOCK_SECONDS):
+        self.app = app
+        self.state = state
+        self.wait_seconds = wait_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = Headers(scope=scope).get("idempotency-key")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > 255:
+            await JSONResponse({"detail": "Idempotency-Key must be at most 255 characters."}, status_code=400)(
+                scope, receive, send)
+            return
+
+        with tempfile.SpooledTemporaryFile(max_size=IDEMPOTENCY_SPOOL_BYTES) as body:
+            # The body is part of the fingerprint, so read it up front and hand it on unchanged
+            fingerprint = RequestFingerprint(scope)
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    break
+                chunk = message.get("body", b"")
+                fingerprint.update(chunk)
+                body.write(chunk)
+                if not message.get("more_body", False):
+                    break
+            body.seek(0)
+            await self._handle(idempotency_key, fingerprint.hexdigest(), body, scope, receive, send)
+
+    async def _handle(self, idempotency_key: str, fingerprint: str, body: BinaryIO,
+                      scope: Scope, receive: Receive, send: Send) -> None:
+        state = self.state or get_shared_state()
+        key = f"idem:{await asyncio.to_thread(client_key, scope)}:{scope['method']}:{scope['path']}:{idempotency_key}"
+        lock_key = key + ":lock"
+        deadline = asyncio.get_running_loop().time() + self.wait_seconds
+
+        # The shared state is blocking (a Redis round trip), so it is called from a thread
+        while True:
+            stored = await asyncio.to_thread(state.get, key)
+            if stored is not None:
+                await self._replay(stored, fingerprint, scope, receive, send)
+                return
+            if await asyncio.to_thread(state.set, lock_key, b"1", ttl=IDEMPOTENCY_LOCK_SECONDS, only_if_absent=True):
+                break
+            # Another request with this key is running: wait for its response
+            if asyncio.get_running_loop().time() >= deadline:
+                await JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress."},
+                    status_code=409, headers={"Retry-After": "1"},
+                )(scope, receive, send)
+                return
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+
+        try:
+            await self._run(state, key, fingerprint, body, scope, receive, send)
+        finally:
+            await asyncio.to_thread(state.delete, lock_key)
+
+    async def _run(self, state: SharedState, key: str, fingerprint: str, body: BinaryIO,
+                   scope: Scope, receive: Receive, send: Send) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                chunk = body.read(REPLAY_CHUNK_SIZE)
+                body_sent = len(chunk) < REPLAY_CHUNK_SIZE
+                return {"type": "http.request", "body": chunk, "more_body": not body_sent}
+            return await receive()  # waits for the client to disconnect
+
+        status, headers, response_body = 500, [], []
+        size = 0
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, headers, size
+            if message["type"] == "http.response.start":
+                status, headers = message["status"], list(message.get("headers", []))
+            elif message["type"] == "http.response.body" and size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                response_body.append(chunk)
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+        if should_store(status, scope) and size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+            stored = encode_response(fingerprint, status, headers, b"".join(response_body))
+            await asyncio.to_thread(state.set, key, stored, ttl=IDEMPOTENCY_TTL_SECONDS)
+
+    async def _replay(self, stored: bytes, fingerprint: str, scope: Scope, receive: Receive, send: Send) -> None:
+        meta, body = decode_response(stored)
+        if meta["fingerprint"] != fingerprint:
+            await JSONResponse(
+                {"detail": "This Idempotency-Key was already used with a different request."}, status_code=422,
+            )(scope, receive, send)
+            return
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in meta["headers"]]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": meta["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,91 @@
+# backend/app/utils/image_derivatives.py
+"""
+Image processing for upload derivatives.
+Runs inside worker processes, so it must not import the database or app state.
+"""
+import shutil
+import tempfile
+from pathlib import Path, PurePosixPath
+from typing import Dict
+from app.storage import get_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; derivatives are skipped without it
+    Image = None
+    ImageOps = None
+
+THUMBNAIL_SIZE = (256, 256)
+WEBP_MAX_SIZE = (1600, 1600)
+WEBP_QUALITY = 80
+DERIVED_DIR = "derived"
+
+
+def derivatives_available() -> bool:
+    return Image is not None
+
+
+def derivative_paths(source: Path) -> Dict[str, Path]:
+    """Where the derivatives of `source` live: <dir>/derived/<stem>_thumb.webp and <stem>.webp"""
+    derived = source.parent / DERIVED_DIR
+    return {
+        "thumbnail": derived / f"{source.stem}_thumb.webp",
+        "webp": derived / f"{source.stem}.webp",
+    }
+
+
+def generate_derivatives(source_path: str) -> Dict[str, str]:
+    """
+    Write a fixed-size WebP thumbnail and a size-capped WebP copy of an image.
+    Returns {"thumbnail": path, "webp": path}. Existing derivatives are kept.
+    """
+    source = Path(source_path)
+    paths = derivative_paths(source)
+    if all(p.exists() for p in paths.values()):
+        return {name: str(p) for name, p in paths.items()}
+
+    paths["thumbnail"].parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        thumbnail = ImageOps.fit(image, THUMBNAIL_SIZE, method=Image.Resampling.LANCZOS)
+        _save_atomic(thumbnail, paths["thumbnail"])
+
+        full = image.copy()
+        full.thumbnail(WEBP_MAX_SIZE, Image.Resampling.LANCZOS)
+        _save_atomic(full, paths["webp"])
+
+    return {name: str(p) for name, p in paths.items()}
+
+
+def derive_stored_image(key: str) -> Dict[str, str]:
+    """
+    Build derivatives for an upload in the configured storage and return their keys.
+    Remote objects are downloaded to a scratch directory and the results uploaded back.
+    """
+    storage = get_storage()
+    keys = {name: str(p) for name, p in derivative_paths(PurePosixPath(key)).items()}
+    local = storage.local_path(key)
+    if local is not None:
+        generate_derivatives(str(local))
+        return keys
+    if all(storage.exists(k) for k in keys.values()):
+        return keys
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = Path(workdir) / PurePosixPath(key).name
+        with storage.open(key) as body, open(source, "wb") as f:
+            shutil.copyfileobj(body, f)
+        for name, path in generate_derivatives(str(source)).items():
+            with open(path, "rb") as f:
+                storage.save(keys[name], f, "image/webp")
+    return keys
+
+
+def _save_atomic(image, target: Path) -> None:
+    # Write then rename so a half-written file is never served
+    tmp = target.with_suffix(".tmp")
+    image.save(tmp, format="WEBP", quality=WEBP_QUALITY, method=4)
+    tmp.replace(target)
@@ -21,6 +21,13 @@ def create_reset_token(data: dict, expires_minutes: int = RESET_TOKEN_EXPIRE_MIN
     to_encode.update({"exp": expire, "type": "reset"})
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def create_upload_token(data: dict, expires_seconds: int) -> str:
+    """Create a short-lived JWT authorising one direct upload to local storage"""
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
+    to_encode.update({"exp": expire, "type": "upload"})
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
 def verify_token(token: str, expected_type: str = "access") -> dict:
     """Verify and decode JWT token"""
     try:
@@ -0,0 +1,81 @@
+# backend/app/utils/metrics.py
+import bisect
+import threading
+from typing import Dict, List, Sequence
+
+# Seconds; fine-grained at the low end where a healthy pool lives
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to observe on every pool checkout."""
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (the max for the overflow bucket)."""
+        with self._lock:
+            counts, top = list(self._counts), self._max
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank, seen = q * total, 0
+        for bound, count in zip(self.buckets + (top,), counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, top)
+        return top
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts, total_sum, top = list(self._counts), self._sum, self._max
+        count = sum(counts)
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip([str(b) for b in self.buckets] + ["+Inf"], counts):
+            running += bucket_count
+            cumulative[bound] = running
+        return {
+            "count": count,
+            "sum": round(total_sum, 6),
+            "max": round(top, 6),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._max = 0.0
+
+
+_histograms: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Get or create a named histogram."""
+    with _registry_lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram(name, buckets)
+        return _histograms[name]
+
+
+def all_histograms() -> List[Histogram]:
+    with _registry_lock:
+        return list(_histograms.values())
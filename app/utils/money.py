@@ -0,0 +1,27 @@
+# backend/app/utils/money.py
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+
+def parse_fee_cents(fee) -> Optional[int]:
+    """
+    Parse a free-form fee ("150", "$150", "1,200.50") into integer cents.
+    Returns None if the value cannot be parsed or is negative.
+    """
+    if fee is None or isinstance(fee, bool):
+        return None
+    if isinstance(fee, int):
+        return fee * 100 if fee >= 0 else None
+    try:
+        amount = Decimal(str(fee).replace("$", "").replace(",", "").strip())
+    except InvalidOperation:
+        return None
+    if not amount.is_finite() or amount < 0:
+        return None
+    return int((amount * 100).to_integral_value())
+
+
+def format_fee(cents: int) -> str:
+    """Format integer cents as a plain amount string ("150" or "150.50")."""
+    dollars, remainder = divmod(int(cents), 100)
+    return f"{dollars}" if remainder == 0 else f"{dollars}.{remainder:02d}"
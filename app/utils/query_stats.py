@@ -0,0 +1,140 @@
+# backend/app/utils/query_stats.py
+"""
+SQL statement counts and database time per request, collected from the engines'
+cursor events. The same statement shape repeated within one request is what an
+N+1 query pattern looks like, so reports group statements by shape.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import QUERY_COUNT_WARN, QUERY_STATS_HEADERS
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with literals and parameter lists folded, so repeats of one query compare equal."""
+    shape = _LITERALS.sub("?", statement)
+    shape = _PARAM_LISTS.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed (with their durations) while this object was current."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def repeated(self, min_count: int = 2) -> List[Tuple[str, int]]:
+        """Statement shapes run at least `min_count` times, most frequent first."""
+        shapes = Counter(statement_shape(statement) for statement, _ in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= min_count]
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements, {self.total_seconds * 1000:.1f}ms in the database"]
+        lines += [f"  {count}x {shape}" for shape, count in self.repeated()]
+        return "\n".join(lines)
+
+    def assert_at_most(self, max_count: int, max_repeats: Optional[int] = None) -> None:
+        """Fail with the statement report when over budget, or when one shape repeats more than `max_repeats` times."""
+        repeats = self.repeated()
+        if self.count > max_count or (max_repeats is not None and repeats and repeats[0][1] > max_repeats):
+            limits = f"at most {max_count} statements" + (f", {max_repeats} per shape" if max_repeats else "")
+            raise AssertionError(f"Expected {limits}, got {self.report()}\n"
+                                 + "\n".join(f"    {statement}" for statement, _ in self.statements))
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# (method, route path, stats) for every request while a test is recording
+_recordings: List[list] = []
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Collect the statements run in this context (and threads or tasks started from it)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def record_requests() -> Iterator[List[Tuple[str, str, QueryStats]]]:
+    """Collect (method, route path, stats) for every request QueryStatsMiddleware handles meanwhile."""
+    requests: list = []
+    _recordings.append(requests)
+    try:
+        yield requests
+    finally:
+        _recordings.remove(requests)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_stats_started")
+    if stats is not None and started:
+        stats.statements.append((statement, time.perf_counter() - started.pop()))
+
+
+def install_query_stats(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the statements each request runs. Requests over `warn_at` are logged with
+    their repeated statement shapes; with `headers` on, every response carries its
+    count and database time (X-Query-Count, Server-Timing).
+    """
+
+    def __init__(self, app: ASGIApp, warn_at: int = QUERY_COUNT_WARN, headers: bool = QUERY_STATS_HEADERS):
+        self.app = app
+        self.warn_at = warn_at
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append((b"server-timing", f"db;dur={stats.total_seconds * 1000:.1f};desc=\"{stats.count} queries\"".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with count_queries() as stats:
+            await self.app(scope, receive, send_with_stats if self.headers else send)
+
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        for requests in _recordings:
+            requests.append((scope["method"], path, stats))
+        if stats.count > self.warn_at:
+            print(f"{scope['method']} {path} ran {stats.report()}")
@@ -0,0 +1,113 @@
+# backend/app/utils/rate_limit.py
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.shared_state import SharedState, get_shared_state
+from app.utils.jwt_handler import decode_access_token
+from config import (
+    RATE_LIMIT_BOOKING, RATE_LIMIT_CHATBOT, RATE_LIMIT_LOGIN, RATE_LIMIT_PASSWORD_FORGOT, RATE_LIMIT_REGISTER,
+)
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """`limit` requests per `period` seconds on average, up to `burst` of them back to back."""
+
+    name: str
+    limit: int
+    period: float
+    burst: int
+    key: str = "user"  # "user" (the IP for anonymous callers) or "ip"
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+    @property
+    def tolerance(self) -> float:
+        return self.interval * (self.burst - 1)
+
+
+def parse_policy(name: str, env: str, value: str, key: str) -> RatePolicy:
+    """Read a policy as "limit/period_seconds/burst", e.g. RATE_LIMIT_LOGIN=10/60/5."""
+    try:
+        limit, period, burst = value.split("/")
+        return RatePolicy(name, int(limit), float(period), int(burst), key)
+    except ValueError:
+        raise RuntimeError(f"{env} must look like limit/period_seconds/burst, got {value!r}")
+
+
+# (method, path without trailing slash) -> policy
+POLICIES: Dict[Tuple[str, str], RatePolicy] = {
+    # bcrypt on every attempt
+    ("POST", "/auth/login"): parse_policy("login", "RATE_LIMIT_LOGIN", RATE_LIMIT_LOGIN, "ip"),
+    ("POST", "/auth/register"): parse_policy("register", "RATE_LIMIT_REGISTER", RATE_LIMIT_REGISTER, "ip"),
+    # an email per call
+    ("POST", "/password/forgot"): parse_policy(
+        "password-forgot", "RATE_LIMIT_PASSWORD_FORGOT", RATE_LIMIT_PASSWORD_FORGOT, "ip"),
+    # OpenAI tokens
+    ("POST", "/chatbot"): parse_policy("chatbot", "RATE_LIMIT_CHATBOT", RATE_LIMIT_CHATBOT, "user"),
+    # a Stripe checkout session per booking
+    ("POST", "/appointments"): parse_policy("booking", "RATE_LIMIT_BOOKING", RATE_LIMIT_BOOKING, "user"),
+}
+
+
+def client_key(scope: Scope, by_user: bool = True) -> str:
+    """Who is calling: the user id from the bearer token, else the client IP."""
+    if by_user:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return f"user:{decode_access_token(token)['sub']}"
+                    except Exception:
+                        pass
+                break
+    # Behind a proxy the server sets this from X-Forwarded-For (FORWARDED_ALLOW_IPS)
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    GCRA rate limits for the routes in `policies`: one stored timestamp per caller and
+    route, dropped once the caller is idle. Refused requests get 429 with Retry-After.
+    Limits are kept in the shared state, so with the redis backend they hold across
+    workers and nodes; if the backend is unreachable requests are let through. The
+    check (a token decode and a blocking Redis round trip) runs in a thread.
+    """
+
+    def __init__(self, app: ASGIApp, policies: Dict[Tuple[str, str], RatePolicy] = POLICIES,
+                 state: Optional[SharedState] = None):
+        self.app = app
+        self.policies = policies
+        self.state = state
+
+    def check(self, policy: RatePolicy, scope: Scope) -> Tuple[bool, float]:
+        state = self.state or get_shared_state()
+        try:
+            key = f"rate:{policy.name}:{client_key(scope, by_user=policy.key == 'user')}"
+            return state.gcra(key, policy.interval, policy.tolerance)
+        except Exception as e:
+            print(f"Rate limit check for '{policy.name}' failed, allowing request: {e}")
+            return True, 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            policy = self.policies.get((scope["method"], scope["path"].rstrip("/")))
+            if policy is not None:
+                allowed, seconds = await asyncio.to_thread(self.check, policy, scope)
+                if not allowed:
+                    retry_after = max(1, math.ceil(seconds))
+                    response = JSONResponse(
+                        {"detail": f"Too many requests, please retry in {retry_after} seconds."},
+                        status_code=429,
+                        headers={"Retry-After": str(retry_after)},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,54 @@
+# backend/app/utils/scheduler.py
+import asyncio
+from typing import Callable, List, Optional
+
+
+class PeriodicJob:
+    """Run a blocking function every `interval_seconds` in a worker thread."""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], object]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await asyncio.to_thread(self.func)
+            except Exception as e:
+                print(f"Periodic job '{self.name}' failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Jobs registered at import time and started with the app
+jobs: List[PeriodicJob] = []
+
+
+def register_job(name: str, interval_seconds: float, func: Callable[[], object]) -> PeriodicJob:
+    job = PeriodicJob(name, interval_seconds, func)
+    jobs.append(job)
+    return job
+
+
+def start_jobs():
+    for job in jobs:
+        job.start()
+
+
+async def stop_jobs():
+    for job in jobs:
+        await job.stop()
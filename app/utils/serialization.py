@@ -0,0 +1,29 @@
+# backend/app/utils/serialization.py
+from typing import Any
+import orjson
+
+# Dates, datetimes and dataclasses are handled natively by orjson
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any):
+    # Pydantic models (e.g. DoctorOut) and anything exposing model_dump()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string using orjson."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS).decode()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize to JSON bytes using orjson (for HTTP bodies)."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+def loads(data):
+    return orjson.loads(data)
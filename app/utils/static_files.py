@@ -0,0 +1,56 @@
+# backend/app/utils/static_files.py
+import hashlib
+import os
+import stat
+from functools import lru_cache
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+# Upload file names are content hashes (or legacy random UUIDs), so a URL never changes content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(path: str, mtime_ns: int, size: int) -> str:
+    """Hash a file's content once per (path, mtime, size)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for user uploads: content-hash ETags and immutable caching.
+    Uploads are images, which are already compressed, so they are served as
+    stored. Range requests and zero-copy (pathsend) transfer come from
+    Starlette's FileResponse.
+    """
+
+    def lookup_path(self, path: str):
+        # Starlette runs this in a worker thread: hash there, so file_response only reads the cache
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            _content_etag(os.fspath(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+        return full_path, stat_result
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = os.fspath(full_path)
+        etag = _content_etag(full_path, stat_result.st_mtime_ns, stat_result.st_size)
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+        # Our ETag header takes precedence over FileResponse's mtime/size one
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,7 +1,9 @@
 import stripe
-import os
+from datetime import date, time
+from typing import Optional
+from config import FRONTEND_URL, STRIPE_API_KEY
 
-stripe.api_key = os.getenv("STRIPE_API_KEY")
+stripe.api_key = STRIPE_API_KEY
 
 def create_checkout_session(appointment_id: int, doctor_name: str, amount: float, success_url: str, cancel_url: str):
     session = stripe.checkout.Session.create(
@@ -19,3 +21,40 @@ def create_checkout_session(appointment_id: int, doctor_name: str, amount: float
         cancel_url=cancel_url,
     )
     return session
+
+
+def create_appointment_checkout(doctor, fee_cents: int, day: date, at: time, reason: Optional[str],
+                                user_id: int, user_name: str, user_email: str):
+    """
+    Checkout session for one appointment, used by the booking route and the chatbot tools.
+    Nothing is written to the database here: the payment webhook creates the appointment
+    from the session metadata.
+    """
+    return stripe.checkout.Session.create(
+        payment_method_types=['card'],
+        line_items=[{
+            'price_data': {
+                'currency': 'usd',
+                'product_data': {
+                    'name': f'Appointment with Dr. {doctor.name}',
+                    'description': f'{doctor.specialty} consultation on {day.isoformat()} at {at:%H:%M}',
+                },
+                'unit_amount': fee_cents,
+            },
+            'quantity': 1,
+        }],
+        mode='payment',
+        success_url=f"{FRONTEND_URL}/appointments/success?session_id={{CHECKOUT_SESSION_ID}}",
+        cancel_url=f"{FRONTEND_URL}/appointments/cancel",
+        metadata={
+            'user_id': str(user_id),
+            'user_name': user_name or '',
+            'user_email': user_email or '',
+            'doctor_id': str(doctor.id),
+            'doctor_name': doctor.name,
+            'doctor_specialty': doctor.specialty,
+            'date': day.isoformat(),
+            'time': at.isoformat(),
+            'reason': reason or '',
+        },
+    )
@@ -0,0 +1,114 @@
+"""
+Compare the rollup-backed admin stats read with ad-hoc aggregates over appointments.
+
+    python bench/bench_admin_stats.py --appointments 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+
+from sqlalchemy import case, func, insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Appointment, Doctor, User  # noqa: E402
+from app.services.stats_service import get_admin_stats, reconcile_stats  # noqa: E402
+
+
+def seed(db, n_users, n_doctors, n_appointments):
+    db.execute(insert(User), [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "is_adman": "user"}
+        for i in range(n_users)
+    ])
+    db.execute(insert(Doctor), [
+        {"name": f"doctor{i}", "specialty": "General", "fee": f"${random.randint(50, 300)}"}
+        for i in range(n_doctors)
+    ])
+    today = date.today()
+    statuses = ["booked", "confirmed", "cancelled", "completed"]
+    batch = []
+    for _ in range(n_appointments):
+        status = random.choice(statuses)
+        batch.append({
+            "user_id": random.randint(1, n_users),
+            "doctor_id": random.randint(1, n_doctors),
+            "date": today + timedelta(days=random.randint(-365, 60)),
+            "time": dtime(random.randint(8, 17), 0),
+            "status": status,
+            "paid": status != "booked",
+        })
+        if len(batch) >= 10000:
+            db.execute(insert(Appointment), batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(Appointment), batch)
+    db.commit()
+
+
+def adhoc_stats(db, days=30):
+    """What the dashboard has to compute without rollups."""
+    today = date.today()
+    by_status = db.query(
+        Appointment.status, func.count(Appointment.id),
+        func.sum(case((Appointment.paid.is_(True), 1), else_=0)),
+    ).group_by(Appointment.status).all()
+    by_doctor = db.query(Appointment.doctor_id, func.count(Appointment.id)).group_by(Appointment.doctor_id).all()
+    by_day = db.query(Appointment.date, func.count(Appointment.id)).filter(
+        Appointment.date.between(today - timedelta(days=days), today + timedelta(days=days))
+    ).group_by(Appointment.date).all()
+    upcoming = db.query(func.count(Appointment.id)).filter(
+        Appointment.date >= today, Appointment.status.in_(["booked", "confirmed"])
+    ).scalar()
+    active = db.query(func.count(func.distinct(Appointment.user_id))).filter(
+        Appointment.date >= today, Appointment.status.in_(["booked", "confirmed"])
+    ).scalar()
+    return by_status, by_doctor, by_day, upcoming, active
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--appointments", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        seed(db, args.users, args.doctors, args.appointments)
+        print(f"Seeded {args.appointments} appointments in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        groups = reconcile_stats(db)
+        print(f"Reconcile built {groups} rollup rows in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        rollup_p50, rollup_max = timed(lambda: get_admin_stats(db), args.repeat)
+        adhoc_p50, adhoc_max = timed(lambda: adhoc_stats(db), args.repeat)
+        print(f"rollup stats: p50 {rollup_p50:.2f}ms  max {rollup_max:.2f}ms")
+        print(f"ad-hoc stats: p50 {adhoc_p50:.2f}ms  max {adhoc_max:.2f}ms")
+        print(f"speedup: {adhoc_p50 / rollup_p50:.1f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Turns per chatbot booking, offline. A scripted patient books through the real agent
+tools and Runner twice: with a fake model that follows the step-by-step workflow
+(start_booking, questions, then book_appointment) and with one that hands the
+patient's words to quick_book. Counts patient messages and model calls (LLM round
+trips) until the payment link, per patient style.
+
+    python bench/bench_booking_turns.py --conversations 200 --model-latency-ms 800
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/turns.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench-not-used")
+
+import scenarios  # noqa: E402
+from app.ai_agent.agent import get_assistant_agent  # noqa: E402
+from app.ai_agent.booking_request import parse_booking_request  # noqa: E402
+from app.ai_agent.session import SharedSession  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Doctor, User  # noqa: E402
+from app.services.doctor_service import get_doctor_catalog, refresh_doctor_catalog  # noqa: E402
+from app.shared_state import MemoryState  # noqa: E402
+from app.utils.datetime_parser import find_when  # noqa: E402
+
+DOCTORS = [
+    ("Aisha Patel", "Dermatology"), ("Sarah Lee", "Dermatology"), ("John Smith", "Cardiology"),
+    ("Maria Garcia", "Cardiology"), ("Sarah Khan", "Pediatrics"), ("Omar Haddad", "Neurology"),
+    ("Li Wei Chen", "Orthopedics"), ("Grace Okafor", "General Practice"),
+]
+SPECIALISTS = {"Dermatology": "dermatologist", "Cardiology": "cardiologist", "Pediatrics": "pediatrician",
+               "Neurology": "neurologist", "Orthopedics": "orthopedic surgeon", "General Practice": "general practitioner"}
+DAYS = ["tomorrow", "next monday", "next friday", "in 3 days", "day after tomorrow"]
+TIMES = ["2pm", "10:30am", "9am", "3:15 pm", "morning", "11am"]
+REASONS = ["a skin rash", "a checkup", "chest pain", "a follow-up", "headaches"]
+STYLES = ["all at once", "doctor first", "specialty and day", "bare", "one thing at a time"]
+MAX_PATIENT_MESSAGES = 8
+
+
+# ==================== FAKE MODELS ====================
+
+def _reply(text=None, tool=None, arguments=None):
+    from agents import ModelResponse, Usage
+    from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+    call_id = f"call_{uuid.uuid4().hex[:12]}"
+    if tool:
+        output = ResponseFunctionToolCall(id=f"fc_{call_id}", call_id=call_id, name=tool,
+                                          arguments=json.dumps(arguments or {}), type="function_call", status="completed")
+    else:
+        output = ResponseOutputMessage(id=f"msg_{call_id}", role="assistant", status="completed", type="message",
+                                       content=[ResponseOutputText(annotations=[], text=text, type="output_text")])
+    return ModelResponse(output=[output], usage=Usage(requests=1), response_id=None)
+
+
+def _text(item) -> str:
+    content = item.get("content")
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or item.get("output") or "")
+
+
+def build_model(flow: str, calls: list):
+    """A Model for one flow; every get_response (one LLM round trip) is appended to `calls`."""
+    from agents import Model
+
+    class BookingModel(Model):
+        async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                               handoffs, tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+            calls.append(flow)
+            items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+            last_user = max(i for i, item in enumerate(items) if item.get("role") == "user")
+            outputs = [item for item in items[last_user:] if item.get("type") == "function_call_output"]
+            if outputs:
+                # Tool JSON goes back to the frontend unchanged
+                return _reply(text=str(outputs[-1]["output"]))
+            said = [_text(item) for item in items if item.get("role") == "user"]
+            if flow == "quick_book":
+                return _reply(tool="quick_book", arguments={"request": " ".join(said)})
+            return self.step_by_step(items, said)
+
+        def step_by_step(self, items, said):
+            # What the earlier prompt asked of the model: start_booking for the doctor, ask for
+            # date, time and reason, then book_appointment with the doctor ID start_booking showed
+            everything = " ".join(said)
+            tool_outputs = " ".join(_text(item) for item in items if item.get("type") == "function_call_output")
+            asked = " ".join(_text(item) for item in items if item.get("role") == "assistant").lower()
+            found = re.findall(r"I found .*? - ID: (\d+)", tool_outputs)
+            with SessionLocal() as db:
+                request = parse_booking_request(everything, get_doctor_catalog(db))
+            day, at, _ = find_when(everything)
+            if not found:
+                named = request.doctors[0]["name"] if request.matched_by == "name" and len(request.doctors) == 1 else None
+                return _reply(tool="start_booking", arguments={"doctor_name": named} if named else {})
+            if day and at and not request.reason and "reason" not in asked:
+                return _reply(text="What's the reason for your visit? (optional)")
+            if day and at:
+                return _reply(tool="book_appointment", arguments={
+                    "doctor_id": int(found[-1]), "date": day.isoformat(), "time": at.strftime("%H:%M"),
+                    "reason": request.reason or said[-1],
+                })
+            if day:
+                return _reply(text="What time would you like, and what's the reason for your visit?")
+            return _reply(text="When would you like your appointment? (e.g., 'tomorrow', 'next Monday')")
+
+        def stream_response(self, *args, **kwargs):
+            raise NotImplementedError("The harness does not stream")
+
+    return BookingModel()
+
+
+# ==================== PATIENT ====================
+
+def opening(style, intent):
+    name, specialty = intent["doctor"]
+    if style == "all at once":
+        return f"Book Dr. {name} {intent['day']} at {intent['time']} for {intent['reason']}"
+    if style == "doctor first":
+        return f"I'd like to see Dr. {name}"
+    if style == "specialty and day":
+        return f"I need a {SPECIALISTS[specialty]} {intent['day']}"
+    if style == "bare":
+        return "I want to book an appointment"
+    return f"Book with {name}"
+
+
+def answer(style, intent, reply: str) -> str:
+    """The patient's answer to whatever the assistant asked, one item at a time if that is their style."""
+    reply = reply.lower()
+    parts = []
+    if "which doctor" in reply or "doctor's name" in reply or "doctor would you like" in reply:
+        parts.append(f"Dr. {intent['doctor'][0]}")
+    if any(word in reply for word in ("when would", "which day", "date", "other day")):
+        parts.append(intent["day"])
+    if re.search(r"\btimes?\b", reply):
+        offered = re.search(r"free at (\d{2}:\d{2})", reply)
+        parts.append(offered.group(1) if offered and "already booked" in reply else intent["time"])
+    if "reason" in reply:
+        parts.append(f"for {intent['reason']}")
+    if not parts:
+        parts.append(opening("all at once", intent))
+    return parts[0] if style == "one thing at a time" else " ".join(parts)
+
+
+async def converse(agent, style, intent, context, calls) -> dict:
+    from agents import Runner
+
+    session = SharedSession(f"turns-{uuid.uuid4().hex}", MemoryState())
+    message, patient_messages = opening(style, intent), 0
+    while patient_messages < MAX_PATIENT_MESSAGES:
+        patient_messages += 1
+        result = await Runner.run(agent, input=message, context=context, session=session, max_turns=6)
+        # Tool JSON, or a question the model asked itself
+        output = result.final_output
+        reply = json.loads(output) if output.startswith("{") else {"message": output}
+        if reply.get("type") == "payment_redirect":
+            return {"booked": True, "messages": patient_messages}
+        message = answer(style, intent, reply.get("message", ""))
+    return {"booked": False, "messages": patient_messages}
+
+
+def seed():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        if not db.query(Doctor).count():
+            db.add_all(Doctor(name=name, specialty=specialty, fee="150", fee_cents=15000) for name, specialty in DOCTORS)
+            db.add(User(name="Turns Patient", email="turns@bench.example.com", hashed_password="x"))
+            db.commit()
+        refresh_doctor_catalog(db)
+        return db.query(User.id).filter(User.email == "turns@bench.example.com").scalar()
+
+
+async def run(conversations: int, seed_value: int):
+    import stripe
+    from agents import set_tracing_disabled
+
+    stripe.checkout.Session.create = scenarios.fake_checkout_create
+    set_tracing_disabled(True)
+    user_id = seed()
+    context = {"user_id": user_id, "name": "Turns Patient", "email": "turns@bench.example.com"}
+    rng = random.Random(seed_value)
+    intents = [
+        (STYLES[i % len(STYLES)], {"doctor": rng.choice(DOCTORS), "day": rng.choice(DAYS),
+                                   "time": rng.choice(TIMES), "reason": rng.choice(REASONS)})
+        for i in range(conversations)
+    ]
+    results = defaultdict(list)
+    for flow in ("step_by_step", "quick_book"):
+        for style, intent in intents:
+            calls = []
+            agent = get_assistant_agent().clone(model=build_model(flow, calls))
+            outcome = await converse(agent, style, intent, context, calls)
+            results[flow].append({**outcome, "style": style, "model_calls": len(calls)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--model-latency-ms", type=float, default=800, help="per model call, for the time estimate")
+    parser.add_argument("--seed", type=int, default=49)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = asyncio.run(run(args.conversations, args.seed))
+    print(f"{args.conversations} bookings per flow in {time.perf_counter() - started:.1f}s "
+          f"(model time estimated at {args.model_latency_ms:.0f}ms per call)")
+    print(f"{'flow':<14} {'style':<22} {'booked':>7} {'msgs p50':>9} {'msgs p90':>9} {'calls p50':>10} "
+          f"{'calls mean':>11} {'est. model s':>13}")
+    for flow, rows in results.items():
+        groups = [("all", rows)] + [(style, [r for r in rows if r["style"] == style]) for style in STYLES]
+        for style, group in groups:
+            messages = sorted(r["messages"] for r in group)
+            calls = sorted(r["model_calls"] for r in group)
+            booked = sum(r["booked"] for r in group)
+            print(f"{flow:<14} {style:<22} {booked:>4}/{len(group):<3} {statistics.median(messages):>8.1f} "
+                  f"{messages[int(len(messages) * 0.9) - 1]:>9} {statistics.median(calls):>10.1f} "
+                  f"{statistics.mean(calls):>11.2f} {statistics.mean(calls) * args.model_latency_ms / 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Prompt tokens per message over a long chat, offline. A scripted conversation (the
+load test's chat messages, show_doctors' full list among them) runs through the real
+agent tools and Runner twice: with a plain SharedSession, which sends every stored
+item, and with CompactingSession (app/ai_agent/history.py). Reports the input tokens
+the scripted model was sent per message, from the run's usage, and the history sent
+at a few points.
+
+    python bench/bench_chat_history.py --messages 40 --doctors 60
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/history.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench-not-used")
+
+import scenarios  # noqa: E402
+from app.ai_agent.agent import get_assistant_agent  # noqa: E402
+from app.ai_agent.history import CHAT_TOKEN_BUDGET, estimate_tokens  # noqa: E402
+from app.ai_agent.session import CompactingSession, SharedSession  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Doctor, User  # noqa: E402
+from app.shared_state import MemoryState  # noqa: E402
+
+SPECIALTIES = ["Cardiology", "Dermatology", "Pediatrics", "Neurology", "Orthopedics", "General Practice"]
+REPORTED_AT = (1, 5, 10, 20, 30, 40)
+
+
+def seed(doctors: int) -> int:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        if not db.query(Doctor).count():
+            db.add_all(Doctor(name=f"History Doctor {i}", specialty=SPECIALTIES[i % len(SPECIALTIES)],
+                              fee="150", fee_cents=15000) for i in range(doctors))
+            db.add(User(name="History Patient", email="history@bench.example.com", hashed_password="x"))
+            db.commit()
+        return db.query(User.id).filter(User.email == "history@bench.example.com").scalar()
+
+
+def script(messages: int):
+    lines = []
+    for n in range(messages):
+        template, _ = scenarios.CHAT_MESSAGES[n % len(scenarios.CHAT_MESSAGES)]
+        lines.append(template.format(specialty=SPECIALTIES[n % len(SPECIALTIES)]))
+    return lines
+
+
+async def converse(agent, session, lines, context):
+    from agents import Runner
+
+    rows = []
+    for line in lines:
+        history = await session.get_items()
+        started = time.perf_counter()
+        result = await Runner.run(agent, input=line, context=context, session=session, max_turns=4)
+        seconds = time.perf_counter() - started
+        # The first model call of each message carries the whole history
+        rows.append({
+            "history_items": len(history),
+            "history_tokens": estimate_tokens(history),
+            "first_call": result.raw_responses[0].usage.input_tokens,
+            "message": sum(response.usage.input_tokens for response in result.raw_responses),
+            "seconds": seconds,
+        })
+    return rows
+
+
+async def run(messages: int, doctors: int):
+    import stripe
+    from agents import set_tracing_disabled
+
+    stripe.checkout.Session.create = scenarios.fake_checkout_create
+    set_tracing_disabled(True)
+    user_id = seed(doctors)
+    context = {"user_id": user_id, "name": "History Patient", "email": "history@bench.example.com"}
+    agent = get_assistant_agent().clone(model=scenarios.build_scripted_model())
+    lines = script(messages)
+    results = {}
+    for label, session_class in (("all items", SharedSession), ("compacted", CompactingSession)):
+        session = session_class(f"history-{label}", MemoryState())
+        results[label] = await converse(agent, session, lines, context)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--doctors", type=int, default=60, help="rows in show_doctors' output")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.messages, args.doctors))
+    print(f"{args.messages} messages, {args.doctors} doctors, CHAT_TOKEN_BUDGET={CHAT_TOKEN_BUDGET} "
+          f"(tokens estimated as characters / 4)")
+    print(f"{'session':<10} {'message':>8} {'items':>6} {'history tok':>12} {'1st call tok':>13} {'message tok':>12}")
+    for label, rows in results.items():
+        for n in REPORTED_AT:
+            if n <= len(rows):
+                row = rows[n - 1]
+                print(f"{label:<10} {n:>8} {row['history_items']:>6} {row['history_tokens']:>12} "
+                      f"{row['first_call']:>13} {row['message']:>12}")
+    print()
+    print(f"{'session':<10} {'tokens total':>13} {'per msg mean':>13} {'per msg max':>12} {'run ms mean':>12}")
+    for label, rows in results.items():
+        tokens = [row["message"] for row in rows]
+        print(f"{label:<10} {sum(tokens):>13} {statistics.mean(tokens):>13.0f} {max(tokens):>12} "
+              f"{statistics.mean(row['seconds'] for row in rows) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
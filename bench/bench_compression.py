@@ -0,0 +1,93 @@
+"""
+Bytes on the wire and throughput for a typical doctors-page load:
+GET /doctors/ plus the avatar images, first visit and repeat visit (ETag revalidation).
+
+    python bench/bench_compression.py --doctors 500 --requests 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.chdir(workdir)
+os.makedirs("uploads/doctor_images", exist_ok=True)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Doctor  # noqa: E402
+from main import app  # noqa: E402
+
+ENCODINGS = {"identity": "identity", "gzip": "gzip", "br": "br, gzip"}
+
+
+def seed(n_doctors, image_kib):
+    Base.metadata.create_all(engine)
+    specialties = ["Cardiology", "Dermatology", "Neurology", "Pediatrics", "Orthopedics"]
+    rows = []
+    for i in range(n_doctors):
+        image_name = f"{uuid.uuid4()}.jpg"
+        with open(f"uploads/doctor_images/{image_name}", "wb") as f:
+            f.write(os.urandom(image_kib * 1024))  # incompressible, like a real JPEG
+        rows.append({
+            "name": f"Doctor {i}", "specialty": random.choice(specialties),
+            "bio": "Board-certified physician with a focus on patient-centred care. " * 3,
+            "image_url": f"/uploads/doctor_images/{image_name}", "fee": "150", "fee_cents": 15000,
+        })
+    db = SessionLocal()
+    db.execute(insert(Doctor), rows)
+    db.commit()
+    db.close()
+
+
+def page_load(client, accept_encoding, avatars, etags=None):
+    """Fetch the list and the first `avatars` images; returns (wire bytes, etags)."""
+    response = client.get("/doctors/", headers={"Accept-Encoding": accept_encoding})
+    wire = len(response.content) if "content-encoding" not in response.headers else int(response.headers["content-length"])
+    new_etags = {}
+    for doctor in response.json()[:avatars]:
+        headers = {"Accept-Encoding": accept_encoding}
+        if etags and doctor["image_url"] in etags:
+            headers["If-None-Match"] = etags[doctor["image_url"]]
+        image = client.get(doctor["image_url"], headers=headers)
+        wire += len(image.content)
+        new_etags[doctor["image_url"]] = image.headers.get("etag")
+    return wire, new_etags
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--avatars", type=int, default=24, help="images rendered on the first page")
+    parser.add_argument("--image-kib", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(7)
+    seed(args.doctors, args.image_kib)
+    with TestClient(app) as client:
+        for label, accept in ENCODINGS.items():
+            first, etags = page_load(client, accept, args.avatars)
+            repeat, _ = page_load(client, accept, args.avatars, etags)
+            list_response = client.get("/doctors/", headers={"Accept-Encoding": accept})
+            list_bytes = int(list_response.headers.get("content-length", len(list_response.content)))
+
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.get("/doctors/", headers={"Accept-Encoding": accept})
+            rps = args.requests / (time.perf_counter() - start)
+
+            print(f"{label:<9} list {list_bytes / 1024:8.1f} KiB   first page {first / 1024:9.1f} KiB   "
+                  f"repeat page {repeat / 1024:8.1f} KiB   list throughput {rps:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Parse a corpus of booking phrases ("tomorrow 2pm", "next Monday morning", ISO
+strings, "Jan 15 at 10:30am", some garbage) with app/utils/datetime_parser.py and
+report throughput overall and per phrase kind.
+
+    python bench/bench_date_parser.py --phrases 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.datetime_parser import DateParseError, parse_date, parse_time, parse_when  # noqa: E402
+
+TIMES = ["2pm", "2:30 p.m.", "14:30", "9am", "10:15am", "morning", "in the afternoon", "noon", "at 4 PM"]
+DAYS = ["today", "tomorrow", "day after tomorrow", "monday", "next friday", "this wed", "coming sunday",
+        "next week", "in 3 days", "in two weeks"]
+GARBAGE = ["someday", "whenever works", "asap please", "2pm 3pm", "31/02", "next next friday"]
+
+
+def make_corpus(n, seed=48):
+    rng = random.Random(seed)
+    today = date.today()
+    kinds = [
+        ("iso date", lambda: (today + timedelta(days=rng.randrange(365))).isoformat()),
+        ("iso datetime", lambda: f"{today + timedelta(days=rng.randrange(365))}T{rng.randrange(8, 18):02d}:30"),
+        ("relative + time", lambda: f"{rng.choice(DAYS)} {rng.choice(TIMES)}"),
+        ("time + relative", lambda: f"{rng.choice(TIMES)} {rng.choice(DAYS)}"),
+        ("month day", lambda: (today + timedelta(days=rng.randrange(365))).strftime(rng.choice(("%b %d", "%B %d, %Y", "%d %B")))),
+        ("time only", lambda: rng.choice(TIMES)),
+        ("garbage", lambda: rng.choice(GARBAGE)),
+    ]
+    weights = [10, 5, 35, 10, 20, 10, 10]
+    return [(kind, make()) for kind, make in rng.choices(kinds, weights, k=n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phrases", type=int, default=100000)
+    args = parser.parse_args()
+    corpus = make_corpus(args.phrases)
+
+    by_kind = defaultdict(lambda: [0, 0, 0.0])  # phrases, rejected, seconds
+    start = time.perf_counter()
+    for kind, phrase in corpus:
+        began = time.perf_counter()
+        try:
+            parse_when(phrase)
+        except DateParseError:
+            by_kind[kind][1] += 1
+        stats = by_kind[kind]
+        stats[0] += 1
+        stats[2] += time.perf_counter() - began
+    elapsed = time.perf_counter() - start
+
+    print(f"parse_when: {len(corpus)} phrases in {elapsed:.2f}s ({len(corpus) / elapsed:,.0f}/s, "
+          f"{elapsed / len(corpus) * 1e6:.1f}us each)")
+    for kind, (count, rejected, seconds) in sorted(by_kind.items(), key=lambda item: -item[1][0]):
+        print(f"  {kind:<16} {count:>7} phrases {seconds / count * 1e6:6.1f}us  rejected {rejected}")
+
+    dates = [phrase for kind, phrase in corpus if kind in ("iso date", "month day")]
+    times = [phrase for kind, phrase in corpus if kind == "time only"]
+    for label, parse, phrases in (("parse_date", parse_date, dates), ("parse_time", parse_time, times)):
+        start = time.perf_counter()
+        for phrase in phrases:
+            parse(phrase)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {len(phrases)} phrases, {elapsed / len(phrases) * 1e6:.1f}us each")
+
+
+if __name__ == "__main__":
+    main()
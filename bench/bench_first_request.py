@@ -0,0 +1,95 @@
+"""
+First-request latency after boot, with and without the lifespan warm-up.
+Each variant runs in a fresh interpreter against the same seeded database.
+
+    python bench/bench_first_request.py --doctors 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED = """
+from sqlalchemy import insert
+from app.database import Base, engine, SessionLocal
+from app.models import Doctor, User
+Base.metadata.create_all(engine)
+with SessionLocal() as db:
+    db.execute(insert(Doctor), [{"name": f"doctor{i}", "specialty": "General", "fee": "100"} for i in range({doctors})])
+    db.execute(insert(User), [{"name": "bench", "email": "bench@example.com",
+                               "hashed_password": "x", "is_adman": "user"}])
+    db.commit()
+"""
+
+VARIANT = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from main import app
+from app.utils.jwt_handler import create_access_token
+imported = time.perf_counter()
+headers = {{"Authorization": "Bearer " + create_access_token({{"sub": "1"}})}}
+
+def timed(client, path, **kwargs):
+    t = time.perf_counter()
+    assert client.get(path, **kwargs).status_code == 200, path
+    return (time.perf_counter() - t) * 1000
+
+def requests(client):
+    first = [timed(client, p, **kw) for p, kw in (("/doctors/", {{}}), ("/users/me", {{"headers": headers}}))]
+    second = [timed(client, p, **kw) for p, kw in (("/doctors/", {{}}), ("/users/me", {{"headers": headers}}))]
+    return first, second
+
+if {warm}:
+    with TestClient(app) as client:
+        while client.get("/health/ready").status_code != 200:
+            time.sleep(0.005)
+        ready = time.perf_counter()
+        first, second = requests(client)
+else:
+    client = TestClient(app)
+    ready = time.perf_counter()
+    first, second = requests(client)
+print(f"{{(imported - start) * 1000:.0f}} {{(ready - imported) * 1000:.0f}} "
+      f"{{first[0]:.1f}} {{first[1]:.1f}} {{second[0]:.1f}} {{second[1]:.1f}}")
+"""
+
+
+def run(code, env):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(result.stderr)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "HOME": os.environ.get("HOME", ""),
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "SECRET_KEY": "bench",
+        "STORAGE_LOCAL_ROOT": f"{workdir}/uploads",
+    }
+    if os.getenv("OPENAI_API_KEY"):
+        env["OPENAI_API_KEY"] = os.environ["OPENAI_API_KEY"]
+    os.makedirs(env["STORAGE_LOCAL_ROOT"])
+    run(SEED.replace("{doctors}", str(args.doctors)) + "print('seeded')", env)
+
+    print("variant       import  until-ready  first /doctors/  first /users/me  second /doctors/  second /users/me")
+    for label, warm in (("cold", False), ("lifespan", True)):
+        for _ in range(args.runs):
+            imported, ready, d1, u1, d2, u2 = run(VARIANT.format(warm=warm), env).split()
+            print(f"{label:<12} {imported:>6}ms {ready:>10}ms {d1:>15}ms {u1:>15}ms {d2:>16}ms {u2:>16}ms")
+
+
+if __name__ == "__main__":
+    main()
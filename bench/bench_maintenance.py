@@ -0,0 +1,88 @@
+"""
+Appointment maintenance run over a backlog of past appointments, chunk size vs
+total time and the longest single transaction (how long row locks are held).
+
+    python bench/bench_maintenance.py --appointments 200000 --chunk-size 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Appointment, Doctor, User  # noqa: E402
+from app.services import maintenance_service  # noqa: E402
+from app.services.stats_service import reconcile_stats  # noqa: E402
+
+
+def seed(db, n_appointments, now):
+    db.execute(insert(User), [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "is_adman": "user"}
+        for i in range(5000)
+    ])
+    db.execute(insert(Doctor), [{"name": f"doctor{i}", "specialty": "General", "fee": "100"} for i in range(50)])
+    rows = []
+    for _ in range(n_appointments):
+        # Two thirds in the past 90 days, the rest upcoming
+        starts_at = now + timedelta(minutes=15 * random.randint(-4 * 24 * 90, 4 * 24 * 45))
+        status = random.choice(["booked", "confirmed", "confirmed", "cancelled"])
+        rows.append({
+            "user_id": random.randint(1, 5000), "doctor_id": random.randint(1, 50),
+            "date": starts_at.date(), "time": starts_at.time(), "reason": "Checkup",
+            "status": status, "paid": status == "confirmed",
+        })
+        if len(rows) >= 10000:
+            db.execute(insert(Appointment), rows)
+            rows.clear()
+    if rows:
+        db.execute(insert(Appointment), rows)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=maintenance_service.MAINTENANCE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    random.seed(42)
+    Base.metadata.create_all(engine)
+    now = datetime.now().replace(second=0, microsecond=0)
+    db = SessionLocal()
+    try:
+        seed(db, args.appointments, now)
+        reconcile_stats(db)
+
+        # Time each chunk's transaction to see how long locks are held
+        chunk_ms = []
+        transition_chunk = maintenance_service._transition_chunk
+
+        def timed_chunk(*a, **kw):
+            start = time.perf_counter()
+            count = transition_chunk(*a, **kw)
+            chunk_ms.append((time.perf_counter() - start) * 1000)
+            return count
+
+        maintenance_service._transition_chunk = timed_chunk
+        result = maintenance_service.run_appointment_maintenance(db, now=now, chunk_size=args.chunk_size)
+        chunk_ms.sort()
+        print(f"backlog run: {result}")
+        print(f"{len(chunk_ms)} transactions: p50 {chunk_ms[len(chunk_ms) // 2]:.1f}ms  max {chunk_ms[-1]:.1f}ms")
+
+        # Steady state: the next tick only sees what became due in the meantime
+        result = maintenance_service.run_appointment_maintenance(db, now=now + timedelta(minutes=5))
+        print(f"next tick: {result}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Latency of the appointment route queries on one unpartitioned table vs the
+monthly-partitioned layout (with old months archived). Needs Postgres:
+
+    DATABASE_URL=postgresql+psycopg2://localhost/bench python bench/bench_partitions.py --rows 5000000
+
+Both layouts are built side by side in the bench_flat and bench_part schemas
+and the same compiled ORM queries run against each through search_path.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SMTP_PORT", "587")
+
+from sqlalchemy import create_engine, exists, func, select, text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from app.models.appointment import Appointment, ACTIVE_STATUSES  # noqa: E402
+from app.services.partition_service import add_months, partition_name  # noqa: E402
+
+USERS, DOCTORS = 200000, 500
+YEARS_BACK, MONTHS_AHEAD = 5, 3
+
+COLUMNS = """
+    id integer NOT NULL,
+    user_id integer NOT NULL,
+    doctor_id integer NOT NULL,
+    date date NOT NULL,
+    time time NOT NULL,
+    reason varchar,
+    status varchar NOT NULL,
+    paid boolean,
+    stripe_payment_id varchar
+"""
+INDEXES = [
+    "CREATE INDEX ON appointments (id)",
+    "CREATE INDEX ON appointments (user_id, doctor_id) WHERE status IN ('booked', 'confirmed')",
+    "CREATE INDEX ON appointments (date, time, doctor_id) WHERE status IN ('booked', 'confirmed')",
+    "CREATE INDEX ON appointments (user_id, date)",
+]
+
+
+def seed_sql(rows, first_month, months):
+    # Past appointments are finished; the upcoming ones are still active
+    return f"""
+        INSERT INTO appointments
+        SELECT g, 1 + (g * 7919) % {USERS}, 1 + g % {DOCTORS},
+               d, make_time((8 + g % 10)::int, ((g % 4) * 15)::int, 0), 'Checkup',
+               CASE WHEN d >= current_date THEN (ARRAY['booked', 'confirmed'])[1 + g % 2]
+                    ELSE (ARRAY['completed', 'completed', 'cancelled', 'expired'])[1 + g % 4] END,
+               g % 3 <> 0, NULL
+        FROM generate_series(1::bigint, {rows}) AS g,
+             LATERAL (SELECT DATE '{first_month.isoformat()}' + ((g * 104729) % ({months} * 30))::int AS d) AS day
+    """
+
+
+def build(conn, schema, rows, partitioned, archive_months):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {schema}"))
+    conn.execute(text(f"SET search_path TO {schema}"))
+    this_month = date.today().replace(day=1)
+    first_month = add_months(this_month, -12 * YEARS_BACK)
+    months = 12 * YEARS_BACK + MONTHS_AHEAD
+    if partitioned:
+        conn.execute(text(f"CREATE TABLE appointments ({COLUMNS}, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)"))
+        for offset in range(months + 1):
+            month = add_months(first_month, offset)
+            conn.execute(text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF appointments "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            ))
+        conn.execute(text("CREATE TABLE appointments_default PARTITION OF appointments DEFAULT"))
+    else:
+        conn.execute(text(f"CREATE TABLE appointments ({COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(text(seed_sql(rows, first_month, months)))
+    for statement in INDEXES:
+        conn.execute(text(statement))
+    if partitioned and archive_months:
+        cutoff = add_months(this_month, -archive_months)
+        month = first_month
+        while month < cutoff:
+            conn.execute(text(f"ALTER TABLE appointments DETACH PARTITION {partition_name(month)}"))
+            month = add_months(month, 1)
+    conn.execute(text("ANALYZE appointments"))
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def route_queries():
+    """The queries issued by routes/appointments.py and the scheduled jobs, as compiled by the ORM."""
+    user_id, doctor_id, appointment_id = 4242, 17, 123457
+    month_start = date.today().replace(day=1)
+    next_month = add_months(month_start, 1)
+    return {
+        "list my appointments": compiled(select(Appointment).where(Appointment.user_id == user_id)),
+        "duplicate booking check": compiled(select(exists().where(
+            Appointment.user_id == user_id, Appointment.doctor_id == doctor_id,
+            Appointment.status.in_([s.value for s in ACTIVE_STATUSES]),
+        ))),
+        "cancel: load by id": compiled(select(Appointment).where(Appointment.id == appointment_id).limit(1)),
+        "doctor's month": compiled(select(Appointment).where(
+            Appointment.doctor_id == doctor_id, Appointment.date >= month_start, Appointment.date < next_month,
+        )),
+        "this month's count": compiled(select(func.count()).select_from(Appointment).where(
+            Appointment.date >= month_start, Appointment.date < next_month,
+        )),
+        "all appointments (admin)": compiled(select(func.count()).select_from(Appointment)),
+    }
+
+
+def measure(conn, schema, sql, repeat):
+    conn.execute(text(f"SET search_path TO {schema}"))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(text(sql)).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--archive-months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="keep the bench schemas")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        sys.exit("bench_partitions needs a Postgres DATABASE_URL")
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        for schema, partitioned in (("bench_flat", False), ("bench_part", True)):
+            start = time.perf_counter()
+            build(conn, schema, args.rows, partitioned, args.archive_months)
+            print(f"built {schema}: {args.rows} rows in {time.perf_counter() - start:.0f}s")
+
+        print(f"{'query':28} {'flat ms':>9} {'partitioned ms':>15}")
+        for name, sql in route_queries().items():
+            flat = measure(conn, "bench_flat", sql, args.repeat)
+            part = measure(conn, "bench_part", sql, args.repeat)
+            print(f"{name:28} {flat:9.2f} {part:15.2f}")
+
+        if not args.keep:
+            conn.execute(text("DROP SCHEMA bench_flat CASCADE"))
+            conn.execute(text("DROP SCHEMA bench_part CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Pool-exhaustion load test: concurrent reads against the API while "stuck" agent
+tools hold database sessions, with a deliberately small pool.
+
+    python bench/bench_pool_exhaustion.py --pool-size 4 --clients 8 --requests 100
+
+Reports request latency and status codes, the pool checkout-wait histogram and
+what the held-connection detector logs for the stuck sessions.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("STORAGE_LOCAL_ROOT", os.path.join(workdir, "uploads"))
+os.makedirs(os.environ["STORAGE_LOCAL_ROOT"], exist_ok=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--pool-timeout", type=float, default=1.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="per client")
+    parser.add_argument("--stuck-seconds", type=float, default=4.0)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+os.environ["DB_MAX_OVERFLOW"] = "0"
+os.environ["DB_POOL_TIMEOUT"] = str(args.pool_timeout)
+os.environ["DB_HOLD_WARN_SECONDS"] = "1"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from app.database import Base, SessionLocal, engine, get_db, report_held_connections  # noqa: E402
+from app.models import Doctor  # noqa: E402
+from main import app  # noqa: E402
+
+WAIT = engine.pool.wait_histogram
+
+
+def stuck_tool(release: threading.Event):
+    """What a hung agent tool looks like: a session checked out and never returned."""
+    db = next(get_db())
+    db.execute(text("SELECT 1"))
+    release.wait()
+    db.close()
+
+
+def run_load(label, stuck):
+    release = threading.Event()
+    holders = [threading.Thread(target=stuck_tool, args=(release,)) for _ in range(stuck)]
+    for holder in holders:
+        holder.start()
+    time.sleep(0.2)
+    WAIT.reset()
+
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def client():
+        http = TestClient(app)
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            status = http.get("/doctors/1").status_code
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    if stuck:
+        time.sleep(max(0.0, 1.1 - wall))
+        report_held_connections()
+    release.set()
+    for holder in holders:
+        holder.join()
+
+    latencies.sort()
+    wait = WAIT.snapshot()
+    print(
+        f"{label:34} {len(latencies) / wall:7.0f} req/s  p50 {latencies[len(latencies) // 2]:7.1f}ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:7.1f}ms  statuses {dict(statuses)}  "
+        f"checkout wait p50 {wait['p50'] * 1000:.1f}ms p99 {wait['p99'] * 1000:.1f}ms max {wait['max'] * 1000:.0f}ms"
+    )
+
+
+def main():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Doctor(name="Lee", specialty="General", fee="100"))
+        db.commit()
+
+    print(f"pool_size={args.pool_size} max_overflow=0 pool_timeout={args.pool_timeout}s, "
+          f"{args.clients} clients x {args.requests} requests")
+    run_load("healthy pool", stuck=0)
+    run_load(f"{args.pool_size - 1} of {args.pool_size} connections stuck", stuck=args.pool_size - 1)
+    run_load("every connection stuck", stuck=args.pool_size)
+
+
+if __name__ == "__main__":
+    main()
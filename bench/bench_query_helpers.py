@@ -0,0 +1,83 @@
+"""
+Per-call cost of the full-row fetches that only tested existence or counted, next
+to their replacements in app/services/query_service.py, on a large seed. Each call
+uses a fresh session, as a request would.
+
+    python bench/bench_query_helpers.py --users 20000 --appointments 200000 --heavy 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import datagen  # noqa: E402  (also puts the repo on the path and defaults the environment)
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.models import Appointment, User  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services.query_service import column_value, count, exists  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            fn(db)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--appointments", type=int, default=200000)
+    parser.add_argument("--heavy", type=int, default=5000, help="extra appointments for one patient")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    datagen.prepare_schema()
+    dataset = datagen.generate(args.users, args.doctors, args.appointments)
+    heavy, typical = dataset.user_ids[0], dataset.user_ids[len(dataset.user_ids) // 2]
+    with SessionLocal() as db:
+        db.execute(insert(Appointment), [
+            {"user_id": heavy, "doctor_id": random.choice(dataset.doctor_ids), "status": "completed", "paid": True,
+             "date": date.today() - timedelta(days=random.randint(1, 3000)), "time": dtime(9, 0), "reason": "Checkup"}
+            for _ in range(args.heavy)
+        ])
+        db.commit()
+    email = datagen.ADMIN_EMAIL.replace("admin", "patient100")
+
+    cases = [
+        ("delete_user: appointments of a typical patient",
+         lambda db: len(db.query(Appointment).filter(Appointment.user_id == typical).all()),
+         lambda db: count(db, Appointment, Appointment.user_id == typical)),
+        (f"delete_user: appointments of a patient with {args.heavy}+",
+         lambda db: len(db.query(Appointment).filter(Appointment.user_id == heavy).all()),
+         lambda db: count(db, Appointment, Appointment.user_id == heavy)),
+        ("register/update_user: email taken",
+         lambda db: db.query(User).filter(User.email == email).first() is not None,
+         lambda db: exists(db, User.email == email)),
+        ("register/update_user: email free",
+         lambda db: db.query(User).filter(User.email == "new@example.com").first() is not None,
+         lambda db: exists(db, User.email == "new@example.com")),
+        ("agent tools: admin check",
+         lambda db: db.query(User).filter(User.id == dataset.admin_id).first().is_admin,
+         lambda db: column_value(db, User.is_adman, User.id == dataset.admin_id) == UserRole.ADMIN),
+    ]
+    print(f"{datagen.engine.dialect.name}, {args.users} users, {args.appointments + args.heavy} appointments, "
+          f"median of {args.repeat} calls")
+    for label, before, after in cases:
+        assert before(SessionLocal()) == after(SessionLocal()), label
+        old, new = timed(before, args.repeat), timed(after, args.repeat)
+        print(f"{label:<56} rows {old:9.1f}us   helper {new:8.1f}us   x{old / new:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Reminder scheduler tick cost with a large number of upcoming appointments.
+SMTP is replaced by a sender that only counts messages and connections.
+
+    python bench/bench_reminders.py --appointments 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Appointment, AppointmentReminder, Doctor, User  # noqa: E402
+from app.services.reminder_service import REMINDER_HOURS, reminder_kind, send_due_reminders  # noqa: E402
+
+
+class CountingSender:
+    def __init__(self):
+        self.messages = 0
+        self.connections = 0
+
+    def __call__(self, messages):
+        self.connections += 1  # send_emails opens one SMTP connection per batch
+        self.messages += len(messages)
+        return [True] * len(messages)
+
+
+def seed(db, n_appointments, now):
+    db.execute(insert(User), [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "is_adman": "user"}
+        for i in range(5000)
+    ])
+    db.execute(insert(Doctor), [{"name": f"doctor{i}", "specialty": "General", "fee": "100"} for i in range(50)])
+    appointments, reminders = [], []
+    for appointment_id in range(1, n_appointments + 1):
+        # Spread over the next 7 days on 15-minute slots
+        starts_at = (now + timedelta(minutes=15 * random.randint(1, 4 * 24 * 7))).replace(second=0, microsecond=0)
+        appointments.append({
+            "id": appointment_id, "user_id": random.randint(1, 5000), "doctor_id": random.randint(1, 50),
+            "date": starts_at.date(), "time": starts_at.time(), "reason": "Checkup",
+            "status": random.choice(["booked", "confirmed", "confirmed", "cancelled"]), "paid": False,
+        })
+        for hours in REMINDER_HOURS:
+            reminders.append({
+                "appointment_id": appointment_id, "kind": reminder_kind(hours),
+                "due_at": starts_at - timedelta(hours=hours), "attempts": 0,
+            })
+        if len(appointments) >= 10000:
+            db.execute(insert(Appointment), appointments)
+            db.execute(insert(AppointmentReminder), reminders)
+            appointments.clear()
+            reminders.clear()
+    if appointments:
+        db.execute(insert(Appointment), appointments)
+        db.execute(insert(AppointmentReminder), reminders)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--tick-minutes", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(42)
+    Base.metadata.create_all(engine)
+    now = datetime.now().replace(second=0, microsecond=0)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        seed(db, args.appointments, now)
+        print(f"Seeded {args.appointments} upcoming appointments in {time.perf_counter() - start:.1f}s")
+
+        # First tick after deploy: every reminder whose window is already open
+        sender = CountingSender()
+        start = time.perf_counter()
+        totals = send_due_reminders(db, now=now, batch_size=args.batch_size, sender=sender)
+        elapsed = time.perf_counter() - start
+        print(f"catch-up tick: {elapsed * 1000:.0f}ms, {totals}, "
+              f"{sender.connections} SMTP connections for {sender.messages} emails")
+
+        # Steady state: each tick only sees the reminders that became due since the last one
+        timings, sent = [], 0
+        for minute in range(1, 61):
+            sender = CountingSender()
+            start = time.perf_counter()
+            totals = send_due_reminders(
+                db, now=now + timedelta(minutes=minute * args.tick_minutes),
+                batch_size=args.batch_size, sender=sender,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            sent += totals["sent"]
+        timings.sort()
+        print(f"steady ticks: p50 {timings[len(timings) // 2]:.2f}ms  max {timings[-1]:.2f}ms  "
+              f"({sent} reminders over {len(timings)} ticks)")
+
+        # Nothing due: the cost of a tick that finds no work
+        start = time.perf_counter()
+        send_due_reminders(db, now=now + timedelta(minutes=60 * args.tick_minutes), sender=CountingSender())
+        print(f"idle tick: {(time.perf_counter() - start) * 1000:.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Serialize 10k DoctorOut / AppointmentOut records the way a response_model route
+does (pydantic dump to JSON-compatible data, then render) with the stdlib
+JSONResponse and with ORJSONResponse, plus an agent tool payload round trip.
+
+    python bench/bench_serialization.py --records 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, time as dtime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from app.schemas.appointment_schema import AppointmentOut  # noqa: E402
+from app.schemas.doctor_schema import DoctorOut  # noqa: E402
+from app.ai_agent.payloads import NavigationResponse  # noqa: E402
+
+
+def make_records(n):
+    doctors = [
+        DoctorOut(id=i, name=f"Doctor {i}", specialty="Cardiology", bio="Experienced clinician " * 5,
+                  image_url=f"/uploads/doctor_images/{i}.jpg", fee="150", fee_cents=15000)
+        for i in range(n)
+    ]
+    appointments = [
+        AppointmentOut(id=i, user_id=i % 500, doctor_id=i % 50, date=date(2026, 1, 1 + i % 28),
+                       time=dtime(9 + i % 8, 0), reason="Checkup", status="confirmed", paid=True,
+                       stripe_payment_id=f"cs_test_{i}")
+        for i in range(n)
+    ]
+    return doctors, appointments
+
+
+def bench(label, fn, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    print(f"{label:<44} p50 {samples[len(samples) // 2]:8.2f}ms   {size / 1024:8.1f} KiB")
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    doctors, appointments = make_records(args.records)
+    for name, model, records in (("DoctorOut", DoctorOut, doctors), ("AppointmentOut", AppointmentOut, appointments)):
+        adapter = TypeAdapter(list[model])
+        encoded = adapter.dump_python(records, mode="json")
+        stdlib = bench(f"{name} stdlib (JSONResponse)", lambda: JSONResponse(adapter.dump_python(records, mode="json")).body, args.repeat)
+        fast = bench(f"{name} orjson (ORJSONResponse)", lambda: ORJSONResponse(adapter.dump_python(records, mode="json")).body, args.repeat)
+        render_std = bench(f"{name} render only, stdlib", lambda: JSONResponse(encoded).body, args.repeat)
+        render_fast = bench(f"{name} render only, orjson", lambda: ORJSONResponse(encoded).body, args.repeat)
+        print(f"  end-to-end speedup {stdlib / fast:.2f}x, render speedup {render_std / render_fast:.2f}x\n")
+
+    data = {"doctors": [{"id": d.id, "name": d.name, "specialty": d.specialty, "fee": d.fee, "fee_cents": d.fee_cents}
+                        for d in doctors[:500]]}
+
+    def old_tool_path():
+        # tool json.dumps, chatbot route json.loads to sniff the type, response json.dumps again
+        payload = json.dumps({"type": "navigation_response", "success": True, "message": "Doctors",
+                              "data": data, "navigation": {"action": "navigate", "path": "/doctors", "delay_ms": 300}})
+        json.loads(payload)
+        return json.dumps({"reply": payload})
+
+    def new_tool_path():
+        payload = NavigationResponse("Doctors", path="/doctors", delay_ms=300, data=data).to_json()
+        return ORJSONResponse({"reply": payload}).body
+
+    old = bench("show_doctors payload, dumps+loads+dumps", old_tool_path, args.repeat * 10)
+    new = bench("show_doctors payload, serialized once", new_tool_path, args.repeat * 10)
+    print(f"  speedup {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
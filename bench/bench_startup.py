@@ -0,0 +1,67 @@
+"""
+Cold-start import cost of the app, from `python -X importtime`.
+Each run is a fresh interpreter with only the settings the app needs; the eager
+variant also builds the chatbot agent, which is what importing main used to do.
+
+    python bench/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+LAZY = "import main"
+EAGER = "import main; from app.ai_agent.agent import get_assistant_agent; get_assistant_agent()"
+
+
+def run_once(code):
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "HOME": os.environ.get("HOME", ""),
+        "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench.db",
+        "SECRET_KEY": "bench",
+        "OPENAI_API_KEY": "sk-bench",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            # self time in microseconds, summed per top-level package
+            top = match.group(3).split(".")[0]
+            modules[top] = modules.get(top, 0) + int(match.group(1))
+    return modules
+
+
+def report(label, code, runs):
+    samples = [run_once(code) for _ in range(runs)]
+    totals = [sum(s.values()) / 1000 for s in samples]
+    print(f"{label}: median {statistics.median(totals):.0f}ms  min {min(totals):.0f}ms  ({runs} runs)")
+    last = samples[-1]
+    for name, micros in sorted(last.items(), key=lambda item: -item[1])[:8]:
+        print(f"    {micros / 1000:7.1f}ms  {name}")
+    print(f"    agents loaded: {'agents' in last}, openai loaded: {'openai' in last}")
+    return statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy = report("import main (lazy agent)", LAZY, args.runs)
+    eager = report("import main + build agent", EAGER, args.runs)
+    print(f"deferred to first chatbot use: {eager - lazy:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Disk saved by content-addressed uploads and the cost of an upload GC pass,
+compared with the uuid-per-upload layout and a full-tree orphan scan.
+
+    python bench/bench_upload_storage.py --uploads 20000 --distinct 4000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+os.environ.setdefault("SMTP_PORT", "587")
+os.chdir(workdir)
+
+from sqlalchemy import update  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import UploadBlob  # noqa: E402
+from app.services.upload_service import collect_garbage, release_upload, retain_upload, store_upload  # noqa: E402
+from app.storage import get_storage  # noqa: E402
+
+UPLOAD_ROOT = get_storage().root
+
+
+def tree_size(root):
+    total = files = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            total += os.path.getsize(os.path.join(dirpath, name))
+            files += 1
+    return total, files
+
+
+def full_tree_scan(db):
+    """What a GC without reference tracking has to do: walk every file and look it up."""
+    referenced = {path for (path,) in db.query(UploadBlob.path).filter(UploadBlob.ref_count > 0)}
+    orphans = 0
+    for dirpath, _, filenames in os.walk(UPLOAD_ROOT):
+        for name in filenames:
+            relative = os.path.relpath(os.path.join(dirpath, name), UPLOAD_ROOT)
+            if relative not in referenced:
+                orphans += 1
+    return orphans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=4000)
+    parser.add_argument("--size", type=int, default=16 * 1024, help="Bytes per image")
+    parser.add_argument("--release", type=float, default=0.7, help="Fraction of references dropped before GC")
+    args = parser.parse_args()
+
+    random.seed(42)
+    Base.metadata.create_all(engine)
+    contents = [random.randbytes(args.size) for _ in range(args.distinct)]
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        urls = []
+        for _ in range(args.uploads):
+            url = store_upload(db, io.BytesIO(random.choice(contents)), "doctor_images", ".jpg")
+            retain_upload(db, url)
+            db.commit()
+            urls.append(url)
+        elapsed = time.perf_counter() - start
+
+        stored, files = tree_size(UPLOAD_ROOT)
+        legacy = args.uploads * args.size
+        print(f"Stored {args.uploads} uploads in {elapsed:.1f}s ({args.uploads / elapsed:.0f}/s)")
+        print(f"uuid layout:      {legacy / 1e6:.1f} MB in {args.uploads} files")
+        print(f"content-addressed: {stored / 1e6:.1f} MB in {files} files "
+              f"({(1 - stored / legacy) * 100:.0f}% saved)")
+
+        for url in random.sample(urls, int(len(urls) * args.release)):
+            release_upload(db, url)
+        db.commit()
+        # Age everything past the grace period
+        db.execute(update(UploadBlob).where(UploadBlob.ref_count == 0).values(unreferenced_since=UploadBlob.created_at))
+        db.commit()
+
+        start = time.perf_counter()
+        orphans = full_tree_scan(db)
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"full-tree scan:   {scan_ms:.0f}ms to find {orphans} orphans")
+
+        passes = deleted = freed = 0
+        timings = []
+        while True:
+            start = time.perf_counter()
+            result = collect_garbage(db, grace_seconds=0)
+            timings.append((time.perf_counter() - start) * 1000)
+            passes += 1
+            deleted += result["deleted"]
+            freed += result["bytes_freed"]
+            if not result["deleted"]:
+                break
+        print(f"incremental GC:   {passes} passes, {deleted} blobs, {freed / 1e6:.1f} MB freed, "
+              f"{sum(timings):.0f}ms total, {max(timings):.1f}ms worst pass, {timings[-1]:.2f}ms idle pass")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
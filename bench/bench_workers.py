@@ -0,0 +1,134 @@
+"""
+Throughput of the main read endpoints with 1..N gunicorn workers (gunicorn.conf.py),
+all sharing one Redis-protocol state server (fakeredis stand-in unless --redis-url).
+
+    python bench/bench_workers.py --max-workers 4 --seconds 10 --concurrency 32
+
+The load generator runs on the same machine, so the numbers only scale while there
+are spare cores for both.
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKDIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{WORKDIR}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("STORAGE_LOCAL_ROOT", f"{WORKDIR}/uploads")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Doctor, User  # noqa: E402
+from app.utils.jwt_handler import create_access_token  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(n_doctors):
+    os.makedirs(os.environ["STORAGE_LOCAL_ROOT"], exist_ok=True)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.execute(insert(Doctor), [{"name": f"doctor{i}", "specialty": "General", "fee": "100"} for i in range(n_doctors)])
+        db.execute(insert(User), [{"name": "bench", "email": "bench@example.com", "hashed_password": "x", "is_adman": "user"}])
+        db.commit()
+
+
+def start_redis_stand_in():
+    import fakeredis
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return f"redis://{host}:{port}/0"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, redis_url):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}",
+               SHARED_STATE_BACKEND="redis", REDIS_URL=redis_url)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    ready = 0
+    while time.monotonic() < deadline and ready < workers * 3:
+        # Several ready answers in a row, so most workers have finished warming up
+        try:
+            ready = ready + 1 if httpx.get(f"{base}/health/ready").status_code == 200 else 0
+        except httpx.HTTPError:
+            ready = 0
+        time.sleep(0.05)
+    return proc, base
+
+
+def load(base, seconds, concurrency, n_doctors):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    paths = [("/doctors/", {}), ("/users/me", headers)] + [("/doctors/{}", {})] * 2
+    stop_at = time.monotonic() + seconds
+    latencies, errors = [], [0]
+
+    def client_loop():
+        local = []
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while time.monotonic() < stop_at:
+                path, hdrs = random.choice(paths)
+                start = time.perf_counter()
+                response = client.get(path.format(random.randint(1, n_doctors)), headers=hdrs)
+                local.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors[0] += 1
+        latencies.extend(local)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client_loop)
+    latencies.sort()
+    return len(latencies) / seconds, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    seed(args.doctors)
+    redis_url = args.redis_url or start_redis_stand_in()
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} concurrent clients, {args.seconds:.0f}s per run")
+    baseline = None
+    workers = 1
+    while workers <= args.max_workers:
+        proc, base = start_server(workers, redis_url)
+        try:
+            rps, p50, p99, errors = load(base, args.seconds, args.concurrency, args.doctors)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=60)
+        baseline = baseline or rps
+        print(f"workers={workers}: {rps:7.0f} req/s  p50 {p50:6.1f}ms  p99 {p99:6.1f}ms  "
+              f"x{rps / baseline:.2f}  errors={errors}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
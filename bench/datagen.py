@@ -0,0 +1,154 @@
+"""
+Synthetic data for the load tests: one admin, N patients, M doctors and K
+appointments spread over the last months and the next few weeks, bulk-inserted
+(COPY on Postgres, executemany elsewhere), then the stats rollups rebuilt.
+
+    python bench/datagen.py --users 20000 --doctors 500 --appointments 500000
+    DATABASE_URL=postgresql+psycopg2://localhost/bench python bench/datagen.py --reset
+
+Refuses to seed a database that already has users unless --reset is given
+(which drops and recreates every table).
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, time as dtime, timedelta
+from typing import Dict, List, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.models import Appointment, Doctor, User  # noqa: E402
+from app.services.doctor_service import bulk_insert_doctors, refresh_doctor_catalog  # noqa: E402
+from app.services.partition_service import ensure_future_partitions  # noqa: E402
+from app.services.stats_service import reconcile_stats  # noqa: E402
+
+SPECIALTIES = ["Cardiology", "Dermatology", "Neurology", "Pediatrics", "Orthopedics",
+               "Psychiatry", "General Practice", "Ophthalmology", "Oncology", "ENT"]
+REASONS = ["Checkup", "Follow-up", "Chest pain", "Rash", "Headache", "Back pain", None]
+ADMIN_EMAIL = "admin@bench.example.com"
+BATCH_SIZE = 10000
+
+
+@dataclass
+class Dataset:
+    admin_id: int
+    user_ids: List[int]
+    doctor_ids: List[int]
+    specialties: List[str]
+
+
+def _bulk_insert(db, model, columns: Sequence[str], rows: List[Dict]) -> None:
+    """Insert rows with COPY on Postgres and executemany everywhere else."""
+    if db.bind.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(model), rows)
+
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prepare_schema(reset: bool = False) -> None:
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def generate(n_users: int, n_doctors: int, n_appointments: int, seed: int = 42) -> Dataset:
+    rng = random.Random(seed)
+    with SessionLocal() as db:
+        if db.query(User.id).first() is not None:
+            raise SystemExit("The database already has users; use --reset to start from an empty schema.")
+        # A real password hash is not needed: the scenarios sign their own tokens
+        users = [{"name": "Bench Admin", "email": ADMIN_EMAIL, "hashed_password": "x", "is_adman": "admin"}]
+        users += [{"name": f"Patient {i}", "email": f"patient{i}@bench.example.com", "hashed_password": "x",
+                   "is_adman": "user"} for i in range(n_users)]
+        for batch in _batched(users):
+            _bulk_insert(db, User, ("name", "email", "hashed_password", "is_adman"), batch)
+
+        doctors = []
+        for i in range(n_doctors):
+            fee_cents = rng.randrange(50, 300) * 100
+            doctors.append({"name": f"Doctor {i}", "specialty": SPECIALTIES[i % len(SPECIALTIES)],
+                            "bio": None, "image_url": None, "fee": f"${fee_cents // 100}", "fee_cents": fee_cents})
+        for batch in _batched(doctors):
+            bulk_insert_doctors(db, batch)
+        db.commit()
+
+        admin_id = db.query(User.id).filter(User.email == ADMIN_EMAIL).scalar()
+        user_ids = [row.id for row in db.query(User.id).filter(User.id != admin_id).order_by(User.id)]
+        doctor_ids = [row.id for row in db.query(Doctor.id).order_by(Doctor.id)]
+
+        ensure_future_partitions(db)
+        today = date.today()
+
+        def appointments():
+            for _ in range(n_appointments):
+                day = today + timedelta(days=rng.randint(-180, 45))
+                if day >= today:
+                    status = rng.choice(("booked", "confirmed", "confirmed", "cancelled"))
+                else:
+                    status = rng.choice(("completed", "completed", "cancelled", "expired"))
+                yield {"user_id": rng.choice(user_ids), "doctor_id": rng.choice(doctor_ids), "date": day,
+                       "time": dtime(rng.randint(8, 17), rng.choice((0, 15, 30, 45))),
+                       "reason": rng.choice(REASONS), "status": status, "paid": status in ("confirmed", "completed"),
+                       "stripe_payment_id": None}
+
+        columns = ("user_id", "doctor_id", "date", "time", "reason", "status", "paid", "stripe_payment_id")
+        for batch in _batched(appointments()):
+            _bulk_insert(db, Appointment, columns, batch)
+        db.commit()
+
+        reconcile_stats(db)
+        refresh_doctor_catalog(db)
+        return Dataset(admin_id, user_ids, doctor_ids, list(SPECIALTIES))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    prepare_schema(args.reset)
+    start = time.perf_counter()
+    dataset = generate(args.users, args.doctors, args.appointments, args.seed)
+    elapsed = time.perf_counter() - start
+    rows = 1 + len(dataset.user_ids) + len(dataset.doctor_ids) + args.appointments
+    print(f"{engine.dialect.name}: {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+In-process load test: seeds a synthetic dataset (bench/datagen.py), starts the app
+with its lifespan, and runs a mix of scripted journeys (bench/scenarios.py) from
+concurrent clients. Stripe checkout and the assistant's model are in-process
+stand-ins; everything else (middleware, routes, tools, database) is the real code.
+Reports throughput and latency percentiles per endpoint and compares them with a
+recorded baseline.
+
+    python bench/run_load.py                       # compare with bench/baseline.json
+    python bench/run_load.py --write-baseline      # record a new baseline
+    python bench/run_load.py --scenarios browse,chatbot --seconds 30 --concurrency 16
+    DATABASE_URL=postgresql+psycopg2://localhost/bench python bench/run_load.py --reset
+
+Exits with status 1 when an endpoint's p95 or the overall throughput is worse than
+the baseline by more than --tolerance, or when any request failed. Baselines are
+only comparable on the same machine, database and settings; the recorded config
+is printed next to the comparison.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKDIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{WORKDIR}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("STORAGE_LOCAL_ROOT", f"{WORKDIR}/uploads")
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench-not-used")
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_bench")
+# The virtual users book and chat far faster than people do; the limiter still runs on every call
+for _env in ("RATE_LIMIT_BOOKING", "RATE_LIMIT_CHATBOT"):
+    os.environ.setdefault(_env, "1000000/1/1000000")
+
+import datagen  # noqa: E402
+import scenarios  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def percentile(sorted_samples, q):
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for name in sorted(recorder.samples):
+        samples = sorted(recorder.samples[name])
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        }
+    total = sum(e["count"] for e in endpoints.values())
+    return {"endpoints": endpoints, "total": {"count": total, "rps": round(total / elapsed, 1),
+                                              "errors": sum(e["errors"] for e in endpoints.values())}}
+
+
+def run(client, dataset, names, seconds, concurrency, seed):
+    stop_at = time.monotonic() + seconds
+    recorders = []
+    lock = threading.Lock()
+
+    def client_loop(index):
+        rng = random.Random(seed + index)
+        recorder = scenarios.Recorder(client)
+        while time.monotonic() < stop_at:
+            scenarios.pick(names, rng)(recorder, dataset, rng)
+        with lock:
+            recorders.append(recorder)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client_loop, i) for i in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    merged = scenarios.Recorder(client)
+    for recorder in recorders:
+        merged.merge(recorder)
+    return summarize(merged, elapsed)
+
+
+def print_report(result, baseline, tolerance, min_delta_ms, min_samples):
+    """Print the per-endpoint table; return the list of regressions against the baseline."""
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    regressions = []
+    width = max(len(name) for name in result["endpoints"])
+    print(f"{'endpoint':<{width}}  {'count':>6} {'err':>4} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8}  vs baseline p95")
+    for name, stats in result["endpoints"].items():
+        line = (f"{name:<{width}}  {stats['count']:>6} {stats['errors']:>4} {stats['rps']:>7.1f} "
+                f"{stats['p50_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms")
+        base = base_endpoints.get(name)
+        if base:
+            change = stats["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+            slower = change > tolerance and stats["p95_ms"] - base["p95_ms"] > min_delta_ms
+            line += f"  {base['p95_ms']:>6.1f}ms {change:+7.1%}"
+            if min(stats["count"], base["count"]) < min_samples:
+                # A p95 over a few dozen requests moves too much between identical runs to judge
+                slower = False
+                line += "  (few samples)"
+            elif slower:
+                line += "  REGRESSION"
+            if slower:
+                regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {stats['p95_ms']}ms")
+        elif baseline:
+            line += "  (new)"
+        if stats["errors"]:
+            regressions.append(f"{name}: {stats['errors']} failed requests")
+        print(line)
+
+    total = result["total"]
+    line = f"total: {total['count']} requests, {total['rps']:.1f} req/s, {total['errors']} errors"
+    if baseline:
+        base_rps = baseline["total"]["rps"]
+        change = total["rps"] / base_rps - 1
+        line += f" (baseline {base_rps:.1f} req/s, {change:+.1%})"
+        if change < -tolerance:
+            regressions.append(f"throughput {base_rps} -> {total['rps']} req/s")
+        missing = sorted(set(base_endpoints) - set(result["endpoints"]))
+        if missing:
+            line += f"\nnot exercised this run: {', '.join(missing)}"
+    print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables before seeding")
+    parser.add_argument("--scenarios", default=",".join(scenarios.SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-latency-ms", type=float, default=0, help="simulated LLM time per model call")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed p95/throughput change, 0.3 = 30%%")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--min-samples", type=int, default=100, help="only judge endpoints with this many requests")
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's own log output")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(scenarios.SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.makedirs(os.environ["STORAGE_LOCAL_ROOT"], exist_ok=True)
+    datagen.prepare_schema(args.reset)
+    dataset = datagen.generate(args.users, args.doctors, args.appointments, args.seed)
+
+    from main import app
+    app_output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with app_output, TestClient(app) as client:
+        while client.get("/health/ready").status_code != 200:
+            time.sleep(0.01)
+        scenarios.install_fakes(args.model_latency_ms / 1000)
+        # A short warm-up so first-call costs do not land in the percentiles
+        run(client, dataset, names, min(2.0, args.seconds / 5), args.concurrency, args.seed + 1000)
+        result = run(client, dataset, names, args.seconds, args.concurrency, args.seed)
+
+    config = {
+        "database": datagen.engine.dialect.name, "users": args.users, "doctors": args.doctors,
+        "appointments": args.appointments, "scenarios": names, "seconds": args.seconds,
+        "concurrency": args.concurrency, "model_latency_ms": args.model_latency_ms,
+        "python": platform.python_version(), "cpus": os.cpu_count(),
+    }
+    baseline = None
+    if not args.write_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            differing = sorted(k for k in config if baseline.get("config", {}).get(k) != config[k])
+            print(f"note: baseline was recorded with different {', '.join(differing)}")
+
+    print(f"{config['database']}, {args.concurrency} clients, {args.seconds:.0f}s, scenarios: {', '.join(names)}")
+    regressions = print_report(result, baseline, args.tolerance, args.min_delta_ms, args.min_samples)
+
+    if args.write_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, **result}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+    elif regressions:
+        print("\nregressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
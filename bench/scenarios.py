@@ -0,0 +1,213 @@
+"""
+Scripted user journeys for bench/run_load.py, plus the in-process stand-ins they
+need: Stripe checkout (sessions are remembered so the signed webhook can complete
+them) and an agents Model that calls the app's real tools without OpenAI.
+"""
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from app.utils.jwt_handler import create_access_token
+
+CHAT_MESSAGES = [
+    ("Show me the {specialty} doctors", "show_doctors"),
+    ("What appointments do I have?", "show_appointments"),
+    ("Open my profile", "show_profile"),
+]
+
+
+class Recorder:
+    """Latency samples and failures per endpoint, keyed by method and path template."""
+
+    def __init__(self, client):
+        self.client = client
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def call(self, method: str, template: str, expect=(200,), path_args: Optional[dict] = None, **kwargs):
+        name = f"{method} {template}"
+        url = template.format(**path_args) if path_args else template
+        start = time.perf_counter()
+        response = self.client.request(method, url, **kwargs)
+        self.samples[name].append(time.perf_counter() - start)
+        if response.status_code not in expect:
+            self.errors[name] += 1
+        return response
+
+    def fail(self, method: str, template: str) -> None:
+        self.errors[f"{method} {template}"] += 1
+
+    def merge(self, other: "Recorder") -> None:
+        for name, samples in other.samples.items():
+            self.samples[name].extend(samples)
+        for name, count in other.errors.items():
+            self.errors[name] += count
+
+
+_tokens: Dict[int, str] = {}
+
+
+def auth(user_id: int, admin: bool = False) -> dict:
+    token = _tokens.get(user_id)
+    if token is None:
+        token = _tokens[user_id] = create_access_token({"sub": str(user_id), "is_adman": "admin" if admin else "user"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==================== STRIPE ====================
+
+_checkout_sessions: Dict[str, dict] = {}
+_session_ids = itertools.count(1)
+
+
+def fake_checkout_create(**params):
+    session_id = f"cs_bench_{next(_session_ids)}"
+    _checkout_sessions[session_id] = params.get("metadata", {})
+    return SimpleNamespace(id=session_id, url=f"https://checkout.stripe.test/{session_id}")
+
+
+def signed_webhook(event: dict, secret: str):
+    """Body and Stripe-Signature header the way Stripe signs webhook deliveries."""
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    if not secret:
+        return payload, {}
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return payload, {"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+
+# ==================== AGENT ====================
+
+def build_scripted_model(latency_s: float = 0.0):
+    """
+    A Model that answers each user message by calling the tool named in CHAT_MESSAGES and
+    then replying with the tool output, as the real assistant does for these requests.
+    `latency_s` is slept per model call to stand in for the LLM round trip.
+    """
+    from agents import Model, ModelResponse, Usage
+    from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+    tools_by_phrase = {message.split("{")[0].strip().lower(): tool for message, tool in CHAT_MESSAGES}
+
+    class ScriptedModel(Model):
+        async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                               handoffs, tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+            if latency_s:
+                await asyncio.sleep(latency_s)
+            items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+            last_user = max(i for i, item in enumerate(items) if item.get("role") == "user")
+            text = str(items[last_user]["content"])
+            outputs = [item for item in items[last_user:] if item.get("type") == "function_call_output"]
+            call_id = f"call_{uuid.uuid4().hex[:12]}"
+            if outputs:
+                output = ResponseOutputMessage(
+                    id=f"msg_{call_id}", role="assistant", status="completed", type="message",
+                    content=[ResponseOutputText(annotations=[], text=str(outputs[-1]["output"]), type="output_text")],
+                )
+            else:
+                tool = next((t for phrase, t in tools_by_phrase.items() if text.lower().startswith(phrase)), "show_profile")
+                arguments = {}
+                if tool == "show_doctors":
+                    arguments["specialty"] = text.split("the ", 1)[1].rsplit(" doctors", 1)[0]
+                output = ResponseFunctionToolCall(
+                    id=f"fc_{call_id}", call_id=call_id, name=tool, arguments=json.dumps(arguments),
+                    type="function_call", status="completed",
+                )
+            usage = Usage(requests=1, input_tokens=len(json.dumps(items, default=str)) // 4, output_tokens=20)
+            usage.total_tokens = usage.input_tokens + usage.output_tokens
+            return ModelResponse(output=[output], usage=usage, response_id=None)
+
+        def stream_response(self, *args, **kwargs):
+            raise NotImplementedError("The load test does not stream")
+
+    return ScriptedModel()
+
+
+def install_fakes(model_latency_s: float = 0.0) -> None:
+    """Route Stripe checkout and the assistant's model calls to the in-process stand-ins."""
+    import stripe
+    from agents import set_tracing_disabled
+    from app.ai_agent.agent import get_assistant_agent
+
+    stripe.checkout.Session.create = fake_checkout_create
+    set_tracing_disabled(True)
+    get_assistant_agent().model = build_scripted_model(model_latency_s)
+
+
+# ==================== SCENARIOS ====================
+
+def patient_browse(rec: Recorder, dataset, rng) -> None:
+    headers = auth(rng.choice(dataset.user_ids))
+    rec.call("GET", "/doctors/")
+    for _ in range(2):
+        rec.call("GET", "/doctors/{doctor_id}", path_args={"doctor_id": rng.choice(dataset.doctor_ids)})
+    rec.call("GET", "/doctors/?sort=fee_asc&max_fee_cents={max_fee_cents}",
+             path_args={"max_fee_cents": rng.randrange(100, 300) * 100})
+    rec.call("GET", "/users/me", headers=headers)
+    rec.call("GET", "/appointments/", headers=headers)
+
+
+def booking_with_webhook(rec: Recorder, dataset, rng) -> None:
+    from config import STRIPE_WEBHOOK_SECRET
+
+    user_id = rng.choice(dataset.user_ids)
+    headers = auth(user_id)
+    booking = {
+        "doctor_id": rng.choice(dataset.doctor_ids),
+        "date": (date.today() + timedelta(days=rng.randint(1, 30))).isoformat(),
+        "time": f"{rng.randint(8, 17):02d}:{rng.choice((0, 30)):02d}:00",
+        "reason": "Checkup",
+    }
+    # 400 when the patient already has an active appointment with this doctor, or the slot is taken
+    response = rec.call("POST", "/appointments/", expect=(200, 400), json=booking,
+                        headers={**headers, "Idempotency-Key": uuid.uuid4().hex})
+    if response.status_code != 200:
+        return
+    session_id = response.json()["checkout_url"].rsplit("/", 1)[1]
+    event = {
+        "id": f"evt_{session_id}", "object": "event", "type": "checkout.session.completed",
+        "data": {"object": {"id": session_id, "object": "checkout.session",
+                            "metadata": _checkout_sessions.pop(session_id)}},
+    }
+    payload, webhook_headers = signed_webhook(event, STRIPE_WEBHOOK_SECRET)
+    rec.call("POST", "/payments/webhook", content=payload, headers=webhook_headers)
+    rec.call("GET", "/appointments/", headers=headers)
+
+
+def admin_dashboard(rec: Recorder, dataset, rng) -> None:
+    headers = auth(dataset.admin_id, admin=True)
+    rec.call("GET", "/admin/stats", headers=headers)
+    rec.call("GET", "/users/", headers=headers)
+    rec.call("GET", "/appointments/all", headers=headers)
+
+
+def chatbot(rec: Recorder, dataset, rng) -> None:
+    headers = auth(rng.choice(dataset.user_ids))
+    message = rng.choice(CHAT_MESSAGES)[0].format(specialty=rng.choice(dataset.specialties))
+    response = rec.call("POST", "/chatbot/", json={"message": message}, headers=headers)
+    # The route turns agent failures into a 200 with an apology
+    reply = response.json().get("reply", "") if response.status_code == 200 else ""
+    if reply.startswith(("Agent error", "I'm experiencing")):
+        rec.fail("POST", "/chatbot/")
+
+
+# name -> (journey, share of the mix)
+SCENARIOS: Dict[str, tuple] = {
+    "browse": (patient_browse, 0.55),
+    "booking": (booking_with_webhook, 0.2),
+    "chatbot": (chatbot, 0.15),
+    "admin": (admin_dashboard, 0.1),
+}
+
+
+def pick(names: List[str], rng) -> Callable:
+    weights = [SCENARIOS[name][1] for name in names]
+    return SCENARIOS[rng.choices(names, weights)[0]][0]
@@ -1,35 +1,380 @@
 # backend/config.py
+"""
+Application settings, read from the environment (and .env) once at import.
+`settings` is the typed object; the module-level names below are kept for existing imports.
+"""
 import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
-# Load .env file if present
+# Load .env file if present. This is the only place it is loaded.
 load_dotenv()
 
+
+def _str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def _int(name: str, default: int) -> int:
+    value = _str(name)
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer, got {value!r}")
+
+
+def _float(name: str, default: float) -> float:
+    value = _str(name)
+    try:
+        return float(value) if value is not None else default
+    except ValueError:
+        raise RuntimeError(f"{name} must be a number, got {value!r}")
+
+
+def _bool(name: str, default: bool) -> bool:
+    value = _str(name)
+    return value.lower() in ("1", "true", "yes") if value is not None else default
+
+
+def _list(name: str) -> List[str]:
+    return [item.strip() for item in (_str(name) or "").split(",") if item.strip()]
+
+
+def _int_tuple(name: str, default: Tuple[int, ...]) -> Tuple[int, ...]:
+    value = _str(name)
+    try:
+        return tuple(int(item) for item in value.split(",") if item.strip()) if value is not None else default
+    except ValueError:
+        raise RuntimeError(f"{name} must be comma-separated integers, got {value!r}")
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Database
+    database_url: Optional[str] = None
+    # Read replicas (comma-separated URLs); read-only endpoints and agent tools use them when set
+    database_replica_urls: List[str] = field(default_factory=list)
+    replica_sticky_seconds: float = 5  # a user's reads stay on the primary this long after they write
+    replica_max_lag_seconds: float = 10
+    replica_health_seconds: int = 10
+    # Connection pool, per engine (primary and each replica)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 10  # seconds to wait for a free connection before failing
+    db_pool_recycle: int = 3600
+    db_pool_warm_connections: int = 5  # opened at startup so the first requests do not pay for connecting
+    # Statement timeouts (Postgres): default for request sessions, tighter for public read-only routes
+    statement_timeout_ms: int = 15000
+    read_statement_timeout_ms: int = 3000
+    # Connections held longer than this are logged with the code that checked them out
+    db_hold_warn_seconds: float = 30
+    # Bulk doctor imports run large COPY/executemany batches
+    import_statement_timeout_ms: int = 120000
+
+    # State shared by all workers and nodes (chat sessions, cache versions, rate limits):
+    # "memory" keeps it in-process (one worker), "redis" uses any Redis-protocol server
+    shared_state_backend: str = "memory"
+    redis_url: Optional[str] = None
+    shared_state_prefix: str = "docassist:"
+    shared_state_max_keys: int = 100000  # memory backend only; Redis bounds itself with maxmemory
+
+    # JWT
+    jwt_secret: Optional[str] = None
+    jwt_algorithm: str = "HS256"
+    jwt_expire_minutes: int = 30
+
+    # Email
+    smtp_server: Optional[str] = None
+    smtp_port: int = 587
+    smtp_user: Optional[str] = None
+    smtp_password: Optional[str] = None
+
+    # SMS (Optional - for production use)
+    sms_api_key: Optional[str] = None
+    sms_api_url: Optional[str] = None
+    sms_sender_id: Optional[str] = None
+
+    # Stripe
+    stripe_api_key: Optional[str] = None
+    stripe_webhook_secret: str = ""
+
+    # OpenAI, only needed once the chatbot is used
+    openai_api_key: Optional[str] = None
+
+    # Frontend, for Stripe redirect and password reset links
+    frontend_url: str = "https://docassist-web.vercel.app"
+    reset_link_base_url: str = "https://docassist-web.vercel.app"
+
+    # Upload storage: "local" serves files from storage_local_root, "s3" uses any S3-compatible service
+    storage_backend: str = "local"
+    storage_local_root: str = "uploads"
+    storage_public_url: Optional[str] = None  # base URL for stored files, e.g. a CDN in front of the bucket
+    storage_presign_expire_seconds: int = 900
+    s3_bucket: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None  # e.g. http://minio:9000; unset for AWS
+    s3_region: str = "us-east-1"
+    s3_access_key_id: Optional[str] = None
+    s3_secret_access_key: Optional[str] = None
+
+    # Password Reset
+    reset_token_expire_minutes: int = 30
+
+    # HTTP
+    compression_min_size: int = 1024  # smaller responses are sent uncompressed
+    query_count_warn: int = 25  # requests running more statements are logged with their repeated shapes
+    query_stats_headers: bool = False  # X-Query-Count and Server-Timing response headers (development / staging)
+    # Rate limits as "limit/period_seconds/burst"
+    rate_limit_login: str = "10/60/5"
+    rate_limit_register: str = "5/300/3"
+    rate_limit_password_forgot: str = "5/900/3"
+    rate_limit_chatbot: str = "20/60/5"
+    rate_limit_booking: str = "10/60/5"
+    # Idempotency-Key replays
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_lock_seconds: int = 60  # how long a request may hold its key before another attempt may run
+    idempotency_max_response_bytes: int = 256 * 1024  # larger responses are not stored; a retry runs again
+    idempotency_spool_bytes: int = 1024 * 1024  # request bodies past this are spooled to disk while fingerprinted
+
+    # Appointments
+    clinic_hours: str = "00:00-24:00"  # "HH:MM-HH:MM"; an appointment must start before closing
+    clinic_days: str = "mon,tue,wed,thu,fri,sat,sun"
+    slot_minutes: int = 30  # spacing of the start times offered to patients
+    complete_after_minutes: int = 60  # after the start time, a confirmed appointment is over
+    booking_hold_minutes: int = 30  # an unpaid booking holds its slot this long while at checkout
+    maintenance_chunk_size: int = 500
+    reminder_hours: Tuple[int, ...] = (24, 1)  # reminder windows in hours before the appointment
+    reminder_batch_size: int = 200
+    partition_months_ahead: int = 3
+    appointment_archive_months: int = 0  # 0 keeps every month attached
+
+    # Uploads
+    upload_gc_grace_seconds: int = 3600  # unreferenced uploads are kept this long before GC deletes them
+    image_workers: int = 2  # processes making image derivatives
+
+    # Background jobs, seconds between runs
+    stats_reconcile_seconds: int = 900
+    appointment_maintenance_seconds: int = 300
+    reminder_tick_seconds: int = 60
+    partition_job_seconds: int = 86400
+    upload_gc_seconds: int = 600
+
+    # Startup and shutdown
+    shutdown_drain_seconds: float = 20
+    warmup_retry_seconds: float = 5  # between attempts while the primary database is unreachable
+
+    # Chat history
+    chat_session_ttl_seconds: int = 7 * 24 * 3600
+    chat_keep_turns: int = 3  # turns sent verbatim
+    chat_reference_turns: int = 4  # turns before those, sent with long tool outputs shortened
+    chat_token_budget: int = 2000  # most tokens of history sent with each message
+    chat_tool_output_chars: int = 300  # longer tool outputs are shortened outside the verbatim turns
+    chat_memory_lines: int = 20  # summary lines kept for the oldest part of a conversation
+    chat_fold_turns: int = 4  # turns beyond both windows before they are summarised out of storage
+
+    # App
+    project_name: str = "Doctor Appointment Booking System"
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database_url=_str("DATABASE_URL"),
+            database_replica_urls=_list("DATABASE_REPLICA_URLS"),
+            replica_sticky_seconds=_float("REPLICA_STICKY_SECONDS", 5),
+            replica_max_lag_seconds=_float("REPLICA_MAX_LAG_SECONDS", 10),
+            replica_health_seconds=_int("REPLICA_HEALTH_SECONDS", 10),
+            db_pool_size=_int("DB_POOL_SIZE", 10),
+            db_max_overflow=_int("DB_MAX_OVERFLOW", 20),
+            db_pool_timeout=_float("DB_POOL_TIMEOUT", 10),
+            db_pool_recycle=_int("DB_POOL_RECYCLE", 3600),
+            db_pool_warm_connections=_int("DB_POOL_WARM_CONNECTIONS", 5),
+            statement_timeout_ms=_int("STATEMENT_TIMEOUT_MS", 15000),
+            read_statement_timeout_ms=_int("READ_STATEMENT_TIMEOUT_MS", 3000),
+            db_hold_warn_seconds=_float("DB_HOLD_WARN_SECONDS", 30),
+            import_statement_timeout_ms=_int("IMPORT_STATEMENT_TIMEOUT_MS", 120000),
+            shared_state_backend=_str("SHARED_STATE_BACKEND", "memory"),
+            redis_url=_str("REDIS_URL"),
+            shared_state_prefix=_str("SHARED_STATE_PREFIX", "docassist:"),
+            shared_state_max_keys=_int("SHARED_STATE_MAX_KEYS", 100000),
+            jwt_secret=_str("SECRET_KEY"),  # Changed from JWT_SECRET to SECRET_KEY to match .env
+            jwt_expire_minutes=_int("ACCESS_TOKEN_EXPIRE_MINUTES", 30),  # Changed to match .env
+            smtp_server=_str("SMTP_SERVER"),
+            smtp_port=_int("SMTP_PORT", 587),
+            smtp_user=_str("SMTP_USER"),
+            smtp_password=_str("SMTP_PASSWORD"),
+            sms_api_key=_str("SMS_API_KEY"),
+            sms_api_url=_str("SMS_API_URL"),
+            sms_sender_id=_str("SMS_SENDER_ID"),
+            # STRIPE_API_KEY is what the payment routes always read; Secret_key is the older name
+            stripe_api_key=_str("STRIPE_API_KEY", _str("Secret_key")),
+            stripe_webhook_secret=_str("STRIPE_WEBHOOK_SECRET", ""),
+            openai_api_key=_str("OPENAI_API_KEY"),
+            frontend_url=_str("FRONTEND_URL", "https://docassist-web.vercel.app"),
+            reset_link_base_url=_str("NEXT_PUBLIC_API_URL", "https://docassist-web.vercel.app"),
+            storage_backend=_str("STORAGE_BACKEND", "local"),
+            storage_local_root=_str("STORAGE_LOCAL_ROOT", "uploads"),
+            storage_public_url=_str("STORAGE_PUBLIC_URL"),
+            storage_presign_expire_seconds=_int("STORAGE_PRESIGN_EXPIRE_SECONDS", 900),
+            s3_bucket=_str("S3_BUCKET"),
+            s3_endpoint_url=_str("S3_ENDPOINT_URL"),
+            s3_region=_str("S3_REGION", "us-east-1"),
+            s3_access_key_id=_str("S3_ACCESS_KEY_ID"),
+            s3_secret_access_key=_str("S3_SECRET_ACCESS_KEY"),
+            reset_token_expire_minutes=_int("RESET_TOKEN_EXPIRE_MINUTES", 30),
+            compression_min_size=_int("COMPRESSION_MIN_SIZE", 1024),
+            query_count_warn=_int("QUERY_COUNT_WARN", 25),
+            query_stats_headers=_bool("QUERY_STATS_HEADERS", False),
+            rate_limit_login=_str("RATE_LIMIT_LOGIN", "10/60/5"),
+            rate_limit_register=_str("RATE_LIMIT_REGISTER", "5/300/3"),
+            rate_limit_password_forgot=_str("RATE_LIMIT_PASSWORD_FORGOT", "5/900/3"),
+            rate_limit_chatbot=_str("RATE_LIMIT_CHATBOT", "20/60/5"),
+            rate_limit_booking=_str("RATE_LIMIT_BOOKING", "10/60/5"),
+            idempotency_ttl_seconds=_int("IDEMPOTENCY_TTL_SECONDS", 24 * 3600),
+            idempotency_lock_seconds=_int("IDEMPOTENCY_LOCK_SECONDS", 60),
+            idempotency_max_response_bytes=_int("IDEMPOTENCY_MAX_RESPONSE_BYTES", 256 * 1024),
+            idempotency_spool_bytes=_int("IDEMPOTENCY_SPOOL_BYTES", 1024 * 1024),
+            clinic_hours=_str("CLINIC_HOURS", "00:00-24:00"),
+            clinic_days=_str("CLINIC_DAYS", "mon,tue,wed,thu,fri,sat,sun"),
+            slot_minutes=_int("SLOT_MINUTES", 30),
+            complete_after_minutes=_int("COMPLETE_AFTER_MINUTES", 60),
+            booking_hold_minutes=_int("BOOKING_HOLD_MINUTES", 30),
+            maintenance_chunk_size=_int("MAINTENANCE_CHUNK_SIZE", 500),
+            reminder_hours=_int_tuple("REMINDER_HOURS", (24, 1)),
+            reminder_batch_size=_int("REMINDER_BATCH_SIZE", 200),
+            partition_months_ahead=_int("PARTITION_MONTHS_AHEAD", 3),
+            appointment_archive_months=_int("APPOINTMENT_ARCHIVE_MONTHS", 0),
+            upload_gc_grace_seconds=_int("UPLOAD_GC_GRACE_SECONDS", 3600),
+            image_workers=_int("IMAGE_WORKERS", 2),
+            stats_reconcile_seconds=_int("STATS_RECONCILE_SECONDS", 900),
+            appointment_maintenance_seconds=_int("APPOINTMENT_MAINTENANCE_SECONDS", 300),
+            reminder_tick_seconds=_int("REMINDER_TICK_SECONDS", 60),
+            partition_job_seconds=_int("PARTITION_JOB_SECONDS", 86400),
+            upload_gc_seconds=_int("UPLOAD_GC_SECONDS", 600),
+            shutdown_drain_seconds=_float("SHUTDOWN_DRAIN_SECONDS", 20),
+            warmup_retry_seconds=_float("WARMUP_RETRY_SECONDS", 5),
+            chat_session_ttl_seconds=_int("CHAT_SESSION_TTL_SECONDS", 7 * 24 * 3600),
+            chat_keep_turns=_int("CHAT_KEEP_TURNS", 3),
+            chat_reference_turns=_int("CHAT_REFERENCE_TURNS", 4),
+            chat_token_budget=_int("CHAT_TOKEN_BUDGET", 2000),
+            chat_tool_output_chars=_int("CHAT_TOOL_OUTPUT_CHARS", 300),
+            chat_memory_lines=_int("CHAT_MEMORY_LINES", 20),
+            chat_fold_turns=_int("CHAT_FOLD_TURNS", 4),
+        )
+
+
+settings = Settings.from_env()
+
 # Database
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.database_url
+DATABASE_REPLICA_URLS = settings.database_replica_urls
+REPLICA_STICKY_SECONDS = settings.replica_sticky_seconds
+REPLICA_MAX_LAG_SECONDS = settings.replica_max_lag_seconds
+REPLICA_HEALTH_SECONDS = settings.replica_health_seconds
+DB_POOL_SIZE = settings.db_pool_size
+DB_MAX_OVERFLOW = settings.db_max_overflow
+DB_POOL_TIMEOUT = settings.db_pool_timeout
+DB_POOL_RECYCLE = settings.db_pool_recycle
+DB_POOL_WARM_CONNECTIONS = settings.db_pool_warm_connections
+STATEMENT_TIMEOUT_MS = settings.statement_timeout_ms
+READ_STATEMENT_TIMEOUT_MS = settings.read_statement_timeout_ms
+DB_HOLD_WARN_SECONDS = settings.db_hold_warn_seconds
+IMPORT_STATEMENT_TIMEOUT_MS = settings.import_statement_timeout_ms
+
+# Shared state
+SHARED_STATE_BACKEND = settings.shared_state_backend
+REDIS_URL = settings.redis_url
+SHARED_STATE_PREFIX = settings.shared_state_prefix
+SHARED_STATE_MAX_KEYS = settings.shared_state_max_keys
 
 # JWT
-JWT_SECRET = os.getenv("SECRET_KEY")  # Changed from JWT_SECRET to SECRET_KEY to match .env
-JWT_ALGORITHM = "HS256"
-JWT_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))  # Changed to match .env
+JWT_SECRET = settings.jwt_secret
+JWT_ALGORITHM = settings.jwt_algorithm
+JWT_EXPIRE_MINUTES = settings.jwt_expire_minutes
 
 # Email
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = int(os.getenv("SMTP_PORT"))
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_SERVER = settings.smtp_server
+SMTP_PORT = settings.smtp_port
+SMTP_USER = settings.smtp_user
+SMTP_PASSWORD = settings.smtp_password
 
-# SMS (Optional - for production use)
-SMS_API_KEY = os.getenv("SMS_API_KEY")
-SMS_API_URL = os.getenv("SMS_API_URL")
-SMS_SENDER_ID = os.getenv("SMS_SENDER_ID")
+# SMS
+SMS_API_KEY = settings.sms_api_key
+SMS_API_URL = settings.sms_api_url
+SMS_SENDER_ID = settings.sms_sender_id
 
 # Stripe
-STRIPE_API_KEY = os.getenv("Secret_key")  # Use secret key for backend API calls
-STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+STRIPE_API_KEY = settings.stripe_api_key
+STRIPE_WEBHOOK_SECRET = settings.stripe_webhook_secret
+
+# OpenAI / frontend
+OPENAI_API_KEY = settings.openai_api_key
+FRONTEND_URL = settings.frontend_url
+RESET_LINK_BASE_URL = settings.reset_link_base_url
+
+# Upload storage
+STORAGE_BACKEND = settings.storage_backend
+STORAGE_LOCAL_ROOT = settings.storage_local_root
+STORAGE_PUBLIC_URL = settings.storage_public_url
+STORAGE_PRESIGN_EXPIRE_SECONDS = settings.storage_presign_expire_seconds
+S3_BUCKET = settings.s3_bucket
+S3_ENDPOINT_URL = settings.s3_endpoint_url
+S3_REGION = settings.s3_region
+S3_ACCESS_KEY_ID = settings.s3_access_key_id
+S3_SECRET_ACCESS_KEY = settings.s3_secret_access_key
 
 # Password Reset
-RESET_TOKEN_EXPIRE_MINUTES = int(os.getenv("RESET_TOKEN_EXPIRE_MINUTES", "30"))  # default: 30 minutes
+RESET_TOKEN_EXPIRE_MINUTES = settings.reset_token_expire_minutes
+
+# HTTP
+COMPRESSION_MIN_SIZE = settings.compression_min_size
+QUERY_COUNT_WARN = settings.query_count_warn
+QUERY_STATS_HEADERS = settings.query_stats_headers
+RATE_LIMIT_LOGIN = settings.rate_limit_login
+RATE_LIMIT_REGISTER = settings.rate_limit_register
+RATE_LIMIT_PASSWORD_FORGOT = settings.rate_limit_password_forgot
+RATE_LIMIT_CHATBOT = settings.rate_limit_chatbot
+RATE_LIMIT_BOOKING = settings.rate_limit_booking
+IDEMPOTENCY_TTL_SECONDS = settings.idempotency_ttl_seconds
+IDEMPOTENCY_LOCK_SECONDS = settings.idempotency_lock_seconds
+IDEMPOTENCY_MAX_RESPONSE_BYTES = settings.idempotency_max_response_bytes
+IDEMPOTENCY_SPOOL_BYTES = settings.idempotency_spool_bytes
+
+# Appointments
+CLINIC_HOURS = settings.clinic_hours
+CLINIC_DAYS = settings.clinic_days
+SLOT_MINUTES = settings.slot_minutes
+COMPLETE_AFTER_MINUTES = settings.complete_after_minutes
+BOOKING_HOLD_MINUTES = settings.booking_hold_minutes
+MAINTENANCE_CHUNK_SIZE = settings.maintenance_chunk_size
+REMINDER_HOURS = settings.reminder_hours
+REMINDER_BATCH_SIZE = settings.reminder_batch_size
+PARTITION_MONTHS_AHEAD = settings.partition_months_ahead
+APPOINTMENT_ARCHIVE_MONTHS = settings.appointment_archive_months
+
+# Uploads
+UPLOAD_GC_GRACE_SECONDS = settings.upload_gc_grace_seconds
+IMAGE_WORKERS = settings.image_workers
+
+# Background jobs
+STATS_RECONCILE_SECONDS = settings.stats_reconcile_seconds
+APPOINTMENT_MAINTENANCE_SECONDS = settings.appointment_maintenance_seconds
+REMINDER_TICK_SECONDS = settings.reminder_tick_seconds
+PARTITION_JOB_SECONDS = settings.partition_job_seconds
+UPLOAD_GC_SECONDS = settings.upload_gc_seconds
+
+# Startup and shutdown
+SHUTDOWN_DRAIN_SECONDS = settings.shutdown_drain_seconds
+WARMUP_RETRY_SECONDS = settings.warmup_retry_seconds
+
+# Chat history
+CHAT_SESSION_TTL_SECONDS = settings.chat_session_ttl_seconds
+CHAT_KEEP_TURNS = settings.chat_keep_turns
+CHAT_REFERENCE_TURNS = settings.chat_reference_turns
+CHAT_TOKEN_BUDGET = settings.chat_token_budget
+CHAT_TOOL_OUTPUT_CHARS = settings.chat_tool_output_chars
+CHAT_MEMORY_LINES = settings.chat_memory_lines
+CHAT_FOLD_TURNS = settings.chat_fold_turns
 
 # App
-PROJECT_NAME = "Doctor Appointment Booking System"
+PROJECT_NAME = settings.project_name
@@ -0,0 +1,47 @@
+# backend/gunicorn.conf.py
+"""
+Deployment profile for N uvicorn workers per node and any number of nodes:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Workers share nothing in memory. Run more than one worker (or node) only with
+SHARED_STATE_BACKEND=redis, so chat sessions, the doctor catalog version, replica
+stickiness and rate limits are the same everywhere.
+
+Every worker has its own DB pool: plan for
+workers x nodes x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections on the database.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# The app is imported in each worker, so engines, pools and the image process pool
+# are never shared across a fork
+preload_app = False
+
+# Agent runs can take tens of seconds; shutdown drains them (SHUTDOWN_DRAIN_SECONDS)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Proxies whose X-Forwarded-For is trusted for the client IP (rate limits are keyed by it)
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def on_starting(server):
+    if workers > 1 and os.getenv("SHARED_STATE_BACKEND", "memory") != "redis":
+        server.log.warning(
+            "Running %d workers with in-process shared state: chat sessions, caches and "
+            "limits will differ between workers. Set SHARED_STATE_BACKEND=redis and REDIS_URL.",
+            workers,
+        )
@@ -1,15 +1,38 @@
-import os
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.routes import auth, users, doctors, appointments, payments, chatbot, password_routes, file_upload
+from app.routes import auth, users, doctors, appointments, payments, chatbot, password_routes, file_upload, admin, health
+from app.utils.scheduler import start_jobs
+from app.services.lifecycle_service import shut_down, warm_up
+from app.utils.compression import CompressionMiddleware
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.query_stats import QueryStatsMiddleware
+from app.utils.rate_limit import RateLimitMiddleware
+from app.utils.static_files import UploadStaticFiles
+from app.storage import LocalStorage, get_storage
+from config import COMPRESSION_MIN_SIZE, FRONTEND_URL
+
+
+# Background jobs and warm-up start with the app; /health/ready flips once warm-up is done
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_jobs()
+    warmup_task = asyncio.create_task(warm_up(app))
+    yield
+    await shut_down(warmup_task)
 
 
 # FastAPI app
-app = FastAPI(title="Doctor Appointment Booking System")
+app = FastAPI(
+    title="Doctor Appointment Booking System",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS for frontend - support multiple deployment URLs and environment-based configuration
-FRONTEND_URL = os.getenv("FRONTEND_URL", "https://docassist-web.vercel.app")
 origins = [
     "http://localhost:3000",   # React dev server
     "http://127.0.0.1:3000",
@@ -20,6 +43,18 @@ origins = [
     "https://docassist-web-*.vercel.app",  # Branch deployments
 ]
 
+# Statement count and DB time per request; requests over QUERY_COUNT_WARN are logged with
+# their repeated statements (N+1 patterns). Innermost, so only the route's own work is counted.
+app.add_middleware(QueryStatsMiddleware)
+
+# Per-route limits on login, password reset, chatbot and booking (429 + Retry-After).
+# Added before CORS so refused requests still carry the CORS headers.
+app.add_middleware(RateLimitMiddleware)
+
+# Idempotency-Key on POST/PUT/PATCH/DELETE: retries get the first response back instead of
+# a second booking or doctor. Outside the rate limiter, so replays are not counted.
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -28,6 +63,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (doctor/appointment/user lists) for clients that accept it
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+)
+
+# Pool exhaustion and statement timeouts are load problems, not server bugs
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return ORJSONResponse({"detail": "The service is busy, please retry shortly."}, status_code=503,
+                          headers={"Retry-After": "1"})
+
+
+@app.exception_handler(OperationalError)
+async def statement_timeout_handler(request: Request, exc: OperationalError):
+    if getattr(exc.orig, "pgcode", None) == "57014":  # query_canceled (statement_timeout)
+        return ORJSONResponse({"detail": "The request took too long to complete."}, status_code=504)
+    raise exc
+
+
 # Register routes
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -37,9 +92,13 @@ app.include_router(payments.router)
 app.include_router(chatbot.router)
 app.include_router(password_routes.router)
 app.include_router(file_upload.router)
+app.include_router(admin.router)
+app.include_router(health.router)
 
-# Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Mount static files for uploaded images; remote storage backends serve them directly
+storage = get_storage()
+if isinstance(storage, LocalStorage):
+    app.mount("/uploads", UploadStaticFiles(directory=storage.root), name="uploads")
 
 
 @app.get("/")
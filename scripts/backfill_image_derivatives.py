@@ -0,0 +1,123 @@
+"""
+Generate thumbnail/WebP derivatives for every image already in uploads/ and
+store their URLs on the matching doctors and users. Safe to re-run: existing
+derivatives are reused and rows that already have a thumbnail are left alone.
+Running API processes pick up doctor thumbnails on their next catalog refresh.
+Works on the local storage backend, where the originals are files on disk.
+
+    python scripts/backfill_image_derivatives.py --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal  # noqa: E402
+from app.services.image_service import OWNER_MODELS  # noqa: E402
+from app.storage import LocalStorage, get_storage  # noqa: E402
+from app.utils.image_derivatives import DERIVED_DIR, derivatives_available, generate_derivatives  # noqa: E402
+
+UPLOAD_DIRS = {"doctor": "doctor_images", "user": "patient_profile_image"}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+
+
+def find_images(directory: str):
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    return sorted(
+        p for p in root.rglob("*")
+        if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES and DERIVED_DIR not in p.relative_to(root).parts
+    )
+
+
+def _generate(source: str):
+    try:
+        return source, generate_derivatives(source), None
+    except Exception as e:
+        return source, None, str(e)
+
+
+def backfill(storage: LocalStorage, owner: str, directory: str, pool: ProcessPoolExecutor, batch_size: int):
+    images = find_images(directory)
+
+    def url_for(path):
+        return storage.url(Path(path).relative_to(storage.root).as_posix())
+
+    model = OWNER_MODELS[owner]
+    generated = updated = failed = 0
+    source_bytes = derived_bytes = 0
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        pending = {}
+        for source, derived, error in pool.map(_generate, [str(p) for p in images], chunksize=8):
+            if error is not None:
+                failed += 1
+                print(f"  failed {source}: {error}")
+                continue
+            generated += 1
+            source_bytes += os.path.getsize(source)
+            derived_bytes += sum(os.path.getsize(p) for p in derived.values())
+            pending[url_for(source)] = {name: url_for(path) for name, path in derived.items()}
+
+            if len(pending) >= batch_size:
+                updated += _store(db, model, pending)
+                pending = {}
+        updated += _store(db, model, pending)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    rate = generated / elapsed if elapsed else 0.0
+    print(
+        f"{directory}: {len(images)} images, {generated} generated, {failed} failed, "
+        f"{updated} rows updated in {elapsed:.2f}s ({rate:.1f} images/s, "
+        f"{source_bytes / 1e6:.1f} MB originals -> {derived_bytes / 1e6:.1f} MB derivatives)"
+    )
+
+
+def _store(db, model, pending) -> int:
+    """Set derivative URLs on rows that still point at the original and have none yet."""
+    if not pending:
+        return 0
+    rows = (
+        db.query(model)
+        .filter(model.image_url.in_(list(pending)), model.thumbnail_url.is_(None))
+        .all()
+    )
+    for row in rows:
+        derived = pending[row.image_url]
+        row.thumbnail_url = derived["thumbnail"]
+        row.webp_url = derived["webp"]
+    db.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--only", choices=sorted(UPLOAD_DIRS), help="Backfill a single upload directory")
+    args = parser.parse_args()
+
+    if not derivatives_available():
+        sys.exit("Pillow is not installed; install it to generate image derivatives.")
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        sys.exit("Backfill reads files from disk and needs STORAGE_BACKEND=local.")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for owner, directory in UPLOAD_DIRS.items():
+            if args.only and owner != args.only:
+                continue
+            backfill(storage, owner, str(storage.root / directory), pool, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
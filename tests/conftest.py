@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+# Make the project root importable and give config.py the settings it needs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def redis_url():
+    """An in-process Redis-protocol server, standing in for Redis."""
+    pytest.importorskip("redis")
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield f"redis://{host}:{port}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def query_log():
+    """(method, route path, QueryStats) for every request the app handles during the test."""
+    from app.utils.query_stats import record_requests
+
+    with record_requests() as requests:
+        yield requests
@@ -0,0 +1,284 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import Base, SessionLocal, engine
+from app.dependencies import can_manage_appointment, require_admin
+from app.models.appointment import (
+    ACTIVE_STATUSES,
+    ALLOWED_TRANSITIONS,
+    Appointment,
+    AppointmentStatus,
+    InvalidStatusTransition,
+)
+from app.models.doctor import Doctor
+from app.models.reminder import AppointmentReminder
+from app.models.stats import AppointmentStat, StatCounter
+from app.models.user import User, UserRole
+from app.services.appointment_service import SlotUnavailable, check_slot_available
+from app.services.maintenance_service import run_appointment_maintenance
+from app.services.partition_service import (
+    add_months, archive_partitions, archived_months, ensure_future_partitions, maintain_partitions, partition_name,
+)
+from app.services.reminder_service import schedule_reminders, send_due_reminders
+from app.services.stats_service import reconcile_stats
+
+TRANSITIONS = [(old, new) for old in AppointmentStatus for new in AppointmentStatus]
+
+
+@pytest.mark.parametrize("old,new", TRANSITIONS, ids=[f"{o.value}->{n.value}" for o, n in TRANSITIONS])
+def test_status_transition(old, new):
+    appointment = Appointment(status=old)
+    allowed = new in ALLOWED_TRANSITIONS[old]
+
+    assert appointment.can_transition_to(new) is allowed
+    if allowed:
+        appointment.transition_to(new)
+        assert appointment.status == new
+    else:
+        with pytest.raises(InvalidStatusTransition):
+            appointment.transition_to(new)
+        assert appointment.status == old
+
+
+def test_every_status_has_transition_rules():
+    assert set(ALLOWED_TRANSITIONS) == set(AppointmentStatus)
+
+
+def test_active_statuses_are_booked_and_confirmed():
+    assert set(ACTIVE_STATUSES) == {AppointmentStatus.BOOKED, AppointmentStatus.CONFIRMED}
+
+
+def test_require_admin():
+    require_admin(User(id=1, is_adman=UserRole.ADMIN))
+    with pytest.raises(HTTPException) as exc:
+        require_admin(User(id=2, is_adman=UserRole.USER))
+    assert exc.value.status_code == 403
+
+
+def test_can_manage_appointment():
+    appointment = Appointment(user_id=1, status=AppointmentStatus.BOOKED)
+    assert can_manage_appointment(User(id=1, is_adman=UserRole.USER), appointment)
+    assert can_manage_appointment(User(id=2, is_adman=UserRole.ADMIN), appointment)
+    assert not can_manage_appointment(User(id=2, is_adman=UserRole.USER), appointment)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    yield session
+    for model in (AppointmentStat, StatCounter, AppointmentReminder, Appointment, Doctor, User):
+        session.query(model).delete()
+    session.commit()
+    session.close()
+
+
+def _book(db, starts_at, now):
+    user = User(name="Pat", email=f"pat{starts_at.timestamp()}@example.com", hashed_password="x")
+    doctor = Doctor(name="Lee", specialty="General", fee="100")
+    db.add_all([user, doctor])
+    db.flush()
+    appointment = Appointment(
+        user_id=user.id, doctor_id=doctor.id, date=starts_at.date(), time=starts_at.time(),
+        reason="Checkup", status=AppointmentStatus.BOOKED, created_at=now,
+    )
+    db.add(appointment)
+    schedule_reminders(db, appointment, now=now)
+    db.commit()
+    return appointment
+
+
+class RecordingSender:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, messages):
+        self.batches.append(list(messages))
+        return [True] * len(messages)
+
+
+def test_reminders_are_sent_once_per_window(db):
+    now = datetime(2030, 1, 1, 9, 0)
+    _book(db, now + timedelta(hours=30), now)
+    sender = RecordingSender()
+
+    assert send_due_reminders(db, now=now, sender=sender)["sent"] == 0
+    assert send_due_reminders(db, now=now + timedelta(hours=6), sender=sender)["sent"] == 1
+    # A restart re-running the same tick does not resend
+    assert send_due_reminders(db, now=now + timedelta(hours=6), sender=sender)["sent"] == 0
+    assert send_due_reminders(db, now=now + timedelta(hours=29), sender=sender)["sent"] == 1
+    assert [len(batch) for batch in sender.batches] == [1, 1]
+    assert "tomorrow" in sender.batches[0][0][2]
+
+
+def test_reminders_for_cancelled_appointments_are_skipped(db):
+    now = datetime(2030, 1, 1, 9, 0)
+    appointment = _book(db, now + timedelta(hours=30), now)
+    appointment.transition_to(AppointmentStatus.CANCELLED)
+    db.commit()
+    sender = RecordingSender()
+
+    totals = send_due_reminders(db, now=now + timedelta(hours=29), sender=sender)
+    assert totals["skipped"] == 2 and totals["sent"] == 0
+    assert sender.batches == []
+
+
+def test_maintenance_completes_past_and_expires_unpaid_bookings(db):
+    now = datetime(2030, 1, 1, 9, 0)
+    past_confirmed = _book(db, now - timedelta(days=1), now - timedelta(days=3))
+    past_confirmed.transition_to(AppointmentStatus.CONFIRMED)
+    past_unpaid = _book(db, now - timedelta(hours=2), now - timedelta(days=3))
+    abandoned = _book(db, now + timedelta(days=2), now - timedelta(hours=1))
+    at_checkout = _book(db, now + timedelta(days=2, hours=1), now - timedelta(minutes=5))
+    db.commit()
+    reconcile_stats(db)
+
+    result = run_appointment_maintenance(db, now=now, chunk_size=1)
+    assert (result["completed"], result["expired"]) == (1, 2)
+    db.expire_all()
+    assert past_confirmed.status == AppointmentStatus.COMPLETED
+    assert past_unpaid.status == AppointmentStatus.EXPIRED
+    # An abandoned checkout frees its slot long before the appointment time
+    assert abandoned.status == AppointmentStatus.EXPIRED
+    assert at_checkout.status == AppointmentStatus.BOOKED
+
+    # Another node running the same tick finds nothing left to do
+    assert run_appointment_maintenance(db, now=now)["completed"] == 0
+    # The incremental rollup adjustments match a full rebuild
+    rollups = {(s.day, s.doctor_id, s.status): s.appointment_count
+               for s in db.query(AppointmentStat).all() if s.appointment_count}
+    reconcile_stats(db)
+    assert rollups == {(s.day, s.doctor_id, s.status): s.appointment_count for s in db.query(AppointmentStat).all()}
+
+
+def test_slot_availability(db, monkeypatch):
+    now = datetime(2030, 1, 1, 9, 0)
+    taken = _book(db, datetime(2030, 1, 2, 10, 0), now)
+    doctor_id, day = taken.doctor_id, taken.date
+
+    # Any time of day by default; a deployment opts in to clinic hours with CLINIC_HOURS
+    check_slot_available(db, doctor_id, day, datetime(2030, 1, 2, 23, 30).time(), now=now)
+    monkeypatch.setattr("app.services.appointment_service.CLINIC_OPENS", 8 * 60)
+    monkeypatch.setattr("app.services.appointment_service.CLINIC_CLOSES", 18 * 60)
+    check_slot_available(db, doctor_id, day, datetime(2030, 1, 2, 10, 30).time(), now=now)
+    check_slot_available(db, doctor_id + 1, day, taken.time, now=now)
+    for when in (datetime(2029, 12, 31, 10, 0), datetime(2030, 1, 1, 8, 30), datetime(2030, 1, 2, 7, 0),
+                 datetime(2030, 1, 2, 18, 0), datetime(2030, 1, 2, 10, 0)):
+        with pytest.raises(SlotUnavailable):
+            check_slot_available(db, doctor_id, when.date(), when.time(), now=now)
+
+    # A cancelled appointment frees its slot
+    taken.transition_to(AppointmentStatus.CANCELLED)
+    db.commit()
+    check_slot_available(db, doctor_id, day, taken.time, now=now)
+
+
+def test_revenue_is_what_was_paid(db):
+    from app.services.stats_service import record_appointment_change, record_appointment_created
+
+    def revenue():
+        return sum(s.revenue_cents for s in db.query(AppointmentStat).all())
+
+    now = datetime(2030, 1, 1, 9, 0)
+    booked = _book(db, now + timedelta(days=2), now)
+    reconcile_stats(db)
+    old_status, old_paid = booked.status, booked.paid
+    booked.paid, booked.amount_paid_cents = True, 9000  # a discounted checkout; the doctor's fee is 100.00
+    booked.transition_to(AppointmentStatus.CONFIRMED)
+    record_appointment_change(db, booked, old_status, old_paid)
+    paid = Appointment(user_id=booked.user_id, doctor_id=booked.doctor_id, date=booked.date, time=now.time(),
+                       status=AppointmentStatus.CONFIRMED, paid=True, amount_paid_cents=12000)
+    db.add(paid)
+    record_appointment_created(db, paid)
+    db.commit()
+    assert revenue() == 21000
+
+    # A later fee change does not rewrite what was paid
+    db.query(Doctor).filter(Doctor.id == booked.doctor_id).update({"fee": "250", "fee_cents": 25000})
+    reconcile_stats(db)
+    assert revenue() == 21000
+    assert db.query(AppointmentStat).filter(AppointmentStat.status == "booked").count() == 0
+
+
+def test_reminders_for_deleted_appointments_are_skipped(db):
+    now = datetime(2030, 1, 1, 9, 0)
+    appointment = _book(db, now + timedelta(hours=30), now)
+    db.query(Appointment).filter(Appointment.id == appointment.id).delete()
+    db.commit()
+
+    totals = send_due_reminders(db, now=now + timedelta(hours=29), sender=RecordingSender())
+    assert totals["skipped"] == 2
+    assert db.query(AppointmentReminder).filter(AppointmentReminder.outcome.is_(None)).count() == 0
+
+
+def test_reconcile_corrects_days_whose_appointments_were_deleted(db):
+    now = datetime(2030, 1, 1, 9, 0)
+    gone = _book(db, now + timedelta(days=1), now)
+    _book(db, now + timedelta(days=5), now)
+    reconcile_stats(db)
+    db.query(AppointmentReminder).delete()
+    db.query(Appointment).filter(Appointment.id == gone.id).delete()
+    db.commit()
+
+    reconcile_stats(db)
+    assert [s.day for s in db.query(AppointmentStat).all()] == [(now + timedelta(days=5)).date()]
+
+
+def test_incremental_revenue_matches_reconcile_without_fee_cents(db):
+    from app.services.stats_service import record_appointment_change
+
+    now = datetime(2030, 1, 1, 9, 0)
+    booked = _book(db, now + timedelta(days=2), now)
+    reconcile_stats(db)
+    # A doctor row from before fee_cents existed: both paths count it as 0, not the parsed fee
+    db.query(Doctor).filter(Doctor.id == booked.doctor_id).update({"fee_cents": None})
+    old_status, old_paid = booked.status, booked.paid
+    booked.paid = True
+    booked.transition_to(AppointmentStatus.CONFIRMED)
+    record_appointment_change(db, booked, old_status, old_paid)
+    db.commit()
+    incremental = {(s.day, s.status): s.revenue_cents for s in db.query(AppointmentStat).all() if s.appointment_count}
+
+    reconcile_stats(db)
+    assert incremental == {(s.day, s.status): s.revenue_cents for s in db.query(AppointmentStat).all()}
+
+
+def test_stats_reconcile_job_runs_on_one_worker_per_interval(db, monkeypatch):
+    from app.routes import admin
+    from app.shared_state import MemoryState, set_shared_state
+
+    runs = []
+    monkeypatch.setattr(admin, "reconcile_stats", lambda session: runs.append(session) or 0)
+    set_shared_state(MemoryState())
+    try:
+        for _ in range(3):  # three workers on the same tick
+            admin.run_stats_reconcile()
+    finally:
+        set_shared_state(None)
+    assert len(runs) == 1
+
+
+@pytest.mark.parametrize("month,offset,expected", [
+    ((2026, 10, 1), 0, (2026, 10, 1)),
+    ((2026, 10, 1), 3, (2027, 1, 1)),
+    ((2026, 1, 1), -1, (2025, 12, 1)),
+    ((2026, 3, 1), -26, (2024, 1, 1)),
+    ((2026, 12, 1), 12, (2027, 12, 1)),
+])
+def test_partition_months(month, offset, expected):
+    assert add_months(date(*month), offset) == date(*expected)
+    assert partition_name(date(*expected)) == "appointments_{}_{:02d}".format(*expected[:2])
+
+
+def test_partition_job_leaves_unpartitioned_databases_alone():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        tables = set(engine.dialect.get_table_names(db.connection()))
+        assert ensure_future_partitions(db, months_ahead=3, today=date(2026, 10, 19)) == []
+        assert archive_partitions(db, keep_months=1, today=date(2026, 10, 19)) == []
+        assert maintain_partitions(db) == {"created": [], "archived": []}
+        assert archived_months(db) == []
+        # Nothing was created, and the session is still usable after the rollbacks
+        assert set(engine.dialect.get_table_names(db.connection())) == tables
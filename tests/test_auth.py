@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, engine
+from app.shared_state import MemoryState, RedisState, set_shared_state
+from app.utils.jwt_handler import create_access_token
+from app.utils.rate_limit import POLICIES
+
+
+@pytest.fixture
+def client():
+    from main import app
+
+    Base.metadata.create_all(engine)
+    set_shared_state(MemoryState())
+    yield TestClient(app)
+    set_shared_state(None)
+
+
+def test_login_limit_holds_under_concurrency(client):
+    burst = POLICIES[("POST", "/auth/login")].burst
+
+    def attempt(_):
+        return client.post("/auth/login", data={"username": "nobody@example.com", "password": "wrong"})
+
+    with ThreadPoolExecutor(16) as pool:
+        responses = list(pool.map(attempt, range(40)))
+
+    refused = [r for r in responses if r.status_code == 429]
+    assert len(responses) - len(refused) == burst
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in refused)
+
+
+def test_booking_limit_is_per_user(client):
+    burst = POLICIES[("POST", "/appointments")].burst
+    first = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+    second = {"Authorization": "Bearer " + create_access_token({"sub": "2"})}
+
+    statuses = [client.post("/appointments/", json={}, headers=first).status_code for _ in range(burst + 1)]
+    assert statuses.count(429) == 1 and statuses[-1] == 429
+    assert client.post("/appointments/", json={}, headers=second).status_code != 429
+    # Unlimited routes are untouched
+    assert client.get("/health/live").status_code == 200
+
+
+def test_shared_limit_holds_across_workers(redis_url):
+    # The stand-in accepts connections slowly (listen backlog of 5), so allow more than the default 1s
+    workers = [RedisState(redis_url, timeout=10), RedisState(redis_url, timeout=10)]
+    interval, tolerance = 60.0, 60.0 * 4  # burst of 5
+
+    def attempt(i):
+        return workers[i % 2].gcra("rate:login:ip:10.0.0.1", interval, tolerance)
+
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(attempt, range(40)))
+
+    assert sum(allowed for allowed, _ in results) == 5
+    assert all(0 < retry <= interval for allowed, retry in results if not allowed)
+
+
+def test_slow_limit_checks_do_not_block_the_event_loop():
+    import asyncio
+    import time
+    from app.utils.rate_limit import RatePolicy, RateLimitMiddleware
+
+    class SlowState(MemoryState):
+        def gcra(self, key, interval, tolerance, now=None):
+            time.sleep(0.2)  # a slow Redis round trip
+            return super().gcra(key, interval, tolerance, now)
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    policies = {("POST", "/x"): RatePolicy("slow", 100, 1, 100, "ip")}
+    app = RateLimitMiddleware(endpoint, policies, SlowState())
+
+    async def call(i):
+        scope = {"type": "http", "method": "POST", "path": "/x", "headers": [], "client": (f"10.1.0.{i}", 1)}
+        await app(scope, None, lambda message: asyncio.sleep(0))
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*[call(i) for i in range(5)])
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.6
@@ -0,0 +1,40 @@
+from datetime import date, time
+
+from app.ai_agent.booking_request import match_doctors, parse_booking_request
+
+MONDAY = date(2026, 10, 19)
+CATALOG = [
+    {"id": 1, "name": "Aisha Patel", "specialty": "Dermatology"},
+    {"id": 2, "name": "John Smith", "specialty": "Cardiology"},
+    {"id": 3, "name": "Sarah Lee", "specialty": "Dermatology"},
+    {"id": 4, "name": "Sarah Khan", "specialty": "Pediatrics"},
+]
+
+
+def names(doctors):
+    return [doctor["name"] for doctor in doctors]
+
+
+def test_everything_in_one_request():
+    request = parse_booking_request("Book Dr. Patel tomorrow at 2pm for a skin rash", CATALOG, today=MONDAY)
+    assert (names(request.doctors), request.matched_by) == (["Aisha Patel"], "name")
+    assert (request.day, request.at, request.reason) == (date(2026, 10, 20), time(14), "skin rash")
+
+
+def test_names_win_over_specialties_and_full_names_over_first_names():
+    assert names(match_doctors(CATALOG, "with Sarah")[0]) == ["Sarah Lee", "Sarah Khan"]
+    assert names(match_doctors(CATALOG, "Sarah Lee for skin")[0]) == ["Sarah Lee"]
+    assert match_doctors(CATALOG, "John, my heart")[1] == "name"
+
+
+def test_specialties_by_stem_and_everyday_words():
+    assert match_doctors(CATALOG, "a dermatologist")[0] == [CATALOG[0], CATALOG[2]]
+    assert (names(match_doctors(CATALOG, "my heart")[0]), match_doctors(CATALOG, "my heart")[1]) == (["John Smith"], "specialty")
+    assert names(match_doctors(CATALOG, "my kid has a fever")[0]) == ["Sarah Khan"]
+    assert match_doctors(CATALOG, "I want to book an appointment") == ([], None)
+
+
+def test_reason_leaves_out_dates_times_and_doctors():
+    request = parse_booking_request("Dr Sarah Lee for a checkup with dr lee next friday 9:30am", CATALOG, today=MONDAY)
+    assert (request.reason, request.day, request.at) == ("checkup", date(2026, 10, 23), time(9, 30))
+    assert parse_booking_request("Dr. Smith for tomorrow at 2pm", CATALOG, today=MONDAY).reason is None
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from app.ai_agent.history import MEMORY_HEADER, compact_history, estimate_tokens, split_turns
+from app.ai_agent.session import CHAT_FOLD_TURNS, CompactingSession
+from app.shared_state import MemoryState
+
+DOCTOR_LIST = json.dumps({"type": "doctor_list", "message": "Here are our doctors",
+                          "doctors": [{"id": i, "name": f"Doctor {i}", "specialty": "Cardiology"} for i in range(40)]})
+
+
+def turn(n, big=False):
+    """A user message, a tool call and its output, and the assistant's reply."""
+    output = DOCTOR_LIST if big else json.dumps({"type": "info", "message": f"answer {n}"})
+    return [
+        {"role": "user", "content": f"question {n}"},
+        {"type": "function_call", "call_id": f"call_{n}", "name": "show_doctors", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": f"call_{n}", "output": output},
+        {"role": "assistant", "content": output},
+    ]
+
+
+def conversation(turns, big=True):
+    return [item for n in range(turns) for item in turn(n, big)]
+
+
+def test_recent_turns_verbatim_older_shortened_oldest_summarised():
+    items = conversation(10)
+    history = compact_history(items, keep_turns=2, reference_turns=3, token_budget=100000)
+    assert history[0]["role"] == "system" and history[0]["content"].startswith(MEMORY_HEADER)
+    assert history[0]["content"].count("- User: question") == 5
+    assert "| tools: show_doctors | reply: [doctor_list] Here are our doctors" in history[0]["content"]
+    referenced, verbatim = history[1:13], history[13:]
+    assert verbatim == items[-8:]
+    assert [item.get("content") for item in referenced if item.get("role") == "user"] == [
+        "question 5", "question 6", "question 7"]
+    assert all(item["output"].startswith("[show_doctors result,") for item in referenced
+               if item.get("type") == "function_call_output")
+
+
+def test_short_conversations_are_sent_unchanged():
+    items = conversation(2, big=False)
+    assert compact_history(items) == items
+
+
+def test_token_budget_is_enforced_and_calls_keep_their_outputs():
+    items = conversation(30)
+    assert estimate_tokens(items) > 2000
+    for budget in (2000, 800, 300):
+        history = compact_history(items, token_budget=budget)
+        assert estimate_tokens(history) <= budget
+        calls = {item["call_id"] for item in history if item.get("type") == "function_call"}
+        outputs = {item["call_id"] for item in history if item.get("type") == "function_call_output"}
+        assert calls == outputs
+
+
+def test_split_turns_starts_a_turn_at_each_user_message():
+    turns = split_turns([{"type": "function_call_output", "output": "orphan"}] + conversation(2))
+    assert [len(t) for t in turns] == [1, 4, 4]
+
+
+def test_session_folds_old_turns_out_of_storage():
+    state = MemoryState()
+    session = CompactingSession("7", state)
+    turns_stored = 3 + 4 + CHAT_FOLD_TURNS  # keep + reference windows, then a batch to fold
+
+    async def chat():
+        for n in range(turns_stored):
+            await session.add_items(turn(n))
+        return await session.get_items()
+
+    history = asyncio.run(chat())
+    assert len(state.list_range(session.key)) == 4 * 7
+    assert len(state.list_range(session.memory_key)) == CHAT_FOLD_TURNS
+    assert history[0]["content"].splitlines()[1] == "- User: question 0 | tools: show_doctors | reply: [info] answer 0"
+    assert history[-4:] == turn(turns_stored - 1)
+
+    asyncio.run(session.clear_session())
+    assert state.list_range(session.key) == state.list_range(session.memory_key) == []
+
+
+def test_fold_from_a_stale_read_does_not_drop_turns():
+    state = MemoryState()
+    first, second = CompactingSession("8", state), CompactingSession("8", state)
+    turns_stored = 3 + 4 + CHAT_FOLD_TURNS
+
+    async def chat():
+        for n in range(turns_stored):
+            await first.add_items(turn(n))
+
+    asyncio.run(chat())
+    # The second worker read the list, then the first folded before it took the lock
+    stale = [item for n in range(turns_stored) for item in turn(n)]
+    asyncio.run(first.get_items())
+    remaining = second._fold(stale)
+
+    assert remaining == stale[4 * CHAT_FOLD_TURNS:]
+    assert len(state.list_range(first.key)) == 4 * 7
+    assert len(state.list_range(first.memory_key)) == CHAT_FOLD_TURNS
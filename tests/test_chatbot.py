@@ -0,0 +1,86 @@
+import json
+from datetime import date, datetime, time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.ai_agent.payloads import MessageResponse, NavigationResponse, PaymentRedirect
+from app.schemas.doctor_schema import DoctorOut
+from app.shared_state import MemoryState, set_shared_state
+from app.utils.serialization import dumps, dumps_bytes, loads
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from main import app
+    from app.routes.users import get_current_user
+
+    set_shared_state(MemoryState())
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        id=1, name="Chat Patient", email="chat@example.com", is_admin=False)
+    replies = []
+
+    async def run_agent(message, user_context=None):
+        return {"final_output": replies.pop(0)}
+
+    monkeypatch.setattr("app.routes.chatbot.run_agent", run_agent)
+    yield TestClient(app), replies
+    app.dependency_overrides.pop(get_current_user)
+    set_shared_state(None)
+
+
+def test_serialization_handles_dates_models_sets_and_int_keys():
+    doctor = DoctorOut(id=3, name="Ada", specialty="General", fee="$100", fee_cents=10000)
+    payload = {
+        "on": date(2026, 3, 1), "at": time(14, 30), "created": datetime(2026, 3, 1, 9, 0),
+        "doctor": doctor, "tags": {"x"}, 7: "seven",
+    }
+
+    assert loads(dumps_bytes(payload)) == loads(dumps(payload)) == {
+        "on": "2026-03-01", "at": "14:30:00", "created": "2026-03-01T09:00:00",
+        "doctor": doctor.model_dump(mode="json"), "tags": ["x"], "7": "seven",
+    }
+    # Same text the standard library would read back, no whitespace padding
+    assert json.loads(dumps({"a": [1, "é"]})) == {"a": [1, "é"]}
+    assert "\n" not in dumps({"text": "two\nlines"})
+    with pytest.raises(TypeError):
+        dumps({"bad": object()})
+
+
+def test_tool_payloads_keep_the_frontend_shape():
+    assert json.loads(NavigationResponse("Opening...", path="/profile").to_json()) == {
+        "type": "navigation_response", "success": True, "message": "Opening...",
+        "navigation": {"action": "navigate", "path": "/profile", "delay_ms": 200},
+    }
+    navigation = json.loads(NavigationResponse("Found 1", path="/doctors", data={"doctors": [{"id": 1}]}).to_json())
+    assert navigation["data"] == {"doctors": [{"id": 1}]}
+    assert json.loads(MessageResponse("No.", success=False).to_json()) == {
+        "type": "message_response", "success": False, "message": "No."}
+    redirect = json.loads(PaymentRedirect("Pay", "https://checkout.test/cs", {"fee": 120.0}).to_json())
+    assert redirect["type"] == "payment_redirect"
+    assert redirect["payment_url"] == "https://checkout.test/cs"
+    assert redirect["appointment_details"] == {"fee": 120.0}
+
+
+def test_chatbot_passes_tool_payloads_through_and_unwraps_wrappers(client):
+    client, replies = client
+    payload = MessageResponse("Booked.").to_json()
+    replies.extend([
+        payload,
+        json.dumps({"quick_book_response": {"results": [payload]}}),
+        json.dumps({"quick_book_response": {"results": [{"type": "message_response", "message": "Hi"}]}}),
+        "Plain text answer",
+    ])
+
+    def reply():
+        response = client.post("/chatbot/", json={"message": "hello"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        return response.json()["reply"]
+
+    assert reply() == payload
+    assert reply() == payload
+    assert json.loads(reply()) == {"type": "message_response", "message": "Hi"}
+    assert reply() == "Plain text answer"
+    assert client.post("/chatbot/", json={}).json() == {"reply": "Please provide a message."}
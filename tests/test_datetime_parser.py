@@ -0,0 +1,100 @@
+import random
+from datetime import date, time, timedelta
+
+import pytest
+
+from app.utils.datetime_parser import DATE_PATTERNS, WEEKDAYS, DateParseError, parse_date, parse_time, parse_when
+
+MONDAY = date(2026, 10, 19)
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("tomorrow 2pm", (date(2026, 10, 20), time(14))),
+    ("Next Monday morning", (date(2026, 10, 26), time(9))),
+    ("monday", (MONDAY, None)),
+    ("this Friday at 3:30 p.m.", (date(2026, 10, 23), time(15, 30))),
+    ("at 2.30pm on Fri", (date(2026, 10, 23), time(14, 30))),
+    ("14:30 tomorrow", (date(2026, 10, 20), time(14, 30))),
+    ("day after tomorrow in the afternoon", (date(2026, 10, 21), time(14))),
+    ("2025-01-15T14:30", (date(2025, 1, 15), time(14, 30))),
+    ("2027-03-01 09:15:00", (date(2027, 3, 1), time(9, 15))),
+    ("Jan 15", (date(2027, 1, 15), None)),
+    ("December 24th", (date(2026, 12, 24), None)),
+    ("15th of January 2028, 10am", (date(2028, 1, 15), time(10))),
+    ("Feb 29", (date(2028, 2, 29), None)),
+    ("in 3 days", (date(2026, 10, 22), None)),
+    ("in two weeks", (date(2026, 11, 2), None)),
+    ("next week", (date(2026, 10, 26), None)),
+    ("noon", (None, time(12))),
+])
+def test_parse_when(phrase, expected):
+    assert parse_when(phrase, today=MONDAY) == expected
+
+
+@pytest.mark.parametrize("phrase", [
+    "yesterday", "someday", "2026-02-30", "Feb 30", "13pm", "25:00", "tomorrow 9:75",
+    "next next friday", "tomorrow tomorrow", "2pm 3pm", "in -3 days",
+])
+def test_parse_when_rejects(phrase):
+    with pytest.raises(DateParseError):
+        parse_when(phrase, today=MONDAY)
+
+
+def test_parse_when_leaves_out_what_is_not_said():
+    assert parse_when("", today=MONDAY) == (None, None)
+    assert parse_when("friday", today=MONDAY)[1] is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2pm", time(14)), ("2 PM", time(14)), ("12am", time(0)), ("12:15 p.m.", time(12, 15)),
+    ("14:30", time(14, 30)), ("09:00:00", time(9)), ("14", time(14)), ("evening", time(17)),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+@pytest.mark.parametrize("today", [MONDAY + timedelta(days=offset) for offset in range(7)])
+def test_weekdays_from_every_day_of_the_week(today):
+    for name, weekday in WEEKDAYS.items():
+        this, upcoming = parse_date(name, today=today), parse_date(f"next {name}", today=today)
+        assert this.weekday() == upcoming.weekday() == weekday
+        assert 0 <= (this - today).days <= 6
+        assert 1 <= (upcoming - today).days <= 7
+
+
+def test_date_patterns_are_compiled_once():
+    assert all(hasattr(pattern, "fullmatch") for pattern, _ in DATE_PATTERNS)
+
+
+def test_round_trips_formatted_dates_and_times():
+    rng = random.Random(48)
+    for _ in range(2000):
+        day = MONDAY + timedelta(days=rng.randrange(-400, 800))
+        fmt = rng.choice(("%Y-%m-%d", "%B %d %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y"))
+        assert parse_date(day.strftime(fmt), today=MONDAY) == day
+        at = time(rng.randrange(24), rng.randrange(60))
+        twelve = f"{at.hour % 12 or 12}:{at.minute:02d}{rng.choice((' ', ''))}{'pm' if at.hour >= 12 else 'am'}"
+        assert parse_time(twelve) == parse_time(at.strftime("%H:%M")) == at
+
+
+VOCABULARY = [
+    "today", "tomorrow", "next", "this", "coming", "week", "in", "days", "a", "the", "at", "on", "of",
+    "monday", "fri", "Sept", "january", "15th", "3rd", "2026", "2pm", "14:30", "9", "12", "am", "p.m.",
+    "morning", "noon", ",", ".", "-", ":", "T", "2026-02-29", "o'clock", "é", "0", "99", "  ", "\t",
+]
+
+
+def test_fuzzed_phrases_only_raise_date_parse_error():
+    rng = random.Random(2026)
+    for _ in range(20000):
+        if rng.random() < 0.8:
+            phrase = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 5)))
+        else:
+            phrase = "".join(chr(rng.randrange(32, 0x2500)) for _ in range(rng.randint(0, 12)))
+        for parse in (parse_date, parse_time, parse_when):
+            try:
+                result = parse(phrase, today=MONDAY) if parse is not parse_time else parse(phrase)
+            except DateParseError:
+                continue
+            values = result if parse is parse_when else (result,)
+            assert all(value is None or isinstance(value, (date, time)) for value in values), (phrase, result)
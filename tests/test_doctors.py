@@ -0,0 +1,177 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.database import Base, SessionLocal, engine, read_router, read_session
+from app.models.doctor import Doctor
+from app.shared_state import set_shared_state
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second local database standing in for a read replica."""
+    replica_engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(engine)
+    Base.metadata.create_all(replica_engine)
+    monkeypatch.setattr(read_router, "replicas", [replica_engine])
+    yield replica_engine
+    read_router._down.clear()
+    set_shared_state(None)
+    with SessionLocal() as db:
+        db.query(Doctor).delete()
+        db.commit()
+    replica_engine.dispose()
+
+
+def _add_doctor(bind, name, user_id=None):
+    with SessionLocal(bind=bind) as db:
+        if user_id is not None:
+            db.info["user_id"] = user_id
+        doctor = Doctor(name=name, specialty="General", fee="100")
+        db.add(doctor)
+        db.commit()
+        return doctor.id
+
+
+def test_read_only_routes_are_served_by_the_replica(replica):
+    from main import app
+
+    doctor_id = _add_doctor(engine, "On Primary")
+    _add_doctor(replica, "On Replica")
+
+    response = TestClient(app).get(f"/doctors/{doctor_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "On Replica"
+
+
+def test_reads_stick_to_the_primary_after_the_users_own_write(replica):
+    _add_doctor(engine, "Just Added", user_id=7)
+
+    with read_session(7) as db:
+        assert db.get_bind() is engine
+    with read_session(8) as db:
+        assert db.get_bind() is replica
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(replica, tmp_path, monkeypatch):
+    unreachable = create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+    monkeypatch.setattr(read_router, "replicas", [unreachable, replica])
+    read_router.check_replicas()
+    assert all(read_router.pick() is replica for _ in range(4))
+
+    monkeypatch.setattr(read_router, "replicas", [unreachable])
+    assert read_router.pick() is engine
+
+
+def test_replica_sessions_refuse_writes(replica):
+    with read_session() as db:
+        db.add(Doctor(name="Nope", specialty="General", fee="100"))
+        with pytest.raises(RuntimeError):
+            db.commit()
+
+
+def test_admin_tool_deletes_leave_the_catalog(replica):
+    import asyncio
+    from agents import RunContextWrapper
+    from app.ai_agent.tools import delete_doctor
+    from app.models.user import User
+    from app.services.doctor_service import get_doctor_catalog
+    from app.shared_state import MemoryState
+
+    set_shared_state(MemoryState())
+    _add_doctor(engine, "Leaving Soon")
+    with SessionLocal() as db:
+        admin = User(name="Tool Admin", email="tool-admin@example.com", hashed_password="x", is_adman="admin")
+        db.add(admin)
+        db.commit()
+        admin_id = admin.id
+        assert [d["name"] for d in get_doctor_catalog()] == ["Leaving Soon"]
+
+    context = RunContextWrapper(context={"user_id": admin_id})
+    asyncio.run(delete_doctor.on_invoke_tool(context, '{"doctor_name": "Leaving Soon"}'))
+    with SessionLocal() as db:
+        assert get_doctor_catalog() == []
+        db.query(User).filter(User.id == admin_id).delete()
+        db.commit()
+
+
+def test_bulk_import_inserts_valid_rows_in_batches_and_reports_the_rest(tmp_path):
+    import io
+    import zipfile
+    from app.services.doctor_import_service import detect_format, import_doctors
+    from app.storage import LocalStorage, set_storage
+
+    assert detect_format("doctors.csv", None) == "csv"
+    assert detect_format("upload", "application/x-ndjson") == "ndjson"
+    assert detect_format("doctors.xlsx", "application/octet-stream") is None
+
+    Base.metadata.create_all(engine)
+    set_storage(LocalStorage(str(tmp_path / "uploads"), "/uploads"))
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as images:
+        images.writestr("ada.png", b"\x89PNG ada")
+    csv_file = io.BytesIO(
+        b"name,specialty,fee,image\n"
+        b"Ada,Cardiology,$150,\n"
+        b"Grace,Neurology,\"1,200.50\",ada.png\n"
+        b"Linus,Pediatrics,free,\n"
+        b"Ken,General,90,missing.png\n"
+        b"Barbara,General,150,\n"
+    )
+    try:
+        with SessionLocal() as db:
+            report = import_doctors(db, csv_file, "csv", images=zipfile.ZipFile(archive), batch_size=2)
+            assert report["inserted"] == 3
+            assert [error["row"] for error in report["errors"]] == [3, 4]
+            assert "fee" in report["errors"][0]["error"] and "missing.png" in report["errors"][1]["error"]
+            grace = db.query(Doctor).filter(Doctor.name == "Grace").one()
+            assert grace.fee_cents == 120050 and grace.image_url.startswith("/uploads/doctor_images/")
+
+            report = import_doctors(db, io.BytesIO(b'{"name": "Edsger", "specialty": "General", "fee": "80"}\n'
+                                                   b'not json\n\n[1, 2]\n'), "ndjson")
+            assert report["inserted"] == 1 and [error["row"] for error in report["errors"]] == [2, 4]
+    finally:
+        set_storage(None)
+        set_shared_state(None)
+        with SessionLocal() as db:
+            db.query(Doctor).delete()
+            db.commit()
+
+
+def _load_migration(name):
+    import importlib.util
+    import os
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(root, "alembic", "versions", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("fee,cents", [
+    ("150", 15000), ("$150", 15000), ("1,200.50", 120050), (" 99.999 ", 10000), (150, 15000), (0, 0),
+    (-5, None), ("-5", None), (True, None), ("free", None), ("NaN", None), ("", None), (None, None),
+])
+def test_parse_fee_cents(fee, cents):
+    from app.utils.money import parse_fee_cents
+
+    assert parse_fee_cents(fee) == cents
+
+
+def test_fee_cents_backfill_resumes_and_skips_unparseable_fees(tmp_path):
+    migration = _load_migration("77ad95f9620c_add_fee_cents_to_doctors")
+    legacy = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE doctors (id INTEGER PRIMARY KEY, fee TEXT, fee_cents INTEGER)"))
+        conn.execute(text(
+            "INSERT INTO doctors (id, fee, fee_cents) VALUES "
+            "(1, '$100', NULL), (2, 'call us', NULL), (3, '75.50', NULL), (4, '20', 999), (5, '1,000', NULL)"
+        ))
+        assert migration.backfill_fee_cents(conn, batch_size=2) == 3
+        # A re-run only looks at what is still NULL
+        assert migration.backfill_fee_cents(conn, batch_size=2) == 0
+        assert conn.execute(text("SELECT id, fee_cents FROM doctors ORDER BY id")).fetchall() == [
+            (1, 10000), (2, None), (3, 7550), (4, 999), (5, 100000)]
+    legacy.dispose()
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import Base, SessionLocal, engine, get_db, statement_timeout
+from app.models.doctor import Doctor
+from app.services import doctor_service, lifecycle_service
+from app.utils.db_monitor import TimedQueuePool, instrument_engine, pool_status, set_statement_timeout
+from config import STATEMENT_TIMEOUT_MS
+
+
+def test_ready_after_warm_up_and_not_while_draining(monkeypatch):
+    from main import app
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Doctor(name="Warm", specialty="General", fee="100"))
+        db.commit()
+    monkeypatch.setattr(lifecycle_service, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(doctor_service, "_catalog", None)
+    engine.dispose()
+
+    try:
+        with TestClient(app) as client:
+            assert client.get("/health/live").status_code == 200
+            deadline = time.monotonic() + 10
+            while client.get("/health/ready").status_code != 200 and time.monotonic() < deadline:
+                time.sleep(0.02)
+
+            body = client.get("/health/ready").json()
+            assert body["status"] == "ready"
+            assert body["warmup"]["pool"]["result"] >= 1
+            assert body["warmup"]["queries"]["result"] == 3
+            assert body["warmup"]["catalog"]["result"] == 1
+            assert body["warmup"]["agent"]["result"] is False
+            assert engine.pool.checkedin() >= 1
+            assert doctor_service._catalog is not None
+
+        assert lifecycle_service.STATE["draining"] is True
+        assert engine.pool.checkedin() == 0  # disposed on shutdown
+    finally:
+        with SessionLocal() as db:
+            db.query(Doctor).delete()
+            db.commit()
+        doctor_service._catalog = None
+
+
+def test_not_ready_while_the_primary_database_fails(monkeypatch):
+    from main import app
+
+    def unreachable():
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(lifecycle_service, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(lifecycle_service, "WARMUP_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(lifecycle_service, "warm_queries", unreachable)
+
+    with TestClient(app) as client:
+        time.sleep(0.2)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "database_unavailable"
+        assert response.json()["warmup"]["queries"]["error"] == "database is down"
+
+
+def test_settings_reject_malformed_values(monkeypatch):
+    from config import Settings
+
+    monkeypatch.setenv("REMINDER_HOURS", "24, 1")
+    monkeypatch.setenv("QUERY_STATS_HEADERS", "yes")
+    settings = Settings.from_env()
+    assert settings.reminder_hours == (24, 1) and settings.query_stats_headers
+
+    for name, value in (("SLOT_MINUTES", "half an hour"), ("REMINDER_HOURS", "24,1h"),
+                        ("WARMUP_RETRY_SECONDS", "soon")):
+        monkeypatch.setenv(name, value)
+        with pytest.raises(RuntimeError, match=name):
+            Settings.from_env()
+        monkeypatch.delenv(name)
+
+
+def test_held_connections_are_reported_once_with_the_holding_code(tmp_path, capsys):
+    pooled = create_engine(f"sqlite:///{tmp_path}/held.db", poolclass=TimedQueuePool, pool_size=2, max_overflow=0)
+    tracker = instrument_engine(pooled, "held-test")
+    checkouts = pooled.pool.wait_histogram.snapshot()["count"]
+
+    conn = pooled.connect()
+    try:
+        conn.execute(text("SELECT 1"))
+        assert pool_status(pooled) == {"size": 2, "checked_out": 1, "overflow": 0, "idle": 0}
+        assert tracker.held(older_than=60) == []
+        (held,) = tracker.held()
+        assert held["thread"] == threading.current_thread().name
+
+        assert tracker.report(threshold_seconds=0) == 1
+        report = capsys.readouterr().out
+        assert "DB connection (held-test) held for" in report
+        assert "test_held_connections_are_reported_once" in report
+        assert "sqlalchemy" not in report
+        assert tracker.report(threshold_seconds=0) == 0
+    finally:
+        conn.close()
+    assert tracker.held() == []
+    assert pool_status(pooled)["idle"] == 1
+    assert pooled.pool.wait_histogram.snapshot()["count"] == checkouts + 1
+    pooled.dispose()
+
+
+def test_statement_timeout_dependency_applies_to_the_route_session():
+    timeouts = []
+    app = FastAPI()
+
+    @app.get("/slow", dependencies=[Depends(statement_timeout(120000))])
+    def slow(db=Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        return db.info["statement_timeout_ms"]
+
+    @app.get("/fast")
+    def fast(db=Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        return db.info["statement_timeout_ms"]
+
+    def record(session, transaction, connection):
+        timeouts.append(session.info.get("statement_timeout_ms"))
+
+    event.listen(SessionLocal, "after_begin", record)
+    try:
+        client = TestClient(app)
+        # The dependency and the route share one session, which begins with the timeout in place
+        assert client.get("/slow").json() == 120000
+        assert client.get("/fast").json() == STATEMENT_TIMEOUT_MS
+        assert timeouts == [120000, STATEMENT_TIMEOUT_MS]
+    finally:
+        event.remove(SessionLocal, "after_begin", record)
+
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+        set_statement_timeout(db, 500)
+        assert db.info["statement_timeout_ms"] == 500
+        set_statement_timeout(db, None)
+        assert db.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_statement_timeouts_answer_504_and_other_errors_propagate():
+    from main import statement_timeout_handler
+
+    class QueryCanceled(Exception):
+        pgcode = "57014"
+
+    response = asyncio.run(statement_timeout_handler(None, OperationalError("SELECT", {}, QueryCanceled())))
+    assert response.status_code == 504
+    with pytest.raises(OperationalError):
+        asyncio.run(statement_timeout_handler(None, OperationalError("SELECT", {}, Exception("disk I/O error"))))
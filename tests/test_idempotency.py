@@ -0,0 +1,184 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.models.doctor import Doctor
+from app.models.user import User
+from app.shared_state import MemoryState, set_shared_state
+from app.utils.idempotency import IDEMPOTENCY_SPOOL_BYTES, IdempotencyMiddleware, RequestFingerprint, request_fingerprint
+from app.utils.jwt_handler import create_access_token
+
+
+@pytest.fixture
+def admin_client():
+    from main import app
+
+    Base.metadata.create_all(engine)
+    set_shared_state(MemoryState())
+    with SessionLocal() as db:
+        admin = User(name="Admin", email="idem-admin@example.com", hashed_password="x", is_adman="admin")
+        db.add(admin)
+        db.commit()
+        token = create_access_token({"sub": str(admin.id)})
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {token}"
+    yield client
+    with SessionLocal() as db:
+        db.query(Doctor).delete()
+        db.query(User).filter(User.email == "idem-admin@example.com").delete()
+        db.commit()
+    set_shared_state(None)
+
+
+def _create_doctor(client, key, name="Dr. Once"):
+    return client.post(
+        "/doctors/",
+        data={"name": name, "specialty": "General", "fee": "100"},
+        files={"bio": (None, "General practice")},  # multipart, with a new boundary on every attempt
+        headers={"Idempotency-Key": key},
+    )
+
+
+def test_concurrent_duplicates_create_one_doctor(admin_client):
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda _: _create_doctor(admin_client, "create-once"), range(8)))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 7
+    with SessionLocal() as db:
+        assert db.query(Doctor).filter(Doctor.name == "Dr. Once").count() == 1
+
+    # A later retry is replayed too; a new key creates a new doctor
+    assert _create_doctor(admin_client, "create-once").json()["id"] == responses[0].json()["id"]
+    assert _create_doctor(admin_client, "create-twice").json()["id"] != responses[0].json()["id"]
+
+
+def test_key_reused_with_a_different_body_is_refused(admin_client):
+    assert _create_doctor(admin_client, "reused", name="Dr. First").status_code == 200
+    assert _create_doctor(admin_client, "reused", name="Dr. Second").status_code == 422
+
+
+def test_retries_wait_for_the_request_in_flight():
+    calls = []
+
+    async def slow_endpoint(scope, receive, send):
+        calls.append(await receive())
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"id": 1}'})
+
+    app = IdempotencyMiddleware(slow_endpoint, state=MemoryState())
+
+    async def attempt():
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b'{"doctor_id": 3}', "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/appointments/", "query_string": b"",
+                 "headers": [(b"idempotency-key", b"k1")], "client": ("10.0.0.1", 1)}
+        await app(scope, receive, send)
+        return sent
+
+    async def run():
+        return await asyncio.gather(*[attempt() for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and calls[0]["body"] == b'{"doctor_id": 3}'
+    assert [r[0]["status"] for r in results] == [201] * 5
+    assert all(r[1]["body"] == b'{"id": 1}' for r in results)
+
+
+def _post(app, key, body=b"{}", headers=()):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/x", "query_string": b"", "client": ("10.0.0.2", 1),
+             "headers": [(b"idempotency-key", key.encode()), *headers]}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]
+
+
+def test_refusals_from_before_the_route_are_not_replayed():
+    from app.utils.rate_limit import RatePolicy, RateLimitMiddleware
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    state = MemoryState()
+    policies = {("POST", "/x"): RatePolicy("idem-test", 1, 0.2, 1, "ip")}
+    app = IdempotencyMiddleware(RateLimitMiddleware(endpoint, policies, state), state=state)
+    assert _post(app, "first")["status"] == 201
+    refused = _post(app, "second")
+    assert refused["status"] == 429 and (b"idempotent-replayed", b"true") not in refused["headers"]
+    time.sleep(0.25)
+    assert _post(app, "second")["status"] == 201
+
+
+def test_large_bodies_are_streamed_through():
+    received = []
+
+    async def endpoint(scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message["body"]
+            if not message["more_body"]:
+                break
+        received.append(body)
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    def post(chunks):
+        messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+        messages[-1]["more_body"] = False
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/upload", "query_string": b"",
+                 "client": ("10.0.0.3", 1), "headers": [(b"idempotency-key", b"upload")]}
+        asyncio.run(IdempotencyMiddleware(endpoint, state=state)(scope, receive, send))
+        return sent[0]
+
+    state = MemoryState()
+    body = bytes(range(256)) * (IDEMPOTENCY_SPOOL_BYTES // 128 + 1)  # spills to disk
+    assert post([body[:1000], body[1000:]])["status"] == 201
+    assert received == [body]
+    # The retry arrives in different chunks and is still the same request
+    replayed = post([body[:70000], body[70000:]])
+    assert replayed["status"] == 201 and (b"idempotent-replayed", b"true") in replayed["headers"]
+    assert len(received) == 1
+
+
+def test_multipart_fingerprint_ignores_boundaries_split_across_chunks():
+    def scope(boundary):
+        return {"method": "POST", "path": "/doctors", "query_string": b"",
+                "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]}
+
+    def body(boundary):
+        return f"--{boundary}\r\nname\r\n--{boundary}--\r\n".encode()
+
+    streamed = RequestFingerprint(scope("first-boundary"))
+    whole = body("first-boundary")
+    for n in range(0, len(whole), 5):
+        streamed.update(whole[n:n + 5])
+    assert streamed.hexdigest() == request_fingerprint(scope("second-boundary-x"), body("second-boundary-x"))
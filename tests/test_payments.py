@@ -0,0 +1,73 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.doctor import Doctor
+from app.models.reminder import AppointmentReminder
+from app.models.stats import AppointmentStat
+from app.models.user import User
+
+SECRET = "whsec_payments_test"
+
+
+@pytest.fixture
+def booking(monkeypatch):
+    from main import app
+
+    monkeypatch.setattr("app.routes.payments.STRIPE_WEBHOOK_SECRET", SECRET)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(name="Payer", email="payer@example.com", hashed_password="x")
+        doctor = Doctor(name="Paid", specialty="General", fee="$100")
+        db.add_all([user, doctor])
+        db.commit()
+        metadata = {
+            "user_id": str(user.id), "user_name": user.name, "user_email": user.email,
+            "doctor_id": str(doctor.id), "doctor_name": doctor.name, "doctor_specialty": doctor.specialty,
+            "date": "2030-01-15", "time": "10:30:00", "reason": "Checkup",
+        }
+    yield TestClient(app), metadata
+    with SessionLocal() as db:
+        db.query(AppointmentReminder).delete()
+        db.query(Appointment).delete()
+        db.query(AppointmentStat).delete()
+        db.query(Doctor).filter(Doctor.name == "Paid").delete()
+        db.query(User).filter(User.email == "payer@example.com").delete()
+        db.commit()
+
+
+def _signed(event, secret=SECRET):
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return payload, {"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+
+def test_signed_checkout_completed_creates_confirmed_appointment(booking):
+    client, metadata = booking
+    event = {"id": "evt_1", "object": "event", "type": "checkout.session.completed",
+             "data": {"object": {"id": "cs_test_1", "object": "checkout.session", "metadata": metadata}}}
+    payload, headers = _signed(event)
+
+    response = client.post("/payments/webhook", content=payload, headers=headers)
+
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        appointment = db.query(Appointment).filter(Appointment.stripe_payment_id == "cs_test_1").one()
+        assert appointment.status == AppointmentStatus.CONFIRMED
+        assert appointment.paid is True
+        assert appointment.date == date(2030, 1, 15)
+
+
+def test_bad_signature_is_refused(booking):
+    client, metadata = booking
+    payload, headers = _signed({"type": "checkout.session.completed"}, secret="whsec_wrong")
+
+    assert client.post("/payments/webhook", content=payload, headers=headers).status_code == 400
@@ -0,0 +1,359 @@
+"""
+Statement budgets for every route. Each route is exercised against a patient with
+several appointments (so per-row lookups show up as repeats) and every recorded
+request must stay within its budget. Routes added without a budget fail
+test_every_route_has_a_budget.
+"""
+import hashlib
+import hmac
+import json
+import time
+from datetime import date, time as dtime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.models import Appointment, Doctor, UploadBlob, User
+from app.models.reminder import AppointmentReminder
+from app.models.stats import AppointmentStat, StatCounter
+from app.shared_state import MemoryState, set_shared_state
+from app.storage import LocalStorage, set_storage
+from app.utils.jwt_handler import create_access_token, create_reset_token
+from app.utils.query_stats import count_queries
+
+APPOINTMENTS = 6
+
+# (method, route path) -> most statements one request may run
+BUDGETS = {
+    ("GET", "/"): 0,
+    ("GET", "/admin/stats"): 6,
+    ("GET", "/admin/maintenance"): 2,
+    ("GET", "/admin/db-pool"): 1,
+    ("POST", "/appointments/"): 4,
+    ("GET", "/appointments/"): 2,
+    ("GET", "/appointments/all"): 2,
+    ("POST", "/appointments/{appointment_id}/cancel"): 7,
+    ("POST", "/auth/register"): 3,
+    ("POST", "/auth/login"): 1,
+    ("POST", "/chatbot/"): 1,
+    ("GET", "/doctors/"): 1,
+    ("GET", "/doctors/{doctor_id}"): 1,
+    ("POST", "/doctors/"): 4,
+    ("POST", "/doctors/bulk"): 4,
+    ("PUT", "/doctors/{doctor_id}"): 5,
+    ("DELETE", "/doctors/{doctor_id}"): 5,
+    ("POST", "/upload/profile-image"): 6,
+    ("DELETE", "/upload/profile-image"): 4,
+    ("POST", "/upload/presign"): 2,
+    ("PUT", "/upload/direct/{token}"): 0,
+    ("POST", "/upload/profile-image/complete"): 5,
+    ("GET", "/health/live"): 0,
+    ("GET", "/health/ready"): 0,
+    ("POST", "/password/forgot"): 1,
+    ("POST", "/password/reset"): 2,
+    ("POST", "/payments/webhook"): 5,
+    ("GET", "/payments/verify/{session_id}"): 1,
+    ("GET", "/users/"): 2,
+    ("GET", "/users/me"): 1,
+    ("PUT", "/users/me"): 3,
+    ("PUT", "/users/{user_id}"): 5,
+    ("DELETE", "/users/{user_id}"): 5,
+}
+
+
+@pytest.fixture
+def world(tmp_path, monkeypatch):
+    from main import app
+
+    Base.metadata.create_all(engine)
+    set_shared_state(MemoryState())
+    set_storage(LocalStorage(str(tmp_path / "uploads"), "/uploads"))
+    monkeypatch.setattr("app.routes.auth.hash_password", lambda password: "hashed:" + password)
+    monkeypatch.setattr("app.routes.auth.verify_password", lambda password, hashed: hashed == "hashed:" + password)
+    monkeypatch.setattr("app.routes.password_routes.hash_password", lambda password: "hashed:" + password)
+    with SessionLocal() as db:
+        admin = User(name="Budget Admin", email="budget-admin@example.com", hashed_password="x", is_adman="admin")
+        patient = User(name="Budget Patient", email="budget-patient@example.com", hashed_password="hashed:secret")
+        spare = User(name="Budget Spare", email="budget-spare@example.com", hashed_password="x")
+        doctors = [Doctor(name=f"Budget {i}", specialty="General", fee="$100") for i in range(3)]
+        db.add_all([admin, patient, spare, *doctors])
+        db.flush()
+        db.add_all([
+            Appointment(user_id=patient.id, doctor_id=doctors[i % 3].id, date=date.today() + timedelta(days=i + 1),
+                        time=dtime(10, 0), reason="Checkup", status="confirmed", paid=True)
+            for i in range(APPOINTMENTS)
+        ])
+        db.commit()
+        ids = SimpleNamespace(admin=admin.id, patient=patient.id, spare=spare.id, doctors=[d.id for d in doctors])
+    client = TestClient(app)
+    yield client, ids, {
+        "admin": {"Authorization": "Bearer " + create_access_token({"sub": str(ids.admin)})},
+        "patient": {"Authorization": "Bearer " + create_access_token({"sub": str(ids.patient)})},
+    }
+    with SessionLocal() as db:
+        for model in (AppointmentReminder, Appointment, AppointmentStat, StatCounter, UploadBlob, Doctor):
+            db.query(model).delete()
+        db.query(User).filter(User.email.like("budget-%")).delete(synchronize_session=False)
+        db.commit()
+    set_storage(None)
+    set_shared_state(None)
+
+
+def check_budgets(query_log):
+    assert query_log, "no requests were recorded"
+    for method, path, stats in query_log:
+        try:
+            stats.assert_at_most(BUDGETS[(method, path)])
+        except AssertionError as e:
+            raise AssertionError(f"{method} {path}: {e}") from None
+
+
+def test_every_route_has_a_budget():
+    from main import app
+
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    assert routes == set(BUDGETS)
+
+
+def test_admin_routes(world, query_log):
+    client, ids, auth = world
+    for path in ("/admin/stats", "/admin/maintenance", "/admin/db-pool"):
+        assert client.get(path, headers=auth["admin"]).status_code == 200
+    check_budgets(query_log)
+
+
+def test_appointment_routes(world, query_log, monkeypatch):
+    client, ids, auth = world
+    monkeypatch.setattr("stripe.checkout.Session.create",
+                        lambda **params: SimpleNamespace(id="cs_budget", url="https://checkout.test/cs_budget"))
+    booking = {"doctor_id": ids.doctors[0], "date": (date.today() + timedelta(days=40)).isoformat(),
+               "time": "09:00:00", "reason": "Checkup"}
+    # The patient already has an appointment with every doctor; the spare user does not
+    spare = {"Authorization": "Bearer " + create_access_token({"sub": str(ids.spare)})}
+    assert client.post("/appointments/", json=booking, headers=spare).status_code == 200
+    assert client.post("/appointments/", json=booking, headers=auth["patient"]).status_code == 400
+    assert len(client.get("/appointments/", headers=auth["patient"]).json()) == APPOINTMENTS
+    assert len(client.get("/appointments/all", headers=auth["admin"]).json()) == APPOINTMENTS
+    appointment_id = client.get("/appointments/", headers=auth["patient"]).json()[0]["id"]
+    assert client.post(f"/appointments/{appointment_id}/cancel", headers=auth["patient"]).status_code == 200
+    check_budgets(query_log)
+
+
+def test_auth_and_password_routes(world, query_log, monkeypatch):
+    client, ids, auth = world
+    monkeypatch.setattr("app.routes.password_routes.send_email", lambda *args: True)
+    registered = client.post("/auth/register", json={"name": "Budget New", "email": "budget-new@example.com",
+                                                     "password": "secret"})
+    assert registered.status_code == 200
+    assert client.post("/auth/login", json={"email": "budget-patient@example.com", "password": "secret"}).status_code == 200
+    assert client.post("/password/forgot", json={"email": "budget-patient@example.com"}).status_code == 200
+    token = create_reset_token({"sub": str(ids.patient), "email": "budget-patient@example.com"})
+    assert client.post("/password/reset", json={"token": token, "new_password": "secret2"}).status_code == 200
+    check_budgets(query_log)
+
+
+def test_chatbot_route(world, query_log):
+    client, ids, auth = world
+    # Without an OpenAI key the agent fails fast and the route answers with an apology
+    assert client.post("/chatbot/", json={"message": "hello"}, headers=auth["patient"]).status_code == 200
+    check_budgets(query_log)
+
+
+def test_doctor_routes(world, query_log):
+    client, ids, auth = world
+    assert len(client.get("/doctors/").json()) == 3
+    assert client.get("/doctors/?sort=fee_asc").status_code == 200
+    assert client.get(f"/doctors/{ids.doctors[0]}").status_code == 200
+    created = client.post("/doctors/", data={"name": "Budget New", "specialty": "ENT", "fee": "$80"},
+                          headers=auth["admin"])
+    assert created.status_code == 200
+    doctor_id = created.json()["id"]
+    assert client.put(f"/doctors/{doctor_id}", json={"fee": "$90"}, headers=auth["admin"]).status_code == 200
+    assert client.delete(f"/doctors/{doctor_id}", headers=auth["admin"]).status_code == 200
+    rows = "name,specialty,fee\n" + "".join(f"Budget Bulk {i},General,$50\n" for i in range(20))
+    bulk = client.post("/doctors/bulk", files={"file": ("doctors.csv", rows, "text/csv")}, headers=auth["admin"])
+    assert bulk.status_code == 200
+    check_budgets(query_log)
+
+
+def test_upload_routes(world, query_log, monkeypatch):
+    client, ids, auth = world
+    # Derivatives are made in a worker process that does not see the test storage
+    monkeypatch.setattr("app.routes.file_upload.schedule_derivatives", lambda *args: None)
+    image = b"\x89PNG\r\n\x1a\n" + b"0" * 64
+    assert client.post("/upload/profile-image", files={"file": ("me.png", image, "image/png")},
+                       headers=auth["patient"]).status_code == 200
+    assert client.delete("/upload/profile-image", headers=auth["patient"]).status_code == 200
+    other = image + b"1"
+    presigned = client.post("/upload/presign", json={
+        "filename": "me.png", "content_type": "image/png", "size": len(other),
+        "sha256": hashlib.sha256(other).hexdigest()}, headers=auth["patient"]).json()
+    upload = presigned["upload"]
+    assert client.request(upload["method"], upload["url"], content=other, headers=upload["headers"]).status_code == 200
+    assert client.post("/upload/profile-image/complete", json={"key": presigned["key"]},
+                       headers=auth["patient"]).status_code == 200
+    check_budgets(query_log)
+
+
+def test_health_routes(world, query_log):
+    client, ids, auth = world
+    assert client.get("/").status_code == 200
+    assert client.get("/health/live").status_code == 200
+    client.get("/health/ready")
+    check_budgets(query_log)
+
+
+def test_payment_routes(world, query_log, monkeypatch):
+    client, ids, auth = world
+    secret = "whsec_budget"
+    monkeypatch.setattr("app.routes.payments.STRIPE_WEBHOOK_SECRET", secret)
+    monkeypatch.setattr("app.routes.payments.send_email", lambda *args, **kwargs: True, raising=False)
+    metadata = {"user_id": str(ids.spare), "user_name": "Budget Spare", "user_email": "budget-spare@example.com",
+                "doctor_id": str(ids.doctors[0]), "doctor_name": "Budget 0", "doctor_specialty": "General",
+                "date": (date.today() + timedelta(days=3)).isoformat(), "time": "11:00:00", "reason": "Checkup"}
+    payload = json.dumps({"id": "evt_budget", "object": "event", "type": "checkout.session.completed",
+                          "data": {"object": {"id": "cs_budget", "object": "checkout.session", "metadata": metadata}}}).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    assert client.post("/payments/webhook", content=payload,
+                       headers={"Stripe-Signature": f"t={timestamp},v1={signature}"}).status_code == 200
+    monkeypatch.setattr("stripe.checkout.Session.retrieve",
+                        lambda session_id: SimpleNamespace(id=session_id, payment_status="paid", metadata=metadata))
+    assert client.get("/payments/verify/cs_budget").status_code == 200
+    check_budgets(query_log)
+
+
+def test_user_routes(world, query_log):
+    client, ids, auth = world
+    assert len(client.get("/users/", headers=auth["admin"]).json()) >= 3
+    assert client.get("/users/me", headers=auth["patient"]).status_code == 200
+    assert client.put("/users/me", json={"phone_number": "555-0100"}, headers=auth["patient"]).status_code == 200
+    assert client.put(f"/users/{ids.spare}", json={"email": "budget-spare2@example.com"},
+                      headers=auth["admin"]).status_code == 200
+    # Refused while the patient has appointments; the spare user has none
+    assert client.delete(f"/users/{ids.patient}", headers=auth["admin"]).status_code == 400
+    assert client.delete(f"/users/{ids.spare}", headers=auth["admin"]).status_code == 200
+    check_budgets(query_log)
+
+
+def test_show_appointments_tool_does_not_query_per_appointment(world):
+    from agents import RunContextWrapper
+    from app.ai_agent.tools import show_appointments
+
+    client, ids, auth = world
+    with count_queries() as stats:
+        import asyncio
+        reply = asyncio.run(show_appointments.on_invoke_tool(RunContextWrapper(context={"user_id": ids.patient}), "{}"))
+    assert reply.count("Doctor: Dr. Budget") == APPOINTMENTS
+    stats.assert_at_most(2, max_repeats=1)
+
+
+def test_book_appointment_tool_parses_phrases(world, monkeypatch):
+    import asyncio
+    from agents import RunContextWrapper
+    from app.ai_agent.tools import book_appointment
+
+    client, ids, auth = world
+    sessions = []
+    monkeypatch.setattr("stripe.checkout.Session.create",
+                        lambda **params: sessions.append(params) or SimpleNamespace(url="https://checkout.test/cs"))
+    context = RunContextWrapper(context={"user_id": ids.spare})
+
+    def book(when, at):
+        arguments = json.dumps({"doctor_id": ids.doctors[0], "date": when, "time": at})
+        with count_queries() as stats:
+            reply = json.loads(asyncio.run(book_appointment.on_invoke_tool(context, arguments)))
+        return reply, stats
+
+    reply, stats = book("next friday", "2:30 pm")
+    assert reply["type"] == "payment_redirect"
+    assert reply["appointment_details"]["time"] == "14:30"
+    assert sessions[0]["metadata"]["time"] == "14:30:00"
+    assert date.fromisoformat(sessions[0]["metadata"]["date"]).weekday() == 4
+    stats.assert_at_most(3)
+    # The whole phrase in the date argument works too
+    assert book("tomorrow at 11:15am", "")[0]["type"] == "payment_redirect"
+    assert "Invalid Date" in book("someday", "2pm")[0]["message"]
+    assert "Missing Time" in book("tomorrow", "")[0]["message"]
+    monkeypatch.setattr("app.services.appointment_service.CLINIC_OPENS", 8 * 60)
+    assert "Slot Unavailable" in book("tomorrow", "7am")[0]["message"]
+
+
+def test_quick_book_tool_books_or_asks_one_question(world, monkeypatch):
+    import asyncio
+    from agents import RunContextWrapper
+    from app.ai_agent.tools import quick_book
+    from app.services.doctor_service import refresh_doctor_catalog
+
+    client, ids, auth = world
+    monkeypatch.setattr("stripe.checkout.Session.create", lambda **params: SimpleNamespace(url="https://checkout.test/cs"))
+    # Clinic hours as a deployment would set them (CLINIC_HOURS=08:00-18:00)
+    monkeypatch.setattr("app.services.appointment_service.CLINIC_OPENS", 8 * 60)
+    monkeypatch.setattr("app.services.appointment_service.CLINIC_CLOSES", 18 * 60)
+    tomorrow = date.today() + timedelta(days=1)
+    with SessionLocal() as db:
+        harper = Doctor(name="Quinn Harper", specialty="Dermatology", fee="120")
+        db.add(harper)
+        db.flush()
+        db.add(Appointment(user_id=ids.patient, doctor_id=harper.id, date=tomorrow, time=dtime(10, 0), status="booked"))
+        db.commit()
+        refresh_doctor_catalog(db)
+
+    def ask(request, user_id=ids.spare):
+        context = RunContextWrapper(context={"user_id": user_id})
+        with count_queries() as stats:
+            reply = json.loads(asyncio.run(quick_book.on_invoke_tool(context, json.dumps({"request": request}))))
+        return reply, stats
+
+    reply, stats = ask("Book Dr. Harper tomorrow at 2pm for a skin rash")
+    assert reply["type"] == "payment_redirect"
+    assert reply["appointment_details"] == {"doctor": "Quinn Harper", "specialty": "Dermatology",
+                                            "date": tomorrow.isoformat(), "time": "14:00", "fee": 120.0}
+    # The catalog is cached: slot, doctor and duplicate checks only
+    stats.assert_at_most(3)
+
+    assert "Which doctor would you like to see and which day and time?" in ask("I want to book an appointment")[0]["message"]
+    assert "Which day and time would you like to see Dr. Quinn Harper?" in ask("I'd like to see Dr. Harper")[0]["message"]
+    assert "Dr. Budget 0 (General)" in ask("a general practitioner tomorrow at 9am")[0]["message"]
+    asked = ask("a dermatologist tomorrow")[0]["message"]
+    assert asked.startswith("What time on") and "09:30, 10:30" in asked
+    refused = ask("Dr. Harper tomorrow at 10am")[0]["message"]
+    assert "already booked" in refused and "free at" in refused
+    assert "Duplicate Appointment" in ask("Dr. Harper next week at 3pm", user_id=ids.patient)[0]["message"]
+
+
+def test_statement_shapes_fold_literals_and_parameter_lists():
+    from app.utils.query_stats import statement_shape
+
+    assert statement_shape("SELECT * FROM doctors\n  WHERE id = 42 AND name = 'x'") == \
+        "SELECT * FROM doctors WHERE id = ? AND name = ?"
+    assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT * FROM users WHERE id IN (%(id_1)s, %(id_2)s)")
+
+
+def test_query_helpers_do_not_load_rows(world):
+    from app.services.query_service import column_value, count, exists
+
+    client, ids, auth = world
+    with SessionLocal() as db:
+        with count_queries() as stats:
+            assert exists(db, User.email == "budget-patient@example.com")
+            assert not exists(db, User.email == "nobody@example.com")
+            assert count(db, Appointment, Appointment.user_id == ids.patient) == APPOINTMENTS
+            assert count(db, Appointment, Appointment.user_id == ids.spare) == 0
+            assert column_value(db, User.name, User.id == ids.patient) == "Budget Patient"
+            assert column_value(db, User.name, User.id == -1) is None
+        assert stats.count == 6
+        assert not db.identity_map
+
+
+def test_refused_user_delete_counts_appointments_instead_of_loading_them(world, query_log):
+    client, ids, auth = world
+    response = client.delete(f"/users/{ids.patient}", headers=auth["admin"])
+
+    assert f"They have {APPOINTMENTS} appointment(s)" in response.json()["detail"]
+    (_, _, stats), = query_log
+    assert not any("appointments.reason" in statement for statement, _ in stats.statements)
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from app.ai_agent.session import SharedSession
+from app.database import Base, SessionLocal, engine
+from app.models.doctor import Doctor
+from app.services import doctor_service
+from app.shared_state import MemoryState, RedisState, set_shared_state
+
+
+@pytest.fixture(params=["memory", "redis"])
+def state(request):
+    if request.param == "memory":
+        return MemoryState()
+    return RedisState(request.getfixturevalue("redis_url"), prefix="test:")
+
+
+def test_basic_operations(state):
+    assert state.get("k") is None
+    assert state.set("k", b"v")
+    assert not state.set("k", b"other", only_if_absent=True)
+    assert state.get("k") == b"v"
+    assert state.incr("n") == 1
+    assert state.incr("n", 5) == 6
+    assert state.list_push("l", [b"a", b"b", b"c"]) == 3
+    assert state.list_range("l") == [b"a", b"b", b"c"]
+    assert state.list_range("l", -2, -1) == [b"b", b"c"]
+    assert state.list_pop("l") == b"c"
+    assert state.delete("k", "n", "l", "missing") == 3
+    assert state.get("n") is None
+
+
+def test_list_trim(state):
+    state.list_push("l", [b"a", b"b", b"c", b"d"])
+    state.list_trim("l", 1)
+    assert state.list_range("l") == [b"b", b"c", b"d"]
+    state.list_trim("l", -2)
+    assert state.list_range("l") == [b"c", b"d"]
+    state.list_trim("l", 5)
+    assert state.list_range("l") == []
+    state.list_trim("missing", 1)
+
+
+def test_keys_expire(state):
+    state.set("short", b"1", ttl=0.05)
+    state.incr("counter", ttl=0.05)
+    time.sleep(0.1)
+    assert state.get("short") is None
+    assert state.incr("counter") == 1
+
+
+def test_memory_state_evicts_least_recently_written_keys():
+    state = MemoryState(max_keys=100)
+    for i in range(1000):
+        state.set(f"k{i}", b"x")
+        state.set("hot", b"x")  # rewritten all the time, so never the oldest
+
+    assert len(state._data) <= 100
+    assert state.get("hot") == b"x" and state.get("k999") == b"x"
+    assert state.get("k0") is None
+
+
+def test_chat_session_is_shared_between_workers(redis_url):
+    first_worker = SharedSession("42", RedisState(redis_url))
+    second_worker = SharedSession("42", RedisState(redis_url))
+
+    async def conversation():
+        await first_worker.add_items([{"role": "user", "content": "Book Dr. Smith"}])
+        await second_worker.add_items([{"role": "assistant", "content": "Which day?"}])
+        assert [i["content"] for i in await first_worker.get_items()] == ["Book Dr. Smith", "Which day?"]
+        assert await second_worker.get_items(limit=1) == [{"role": "assistant", "content": "Which day?"}]
+        assert (await first_worker.pop_item())["content"] == "Which day?"
+        await second_worker.clear_session()
+        assert await first_worker.get_items() == []
+
+    asyncio.run(conversation())
+
+
+def test_doctor_catalog_follows_writes_from_other_workers():
+    state = MemoryState()
+    set_shared_state(state)
+    Base.metadata.create_all(engine)
+    try:
+        with SessionLocal() as db:
+            db.add(Doctor(name="First", specialty="General", fee="100"))
+            db.commit()
+            assert [d["name"] for d in doctor_service.get_doctor_catalog()] == ["First"]
+
+            # Another worker adds a doctor and bumps the shared version
+            db.add(Doctor(name="Second", specialty="General", fee="100"))
+            db.commit()
+            assert len(doctor_service.get_doctor_catalog()) == 1
+            state.incr(doctor_service.CATALOG_VERSION_KEY)
+            assert len(doctor_service.get_doctor_catalog()) == 2
+    finally:
+        with SessionLocal() as db:
+            db.query(Doctor).delete()
+            db.commit()
+        doctor_service._catalog = None
+        set_shared_state(None)
+
+
+def test_memory_backend_starts_without_loading_redis():
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('redis' in sys.modules)"],
+        cwd=root, env={**os.environ, "SHARED_STATE_BACKEND": "memory"}, capture_output=True, text=True, check=True,
+    ).stdout.split()[-1]
+    assert loaded == "False"
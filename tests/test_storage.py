@@ -0,0 +1,275 @@
+import hashlib
+import io
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models import UploadBlob
+from app.services.upload_service import (
+    collect_garbage, complete_upload, grant_upload, register_upload, release_upload, retain_upload, store_upload,
+    verify_upload,
+)
+from app.storage import LocalStorage, S3Storage, set_storage
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    storage = LocalStorage(str(tmp_path / "uploads"), "/uploads")
+    set_storage(storage)
+    yield storage
+    set_storage(None)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    yield session
+    session.query(UploadBlob).delete()
+    session.commit()
+    session.close()
+
+
+def test_local_storage_roundtrip(local_storage):
+    local_storage.save("doctor_images/ab/cd/x.jpg", io.BytesIO(b"image"), "image/jpeg")
+
+    assert local_storage.exists("doctor_images/ab/cd/x.jpg")
+    assert local_storage.size("doctor_images/ab/cd/x.jpg") == 5
+    assert local_storage.url("doctor_images/ab/cd/x.jpg") == "/uploads/doctor_images/ab/cd/x.jpg"
+    assert local_storage.key_for_url("/uploads/doctor_images/ab/cd/x.jpg") == "doctor_images/ab/cd/x.jpg"
+    assert local_storage.key_for_url("https://example.com/x.jpg") is None
+
+    local_storage.delete("doctor_images/ab/cd/x.jpg")
+    local_storage.delete("doctor_images/ab/cd/x.jpg")
+    assert not local_storage.exists("doctor_images/ab/cd/x.jpg")
+
+
+def test_local_storage_rejects_keys_outside_root(local_storage):
+    with pytest.raises(ValueError):
+        local_storage.save("../escape.txt", io.BytesIO(b"x"))
+
+
+def test_identical_uploads_share_one_blob_and_are_collected(local_storage, db):
+    first = store_upload(db, io.BytesIO(b"same avatar"), "patient_profile_image", ".png")
+    second = store_upload(db, io.BytesIO(b"same avatar"), "patient_profile_image", ".png")
+    assert first == second
+    retain_upload(db, first)
+    retain_upload(db, second)
+    db.commit()
+
+    blob = db.query(UploadBlob).one()
+    assert blob.ref_count == 2
+    key = blob.path
+    assert collect_garbage(db, grace_seconds=0)["deleted"] == 0
+
+    release_upload(db, first)
+    release_upload(db, second)
+    db.commit()
+    assert collect_garbage(db, grace_seconds=0) == {"deleted": 1, "bytes_freed": len(b"same avatar")}
+    assert not local_storage.exists(key)
+
+
+def test_direct_uploads_complete_only_for_their_uploader_and_content(local_storage, db):
+    image = b"\x89PNG direct upload"
+    key = register_upload(db, "patient_profile_image", hashlib.sha256(image).hexdigest(), ".png", len(image))
+    local_storage.save(key, io.BytesIO(image))
+    grant_upload(1, key, 60)
+
+    # Keys follow from the content, so another user who knows it has still not uploaded it
+    assert complete_upload(db, 2, key, "patient_profile_image") is None
+    assert complete_upload(db, 1, key, "doctor_images") is None
+    assert complete_upload(db, 1, key, "patient_profile_image").path == key
+    assert complete_upload(db, 1, key, "patient_profile_image") is None
+
+    # Same size, different bytes
+    local_storage.save(key, io.BytesIO(image.replace(b"PNG", b"GIF")))
+    grant_upload(1, key, 60)
+    assert complete_upload(db, 1, key, "patient_profile_image") is None
+    assert verify_upload(db, "doctor_images/ab/cd/unknown.png", "doctor_images") is None
+
+
+@pytest.fixture
+def s3_stand_in():
+    """An in-process S3-compatible server, standing in for MinIO."""
+    pytest.importorskip("boto3")
+    server_module = pytest.importorskip("moto.server")
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    storage = S3Storage("uploads", endpoint_url=f"http://{host}:{port}", access_key_id="test", secret_access_key="test")
+    storage.client.create_bucket(Bucket="uploads")
+    yield storage
+    server.stop()
+
+
+def test_s3_storage_streams_multipart_uploads(s3_stand_in):
+    data = b"x" * (20 * 1024 * 1024)  # above the multipart threshold
+    s3_stand_in.save("doctor_images/big.jpg", io.BytesIO(data), "image/jpeg")
+
+    assert s3_stand_in.size("doctor_images/big.jpg") == len(data)
+    with s3_stand_in.open("doctor_images/big.jpg") as body:
+        assert hashlib.sha256(body.read()).digest() == hashlib.sha256(data).digest()
+    assert s3_stand_in.url("doctor_images/big.jpg").endswith("/uploads/doctor_images/big.jpg")
+
+    s3_stand_in.delete("doctor_images/big.jpg")
+    assert not s3_stand_in.exists("doctor_images/big.jpg")
+
+
+def test_s3_presigned_upload_goes_directly_to_storage(s3_stand_in):
+    httpx = pytest.importorskip("httpx")
+    body = b"avatar bytes"
+    sha256 = hashlib.sha256(body).hexdigest()
+
+    upload = s3_stand_in.presign_upload("patient_profile_image/a.png", "image/png", len(body), sha256, 60)
+    # Length and checksum are signed, so storage rejects any other body
+    assert "content-length" in upload["url"] and "x-amz-checksum-sha256" in upload["url"]
+
+    response = httpx.request(upload["method"], upload["url"], content=body, headers=upload["headers"])
+    assert response.status_code == 200
+    assert s3_stand_in.size("patient_profile_image/a.png") == len(body)
+
+
+def test_admin_tool_deletes_release_their_uploads(local_storage, db):
+    import asyncio
+    from agents import RunContextWrapper
+    from app.ai_agent.tools import delete_doctor, delete_user
+    from app.models import Doctor, User
+    from app.shared_state import MemoryState, set_shared_state
+
+    set_shared_state(MemoryState())
+    avatar = store_upload(db, io.BytesIO(b"tool avatar"), "patient_profile_image", ".png")
+    photo = store_upload(db, io.BytesIO(b"tool photo"), "doctor_images", ".png")
+    admin = User(name="Upload Admin", email="upload-admin@example.com", hashed_password="x", is_adman="admin")
+    patient = User(name="Upload Patient", email="upload-patient@example.com", hashed_password="x", image_url=avatar)
+    db.add_all([admin, patient, Doctor(name="Upload Doctor", specialty="General", fee="100", image_url=photo)])
+    retain_upload(db, avatar)
+    retain_upload(db, photo)
+    db.commit()
+
+    context = RunContextWrapper(context={"user_id": admin.id})
+    asyncio.run(delete_user.on_invoke_tool(context, '{"user_name": "Upload Patient"}'))
+    asyncio.run(delete_doctor.on_invoke_tool(context, '{"doctor_name": "Upload Doctor"}'))
+    db.expire_all()
+    assert [blob.ref_count for blob in db.query(UploadBlob)] == [0, 0]
+    assert collect_garbage(db, grace_seconds=0)["deleted"] == 2
+
+    db.delete(admin)
+    db.commit()
+    set_shared_state(None)
+
+
+def test_upload_etags_are_hashed_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.utils import static_files
+
+    (tmp_path / "photo.jpg").write_bytes(b"pixels" * 1000)
+    hashed_on = []
+    original = static_files._content_etag
+
+    def recording(*args):
+        misses = original.cache_info().misses
+        etag = original(*args)
+        if original.cache_info().misses > misses:
+            try:
+                asyncio.get_running_loop()
+                hashed_on.append("event loop")
+            except RuntimeError:
+                hashed_on.append("worker thread")
+        return etag
+
+    monkeypatch.setattr(static_files, "_content_etag", recording)
+    app = FastAPI()
+    app.mount("/uploads", static_files.UploadStaticFiles(directory=str(tmp_path)))
+    with TestClient(app) as client:
+        response = client.get("/uploads/photo.jpg")
+        assert response.status_code == 200
+        assert client.get("/uploads/photo.jpg", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    assert hashed_on == ["worker thread"]
+
+
+def test_upload_routes_that_touch_storage_run_in_the_threadpool():
+    import inspect
+    from app.routes import file_upload
+
+    # S3 round trips and hashing would otherwise stall the event loop
+    for route in (file_upload.upload_profile_image, file_upload.delete_profile_image,
+                  file_upload.complete_profile_image_upload):
+        assert not inspect.iscoroutinefunction(route)
+
+
+def test_local_backend_starts_without_loading_boto3():
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('boto3' in sys.modules)"],
+        cwd=root, env={**os.environ, "STORAGE_BACKEND": "local"}, capture_output=True, text=True, check=True,
+    ).stdout.split()[-1]
+    assert loaded == "False"
+
+
+def test_derivatives_are_made_once_next_to_the_upload(local_storage):
+    Image = pytest.importorskip("PIL.Image")
+    from app.utils.image_derivatives import derive_stored_image
+
+    original = io.BytesIO()
+    Image.new("P", (2000, 1000)).save(original, format="PNG")
+    original.seek(0)
+    local_storage.save("doctor_images/ab/cd/x.png", original, "image/png")
+
+    keys = derive_stored_image("doctor_images/ab/cd/x.png")
+    assert keys == {"thumbnail": "doctor_images/ab/cd/derived/x_thumb.webp",
+                    "webp": "doctor_images/ab/cd/derived/x.webp"}
+    with Image.open(local_storage.local_path(keys["thumbnail"])) as thumbnail:
+        assert (thumbnail.format, thumbnail.size) == ("WEBP", (256, 256))
+    with Image.open(local_storage.local_path(keys["webp"])) as webp:
+        assert (webp.format, webp.size) == ("WEBP", (1600, 800))
+
+    made = local_storage.local_path(keys["webp"]).stat().st_mtime_ns
+    derive_stored_image("doctor_images/ab/cd/x.png")
+    assert local_storage.local_path(keys["webp"]).stat().st_mtime_ns == made
+
+
+def test_derivatives_of_remote_uploads_are_uploaded_back(s3_stand_in):
+    Image = pytest.importorskip("PIL.Image")
+    from app.utils.image_derivatives import derive_stored_image
+
+    original = io.BytesIO()
+    Image.new("RGB", (300, 600)).save(original, format="JPEG")
+    original.seek(0)
+    s3_stand_in.save("patient_profile_image/me.jpg", original, "image/jpeg")
+    set_storage(s3_stand_in)
+    try:
+        keys = derive_stored_image("patient_profile_image/me.jpg")
+    finally:
+        set_storage(None)
+
+    assert all(s3_stand_in.exists(key) for key in keys.values())
+    with s3_stand_in.open(keys["thumbnail"]) as body, Image.open(io.BytesIO(body.read())) as thumbnail:
+        assert thumbnail.size == (256, 256)
+
+
+def test_derivative_urls_are_saved_only_while_the_image_is_current(local_storage, db):
+    from app.models import Doctor
+    from app.services.image_service import save_derivative_urls, schedule_derivatives
+
+    doctor = Doctor(name="Derived", specialty="General", fee="$100", image_url="/uploads/doctor_images/new.png")
+    db.add(doctor)
+    db.commit()
+    derived = {"thumbnail": "doctor_images/derived/new_thumb.webp", "webp": "doctor_images/derived/new.webp"}
+    try:
+        # The doctor changed their image before the worker finished
+        assert not save_derivative_urls("doctor", doctor.id, "/uploads/doctor_images/old.png", derived)
+        assert save_derivative_urls("doctor", doctor.id, "/uploads/doctor_images/new.png", derived)
+        db.refresh(doctor)
+        assert doctor.thumbnail_url == "/uploads/doctor_images/derived/new_thumb.webp"
+        assert doctor.webp_url == "/uploads/doctor_images/derived/new.webp"
+        # Images stored elsewhere are served as they are
+        assert schedule_derivatives("doctor", doctor.id, "https://example.com/x.png") is None
+    finally:
+        db.delete(doctor)
+        db.commit()